@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# 1.개요 : 벤치마크용 tshark 대역 - USB 장치/Wireshark 없이 tshark와 같은 형태의 출력을 지정한 속도로 생성
+# 2.특징 :
+## 1) tshark -D : USBPcap 인터페이스 목록 출력
+## 2) tshark -i IFACE -w - ... : USBPcap(LINKTYPE 249) pcapng를 표준 출력으로 기록
+## 3) tshark -i IFACE -T fields -e ... : UsbSniffService._build_fields_cmd()와 같은 순서의 탭 구분 텍스트 출력
+## 4) 패킷 속도/페이로드 크기/방향 비율/개수는 서비스가 명령줄을 직접 만들기 때문에 환경 변수로 지정한다.
+### - FAKE_TSHARK_RATE (초당 패킷 수, 기본 10000), FAKE_TSHARK_PAYLOAD (바이트, 기본 64)
+### - FAKE_TSHARK_TX_RATIO (OUT 방향 비율 0~1, 기본 0.5), FAKE_TSHARK_COUNT (총 패킷 수, 기본 무제한)
+# 3.사용법 :
+## 1) UsbSniffService().tshark_path = "bench/fake_tshark.py" (실행 권한 필요)
+## 2) FAKE_TSHARK_RATE=50000 bench/fake_tshark.py -i USBPcap1 -w - > out.pcapng
+
+import os
+import random
+import struct
+import sys
+import time
+
+LINKTYPE_USBPCAP = 249
+# USBPcap 의사 헤더: headerLen, irpId, status, function, info, bus, device, endpoint, transfer, dataLength
+USBPCAP_HEADER = struct.Struct('<HQIHBHHBBI')
+EPB_HEADER = struct.Struct('<IIIIIII')   # type, length, interface, ts_high, ts_low, cap_len, orig_len
+TRANSFER_BULK = 3
+URB_FUNCTION_BULK = 9
+
+INTERFACES = ["USBPcap1", "USBPcap2", "USBPcap3"]
+# 출력 간격(초): 이 주기마다 밀린 패킷을 한 번에 기록
+TICK = 0.005
+POOL_SIZE = 1024
+
+
+def _pad4(data):
+    return data + b'\0' * (-len(data) % 4)
+
+
+def _block(block_type, body):
+    body = _pad4(body)
+    length = 12 + len(body)
+    return struct.pack('<II', block_type, length) + body + struct.pack('<I', length)
+
+
+def _make_payloads(payload_size, tx_ratio):
+    """(endpoint, payload) 풀. 방향 비율대로 OUT(0x02)/IN(0x81) 엔드포인트를 섞는다."""
+    rng = random.Random(1234)
+    pool = []
+    for i in range(POOL_SIZE):
+        endpoint = 0x02 if rng.random() < tx_ratio else 0x81
+        text = f"AT+BENCH={i:06d},".encode() + bytes(rng.randrange(32, 127) for _ in range(payload_size))
+        pool.append((endpoint, text[:payload_size]))
+    return pool
+
+
+def _pcapng_header():
+    shb = _block(0x0A0D0D0A, struct.pack('<IHHq', 0x1A2B3C4D, 1, 0, -1))
+    # if_tsresol 기본값(마이크로초)을 그대로 사용
+    idb = _block(0x00000001, struct.pack('<HHI', LINKTYPE_USBPCAP, 0, 65535))
+    return shb + idb
+
+
+def _pcapng_records(pool):
+    """(EPB 앞부분(타임스탬프 자리 포함), 나머지) 쌍. 타임스탬프만 패킷마다 채운다."""
+    records = []
+    for irp_id, (endpoint, payload) in enumerate(pool):
+        info = 1 if endpoint & 0x80 else 0
+        frame = USBPCAP_HEADER.pack(USBPCAP_HEADER.size, irp_id, 0, URB_FUNCTION_BULK, info,
+                                    1, 3, endpoint, TRANSFER_BULK, len(payload)) + payload
+        body = _pad4(frame)
+        length = 28 + len(body) + 4
+        records.append((length, len(frame), body + struct.pack('<I', length)))
+    return records
+
+
+def _fields_lines(pool):
+    lines = []
+    for irp_id, (endpoint, payload) in enumerate(pool):
+        direction = 1 if endpoint & 0x80 else 0
+        info = "URB_BULK in" if direction else "URB_BULK out"
+        capdata = payload.hex(':')
+        lines.append((f"\t{USBPCAP_HEADER.size + len(payload)}\tUSB\t{info}\t{direction}\t0x{endpoint:02x}\t1\t3\t0x{TRANSFER_BULK:02x}\t{capdata}\t\t\t0x00000000\t0x{irp_id:016x}\t{direction}\n"))
+    return lines
+
+
+def _write_pcapng(out, pool, rate, count):
+    records = _pcapng_records(pool)
+    out.write(_pcapng_header())
+    out.flush()
+    for chunk_start, n in _paced(rate, count):
+        parts = []
+        now_us = int(time.time() * 1e6)
+        for i in range(chunk_start, chunk_start + n):
+            length, cap_len, tail = records[i % POOL_SIZE]
+            parts.append(EPB_HEADER.pack(6, length, 0, now_us >> 32, now_us & 0xFFFFFFFF, cap_len, cap_len))
+            parts.append(tail)
+        out.write(b''.join(parts))
+        out.flush()
+
+
+def _write_fields(out, pool, rate, count):
+    lines = _fields_lines(pool)
+    for chunk_start, n in _paced(rate, count):
+        frame_time = f"{time.time():.9f}"
+        out.write(''.join(frame_time + lines[i % POOL_SIZE] for i in range(chunk_start, chunk_start + n)).encode())
+        out.flush()
+
+
+def _paced(rate, count):
+    """TICK마다 (시작 번호, 개수)를 반환하여 평균 rate 패킷/초를 맞춘다."""
+    started = time.monotonic()
+    sent = 0
+    while count is None or sent < count:
+        due = int((time.monotonic() - started) * rate)
+        if count is not None:
+            due = min(due, count)
+        if due > sent:
+            yield sent, due - sent
+            sent = due
+        time.sleep(TICK)
+
+
+def main(argv):
+    if '-D' in argv:
+        for i, name in enumerate(INTERFACES, 1):
+            print(f"{i}. \\\\.\\{name} ({name})")
+        return 0
+
+    rate = float(os.environ.get('FAKE_TSHARK_RATE', 10000))
+    payload_size = int(os.environ.get('FAKE_TSHARK_PAYLOAD', 64))
+    tx_ratio = float(os.environ.get('FAKE_TSHARK_TX_RATIO', 0.5))
+    count = int(os.environ['FAKE_TSHARK_COUNT']) if os.environ.get('FAKE_TSHARK_COUNT') else None
+
+    pool = _make_payloads(payload_size, tx_ratio)
+    out = sys.stdout.buffer
+    sys.stderr.write("Capturing on 'fake'\n")
+    try:
+        if '-T' in argv:
+            _write_fields(out, pool, rate, count)
+        else:
+            _write_pcapng(out, pool, rate, count)
+    except (BrokenPipeError, KeyboardInterrupt):
+        # 캡처 중지로 파이프가 닫힘
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,242 @@
+# 1.개요 : 캡처 파이프라인 종단간(tshark 출력 → 파싱 → 콘솔 큐 → 화면 반영) 벤치마크
+# 2.특징 :
+## 1) tshark 대신 bench/fake_tshark.py를 실행하므로 USB 장치/Wireshark 없는 리눅스에서도 동작한다.
+## 2) 실제 UsbSniffService + 오프스크린 ConsoleWidget(QT_QPA_PLATFORM=offscreen)을 그대로 구동한다.
+## 3) 패킷 속도를 단계적으로 올리며 각 단계마다 측정한다.
+### - 달성 속도(pkt/s), 큐 깊이 증가율, 드롭/생략 수, 추가~화면 반영 지연 p50/p99, 최대 RSS, 10k 패킷당 CPU 시간
+### - 큐가 늘지 않고 드롭 없이 목표 속도의 90% 이상을 처리한 가장 높은 속도 = max_sustained_pps
+## 4) 결과는 커밋 해시와 함께 JSON으로 저장하고, --compare로 두 결과를 비교할 수 있다.
+# 3.사용법 :
+## 1) python -m bench.run_bench --mode pcap --rates 5000,20000,50000 --duration 5
+## 2) python -m bench.run_bench --compare bench/results/old.json bench/results/new.json
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QEventLoop, QTimer
+
+from core.metrics import metrics
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FAKE_TSHARK = os.path.join(BENCH_DIR, 'fake_tshark.py')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+# 큐 깊이 표본 간격(ms)
+SAMPLE_MS = 100
+# 캡처 중지 후 큐에 남은 메세지를 화면에 반영할 때까지 기다리는 최대 시간(초)
+DRAIN_TIMEOUT = 10.0
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=BENCH_DIR)
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _reset_peak_rss():
+    # 리눅스: clear_refs에 5를 쓰면 최대 RSS(VmHWM)가 현재 값으로 초기화됨
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def _peak_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _slope(samples):
+    """(시간, 값) 표본의 최소제곱 기울기 (값/초)."""
+    if len(samples) < 2:
+        return 0.0
+    n = len(samples)
+    mean_t = sum(t for t, _ in samples) / n
+    mean_v = sum(v for _, v in samples) / n
+    var_t = sum((t - mean_t) ** 2 for t, _ in samples)
+    if not var_t:
+        return 0.0
+    return sum((t - mean_t) * (v - mean_v) for t, v in samples) / var_t
+
+
+def _run_event_loop(seconds, on_sample=None):
+    loop = QEventLoop()
+    sampler = QTimer()
+    if on_sample is not None:
+        sampler.timeout.connect(on_sample)
+        sampler.start(SAMPLE_MS)
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec()
+    sampler.stop()
+
+
+def run_rate(service, console, mode, rate, duration, payload, tx_ratio):
+    from core.usb_sniff_service import CaptureMode
+
+    os.environ['FAKE_TSHARK_RATE'] = str(rate)
+    os.environ['FAKE_TSHARK_PAYLOAD'] = str(payload)
+    os.environ['FAKE_TSHARK_TX_RATIO'] = str(tx_ratio)
+    os.environ.pop('FAKE_TSHARK_COUNT', None)
+
+    console.clear_message()
+    console.msg_queue.dropped_total = 0
+    console.msg_queue.suppressed_total = 0
+    metrics.reset()
+    _reset_peak_rss()
+
+    depth_samples = []
+    started = time.monotonic()
+    cpu_started = time.process_time()
+
+    def sample():
+        depth_samples.append((time.monotonic() - started, console.msg_queue.qsize()))
+
+    service.start_capture('USBPcap1', capture_mode=CaptureMode[mode.upper()])
+    _run_event_loop(duration, sample)
+    captured = metrics.get('capture.packets').value
+    elapsed = time.monotonic() - started
+
+    service.stop_capture()
+    if service.capture_thread is not None:
+        service.capture_thread.join(5)
+
+    # 남은 메세지까지 화면에 반영되어야 지연 분포가 완성됨
+    drain_deadline = time.monotonic() + DRAIN_TIMEOUT
+    while not console.msg_queue.empty() and time.monotonic() < drain_deadline:
+        _run_event_loop(0.05)
+    cpu_seconds = time.process_time() - cpu_started
+
+    snapshot = metrics.snapshot()
+    latency = snapshot.get('console.latency_ms', {})
+    tick = snapshot.get('console.tick_ms', {})
+    achieved = captured / elapsed if elapsed else 0.0
+    # 앞쪽 절반은 시작 과도 구간이므로 뒤쪽 절반의 큐 깊이 기울기로 판단
+    growth = _slope(depth_samples[len(depth_samples) // 2:])
+    dropped = console.msg_queue.dropped_total + console.msg_queue.suppressed_total
+    sustained = achieved >= 0.9 * rate and growth < 0.05 * rate and dropped == 0
+
+    return {
+        'target_pps': rate,
+        'achieved_pps': round(achieved, 1),
+        'captured': captured,
+        'queue_growth_per_s': round(growth, 1),
+        'queue_depth_max': max((depth for _, depth in depth_samples), default=0),
+        'dropped': dropped,
+        'latency_p50_ms': round(latency.get('p50', 0.0), 2),
+        'latency_p99_ms': round(latency.get('p99', 0.0), 2),
+        'tick_p99_ms': round(tick.get('p99', 0.0), 2),
+        'parse_us_per_packet': round(snapshot.get('capture.parse_us_per_packet', {}).get('mean', 0.0), 3),
+        'peak_rss_mb': round(_peak_rss_mb(), 1),
+        'cpu_ms_per_10k': round(cpu_seconds * 1000.0 * 10000 / captured, 2) if captured else None,
+        'sustained': sustained,
+    }
+
+
+def run(args):
+    from ui.components.console_widget import ConsoleWidget
+    from core.usb_sniff_service import UsbSniffService
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    console = ConsoleWidget()
+    service = UsbSniffService()
+    service.tshark_path = args.tshark
+    service.set_console_widget(console)
+
+    rates = [int(rate) for rate in args.rates.split(',')]
+    runs = []
+    for rate in rates:
+        result = run_rate(service, console, args.mode, rate, args.duration, args.payload, args.tx_ratio)
+        runs.append(result)
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+        if not result['sustained'] and not args.keep_going:
+            break
+
+    sustained = [result['achieved_pps'] for result in runs if result['sustained']]
+    report = {
+        'commit': _git_commit(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'params': {
+            'mode': args.mode,
+            'duration': args.duration,
+            'payload': args.payload,
+            'tx_ratio': args.tx_ratio,
+            'rates': rates,
+        },
+        'max_sustained_pps': max(sustained, default=0),
+        'runs': runs,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['commit'] or 'local'}_{args.mode}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"max_sustained_pps={report['max_sustained_pps']} -> {output}")
+    del app
+    return report
+
+
+def compare(old_path, new_path):
+    """두 결과 파일의 같은 목표 속도끼리 주요 지표를 비교해 출력합니다."""
+    with open(old_path, encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)
+
+    print(f"max_sustained_pps: {old['max_sustained_pps']} ({old['commit']}) -> {new['max_sustained_pps']} ({new['commit']})")
+    old_runs = {run['target_pps']: run for run in old['runs']}
+    keys = ('achieved_pps', 'latency_p50_ms', 'latency_p99_ms', 'peak_rss_mb', 'cpu_ms_per_10k')
+    for new_run in new['runs']:
+        old_run = old_runs.get(new_run['target_pps'])
+        if old_run is None:
+            continue
+        changes = []
+        for key in keys:
+            before, after = old_run.get(key), new_run.get(key)
+            if before and after is not None:
+                changes.append(f"{key} {before} -> {after} ({(after - before) / before * 100:+.1f}%)")
+        print(f"[{new_run['target_pps']} pps] " + ", ".join(changes))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="USB 캡처 파이프라인 종단간 벤치마크")
+    parser.add_argument('--mode', choices=['pcap', 'fields'], default='pcap')
+    parser.add_argument('--rates', default='5000,10000,20000,50000,100000', help="쉼표로 구분한 목표 패킷 속도 목록")
+    parser.add_argument('--duration', type=float, default=5.0, help="속도 단계별 측정 시간(초)")
+    parser.add_argument('--payload', type=int, default=64, help="패킷 페이로드 크기(바이트)")
+    parser.add_argument('--tx-ratio', type=float, default=0.5, help="OUT(TX) 방향 패킷 비율")
+    parser.add_argument('--tshark', default=FAKE_TSHARK, help="tshark 대역 실행 파일 경로")
+    parser.add_argument('--keep-going', action='store_true', help="처리하지 못한 속도 이후 단계도 계속 측정")
+    parser.add_argument('--output', help="결과 JSON 경로 (기본: bench/results/<커밋>_<모드>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="두 결과 JSON 비교")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+    run(args)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
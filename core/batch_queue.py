@@ -0,0 +1,137 @@
+# 1.개요 : 캡처 쓰레드(생산자)와 UI 쓰레드(소비자) 사이의 용량 제한 배치 큐
+# 2.특징 :
+## 1) 생산자는 put_many()로 여러 항목을 한 번에(청크 단위로) 넣는다. 락은 청크당 한 번만 잡는다.
+## 2) 절대로 생산자를 블로킹하지 않는다. 용량을 넘으면 OverflowPolicy에 따라 버리거나 요약한다.
+## 3) 버려진/요약된 항목 수를 누적 카운터로 제공한다. (dropped_total, suppressed_total)
+# 3.사용법 :
+## 1) BoundedBatchQueue(capacity, policy, summary_factory)로 생성
+## 2) 생산자: put_many(items) / put(item)
+## 3) 소비자: get_batch(max_items)로 최대 max_items개를 꺼낸다.
+
+import threading
+from collections import deque
+from enum import Enum
+
+
+class OverflowPolicy(Enum):
+    DROP_OLDEST = "DROP_OLDEST"   # 큐에 쌓인 가장 오래된 항목부터 버림
+    DROP_NEWEST = "DROP_NEWEST"   # 새로 들어온 항목을 버림
+    COALESCE = "COALESCE"         # 새 항목을 버리고 "N개 생략" 요약 항목 하나로 대체
+
+
+class BoundedBatchQueue:
+    def __init__(self, capacity=200000, policy=OverflowPolicy.COALESCE, summary_factory=None):
+        self.capacity = capacity
+        self.policy = policy
+        # COALESCE 정책에서 생략된 개수를 받아 요약 항목을 만드는 함수
+        self.summary_factory = summary_factory
+
+        self._lock = threading.Lock()
+        self._chunks = deque()
+        self._front_pos = 0          # 첫 번째 청크에서 이미 꺼낸 항목 수
+        self._size = 0
+        self._suppressed_run = 0     # 아직 요약 항목으로 내보내지 않은 생략 개수
+
+        self.dropped_total = 0
+        self.suppressed_total = 0
+
+    def qsize(self):
+        return self._size
+
+    def empty(self):
+        return self._size == 0
+
+    def put(self, item):
+        self.put_many([item])
+
+    def put_many(self, items):
+        """항목 목록을 하나의 청크로 추가합니다. 블로킹하지 않으며 넘치는 분은 정책에 따라 처리합니다."""
+        if not items:
+            return
+        with self._lock:
+            if self._suppressed_run and self._size < self.capacity:
+                # 여유가 생기면 생략 구간을 요약 항목으로 먼저 내보냄
+                self._append_summary()
+
+            space = self.capacity - self._size
+            if len(items) <= space:
+                self._append_chunk(items)
+                return
+
+            if self.policy == OverflowPolicy.DROP_OLDEST:
+                if len(items) > self.capacity:
+                    self.dropped_total += len(items) - self.capacity
+                    items = items[-self.capacity:]
+                self._discard_front(len(items) - space)
+                self._append_chunk(items)
+                return
+
+            overflow = len(items) - space
+            if space > 0:
+                self._append_chunk(items[:space])
+            if self.policy == OverflowPolicy.COALESCE:
+                self._suppressed_run += overflow
+                self.suppressed_total += overflow
+            else:
+                self.dropped_total += overflow
+
+    def get_batch(self, max_items):
+        """최대 max_items개의 항목을 순서대로 꺼냅니다."""
+        batch = []
+        with self._lock:
+            while self._chunks and len(batch) < max_items:
+                chunk = self._chunks[0]
+                take = min(len(chunk) - self._front_pos, max_items - len(batch))
+                if self._front_pos == 0 and take == len(chunk):
+                    batch.extend(chunk)
+                    self._chunks.popleft()
+                else:
+                    batch.extend(chunk[self._front_pos:self._front_pos + take])
+                    self._front_pos += take
+                    if self._front_pos == len(chunk):
+                        self._chunks.popleft()
+                        self._front_pos = 0
+                self._size -= take
+
+            if not self._chunks and self._suppressed_run and len(batch) < max_items:
+                # 큐를 다 비웠는데 생략 구간이 남아 있으면 요약 항목으로 마무리
+                if self._append_summary():
+                    batch.extend(self._chunks.popleft())
+                    self._size = 0
+        return batch
+
+    def clear(self):
+        with self._lock:
+            self._chunks.clear()
+            self._front_pos = 0
+            self._size = 0
+            self._suppressed_run = 0
+
+    # ------------------ 내부 처리 (락 보유 상태에서 호출) ------------------
+
+    def _append_chunk(self, items):
+        self._chunks.append(items if isinstance(items, list) else list(items))
+        self._size += len(items)
+
+    def _append_summary(self):
+        """생략 구간을 요약 항목으로 추가합니다. summary_factory가 없으면 개수만 비우고 False를 반환합니다."""
+        count, self._suppressed_run = self._suppressed_run, 0
+        if self.summary_factory is None:
+            return False
+        self._chunks.append([self.summary_factory(count)])
+        self._size += 1
+        return True
+
+    def _discard_front(self, count):
+        self.dropped_total += count
+        self._size -= count
+        while count > 0:
+            chunk = self._chunks[0]
+            available = len(chunk) - self._front_pos
+            if available <= count:
+                self._chunks.popleft()
+                self._front_pos = 0
+                count -= available
+            else:
+                self._front_pos += count
+                count = 0
@@ -0,0 +1,183 @@
+# 1.개요 : Qt 없이 실행하는 헤드리스 캡처 진입점 (무인 모니터링 장비/데몬용)
+# 2.특징 :
+## 1) GUI와 같은 UsbSniffService 캡처/파싱 파이프라인을 그대로 사용하고, 출력만 core.sinks의 싱크로 보낸다.
+## 2) PySide6/qfluentwidgets를 임포트하지 않으며, 검색 UI가 없으므로 페이로드 검색 인덱스도 만들지 않는다.
+## 3) SIGINT/SIGTERM(Ctrl+C) 또는 --duration 경과 시 캡처를 멈추고 싱크에 남은 메세지를 모두 기록한 뒤 종료한다.
+### - 종료 코드: 0 정상, 1 캡처 시작/재생 실패 또는 tshark 에러, 2 옵션 오류
+# 3.사용법 :
+## 1) python -m core.capture --list
+## 2) python -m core.capture --iface USBPcap1 --filter serial --out session/
+## 3) python -m core.capture --iface USBPcap1 --iface USBPcap2 --socket tcp:127.0.0.1:5555 --format jsonl
+## 4) python -m core.capture --read capture.pcapng --packet-filter 'dir == in and len > 0'
+## 5) python -m core.capture --iface USBPcap1 --trigger ERROR --trigger 0d:0a:ff --trigger-when 'dir == in' --post-seconds 5
+## 6) python -m core.capture --read capture.pcapng --latency-report --latency-threshold 50 (종료 시 지연 분포 표를 stderr로 출력)
+
+import argparse
+import signal
+import sys
+import threading
+import time
+
+from core.sinks import FORMATTERS, FanoutSink, RotatingFileSink, SocketSink, StdoutSink
+from core.stream_reassembler import DelimiterFramer, LengthPrefixFramer, IdleGapFramer
+from core.usb_sniff_service import UsbSniffService, UsbFilter, CaptureMode
+from core.trigger import TriggerEngine, Trigger
+from core.latency_analyzer import format_us
+from core.metrics import metrics
+
+# Serial 벌크 전송 재조립 방식 (HomeWindow.FRAMERS와 같은 구성)
+FRAMERS = {
+    'none': None,
+    'crlf': lambda: DelimiterFramer(b'\r\n', idle_timeout=0.5),
+    'lf': lambda: DelimiterFramer(b'\n', idle_timeout=0.5),
+    'len2': lambda: LengthPrefixFramer(2, 'little', idle_timeout=0.5),
+    'idle': lambda: IdleGapFramer(0.02),
+}
+
+
+def build_sink(args):
+    sinks = []
+    if args.out:
+        sinks.append(RotatingFileSink(args.out, max_bytes=int(args.max_file_mb * 1024 * 1024),
+                                      max_files=args.max_files, fmt=args.format))
+    if args.socket:
+        sinks.append(SocketSink(args.socket, fmt=args.format))
+    if args.stdout or not sinks:
+        sinks.append(StdoutSink(fmt=args.format))
+    return sinks[0] if len(sinks) == 1 else FanoutSink(sinks)
+
+
+def build_trigger_engine(args):
+    if not args.trigger and not args.trigger_when and args.trigger_min_gap is None and args.trigger_max_gap is None:
+        return None
+    name = ",".join(args.trigger or []) or args.trigger_when or "gap"
+    trigger = Trigger(name, patterns=args.trigger or (), condition=args.trigger_when,
+                      min_gap=args.trigger_min_gap, max_gap=args.trigger_max_gap)
+    return TriggerEngine([trigger], args.trigger_dir, pre_packets=args.pre_packets, pre_seconds=args.pre_seconds,
+                         post_packets=args.post_packets, post_seconds=args.post_seconds)
+
+
+def print_latency_report(analyzer, file):
+    rows = analyzer.snapshot()
+    if not rows:
+        print("지연 분석: 샘플 없음", file=file)
+        return
+    print(f"{'Kind':<6} {'Device':<7} {'EP':<12} {'Samples':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'Max':>9} {'Outliers':>8}", file=file)
+    for row in rows:
+        print(f"{row['kind']:<6} {row['bus']}.{row['device']:<5} {row['label']:<12} {row['count']:>9,} "
+              f"{format_us(row['p50_us']):>9} {format_us(row['p95_us']):>9} {format_us(row['p99_us']):>9} "
+              f"{format_us(row['max_us']):>9} {row['outliers']:>8,}", file=file)
+
+
+def run(args):
+    service = UsbSniffService(index_payloads=False)
+    if args.tshark:
+        service.tshark_path = args.tshark
+    if args.latency_threshold is not None:
+        service.latency.threshold_us = args.latency_threshold * 1000
+
+    if args.list:
+        for full_name, short_name in service.get_interfaces():
+            print(f"{short_name}\t{full_name}")
+        return 0
+
+    try:
+        trigger_engine = build_trigger_engine(args)
+    except ValueError as e:
+        print(f"트리거 설정 오류: {e}", file=sys.stderr)
+        return 2
+    try:
+        sink = build_sink(args)
+    except (ValueError, OSError) as e:
+        print(f"출력 설정 오류: {e}", file=sys.stderr)
+        if trigger_engine is not None:
+            trigger_engine.close()
+        return 2
+    service.set_console_widget(sink)
+    if args.metrics:
+        metrics.start_periodic_dump(args.metrics, args.metrics_interval)
+
+    stop_event = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop_event.set())
+
+    filters = [UsbFilter[name.upper()] for name in args.filter] if args.filter else [UsbFilter.ALL]
+    factory = FRAMERS[args.framer]
+    framer = factory() if factory else None
+    if args.read:
+        service.load_capture(args.read, filters, args.speed, framer=framer, packet_filter=args.packet_filter,
+                             trigger_engine=trigger_engine)
+    else:
+        service.start_capture(args.iface if len(args.iface) > 1 else args.iface[0], filters,
+                              capture_mode=CaptureMode[args.mode.upper()], archive_dir=args.archive,
+                              framer=framer, packet_filter=args.packet_filter, trigger_engine=trigger_engine)
+
+    deadline = time.monotonic() + args.duration if args.duration else None
+    try:
+        while service.is_capturing and not stop_event.wait(0.2):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+    finally:
+        if service.is_capturing:
+            service.stop_capture()
+        if service.capture_thread is not None:
+            service.capture_thread.join()
+        metrics.stop_periodic_dump()
+        sink.close()
+        if args.latency_report:
+            print_latency_report(service.latency, sys.stderr)
+    if service.last_error is not None:
+        print(service.last_error, file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.capture", description="USB 패킷 헤드리스 캡처 (Qt 없음)")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--list', action='store_true', help="USBPcap 인터페이스 목록 출력")
+    source.add_argument('--iface', action='append', help="캡처할 인터페이스 (여러 번 지정하면 동시 캡처)")
+    source.add_argument('--read', metavar='FILE', help="저장된 .pcap/.pcapng 파일 재생")
+
+    parser.add_argument('--filter', action='append', choices=[f.name.lower() for f in UsbFilter],
+                        help="프로토콜 필터 (여러 번 지정 가능, 기본 all)")
+    parser.add_argument('--packet-filter', metavar='EXPR', help="소스 단계 패킷 필터 식 (예: 'dir == in and ep == 0x81')")
+    parser.add_argument('--framer', choices=list(FRAMERS), default='none', help="Serial 벌크 전송 재조립 방식")
+    parser.add_argument('--mode', choices=[m.name.lower() for m in CaptureMode], default='pcap', help="캡처 방식")
+    parser.add_argument('--speed', type=float, help="--read 재생 배속 (기본: 최대 속도)")
+    parser.add_argument('--archive', metavar='DIR', help="세션 아카이브(컬럼형) 저장 폴더")
+    parser.add_argument('--duration', type=float, help="지정한 초만큼 캡처한 뒤 종료")
+    parser.add_argument('--tshark', help="tshark 실행 파일 경로")
+
+    trigger = parser.add_argument_group("트리거 (발생 전후 패킷을 pcapng로 저장, PCAP 방식)")
+    trigger.add_argument('--trigger', action='append', metavar='PATTERN',
+                         help="찾을 패턴 (여러 번 지정 가능): ASCII, \"문자열\", 0d:0a 또는 0x0d0a")
+    trigger.add_argument('--trigger-when', metavar='EXPR', help="트리거 조건 (패킷 필터 식, 예: 'dir == in and len >= 8')")
+    trigger.add_argument('--trigger-min-gap', type=float, metavar='SEC', help="같은 엔드포인트 직전 데이터 패킷과의 간격이 이 값 이상일 때")
+    trigger.add_argument('--trigger-max-gap', type=float, metavar='SEC', help="같은 엔드포인트 직전 데이터 패킷과의 간격이 이 값 이하일 때")
+    trigger.add_argument('--trigger-dir', default='triggers', metavar='DIR', help="트리거 구간 저장 폴더")
+    trigger.add_argument('--pre-packets', type=int, default=TriggerEngine.PRE_PACKETS, help="발생 전 보관할 최대 패킷 수")
+    trigger.add_argument('--pre-seconds', type=float, help="발생 전 보관할 최대 시간(초)")
+    trigger.add_argument('--post-packets', type=int, default=TriggerEngine.POST_PACKETS, help="발생 후 저장할 패킷 수")
+    trigger.add_argument('--post-seconds', type=float, help="발생 후 저장할 시간(초, 패킷 수보다 먼저 도달하면 종료)")
+
+    latency = parser.add_argument_group("지연 분석")
+    latency.add_argument('--latency-threshold', type=float, metavar='MS',
+                         help="이 값(ms)을 넘는 URB/TX→RX 지연도 이상값으로 경고 (기본: p99 x 3만 사용)")
+    latency.add_argument('--latency-report', action='store_true', help="종료 시 지연 분포(p50/p95/p99/max) 표를 stderr로 출력")
+
+    output = parser.add_argument_group("출력")
+    output.add_argument('--out', metavar='DIR', help="회전 로그 파일 저장 폴더")
+    output.add_argument('--max-file-mb', type=float, default=64, help="로그 파일 하나의 최대 크기(MB)")
+    output.add_argument('--max-files', type=int, default=20, help="보관할 로그 파일 최대 개수")
+    output.add_argument('--socket', metavar='ADDR', help="로컬 소켓으로 전송 (tcp:호스트:포트 또는 unix:경로)")
+    output.add_argument('--stdout', action='store_true', help="다른 출력과 함께 표준 출력에도 기록 (출력 미지정 시 기본)")
+    output.add_argument('--format', choices=list(FORMATTERS), default='text', help="출력 형식")
+    output.add_argument('--metrics', metavar='FILE', help="계측 지표를 주기적으로 기록할 JSON Lines 파일")
+    output.add_argument('--metrics-interval', type=float, default=10.0, help="계측 지표 기록 주기(초)")
+
+    return run(parser.parse_args(argv))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
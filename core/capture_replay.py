@@ -0,0 +1,129 @@
+# 1.개요 : 저장된 .pcap / .pcapng 캡처 파일을 열어 패킷을 재생하는 모듈
+# 2.특징 :
+## 1) 파일을 mmap으로 매핑하므로 수 GB 파일도 전체를 메모리로 읽지 않는다. (페이로드는 mmap에 대한 memoryview)
+## 2) 패킷 오프셋 인덱스는 처음부터 만들지 않고, 읽어 나가면서(또는 필요한 위치까지만) 지연 생성한다.
+### - 인덱스 끝에서는 인덱서가 읽은 배치를 그대로 내보내므로 같은 구간을 두 번 파싱하지 않는다.
+## 3) 최대 속도 또는 원래 시간 간격(배속 지정)으로 재생할 수 있다.
+# 3.사용법 :
+## 1) capture = CaptureFile(path)
+## 2) for packets in capture.replay(speed=None): ... (speed=None: 최대 속도, 1.0: 원래 속도, 2.0: 2배속)
+## 3) capture.close()
+
+import mmap
+import time
+from array import array
+
+from core.pcap_reader import PcapStreamReader, PcapFormatError
+
+
+class CaptureFile:
+    BATCH_SIZE = 4096
+    # 원래 속도 재생 시 대기 중에도 중지 요청을 확인하는 최대 간격(초)
+    SLEEP_SLICE = 0.05
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise PcapFormatError(f"빈 캡처 파일입니다: {path}")
+
+        # 인덱서: 파일 앞에서부터 순서대로 읽으며 패킷 오프셋을 기록하는 리더
+        self._offsets = array('Q')
+        self._indexer = PcapStreamReader.from_buffer(self._mmap, self.BATCH_SIZE)
+        self._indexer.offsets = self._offsets
+        self._index_iter = self._indexer.iter_batches()
+        self._fully_indexed = False
+
+    @property
+    def indexed_count(self):
+        """지금까지 인덱싱된 패킷 수."""
+        return len(self._offsets)
+
+    def packet_count(self):
+        """전체 패킷 수. (아직 인덱싱되지 않은 부분이 있으면 끝까지 인덱싱합니다)"""
+        while self._advance_index():
+            pass
+        return len(self._offsets)
+
+    def _advance_index(self):
+        """인덱스를 한 배치만큼 늘립니다. 파일 끝이면 None을 반환합니다."""
+        if self._fully_indexed:
+            return None
+        batch = next(self._index_iter, None)
+        if batch is None:
+            self._fully_indexed = True
+        return batch
+
+    def iter_batches(self, start_index=0):
+        """start_index번째 패킷부터 UsbPacket 목록 단위로 반환합니다."""
+        index = start_index
+        while True:
+            if index < len(self._offsets):
+                # 이미 인덱싱된 구간: 기록된 오프셋에서 별도 리더로 읽음
+                # (frontier를 넘어 파싱하지 않도록 남은 개수만큼만 읽게 함 - 그 뒤는 인덱서가 읽음)
+                frontier = len(self._offsets)
+                reader = self._indexer.clone_at(self._offsets[index])
+                batches = reader.iter_batches()
+                while index < frontier:
+                    reader.max_batch = min(self.BATCH_SIZE, frontier - index)
+                    batch = next(batches, None)
+                    if batch is None:
+                        return
+                    yield batch
+                    index += len(batch)
+            else:
+                # 인덱스 끝(frontier): 인덱서가 읽으면서 오프셋을 기록
+                # 시작 위치가 방금 읽은 배치 안에 있으면 그 배치를 잘라 그대로 사용 (다시 파싱하지 않음)
+                batch_start = len(self._offsets)
+                batch = self._advance_index()
+                if batch is None:
+                    return
+                if index < len(self._offsets):
+                    yield batch[index - batch_start:] if index > batch_start else batch
+                    index = len(self._offsets)
+
+    def replay(self, speed=None, is_running=None, start_index=0):
+        """패킷을 배치 단위로 재생합니다. speed가 None이면 최대 속도, 아니면 원래 시간 간격 / speed."""
+        is_running = is_running or (lambda: True)
+        if not speed:
+            for batch in self.iter_batches(start_index):
+                if not is_running():
+                    return
+                yield batch
+            return
+
+        first_ts = None
+        wall_start = 0.0
+        for batch in self.iter_batches(start_index):
+            out = []
+            for packet in batch:
+                if first_ts is None:
+                    first_ts = packet.timestamp
+                    wall_start = time.monotonic()
+                delay = wall_start + (packet.timestamp - first_ts) / speed - time.monotonic()
+                if delay > 0.001:
+                    # 대기 전에 지금까지 모인 패킷을 먼저 내보냄
+                    if out:
+                        yield out
+                        out = []
+                    while delay > 0:
+                        if not is_running():
+                            return
+                        time.sleep(min(delay, self.SLEEP_SLICE))
+                        delay = wall_start + (packet.timestamp - first_ts) / speed - time.monotonic()
+                out.append(packet)
+            if out:
+                yield out
+            if not is_running():
+                return
+
+    def close(self):
+        try:
+            self._mmap.close()
+        except BufferError:
+            # 아직 패킷(memoryview)이 mmap을 참조 중이면 GC가 정리하도록 둠
+            pass
+        self._file.close()
@@ -0,0 +1,291 @@
+# 1.개요 : 인터페이스(USBPcap 루트 허브) 하나의 캡처 세션 - tshark 프로세스 1개 + 리더 쓰레드 1개
+# 2.특징 :
+## 1) 세션마다 독립된 프로세스/파이프/리더를 가지므로 여러 허브가 동시에 바빠도 서로의 읽기를 막지 않는다.
+## 2) 리더 쓰레드는 pcapng 파싱과 인터페이스 태깅만 하고, 배치를 TimestampMerger에 넘긴다. (콘솔 출력은 병합 쓰레드 담당)
+## 3) 세션별 패킷/바이트 수와 에러 메세지를 보관한다.
+## 4) 중지 지연 시간 보장: stdout은 PipeReader(전용 파이프 쓰레드 + 큐)로 읽어, 유휴 버스에서도 stop() 후 POLL_INTERVAL 안에 리더가 끝난다.
+## 5) stderr는 StderrCollector가 동시에 계속 읽어 마지막 부분만 보관한다. (stderr 파이프가 가득 차 tshark가 멈추지 않도록)
+## 6) tshark는 새 프로세스 그룹으로 실행하고 그룹 단위로 종료한다. (POSIX: SIGTERM → 제한 시간 후 SIGKILL, Windows: taskkill /T)
+### - POSIX: 그룹 신호는 리더를 회수하기 전에만 보낸다. (회수 후에는 그룹 번호가 재사용될 수 있음)
+### - tshark가 띄운 dumpcap이 파이프를 물고 남아 있는 일이 없도록 함
+# 3.사용법 :
+## 1) session = CaptureSession("USBPcap1", cmd, merger)
+## 2) session.start() → ... → session.stop() (UI 쓰레드, 블로킹하지 않음) → session.shutdown() (정리 쓰레드, 종료/회수까지 대기)
+
+import os
+import queue
+import signal
+import subprocess
+import threading
+import time
+
+from core.pcap_reader import PcapStreamReader
+from core.metrics import metrics, exponential_bounds
+
+# 패킷 캡처 시각 ~ 리더가 읽은 시각 (tshark/파이프 출력 지연, 배치의 마지막 패킷 기준)
+_CAPTURE_LAG_MS = metrics.histogram('capture.lag_ms', exponential_bounds(0.5, 2, 16))
+
+
+# 종료 요청(SIGTERM) 후 강제 종료(SIGKILL)까지 기다리는 시간(초)
+TERMINATE_TIMEOUT = 0.5
+
+
+def spawn_process(cmd):
+    """콘솔 창 없이 tshark 프로세스를 새 프로세스 그룹으로 실행합니다. (stdout/stderr 모두 바이너리 파이프)"""
+    kwargs = {}
+    if os.name == 'nt':
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        kwargs['startupinfo'] = startupinfo
+        kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        # 새 세션의 리더 = 프로세스 그룹 번호가 pid (하위 dumpcap까지 killpg로 한 번에 종료)
+        kwargs['start_new_session'] = True
+    return subprocess.Popen(
+        cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs
+    )
+
+
+def _signal_group(process, signum):
+    try:
+        os.killpg(process.pid, signum)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def terminate_process(process):
+    """프로세스 그룹에 종료를 요청합니다. 기다리지 않으므로 UI 쓰레드에서 호출해도 됩니다."""
+    if process is None:
+        return
+    if os.name == 'nt':
+        if process.poll() is None:
+            # Windows 환경: /F (강제 종료), /T (하위 프로세스 트리까지 모두 종료) - taskkill 종료는 기다리지 않음
+            try:
+                subprocess.Popen(['taskkill', '/F', '/T', '/PID', str(process.pid)],
+                                 stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                 creationflags=subprocess.CREATE_NO_WINDOW)
+            except OSError:
+                process.kill()
+    elif process.returncode is None:
+        # 리더(tshark)가 끝났어도 회수 전이면 그룹에 남은 하위 프로세스까지 보냄
+        # (회수된 뒤에는 그룹 번호가 다른 프로세스에 재사용될 수 있으므로 보내지 않음)
+        _signal_group(process, signal.SIGTERM)
+
+
+def _wait_leader(process, timeout):
+    """리더가 끝나거나 timeout초가 지날 때까지 회수하지 않고(WNOWAIT) 기다립니다.
+    리더가 아직 회수되지 않아 그룹에 신호를 보내도 안전하면 True를 반환합니다."""
+    deadline = time.monotonic() + timeout
+    while process.returncode is None:
+        try:
+            exited = os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is not None
+        except ChildProcessError:
+            return False
+        if exited or time.monotonic() >= deadline:
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def kill_process(process, timeout=TERMINATE_TIMEOUT):
+    """프로세스 그룹을 종료하고 회수합니다. timeout초 안에 끝나지 않으면 강제 종료합니다. (정리 쓰레드용)"""
+    if process is None:
+        return
+    terminate_process(process)
+    if os.name == 'nt':
+        try:
+            process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        return
+    # 리더가 좀비로 남아 있는 동안에는 그룹 번호가 재사용되지 않으므로, 회수 전에 남은 그룹 전체를 강제 종료
+    if _wait_leader(process, timeout):
+        _signal_group(process, signal.SIGKILL)
+    process.wait()
+
+
+class PipeReader:
+    """파이프를 전용 쓰레드로 읽어 큐에 넣는 스트림 래퍼. read1()은 POLL_INTERVAL마다 close() 여부를 확인하므로
+    파이프에 데이터가 오지 않아도(유휴 버스) close() 후 POLL_INTERVAL 안에 b""(EOF)를 반환합니다."""
+    POLL_INTERVAL = 0.05
+    # 큐에 쌓아 둘 최대 청크 수 (소비가 느리면 파이프 쓰레드가 기다려 tshark에 역압이 걸림)
+    MAX_CHUNKS = 64
+
+    def __init__(self, pipe, chunk_size=1 << 20):
+        self._pipe = pipe
+        self._chunk_size = chunk_size
+        self._queue = queue.Queue(self.MAX_CHUNKS)
+        self._closed = threading.Event()
+        self._pending = b""
+        self._eof = False
+        self._thread = threading.Thread(target=self._pump, daemon=True)
+        self._thread.start()
+
+    def read1(self, size=-1):
+        if not self._pending:
+            self._pending = self._next_chunk()
+            # 이미 도착해 있는 청크는 기다리지 않고 이어 붙여 한 번에 반환 (파서의 버퍼 재구성 횟수를 줄임)
+            while self._pending and (size < 0 or len(self._pending) < size):
+                try:
+                    chunk = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if chunk is None:
+                    self._eof = True
+                    break
+                self._pending += chunk
+        chunk = self._pending
+        if 0 <= size < len(chunk):
+            self._pending = chunk[size:]
+            return chunk[:size]
+        self._pending = b""
+        return chunk
+
+    read = read1
+
+    def close(self):
+        """읽기를 멈춥니다. 기다리고 있는 read1()은 POLL_INTERVAL 안에 b""를 반환합니다."""
+        self._closed.set()
+
+    def _next_chunk(self):
+        while not self._eof and not self._closed.is_set():
+            try:
+                chunk = self._queue.get(timeout=self.POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if chunk is None:
+                self._eof = True
+                break
+            return chunk
+        return b""
+
+    def _pump(self):
+        read = getattr(self._pipe, 'read1', self._pipe.read)
+        chunk = None
+        try:
+            while not self._closed.is_set():
+                chunk = read(self._chunk_size)
+                if not chunk:
+                    chunk = None
+                    break
+                self._put(chunk)
+        except (OSError, ValueError):
+            chunk = None
+        finally:
+            if chunk is None:
+                self._put(None)
+
+    def _put(self, item):
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=self.POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+
+class StderrCollector:
+    """stderr를 전용 쓰레드로 끝까지 읽으며 마지막 max_bytes만 보관합니다."""
+    MAX_BYTES = 16384
+
+    def __init__(self, pipe, max_bytes=MAX_BYTES):
+        self._pipe = pipe
+        self.max_bytes = max_bytes
+        self._data = bytearray()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def text(self, wait=0.0):
+        """지금까지 받은 내용. wait초 동안 파이프가 닫히기(프로세스 종료)를 기다립니다."""
+        if wait:
+            self._thread.join(wait)
+        with self._lock:
+            return self._data.decode('utf-8', errors='replace').strip()
+
+    def _drain(self):
+        read = getattr(self._pipe, 'read1', self._pipe.read)
+        try:
+            while True:
+                chunk = read(4096)
+                if not chunk:
+                    break
+                with self._lock:
+                    self._data += chunk
+                    if len(self._data) > self.max_bytes:
+                        del self._data[:len(self._data) - self.max_bytes]
+        except (OSError, ValueError):
+            pass
+
+
+class CaptureSession:
+    # tshark가 스스로 끝났을 때 stderr가 다 들어오기를 기다리는 최대 시간(초)
+    STDERR_WAIT = 0.5
+
+    def __init__(self, interface_name, cmd, merger):
+        self.interface_name = interface_name
+        self.cmd = cmd
+        self.merger = merger
+        self.process = None
+        self.thread = None
+        self.stdout = None          # PipeReader
+        self.stderr = None          # StderrCollector
+        self.packet_count = 0
+        self.byte_count = 0
+        self.error = None           # tshark stderr 또는 파이썬 예외 메세지
+        self._running = False
+
+    @property
+    def is_alive(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        # 병합기 소스는 세션 객체로 구분 (재시작 직후 이전 리더의 push/close_source가 새 세션 소스에 닿지 않도록)
+        self.merger.add_source(self)
+        self._running = True
+        self.process = spawn_process(self.cmd)
+        self.stdout = PipeReader(self.process.stdout)
+        self.stderr = StderrCollector(self.process.stderr)
+        self.thread = threading.Thread(target=self._reader_worker, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """리더와 tshark에 종료를 요청합니다. (블로킹하지 않음)"""
+        self._running = False
+        if self.stdout is not None:
+            self.stdout.close()
+        terminate_process(self.process)
+
+    def shutdown(self, timeout=TERMINATE_TIMEOUT):
+        """종료를 요청하고 프로세스 회수와 리더 쓰레드 종료까지 기다립니다."""
+        self.stop()
+        kill_process(self.process, timeout)
+        self.join(PipeReader.POLL_INTERVAL * 4)
+
+    def join(self, timeout=None):
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def _reader_worker(self):
+        interface_name = self.interface_name
+        try:
+            reader = PcapStreamReader(self.stdout)
+            for packets in reader.iter_batches():
+                if not self._running:
+                    break
+                for packet in packets:
+                    packet.interface = interface_name
+                    self.byte_count += packet.frame_len
+                self.packet_count += len(packets)
+                _CAPTURE_LAG_MS.observe((time.time() - packets[-1].timestamp) * 1000.0)
+                self.merger.push(self, packets)
+
+            if self._running:
+                err_msg = self.stderr.text(self.STDERR_WAIT)
+                if err_msg:
+                    self.error = err_msg
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.merger.close_source(self)
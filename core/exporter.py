@@ -0,0 +1,203 @@
+# 1.개요 : 세션 아카이브(core.session_archive)의 원시 레코드를 CSV / JSON Lines / pcapng 파일로 내보내는 모듈
+# 2.특징 :
+## 1) 콘솔에 렌더링된 문자열이 아니라 아카이브에 저장된 원시 필드/페이로드를 읽는다.
+## 2) 아카이브를 BATCH_SIZE개씩 읽어 배치마다 한 번에 기록하므로, 수백만 패킷 세션도 메모리 사용량이 일정하다.
+## 3) 시간 구간(start_ts/end_ts, epoch 초)은 희소 시간 인덱스로 바로 찾아가고, 패킷 필터(core.packet_filter 식)는 배치마다 적용한다.
+## 4) run()은 호출한 쓰레드에서 동작한다. UI는 별도 쓰레드에서 호출하고 progress(처리 수, 전체 수) 콜백으로 진행률을 받는다.
+### - is_cancelled()가 True를 반환하면 중단하고, 쓰던 파일(.part)을 지운다. 완료되면 .part를 최종 경로로 바꾼다.
+# 3.사용법 :
+## 1) exporter = SessionExporter("sessions/session_20260101_120000", "out.csv", start_ts=..., packet_filter='dir == in')
+## 2) exported = exporter.run(progress=lambda done, total: ..., is_cancelled=lambda: stop_event.is_set())
+## 3) 명령줄: python -m core.exporter SESSION_DIR OUT.jsonl [--start 초] [--end 초] [--packet-filter 식]
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+
+from core.packet_filter import compile_filter
+from core.pcap_writer import PcapngWriter
+from core.session_archive import SessionArchive
+from core.usb_packet import TRANSFER_NAMES
+
+# 출력 형식 (파일 확장자와 같음)
+EXPORT_FORMATS = ('csv', 'jsonl', 'pcapng')
+
+CSV_COLUMNS = ('time', 'bus', 'device', 'endpoint', 'direction', 'transfer', 'irp_id', 'info', 'function',
+               'status', 'data_length', 'frame_len', 'data')
+
+
+def format_for_path(path):
+    """파일 확장자로 출력 형식을 정합니다. (.csv / .jsonl / .pcapng, 알 수 없으면 ValueError)"""
+    fmt = os.path.splitext(path)[1].lstrip('.').lower()
+    if fmt == 'json':
+        fmt = 'jsonl'
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"지원하지 않는 내보내기 형식입니다: {path} ({', '.join(EXPORT_FORMATS)})")
+    return fmt
+
+
+def _packet_fields(packet):
+    return (
+        f"{packet.timestamp:.6f}",
+        packet.bus,
+        packet.device,
+        f"0x{packet.endpoint:02x}",
+        "in" if packet.endpoint & 0x80 else "out",
+        TRANSFER_NAMES.get(packet.transfer_type, str(packet.transfer_type)),
+        f"0x{packet.irp_id:016x}",
+        packet.info,
+        packet.function,
+        f"0x{packet.status:08x}",
+        packet.data_length,
+        packet.frame_len,
+        bytes(packet.payload).hex(),
+    )
+
+
+class CsvExportWriter:
+    def __init__(self, stream):
+        self._stream = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+        self._writer = csv.writer(self._stream)
+        self._writer.writerow(CSV_COLUMNS)
+
+    def write_packets(self, packets):
+        self._writer.writerows(map(_packet_fields, packets))
+
+    def close(self):
+        self._stream.flush()
+        self._stream.detach()
+
+
+class JsonlExportWriter:
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write_packets(self, packets):
+        lines = [json.dumps(dict(zip(CSV_COLUMNS, _packet_fields(packet))), ensure_ascii=False) for packet in packets]
+        lines.append("")
+        self._stream.write("\n".join(lines).encode('utf-8'))
+
+    def close(self):
+        pass
+
+
+class PcapngExportWriter:
+    def __init__(self, stream, comment=None):
+        self._writer = PcapngWriter(stream, comment=comment)
+
+    def write_packets(self, packets):
+        self._writer.write_packets(packets)
+
+    def close(self):
+        pass
+
+
+class SessionExporter:
+    BATCH_SIZE = 4096
+    # 출력 파일 쓰기 버퍼 (배치 여러 개를 모아 큰 단위로 기록)
+    WRITE_BUFFER = 1 << 20
+
+    def __init__(self, session_dir, output_path, fmt=None, start_ts=None, end_ts=None, packet_filter=None):
+        self.session_dir = session_dir
+        self.output_path = output_path
+        self.fmt = fmt or format_for_path(output_path)
+        if self.fmt not in EXPORT_FORMATS:
+            raise ValueError(f"지원하지 않는 내보내기 형식입니다: {self.fmt} ({', '.join(EXPORT_FORMATS)})")
+        self.start_ts = start_ts
+        self.end_ts = end_ts
+        self.packet_filter = compile_filter(packet_filter) if isinstance(packet_filter, str) else packet_filter
+        self.exported = 0
+
+    def _open_writer(self, stream):
+        if self.fmt == 'csv':
+            return CsvExportWriter(stream)
+        if self.fmt == 'jsonl':
+            return JsonlExportWriter(stream)
+        comment = f"session={os.path.basename(os.path.normpath(self.session_dir))}"
+        if self.packet_filter is not None:
+            comment += f" filter={self.packet_filter.text}"
+        return PcapngExportWriter(stream, comment)
+
+    def run(self, progress=None, is_cancelled=None):
+        """내보내기를 실행하고 기록한 패킷 수를 반환합니다. 취소되면 None을 반환합니다."""
+        archive = SessionArchive(self.session_dir)
+        start = 0 if self.start_ts is None else archive.find_time(self.start_ts)
+        end = archive.record_count if self.end_ts is None else archive.find_time(self.end_ts)
+        total = max(0, end - start)
+        packet_filter = self.packet_filter
+
+        part_path = self.output_path + ".part"
+        done = 0
+        cancelled = False
+        self.exported = 0
+        try:
+            with open(part_path, 'wb', buffering=self.WRITE_BUFFER) as stream:
+                writer = self._open_writer(stream)
+                for packets in archive.iter_records(start, end, self.BATCH_SIZE):
+                    if is_cancelled is not None and is_cancelled():
+                        cancelled = True
+                        break
+                    done += len(packets)
+                    if packet_filter is not None:
+                        packets = [packet for packet in packets if packet_filter(packet)]
+                    if packets:
+                        writer.write_packets(packets)
+                        self.exported += len(packets)
+                    if progress is not None:
+                        progress(done, total)
+                writer.close()
+            if cancelled:
+                os.remove(part_path)
+                return None
+            os.replace(part_path, self.output_path)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+        return self.exported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.exporter", description="세션 아카이브 내보내기 (CSV / JSON Lines / pcapng)")
+    parser.add_argument('session_dir', help="세션 아카이브 폴더 (예: sessions/session_20260101_120000)")
+    parser.add_argument('output', help="출력 파일 (.csv / .jsonl / .pcapng)")
+    parser.add_argument('--format', choices=EXPORT_FORMATS, help="출력 형식 (기본: 확장자로 판단)")
+    parser.add_argument('--start', type=float, metavar='SEC', help="세션 시작부터 이 시각(초) 이후 패킷만")
+    parser.add_argument('--end', type=float, metavar='SEC', help="세션 시작부터 이 시각(초) 이전 패킷만")
+    parser.add_argument('--packet-filter', metavar='EXPR', help="패킷 필터 식 (예: 'dir == in and ep == 0x81')")
+    args = parser.parse_args(argv)
+
+    first_ts = SessionArchive(args.session_dir).first_ts
+    try:
+        exporter = SessionExporter(args.session_dir, args.output, args.format,
+                                   start_ts=None if args.start is None else first_ts + args.start,
+                                   end_ts=None if args.end is None else first_ts + args.end,
+                                   packet_filter=args.packet_filter)
+    except ValueError as e:
+        print(f"내보내기 설정 오류: {e}", file=sys.stderr)
+        return 2
+
+    started = time.monotonic()
+    last_report = [0.0]
+
+    def progress(done, total):
+        now = time.monotonic()
+        if now - last_report[0] >= 1.0 or done == total:
+            last_report[0] = now
+            print(f"\r{done:,} / {total:,} ({done * 100 // max(total, 1)}%)", end="", file=sys.stderr)
+
+    try:
+        exported = exporter.run(progress)
+    except Exception as e:
+        print(f"\n내보내기 실패: {e}", file=sys.stderr)
+        return 1
+    print(f"\n{exported:,}개 패킷 → {args.output} ({time.monotonic() - started:.1f}초)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# 1.개요 : USBPcap 인터페이스 목록(tshark -D)을 백그라운드에서 조회하고 디스크에 캐시하는 탐색기
+# 2.특징 :
+## 1) tshark 실행은 수 초가 걸릴 수 있으므로 UI 쓰레드가 아닌 별도 쓰레드에서 조회하고 결과를 콜백으로 알린다.
+## 2) 마지막 조회 결과를 캐시 파일(JSON)에 저장하여 다음 실행 때 tshark를 기다리지 않고 바로 목록을 보여준다.
+### - 캐시는 tshark 경로별로 저장하며, ttl초가 지나면 오래된 것으로 보고 백그라운드 조회가 필요하다고 알린다.
+## 3) 조회 중에 다시 요청하면 새로 실행하지 않는다. (허브 연결/해제 확인용 주기 조회가 겹치지 않도록)
+## 4) diff_interfaces(이전, 새 목록)로 추가/제거된 인터페이스만 계산하여 목록을 통째로 다시 만들지 않게 한다.
+# 3.사용법 :
+## 1) discovery = InterfaceDiscovery(service.get_interfaces, key=service.tshark_path)
+## 2) interfaces, fresh = discovery.load_cache() → 바로 표시, fresh가 False면 discovery.refresh_async(on_done)
+## 3) on_done(interfaces, error)는 조회 쓰레드에서 호출되므로 UI 갱신은 시그널로 넘긴다.
+
+import json
+import os
+import threading
+import time
+
+
+def default_cache_path():
+    return os.path.join(os.path.expanduser('~'), '.usb_sniffer', 'interfaces.json')
+
+
+def diff_interfaces(old, new):
+    """(전체 이름, 짧은 이름) 목록 두 개를 비교하여 (추가된 목록, 제거된 목록)을 반환합니다."""
+    old_set = set(old)
+    new_set = set(new)
+    return [item for item in new if item not in old_set], [item for item in old if item not in new_set]
+
+
+class InterfaceDiscovery:
+    CACHE_TTL = 10 * 60
+
+    def __init__(self, list_interfaces, key='', cache_path=None, ttl=CACHE_TTL):
+        # list_interfaces(): [(전체 이름, 짧은 이름), ...] 을 반환하는 함수 (예: UsbSniffService.get_interfaces)
+        self.list_interfaces = list_interfaces
+        self.key = key
+        self.cache_path = cache_path or default_cache_path()
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._running = False
+
+    @property
+    def is_refreshing(self):
+        return self._running
+
+    def load_cache(self):
+        """캐시된 목록과 유효 여부 (목록, TTL 이내인지). 캐시가 없거나 읽을 수 없으면 ([], False)."""
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                entry = json.load(f).get(self.key)
+        except (OSError, ValueError, AttributeError):
+            return [], False
+        if not entry:
+            return [], False
+        interfaces = [tuple(item) for item in entry.get('interfaces', [])]
+        fresh = time.time() - entry.get('time', 0) < self.ttl
+        return interfaces, fresh
+
+    def save_cache(self, interfaces):
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                data = {}
+        except (OSError, ValueError):
+            data = {}
+        data[self.key] = {'time': time.time(), 'interfaces': [list(item) for item in interfaces]}
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            # 다른 실행과 동시에 쓰더라도 깨진 파일이 남지 않도록 임시 파일에 쓴 뒤 교체
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass
+
+    def refresh_async(self, on_done):
+        """백그라운드 쓰레드에서 목록을 조회하여 캐시에 저장하고 on_done(목록, 에러)를 호출합니다.
+        이미 조회 중이면 아무것도 하지 않고 False를 반환합니다."""
+        with self._lock:
+            if self._running:
+                return False
+            self._running = True
+        threading.Thread(target=self._refresh_worker, args=(on_done,), daemon=True).start()
+        return True
+
+    def _refresh_worker(self, on_done):
+        interfaces, error = [], None
+        try:
+            interfaces = list(self.list_interfaces())
+            self.save_cache(interfaces)
+        except Exception as e:
+            error = e
+        finally:
+            with self._lock:
+                self._running = False
+        on_done(interfaces, error)
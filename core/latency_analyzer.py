@@ -0,0 +1,206 @@
+# 1.개요 : 요청/응답 트랜잭션 지연 분석기 (URB 제출→완료, TX 명령→RX 응답, 패킷 간격)
+# 2.특징 :
+## 1) 패킷의 숫자 타임스탬프(epoch 초, float)로 세 가지 지연을 측정한다.
+### - URB: 같은 irp_id의 제출(FDO→PDO) → 완료(PDO→FDO) 시간 (엔드포인트별)
+### - TX→RX: 장치에 데이터를 보낸 OUT 패킷 → 같은 장치의 다음 IN 데이터 패킷 시간 (명령/응답 쌍, 컨트롤 전송 제외)
+### - Gap: 같은 엔드포인트의 연속된 데이터 패킷 사이 간격
+## 2) 분포는 core.metrics.Histogram(고정 로그 버킷, 약 9% 해상도)으로 누적하여 패킷마다 O(log 버킷) 갱신,
+##    p50/p95/p99/max는 snapshot() 시점에만 계산한다. (샘플을 보관하지 않으므로 메모리가 늘지 않음)
+## 3) URB / TX→RX 지연이 해당 항목 p99의 OUTLIER_FACTOR배(또는 지정한 절대 기준)를 넘으면 이상값으로 센다.
+### - 기준 p99는 OUTLIER_MIN_SAMPLES개 이상 모인 뒤부터, OUTLIER_REFRESH개 관측마다 다시 계산한다.
+### - update()는 보고할 이상값(LatencyOutlier) 목록을 반환하며, 같은 항목은 REPORT_INTERVAL초(패킷 시간)에 한 번만 보고한다.
+# 3.사용법 :
+## 1) analyzer = LatencyAnalyzer() → 캡처 쓰레드: for outlier in analyzer.update(packets): log(str(outlier))
+## 2) UI: for row in analyzer.snapshot(): row['kind'], row['p99_us'] ...
+## 3) 새 캡처 시작 시 analyzer.reset()
+
+import threading
+
+from core.metrics import Histogram, exponential_bounds
+from core.usb_packet import TRANSFER_CONTROL, INFO_PDO_TO_FDO
+
+KIND_URB = "URB"
+KIND_RESPONSE = "TX→RX"
+KIND_GAP = "Gap"
+
+# 1µs ~ 약 1000초, 2^(1/8)배 간격 (마이크로초 단위)
+LATENCY_BOUNDS_US = exponential_bounds(1, 2 ** 0.125, 241)
+
+
+def format_us(value):
+    """마이크로초 값을 읽기 쉬운 단위 문자열로 (예: 850µs, 12.3ms, 1.50s)"""
+    if value < 1000:
+        return f"{value:.0f}µs"
+    if value < 1000000:
+        return f"{value / 1000:.1f}ms"
+    return f"{value / 1000000:.2f}s"
+
+
+class LatencySeries:
+    """지연 항목 하나(종류 + 장치 + 엔드포인트 쌍)의 분포와 이상값 기준"""
+    __slots__ = ('kind', 'bus', 'device', 'endpoint', 'peer_endpoint', 'histogram', 'outliers',
+                 '_threshold', '_next_refresh', '_last_report', '_suppressed')
+
+    def __init__(self, kind, bus, device, endpoint, peer_endpoint=None):
+        self.kind = kind
+        self.bus = bus
+        self.device = device
+        self.endpoint = endpoint                # URB/Gap: 엔드포인트, TX→RX: 명령을 보낸 OUT 엔드포인트
+        self.peer_endpoint = peer_endpoint      # TX→RX: 응답이 온 IN 엔드포인트
+        self.histogram = Histogram(kind, LATENCY_BOUNDS_US)
+        self.outliers = 0
+        self._threshold = None                  # 이상값 기준(µs), 샘플이 모이기 전에는 None
+        self._next_refresh = LatencyAnalyzer.OUTLIER_MIN_SAMPLES
+        self._last_report = None
+        self._suppressed = 0
+
+    @property
+    def label(self):
+        if self.peer_endpoint is None:
+            return f"0x{self.endpoint:02X}"
+        return f"0x{self.endpoint:02X}→0x{self.peer_endpoint:02X}"
+
+
+class LatencyOutlier:
+    __slots__ = ('series', 'value_us', 'threshold_us', 'timestamp', 'suppressed')
+
+    def __init__(self, series, value_us, threshold_us, timestamp, suppressed):
+        self.series = series
+        self.value_us = value_us
+        self.threshold_us = threshold_us
+        self.timestamp = timestamp
+        self.suppressed = suppressed    # 직전 보고 이후 보고하지 않고 넘긴 이상값 수
+
+    def __str__(self):
+        series = self.series
+        msg = (f"지연 이상값 [{series.kind}] 장치 {series.bus}.{series.device} EP {series.label}: "
+               f"{format_us(self.value_us)} (기준 {format_us(self.threshold_us)}, p50 {format_us(series.histogram.quantile(0.5))})")
+        if self.suppressed:
+            msg += f" 외 {self.suppressed}건"
+        return msg
+
+
+class LatencyAnalyzer:
+    # 이상값 기준 = p99 x OUTLIER_FACTOR
+    OUTLIER_FACTOR = 3.0
+    OUTLIER_MIN_SAMPLES = 100
+    OUTLIER_REFRESH = 256
+    # 같은 항목의 이상값 보고 최소 간격(초, 패킷 타임스탬프 기준)
+    REPORT_INTERVAL = 1.0
+    # 완료를 기다리는 URB 최대 수 (완료가 캡처되지 않는 URB가 쌓이지 않도록)
+    MAX_PENDING = 65536
+
+    def __init__(self, outlier_factor=OUTLIER_FACTOR, threshold_us=None):
+        self.outlier_factor = outlier_factor
+        self.threshold_us = threshold_us    # 지정하면 p99와 무관하게 이 값(µs)을 넘는 지연을 이상값으로 봄
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._series = {}       # (종류, bus, device, endpoint, peer) -> LatencySeries
+            self._pending_urbs = {} # irp_id -> (제출 시각, bus, device, endpoint)
+            self._pending_commands = {}  # (bus, device) -> (OUT 패킷 시각, OUT 엔드포인트)
+            self._last_data = {}    # (bus, device, endpoint) -> 직전 데이터 패킷 시각
+
+    def _get_series(self, kind, bus, device, endpoint, peer_endpoint=None):
+        key = (kind, bus, device, endpoint, peer_endpoint)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = LatencySeries(kind, bus, device, endpoint, peer_endpoint)
+        return series
+
+    def update(self, packets):
+        """파싱된 패킷(UsbPacket) 배치를 분석하고, 보고할 이상값(LatencyOutlier) 목록을 반환합니다."""
+        outliers = []
+        with self._lock:
+            pending_urbs = self._pending_urbs
+            pending_commands = self._pending_commands
+            last_data = self._last_data
+            for packet in packets:
+                timestamp = packet.timestamp
+                bus = packet.bus
+                device = packet.device
+                endpoint = packet.endpoint
+
+                # URB 제출 → 완료
+                if packet.info & INFO_PDO_TO_FDO:
+                    submitted = pending_urbs.pop(packet.irp_id, None)
+                    if submitted is not None and submitted[1:] == (bus, device, endpoint):
+                        self._observe(self._get_series(KIND_URB, bus, device, endpoint),
+                                      (timestamp - submitted[0]) * 1000000, timestamp, outliers)
+                else:
+                    if len(pending_urbs) >= self.MAX_PENDING:
+                        pending_urbs.clear()
+                    pending_urbs[packet.irp_id] = (timestamp, bus, device, endpoint)
+
+                if not packet.data_length or packet.transfer_type == TRANSFER_CONTROL:
+                    continue
+
+                # 데이터 패킷 간격
+                stream = (bus, device, endpoint)
+                previous = last_data.get(stream)
+                last_data[stream] = timestamp
+                if previous is not None:
+                    self._get_series(KIND_GAP, bus, device, endpoint).histogram.observe((timestamp - previous) * 1000000)
+
+                # TX 명령 → RX 응답 (명령마다 첫 응답만)
+                if endpoint & 0x80:
+                    command = pending_commands.pop((bus, device), None)
+                    if command is not None:
+                        self._observe(self._get_series(KIND_RESPONSE, bus, device, command[1], endpoint),
+                                      (timestamp - command[0]) * 1000000, timestamp, outliers)
+                else:
+                    pending_commands[(bus, device)] = (timestamp, endpoint)
+        return outliers
+
+    def _observe(self, series, value_us, timestamp, outliers):
+        if value_us < 0:
+            return
+        histogram = series.histogram
+        threshold = series._threshold
+        if threshold is not None and value_us > threshold:
+            series.outliers += 1
+            if series._last_report is None or timestamp - series._last_report >= self.REPORT_INTERVAL:
+                outliers.append(LatencyOutlier(series, value_us, threshold, timestamp, series._suppressed))
+                series._last_report = timestamp
+                series._suppressed = 0
+            else:
+                series._suppressed += 1
+        histogram.observe(value_us)
+        if histogram.count >= series._next_refresh:
+            series._next_refresh = histogram.count + self.OUTLIER_REFRESH
+            threshold = histogram.quantile(0.99) * self.outlier_factor
+            if self.threshold_us is not None:
+                threshold = min(threshold, self.threshold_us)
+            series._threshold = threshold
+        elif series._threshold is None and self.threshold_us is not None:
+            series._threshold = self.threshold_us
+
+    def snapshot(self):
+        """지연 항목별 분포 목록 (종류, p99 내림차순). 각 항목은 dict:
+        kind, bus, device, endpoint, peer_endpoint, label, count, mean_us, p50_us, p95_us, p99_us, max_us, outliers"""
+        rows = []
+        with self._lock:
+            for series in self._series.values():
+                histogram = series.histogram
+                if not histogram.count:
+                    continue
+                rows.append({
+                    'kind': series.kind,
+                    'bus': series.bus,
+                    'device': series.device,
+                    'endpoint': series.endpoint,
+                    'peer_endpoint': series.peer_endpoint,
+                    'label': series.label,
+                    'count': histogram.count,
+                    'mean_us': histogram.total / histogram.count,
+                    'p50_us': histogram.quantile(0.5),
+                    'p95_us': histogram.quantile(0.95),
+                    'p99_us': histogram.quantile(0.99),
+                    'max_us': histogram.max,
+                    'outliers': series.outliers,
+                })
+        order = {KIND_URB: 0, KIND_RESPONSE: 1, KIND_GAP: 2}
+        rows.sort(key=lambda row: (order[row['kind']], -row['p99_us']))
+        return rows
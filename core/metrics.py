@@ -0,0 +1,201 @@
+# 1.개요 : 캡처 파이프라인 계측용 카운터 / 게이지 / 히스토그램 레지스트리
+# 2.특징 :
+## 1) 모든 지표 객체는 모듈 로드 시 한 번 만들어 두고, 측정 지점에서는 add()/set()/observe()만 호출한다.
+### - 히스토그램은 고정 버킷(미리 할당된 리스트)이므로 observe()는 bisect 한 번 + 정수 증가뿐이다.
+### - 측정은 패킷 단위가 아니라 배치/틱 단위로 한다. (패킷마다 로그를 남기지 않음)
+## 2) 여러 쓰레드에서 락 없이 갱신한다. 드물게 증가분이 누락될 수 있으나 통계 용도로는 무시할 수준이다.
+## 3) snapshot()은 카운터의 초당 변화율과 히스토그램의 평균/분위수를 계산한 dict를 반환한다.
+### - 분위수는 해당 버킷 안에서 선형 보간한 추정값이다. (버킷 상한값만 쓰면 p50/p99가 같은 값으로 뭉침)
+## 4) dump_json(path)로 즉시, start_periodic_dump(path, interval)로 주기적으로(JSON Lines) 파일에 기록한다.
+# 3.사용법 :
+## 1) from core.metrics import metrics
+## 2) PACKETS = metrics.counter('capture.packets') → PACKETS.add(len(batch))
+## 3) TICK_MS = metrics.histogram('console.tick_ms', exponential_bounds(0.25, 2, 14)) → TICK_MS.observe(ms)
+## 4) metrics.snapshot() / metrics.dump_json(path)
+
+import json
+import threading
+import time
+from bisect import bisect_left
+
+
+def exponential_bounds(start, factor, count):
+    """start부터 factor배씩 커지는 count개의 버킷 상한값 목록."""
+    return [start * factor ** i for i in range(count)]
+
+
+class Counter:
+    __slots__ = ('name', 'value', '_rate', '_rate_value', '_rate_time')
+
+    def __init__(self, name):
+        self.name = name
+        self.value = 0
+        self._rate = 0.0
+        self._rate_value = 0
+        self._rate_time = time.monotonic()
+
+    def add(self, n=1):
+        self.value += n
+
+    def rate(self, now, min_interval):
+        """마지막 계산 후 min_interval초 이상 지났으면 초당 변화율을 다시 계산합니다."""
+        elapsed = now - self._rate_time
+        if elapsed >= min_interval:
+            self._rate = (self.value - self._rate_value) / elapsed
+            self._rate_value = self.value
+            self._rate_time = now
+        return self._rate
+
+    def snapshot(self, now, min_interval):
+        return {'value': self.value, 'rate': self.rate(now, min_interval)}
+
+    def reset(self):
+        self.value = 0
+        self._rate = 0.0
+        self._rate_value = 0
+        self._rate_time = time.monotonic()
+
+
+class Gauge:
+    __slots__ = ('name', 'value', 'max')
+
+    def __init__(self, name):
+        self.name = name
+        self.value = 0
+        self.max = 0
+
+    def set(self, value):
+        self.value = value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self, now, min_interval):
+        return {'value': self.value, 'max': self.max}
+
+    def reset(self):
+        self.value = 0
+        self.max = 0
+
+
+class Histogram:
+    __slots__ = ('name', 'bounds', 'counts', 'count', 'total', 'max')
+
+    def __init__(self, name, bounds):
+        self.name = name
+        self.bounds = list(bounds)
+        # 마지막 칸은 가장 큰 상한값을 넘는 값들
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """q 분위수 추정값. 분위수가 속한 버킷 안에서 선형 보간합니다.
+        (버킷 범위는 [이전 상한값, 상한값]이며 위쪽은 관측된 최댓값으로 제한)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= target:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+                lower = min(lower, upper)
+                return lower + (upper - lower) * (target - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.max
+
+    def snapshot(self, now, min_interval):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'max': self.max,
+        }
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class MetricsRegistry:
+    # 카운터 변화율을 다시 계산하는 최소 간격(초) - 여러 곳에서 snapshot()을 불러도 값이 흔들리지 않도록
+    RATE_INTERVAL = 1.0
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._dump_thread = None
+        self._dump_stop = threading.Event()
+
+    def _get_or_create(self, name, factory):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            return metric
+
+    def counter(self, name):
+        return self._get_or_create(name, lambda: Counter(name))
+
+    def gauge(self, name):
+        return self._get_or_create(name, lambda: Gauge(name))
+
+    def histogram(self, name, bounds):
+        return self._get_or_create(name, lambda: Histogram(name, bounds))
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot(now, self.RATE_INTERVAL) for metric in metrics}
+
+    def reset(self):
+        """모든 지표를 0으로 되돌립니다. (벤치마크 구간 측정용)"""
+        with self._lock:
+            for metric in self._metrics.values():
+                metric.reset()
+
+    def to_json(self):
+        return json.dumps({'time': time.time(), 'metrics': self.snapshot()}, ensure_ascii=False)
+
+    def dump_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_json())
+
+    def start_periodic_dump(self, path, interval=10.0):
+        """interval초마다 스냅샷 한 줄(JSON Lines)을 path에 덧붙입니다."""
+        self.stop_periodic_dump()
+        self._dump_stop = threading.Event()
+        self._dump_thread = threading.Thread(target=self._dump_worker, args=(path, interval, self._dump_stop), daemon=True)
+        self._dump_thread.start()
+
+    def stop_periodic_dump(self):
+        if self._dump_thread is not None:
+            self._dump_stop.set()
+            self._dump_thread.join()
+            self._dump_thread = None
+
+    def _dump_worker(self, path, interval, stop_event):
+        with open(path, 'a', encoding='utf-8') as f:
+            while not stop_event.wait(interval):
+                f.write(self.to_json() + '\n')
+                f.flush()
+
+
+# 프로세스 전역 레지스트리
+metrics = MetricsRegistry()
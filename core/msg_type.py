@@ -0,0 +1,13 @@
+# 1.개요 : 콘솔/싱크로 전달되는 메세지 종류
+# 2.특징 : UI(PySide6) 없이도 캡처 서비스와 헤드리스 싱크(core.sinks)가 사용할 수 있도록 core에 둔다.
+## 1) ui.components.console_widget에서도 그대로 다시 내보내므로 기존 임포트 경로도 유지된다.
+
+from enum import Enum, auto
+
+
+class MsgType(Enum):
+    INFO = auto()
+    ERROR = auto()
+    WARNING = auto()
+    TX = auto()
+    RX = auto()
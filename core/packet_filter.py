@@ -0,0 +1,266 @@
+# 1.개요 : 소스 단계 패킷 필터 - 필터 식을 한 번 컴파일하여 문자열 변환 전에 원시 필드로 패킷을 거른다.
+# 2.특징 :
+## 1) 식 → AST → 파이썬 lambda 소스 코드로 변환 후 한 번만 eval하므로, 패킷마다 AST를 해석하지 않는다.
+## 2) 같은 AST를 tshark 디스플레이 필터(-Y) 문법으로도 변환하여 FIELDS 모드에서는 tshark 쪽으로 내려보낼 수 있다.
+## 3) 판정 대상은 endpoint / bus / device / transfer_type / payload 속성을 가진 객체 (UsbPacket, StreamFrame 등)
+# 3.문법 :
+## 1) 조건: dir == in|out, ep == 0x81, dev == 3, bus == 1, type == bulk|interrupt|control|iso, len >= 8
+### - ep/dev/bus/type/len 은 ==, !=, <, <=, >, >= 사용 가능 (len = 캡처된 페이로드 바이트 수)
+### - data startswith "AT" / data contains 0d:0a / data == 0x4f4b (문자열, 콜론 hex, 0x hex)
+## 2) 조합: and / or / not (&&, ||, ! 도 가능), 괄호
+## 3) 예: dir == in and ep == 0x81 and (data startswith "AT" or len > 32)
+# 4.사용법 :
+## 1) packet_filter = compile_filter('dir == in and len > 0')  (빈 식이면 None, 문법 오류면 ValueError)
+## 2) if packet_filter(packet): ...
+## 3) packet_filter.display_filter → 'usb.endpoint_address.direction == 1 && usb.data_len > 0'
+
+import re
+
+from core.usb_packet import TRANSFER_ISOCHRONOUS, TRANSFER_INTERRUPT, TRANSFER_CONTROL, TRANSFER_BULK
+
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*")
+      | (?P<hexbytes>[0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2})+)(?![\w:])
+      | (?P<number>0[xX][0-9A-Fa-f]+|\d+)(?!\w)
+      | (?P<op>==|!=|>=|<=|>|<|&&|\|\||!|\(|\))
+      | (?P<word>[A-Za-z_]+)
+    )""", re.VERBOSE)
+
+_COMPARE_OPS = ('==', '!=', '<', '<=', '>', '>=')
+_NUMERIC_FIELDS = {
+    # 필드 이름: (파이썬 식, tshark 필드)
+    'ep': ('p.endpoint', 'usb.endpoint_address'),
+    'dev': ('p.device', 'usb.device_address'),
+    'bus': ('p.bus', 'usb.bus_id'),
+    'type': ('p.transfer_type', 'usb.transfer_type'),
+    'len': ('len(p.payload)', 'usb.data_len'),
+}
+_TRANSFER_VALUES = {
+    'iso': TRANSFER_ISOCHRONOUS, 'isochronous': TRANSFER_ISOCHRONOUS,
+    'interrupt': TRANSFER_INTERRUPT, 'control': TRANSFER_CONTROL, 'bulk': TRANSFER_BULK,
+}
+_DIRECTION_VALUES = {'in': 1, 'rx': 1, 'out': 0, 'tx': 0}
+_DATA_OPS = ('startswith', 'contains', '==')
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if match is None or match.end() == pos:
+            raise ValueError(f"필터 식을 해석할 수 없습니다: '{text[pos:].strip()[:20]}'")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'word':
+            lowered = value.lower()
+            if lowered in ('and', 'or', 'not'):
+                kind, value = 'op', {'and': '&&', 'or': '||', 'not': '!'}[lowered]
+            else:
+                value = lowered
+        tokens.append((kind, value))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """재귀 하강 파서. AST 노드는 튜플: ('and', a, b) / ('or', a, b) / ('not', a) / ('cmp', 필드, 연산자, 값)"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expect_op(self, op):
+        kind, value = self.take()
+        if kind != 'op' or value != op:
+            raise ValueError(f"'{op}'가 필요합니다. (받은 값: {value})")
+
+    def parse(self):
+        if not self.tokens:
+            return None
+        node = self.parse_or()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"필터 식 끝에 해석할 수 없는 부분이 있습니다: '{self.peek()[1]}'")
+        return node
+
+    def parse_or(self):
+        node = self.parse_and()
+        while self.peek() == ('op', '||'):
+            self.take()
+            node = ('or', node, self.parse_and())
+        return node
+
+    def parse_and(self):
+        node = self.parse_not()
+        while self.peek() == ('op', '&&'):
+            self.take()
+            node = ('and', node, self.parse_not())
+        return node
+
+    def parse_not(self):
+        if self.peek() == ('op', '!'):
+            self.take()
+            return ('not', self.parse_not())
+        if self.peek() == ('op', '('):
+            self.take()
+            node = self.parse_or()
+            self.expect_op(')')
+            return node
+        return self.parse_condition()
+
+    def parse_condition(self):
+        kind, field = self.take()
+        if kind != 'word':
+            raise ValueError(f"필드 이름이 필요합니다. (받은 값: {field})")
+
+        if field == 'dir':
+            op = self.take_compare_op(('==', '!='))
+            _, value = self.take()
+            if value not in _DIRECTION_VALUES:
+                raise ValueError(f"dir 값은 in/out 이어야 합니다. (받은 값: {value})")
+            return ('cmp', 'dir', op, _DIRECTION_VALUES[value])
+
+        if field == 'data':
+            kind, op = self.take()
+            if op not in _DATA_OPS:
+                raise ValueError(f"data 뒤에는 startswith / contains / == 가 필요합니다. (받은 값: {op})")
+            return ('cmp', 'data', op, self.take_bytes())
+
+        if field in _NUMERIC_FIELDS:
+            op = self.take_compare_op(_COMPARE_OPS)
+            kind, value = self.take()
+            if field == 'type' and kind == 'word' and value in _TRANSFER_VALUES:
+                return ('cmp', field, op, _TRANSFER_VALUES[value])
+            if kind != 'number':
+                raise ValueError(f"{field} 값은 숫자여야 합니다. (받은 값: {value})")
+            return ('cmp', field, op, int(value, 0))
+
+        raise ValueError(f"알 수 없는 필드입니다: {field} (dir, ep, dev, bus, type, len, data)")
+
+    def take_compare_op(self, allowed):
+        kind, op = self.take()
+        if kind != 'op' or op not in allowed:
+            raise ValueError(f"비교 연산자({', '.join(allowed)})가 필요합니다. (받은 값: {op})")
+        return op
+
+    def take_bytes(self):
+        kind, value = self.take()
+        data = None
+        if kind == 'string':
+            data = value[1:-1].encode('latin-1').decode('unicode_escape').encode('latin-1')
+        elif kind == 'hexbytes':
+            data = bytes.fromhex(value.replace(':', ''))
+        elif kind == 'number' and value[:2].lower() == '0x' and len(value) % 2 == 0:
+            data = bytes.fromhex(value[2:])
+        if data:
+            return data
+        raise ValueError(f"data 값은 \"문자열\", 41:54 또는 0x4154 형식이어야 합니다. (받은 값: {value})")
+
+
+# ------------------ 코드 생성 ------------------
+
+def _to_python(node, consts):
+    kind = node[0]
+    if kind == 'and':
+        return f"({_to_python(node[1], consts)} and {_to_python(node[2], consts)})"
+    if kind == 'or':
+        return f"({_to_python(node[1], consts)} or {_to_python(node[2], consts)})"
+    if kind == 'not':
+        return f"(not {_to_python(node[1], consts)})"
+
+    _, field, op, value = node
+    if field == 'dir':
+        return f"((p.endpoint >> 7) {op} {value})"
+    if field == 'data':
+        name = f"c{len(consts)}"
+        consts[name] = value
+        if op == 'startswith':
+            return f"(p.payload[:{len(value)}] == {name})"
+        if op == 'contains':
+            return f"({name} in bytes(p.payload))"
+        return f"(p.payload == {name})"
+    return f"({_NUMERIC_FIELDS[field][0]} {op} {value})"
+
+
+# FIELDS 모드 파서가 페이로드로 쓰는 tshark 필드 (이 순서로 처음 값이 있는 필드 - usb_sniff_service._fields_record)
+_PAYLOAD_FIELDS = ('usb.capdata', 'data.data', 'usb.data_fragment')
+
+
+def _to_display_filter(node, negated=False):
+    """tshark -Y 식. tshark가 거른 패킷을 파이썬 판정은 통과시키는 일이 없도록, not 아래(negated)가 아니면
+    노드보다 넓은(노드가 참이면 참인) 식, not 아래면 좁은 식을 만듭니다. (data 외의 조건은 그대로 옮겨짐)"""
+    kind = node[0]
+    if kind == 'and':
+        return f"({_to_display_filter(node[1], negated)} && {_to_display_filter(node[2], negated)})"
+    if kind == 'or':
+        return f"({_to_display_filter(node[1], negated)} || {_to_display_filter(node[2], negated)})"
+    if kind == 'not':
+        return f"!({_to_display_filter(node[1], not negated)})"
+
+    _, field, op, value = node
+    if field == 'dir':
+        return f"usb.endpoint_address.direction {op} {value}"
+    if field == 'data':
+        # 1바이트는 tshark가 숫자로 해석하지 않도록 문자열 이스케이프로 씀
+        hex_value = value.hex(':') if len(value) > 1 else f'"\\x{value.hex()}"'
+        if op == 'startswith':
+            terms = [f"{name}[0:{len(value)}] == {hex_value}" for name in _PAYLOAD_FIELDS]
+        elif op == 'contains':
+            terms = [f"{name} contains {hex_value}" for name in _PAYLOAD_FIELDS]
+        else:
+            terms = [f"{name} == {hex_value}" for name in _PAYLOAD_FIELDS]
+        if negated:
+            # 첫 필드(usb.capdata)에 값이 있으면 파이썬도 그 필드를 보므로 이 항만으로 좁은 식이 됨
+            return terms[0]
+        # 페이로드가 어느 필드에 들어와도 놓치지 않도록 세 필드를 OR로 묶음
+        return f"({' || '.join(terms)})"
+    tshark_field = _NUMERIC_FIELDS[field][1]
+    return f"{tshark_field} {op} {value:#x}" if field in ('ep', 'type') else f"{tshark_field} {op} {value}"
+
+
+def _uses_payload(node):
+    if node[0] in ('and', 'or'):
+        return _uses_payload(node[1]) or _uses_payload(node[2])
+    if node[0] == 'not':
+        return _uses_payload(node[1])
+    return node[1] in ('data', 'len')
+
+
+class PacketFilter:
+    def __init__(self, text, node):
+        self.text = text
+        self.node = node
+        consts = {}
+        source = f"lambda p: {_to_python(node, consts)}"
+        self.source = source
+        self.predicate = eval(source, {'__builtins__': {'len': len, 'bytes': bytes}, **consts})
+        # tshark -Y 로 내려보낼 수 있는 디스플레이 필터
+        self.display_filter = _to_display_filter(node)
+        # 페이로드(데이터/길이)를 참조하는지 - FIELDS 모드에서 hex 디코딩이 필요한지 판단
+        self.uses_payload = _uses_payload(node)
+
+    def __call__(self, packet):
+        return self.predicate(packet)
+
+    def __repr__(self):
+        return f"PacketFilter({self.text!r})"
+
+
+def compile_filter(text):
+    """필터 식을 컴파일합니다. 빈 식이면 None, 문법 오류면 ValueError."""
+    if not text or not text.strip():
+        return None
+    node = _Parser(_tokenize(text)).parse()
+    if node is None:
+        return None
+    return PacketFilter(text.strip(), node)
@@ -0,0 +1,211 @@
+# 1.개요 : 캡처된 패킷 페이로드를 누적 보관하고 바이트 패턴(HEX/ASCII/정규식)으로 검색하는 인덱스
+# 2.특징 :
+## 1) 페이로드를 BLOCK_BYTES 크기의 블록(arena)에 이어 붙여 저장하고, 블록마다 (패킷 번호, 시작 오프셋) 배열을 둔다.
+## 2) 가득 찬 블록은 백그라운드 쓰레드가 2바이트(bigram) 존재 비트맵을 만든다. (패킷이 들어오는 동안 점진적으로 갱신)
+### - 리터럴 검색 시 패턴의 bigram이 모두 있는 블록만 bytes.find로 훑어 대부분의 블록을 건너뛴다.
+## 3) 정규식은 블록 arena 전체에 C 구현 re로 검색하고, 패킷 경계를 넘는 매치가 나오면 그 패킷만 따로 다시 검색한다.
+### - 앵커(^, $), 단어 경계, 전후방 탐색처럼 앞뒤 바이트를 보는 정규식은 패킷마다 따로 검색한다. (이웃 패킷 내용에 영향받지 않음)
+## 4) 전체 보관 용량(max_bytes)을 넘으면 가장 오래된 블록부터 버린다.
+# 3.사용법 :
+## 1) index = PayloadIndex()
+## 2) 캡처 쓰레드: index.add_packets(packet_ids, payloads)
+## 3) 검색 쓰레드: index.search(text, SearchMode.HEX, on_hits) - on_hits는 [(패킷 번호, 페이로드 내 오프셋), ...]을 블록 단위로 받는다.
+
+import queue
+import re
+import threading
+from array import array
+from bisect import bisect_right
+from enum import Enum
+
+
+class SearchMode(Enum):
+    HEX = "HEX"
+    ASCII = "ASCII"
+    REGEX = "REGEX"
+
+
+def compile_pattern(text, mode):
+    """검색어를 (리터럴 bytes, 정규식) 쌍으로 변환합니다. 둘 중 하나만 값이 있습니다."""
+    if mode == SearchMode.HEX:
+        cleaned = text.replace(' ', '').replace(':', '').replace('0x', '')
+        try:
+            return bytes.fromhex(cleaned), None
+        except ValueError:
+            raise ValueError(f"올바른 HEX 패턴이 아닙니다: {text}")
+    if mode == SearchMode.ASCII:
+        return text.encode('latin-1', errors='replace'), None
+    try:
+        return None, re.compile(text.encode('latin-1', errors='replace'), re.DOTALL)
+    except re.error as e:
+        raise ValueError(f"올바른 정규식이 아닙니다: {e}")
+
+
+# 매치 범위 밖의 바이트나 문자열 시작/끝을 보는 정규식 요소 (잘못 걸려도 느린 경로로 갈 뿐 결과는 같음)
+_CONTEXT_RE = re.compile(rb"[\^$]|\\[AZbB]|\(\?<?[=!]")
+
+
+def _bigram_values(data):
+    """data에 나타나는 모든 2바이트 조합 값. (array로 짝수/홀수 위치를 C 속도로 잘라냄)"""
+    even = array('H')
+    even.frombytes(data[:len(data) & ~1])
+    odd = array('H')
+    odd.frombytes(data[1:1 + ((len(data) - 1) & ~1)])
+    return set(even).union(odd)
+
+
+class _PayloadBlock:
+    __slots__ = ('arena', 'packet_ids', 'starts', 'bigrams')
+
+    def __init__(self):
+        self.arena = bytearray()
+        self.packet_ids = array('q')
+        self.starts = array('I')
+        self.bigrams = None     # 봉인 후 백그라운드에서 만든 bigram 비트맵 (bytearray(65536))
+
+
+class PayloadIndex:
+    BLOCK_BYTES = 256 * 1024
+    MAX_BYTES = 256 * 1024 * 1024
+    MAX_HITS = 100000
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._blocks = []
+        self._open = _PayloadBlock()
+        self._total_bytes = 0
+
+        self._pending = queue.SimpleQueue()
+        self._indexer = threading.Thread(target=self._index_worker, daemon=True)
+        self._indexer.start()
+
+    @property
+    def packet_count(self):
+        with self._lock:
+            return sum(len(block.packet_ids) for block in self._blocks) + len(self._open.packet_ids)
+
+    def add_packets(self, packet_ids, payloads):
+        """패킷 번호와 페이로드 목록을 추가합니다. (배치당 락 한 번, 패킷당 복사 한 번)"""
+        with self._lock:
+            block = self._open
+            for packet_id, payload in zip(packet_ids, payloads):
+                if not payload:
+                    continue
+                block.packet_ids.append(packet_id)
+                block.starts.append(len(block.arena))
+                block.arena += payload
+                if len(block.arena) >= self.BLOCK_BYTES:
+                    block = self._seal_open_block()
+
+    def clear(self):
+        with self._lock:
+            self._blocks = []
+            self._open = _PayloadBlock()
+            self._total_bytes = 0
+
+    def _seal_open_block(self):
+        sealed = self._open
+        self._blocks.append(sealed)
+        self._total_bytes += len(sealed.arena)
+        while self._total_bytes > self.max_bytes and len(self._blocks) > 1:
+            self._total_bytes -= len(self._blocks.pop(0).arena)
+        self._pending.put(sealed)
+        self._open = _PayloadBlock()
+        return self._open
+
+    def _index_worker(self):
+        while True:
+            block = self._pending.get()
+            bitmap = bytearray(65536)
+            for value in _bigram_values(block.arena):
+                bitmap[value] = 1
+            block.bigrams = bitmap
+
+    # ------------------ 검색 ------------------
+
+    def search(self, text, mode, on_hits, is_cancelled=None, max_hits=MAX_HITS):
+        """모든 블록을 오래된 순서로 검색하여 블록마다 on_hits([(패킷 번호, 오프셋), ...])를 호출합니다.
+        패킷당 첫 번째 매치만 보고하며, 찾은 총 개수를 반환합니다."""
+        literal, regex = compile_pattern(text, mode)
+        if literal is not None and not literal:
+            return 0
+
+        with self._lock:
+            blocks = list(self._blocks)
+            # 기록 중인 블록은 스냅샷을 떠서 검색
+            snapshot = _PayloadBlock()
+            snapshot.arena = bytes(self._open.arena)
+            snapshot.packet_ids = array('q', self._open.packet_ids)
+            snapshot.starts = array('I', self._open.starts)
+            blocks.append(snapshot)
+
+        needed = _bigram_values(literal) if literal is not None and len(literal) >= 2 else ()
+        total = 0
+        for block in blocks:
+            if is_cancelled is not None and is_cancelled():
+                break
+            if needed and block.bigrams is not None and not all(block.bigrams[v] for v in needed):
+                continue
+            if literal is not None:
+                hits = self._find_literal(block, literal)
+            else:
+                hits = self._find_regex(block, regex)
+            if hits:
+                hits = hits[:max_hits - total]
+                total += len(hits)
+                on_hits(hits)
+                if total >= max_hits:
+                    break
+        return total
+
+    def _packet_end(self, block, i):
+        return block.starts[i + 1] if i + 1 < len(block.starts) else len(block.arena)
+
+    def _find_literal(self, block, literal):
+        hits = []
+        arena, starts = block.arena, block.starts
+        pos = arena.find(literal)
+        while pos >= 0:
+            i = bisect_right(starts, pos) - 1
+            end = self._packet_end(block, i)
+            if pos + len(literal) <= end:
+                hits.append((block.packet_ids[i], pos - starts[i]))
+                pos = arena.find(literal, end)           # 같은 패킷의 나머지는 건너뜀
+            else:
+                pos = arena.find(literal, pos + 1)       # 패킷 경계를 넘는 매치
+        return hits
+
+    def _find_regex(self, block, regex):
+        arena, starts = block.arena, block.starts
+        with memoryview(arena) as view:
+            hits = []
+            if _CONTEXT_RE.search(regex.pattern):
+                for i in range(len(starts)):
+                    offset = self._search_packet(regex, view, starts[i], self._packet_end(block, i))
+                    if offset is not None:
+                        hits.append((block.packet_ids[i], offset))
+                return hits
+
+            pos = 0
+            while pos < len(arena):
+                match = regex.search(arena, pos)
+                if match is None:
+                    break
+                i = bisect_right(starts, match.start()) - 1
+                end = self._packet_end(block, i)
+                if match.end() <= end:
+                    offset = match.start() - starts[i]
+                else:
+                    # 패킷 경계를 넘는 매치: 겹쳐 있던 이 패킷 안의 매치를 잃지 않도록 이 패킷만 다시 검색
+                    offset = self._search_packet(regex, view, starts[i], end)
+                if offset is not None:
+                    hits.append((block.packet_ids[i], offset))
+                pos = end                                   # 같은 패킷의 나머지는 건너뜀
+        return hits
+
+    @staticmethod
+    def _search_packet(regex, view, start, end):
+        """패킷 하나(arena[start:end])만 대상으로 검색하여 첫 매치의 오프셋을 반환합니다. 없으면 None."""
+        match = regex.search(view[start:end])
+        return None if match is None else match.start()
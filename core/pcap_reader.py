@@ -0,0 +1,291 @@
+# 1.개요 : pcap / pcapng 스트림에서 USBPcap 패킷을 직접 파싱하는 리더
+# 2.특징 :
+## 1) tshark -T fields 텍스트(hex 문자열)를 다시 디코딩하는 이중 변환 없이, 원시 바이트를 struct로 바로 해석한다.
+## 2) 파이프(tshark -w - / dumpcap -w -)와 파일 모두 지원한다. (read() 또는 read1()을 가진 바이너리 스트림)
+### - from_buffer()로 mmap 등 버퍼 전체를 직접 파싱할 수 있으며, 이때 offsets에 패킷 오프셋을 기록하고 seek()로 이동할 수 있다.
+## 3) 페이로드는 읽기 청크에 대한 memoryview 슬라이스로 보관하여 패킷마다 복사하지 않는다.
+## 4) pcap(마이크로/나노초, 리틀/빅 엔디안)과 pcapng(SHB/IDB/EPB/SPB 블록)을 자동 판별한다.
+# 3.사용법 :
+## 1) reader = PcapStreamReader(stream)
+## 2) for packets in reader.iter_batches(): ... (UsbPacket 목록 단위로 반환)
+
+import struct
+import time
+
+from core.usb_packet import UsbPacket, TRANSFER_CONTROL
+from core.metrics import metrics, exponential_bounds
+
+LINKTYPE_USBPCAP = 249
+
+PCAP_MAGIC_US = 0xA1B2C3D4
+PCAP_MAGIC_NS = 0xA1B23C4D
+PCAPNG_SHB = 0x0A0D0D0A
+PCAPNG_BYTE_ORDER_MAGIC = 0x1A2B3C4D
+PCAPNG_IDB = 0x00000001
+PCAPNG_SPB = 0x00000003
+PCAPNG_EPB = 0x00000006
+PCAPNG_OPT_IF_TSRESOL = 9
+
+# USBPcap 의사 헤더 (USBPCAP_BUFFER_PACKET_HEADER, 리틀 엔디안 27바이트)
+# headerLen, irpId, status, function, info, bus, device, endpoint, transfer, dataLength
+USBPCAP_HEADER = struct.Struct('<HQIHBHHBBI')
+
+# 배치 파싱 시간을 패킷 수로 나눈 값 (마이크로초)
+_PARSE_US = metrics.histogram('capture.parse_us_per_packet', exponential_bounds(0.125, 2, 16))
+
+
+class PcapFormatError(Exception):
+    pass
+
+
+def parse_usbpcap_frame(timestamp, frame, frame_len):
+    """USBPcap 프레임(memoryview) 하나를 UsbPacket으로 변환합니다. 헤더가 잘렸으면 None."""
+    if len(frame) < USBPCAP_HEADER.size:
+        return None
+    (header_len, irp_id, status, function, info,
+     bus, device, endpoint, transfer, data_length) = USBPCAP_HEADER.unpack_from(frame, 0)
+    payload = frame[header_len:header_len + data_length]
+    packet = UsbPacket(timestamp, frame_len, irp_id, status, function, info,
+                       bus, device, endpoint, transfer, data_length, payload)
+    if transfer == TRANSFER_CONTROL and header_len > USBPCAP_HEADER.size:
+        # 컨트롤 전송은 의사 헤더 뒤에 stage(1바이트)가 붙음 (USBPCAP_BUFFER_CONTROL_HEADER)
+        packet.stage = frame[USBPCAP_HEADER.size]
+    return packet
+
+
+class PcapStreamReader:
+    READ_SIZE = 1 << 20
+    MAX_BATCH = 65536
+
+    def __init__(self, stream, max_batch=MAX_BATCH):
+        self._stream = stream
+        self._read = getattr(stream, 'read1', stream.read) if stream is not None else None
+        self._data = b""
+        self._view = memoryview(self._data)
+        self._pos = 0
+        self._need = 0              # 다음 파싱에 필요한 최소 바이트 수
+        self._eof = stream is None
+        self.max_batch = max_batch
+        # array('Q')를 지정하면 반환하는 패킷마다 레코드 시작 오프셋을 기록 (버퍼 모드 전용)
+        self.offsets = None
+
+        self._format = None         # 'pcap' 또는 'pcapng'
+        self._endian = '<'
+        self._record_header = None
+        self._ts_divisor = 1e6
+        self._linktype = None
+        self._block_header = struct.Struct('<II')
+        self._epb_header = struct.Struct('<IIIII')
+        self._interfaces = []       # pcapng: 인터페이스별 (linktype, 초당 타임스탬프 단위 수)
+
+    @classmethod
+    def from_buffer(cls, buffer, max_batch=MAX_BATCH):
+        """mmap/bytes 등 버퍼 전체를 복사 없이 파싱하는 리더를 만듭니다."""
+        reader = cls(None, max_batch)
+        reader._data = buffer
+        reader._view = memoryview(buffer)
+        return reader
+
+    def clone_at(self, offset):
+        """같은 버퍼/형식 상태(엔디안, 인터페이스 테이블)를 공유하는 새 리더를 offset 위치에 만듭니다."""
+        reader = PcapStreamReader.from_buffer(self._data, self.max_batch)
+        reader._format = self._format
+        reader._endian = self._endian
+        reader._record_header = self._record_header
+        reader._ts_divisor = self._ts_divisor
+        reader._linktype = self._linktype
+        reader._block_header = self._block_header
+        reader._epb_header = self._epb_header
+        reader._interfaces = list(self._interfaces)
+        reader._pos = offset
+        return reader
+
+    @property
+    def position(self):
+        return self._pos
+
+    def seek(self, offset):
+        """버퍼 모드에서 다음 파싱 위치를 레코드 시작 오프셋으로 옮깁니다."""
+        if self._stream is not None:
+            raise PcapFormatError("스트림 모드에서는 seek를 지원하지 않습니다.")
+        if self._format is None:
+            self._read_file_header()
+        self._pos = offset
+
+    # ------------------ 버퍼 관리 ------------------
+
+    def _fill(self, need):
+        """현재 위치부터 need 바이트 이상이 버퍼에 있도록 읽습니다. EOF면 False."""
+        while len(self._data) - self._pos < need:
+            if self._eof:
+                return False
+            chunk = self._read(max(self.READ_SIZE, need))
+            if not chunk:
+                self._eof = True
+                return False
+            # 남은 부분 + 새 청크로 새 블록 생성 (이전 블록은 참조 중인 패킷이 있는 동안 유지됨)
+            self._data = self._data[self._pos:] + chunk
+            self._view = memoryview(self._data)
+            self._pos = 0
+        return True
+
+    def _available(self):
+        return len(self._data) - self._pos
+
+    # ------------------ 헤더 판별 ------------------
+
+    def _read_file_header(self):
+        if not self._fill(4):
+            return False
+        magic_le = struct.unpack_from('<I', self._data, self._pos)[0]
+        magic_be = struct.unpack_from('>I', self._data, self._pos)[0]
+
+        if magic_le == PCAPNG_SHB:
+            self._format = 'pcapng'
+            return True
+
+        if magic_le in (PCAP_MAGIC_US, PCAP_MAGIC_NS):
+            self._endian = '<'
+            magic = magic_le
+        elif magic_be in (PCAP_MAGIC_US, PCAP_MAGIC_NS):
+            self._endian = '>'
+            magic = magic_be
+        else:
+            raise PcapFormatError(f"알 수 없는 캡처 파일 형식입니다. (magic=0x{magic_le:08X})")
+
+        if not self._fill(24):
+            return False
+        self._linktype = struct.unpack_from(self._endian + 'I', self._data, self._pos + 20)[0]
+        self._ts_divisor = 1e9 if magic == PCAP_MAGIC_NS else 1e6
+        self._record_header = struct.Struct(self._endian + 'IIII')
+        self._format = 'pcap'
+        self._pos += 24
+        return True
+
+    # ------------------ 패킷 반복 ------------------
+
+    def iter_batches(self):
+        """버퍼에 들어온 만큼의 패킷을 UsbPacket 목록 단위로 반환합니다."""
+        if self._format is None and not self._read_file_header():
+            return
+        parse_batch = self._parse_pcap_batch if self._format == 'pcap' else self._parse_pcapng_batch
+        while True:
+            started = time.perf_counter()
+            batch = parse_batch()
+            if batch:
+                _PARSE_US.observe((time.perf_counter() - started) * 1e6 / len(batch))
+                yield batch
+            elif not self._fill(self._need):
+                return
+
+    def _parse_pcap_batch(self):
+        batch = []
+        record_header = self._record_header
+        data, view, pos = self._data, self._view, self._pos
+        end = len(data)
+        ts_divisor = self._ts_divisor
+        usbpcap = self._linktype == LINKTYPE_USBPCAP
+        offsets, max_batch = self.offsets, self.max_batch
+
+        while end - pos >= 16 and len(batch) < max_batch:
+            ts_sec, ts_frac, incl_len, orig_len = record_header.unpack_from(data, pos)
+            if end - pos - 16 < incl_len:
+                break
+            if usbpcap:
+                packet = parse_usbpcap_frame(ts_sec + ts_frac / ts_divisor,
+                                             view[pos + 16:pos + 16 + incl_len], orig_len)
+                if packet is not None:
+                    batch.append(packet)
+                    if offsets is not None:
+                        offsets.append(pos)
+            pos += 16 + incl_len
+
+        self._pos = pos
+        if end - pos >= 16:
+            self._need = 16 + record_header.unpack_from(data, pos)[2]
+        else:
+            self._need = 16
+        return batch
+
+    def _parse_pcapng_batch(self):
+        batch = []
+        data, view, pos = self._data, self._view, self._pos
+        end = len(data)
+        offsets, max_batch = self.offsets, self.max_batch
+        self._need = 12
+
+        while end - pos >= 12 and len(batch) < max_batch:
+            block_type, block_len = self._block_header.unpack_from(data, pos)
+
+            if block_type == PCAPNG_SHB:
+                # 섹션 헤더에서 바이트 순서를 다시 판별하고 블록 길이를 다시 읽음
+                self._set_section_endian(data, pos)
+                block_len = self._block_header.unpack_from(data, pos)[1]
+
+            if block_len < 12 or block_len % 4:
+                raise PcapFormatError(f"잘못된 pcapng 블록 길이: {block_len}")
+            if end - pos < block_len:
+                self._need = block_len
+                break
+
+            if block_type == PCAPNG_EPB:
+                # 가장 빈번한 블록이므로 인라인으로 처리
+                interface_id, ts_high, ts_low, cap_len, orig_len = self._epb_header.unpack_from(data, pos + 8)
+                if interface_id < len(self._interfaces):
+                    linktype, ts_units = self._interfaces[interface_id]
+                    if linktype == LINKTYPE_USBPCAP:
+                        ts_sec, ts_frac = divmod((ts_high << 32) | ts_low, ts_units)
+                        packet = parse_usbpcap_frame(ts_sec + ts_frac / ts_units,
+                                                     view[pos + 28:pos + 28 + cap_len], orig_len)
+                        if packet is not None:
+                            batch.append(packet)
+                            if offsets is not None:
+                                offsets.append(pos)
+            elif block_type == PCAPNG_SPB:
+                packet = self._parse_spb(pos, block_len)
+                if packet is not None:
+                    batch.append(packet)
+                    if offsets is not None:
+                        offsets.append(pos)
+            elif block_type == PCAPNG_IDB:
+                self._parse_idb(pos, block_len)
+
+            pos += block_len
+
+        self._pos = pos
+        return batch
+
+    def _set_section_endian(self, data, pos):
+        if struct.unpack_from('<I', data, pos + 8)[0] == PCAPNG_BYTE_ORDER_MAGIC:
+            self._endian = '<'
+        elif struct.unpack_from('>I', data, pos + 8)[0] == PCAPNG_BYTE_ORDER_MAGIC:
+            self._endian = '>'
+        else:
+            raise PcapFormatError("pcapng 섹션 헤더의 바이트 순서 값이 올바르지 않습니다.")
+        self._block_header = struct.Struct(self._endian + 'II')
+        self._epb_header = struct.Struct(self._endian + 'IIIII')
+        self._interfaces = []
+
+    def _parse_idb(self, pos, block_len):
+        linktype = struct.unpack_from(self._endian + 'H', self._data, pos + 8)[0]
+        ts_units = 1000000
+        # 옵션 영역에서 if_tsresol만 확인
+        opt = pos + 16
+        opt_end = pos + block_len - 4
+        while opt + 4 <= opt_end:
+            code, length = struct.unpack_from(self._endian + 'HH', self._data, opt)
+            if code == 0:
+                break
+            if code == PCAPNG_OPT_IF_TSRESOL and length >= 1:
+                resol = self._data[opt + 4]
+                ts_units = 2 ** (resol & 0x7F) if resol & 0x80 else 10 ** resol
+            opt += 4 + ((length + 3) & ~3)
+        self._interfaces.append((linktype, ts_units))
+
+    def _parse_spb(self, pos, block_len):
+        if not self._interfaces or self._interfaces[0][0] != LINKTYPE_USBPCAP:
+            return None
+        orig_len = struct.unpack_from(self._endian + 'I', self._data, pos + 8)[0]
+        cap_len = min(orig_len, block_len - 16)
+        # SPB에는 타임스탬프가 없음
+        return parse_usbpcap_frame(0.0, self._view[pos + 12:pos + 12 + cap_len], orig_len)
@@ -0,0 +1,92 @@
+# 1.개요 : UsbPacket을 USBPcap(LINKTYPE 249) pcapng 파일로 기록하는 라이터 (Wireshark/tshark/core.pcap_reader로 다시 열 수 있음)
+# 2.특징 :
+## 1) UsbPacket의 원시 필드로 USBPcap 의사 헤더를 다시 만들고 페이로드를 그대로 붙인다. (텍스트 변환 없음)
+### - 컨트롤 전송에 stage가 있으면 28바이트 컨트롤 헤더로 기록한다.
+## 2) 인터페이스 이름(packet.interface)마다 IDB를 하나씩 만들고, 처음 나올 때 기록한다. (다중 인터페이스 캡처)
+## 3) 타임스탬프는 마이크로초 해상도(if_tsresol 기본값)로 기록한다.
+## 4) comment를 주면 섹션 헤더(SHB) 주석으로 남긴다. (예: 트리거 발생 정보)
+# 3.사용법 :
+## 1) with open(path, 'wb') as f: writer = PcapngWriter(f); writer.write_packets(packets)
+
+import struct
+
+from core.pcap_reader import LINKTYPE_USBPCAP, USBPCAP_HEADER, PCAPNG_SHB, PCAPNG_IDB, PCAPNG_EPB, PCAPNG_BYTE_ORDER_MAGIC
+
+# 블록 공통: type, total length / 옵션: code, length
+_BLOCK_HEADER = struct.Struct('<II')
+_BLOCK_TRAILER = struct.Struct('<I')
+_OPTION = struct.Struct('<HH')
+_SHB_BODY = struct.Struct('<IHHq')        # byte-order magic, major, minor, section length(-1: 모름)
+_IDB_BODY = struct.Struct('<HHI')         # linktype, reserved, snaplen
+_EPB_BODY = struct.Struct('<IIIII')       # interface id, ts high, ts low, captured len, original len
+
+OPT_END = 0
+OPT_COMMENT = 1
+OPT_SHB_USERAPPL = 4
+OPT_IF_NAME = 2
+
+SNAPLEN = 0x40000
+
+
+def _pad(length):
+    return (4 - length % 4) % 4
+
+
+def _options(options):
+    """(코드, bytes) 목록을 pcapng 옵션 바이트열로 만듭니다. (끝 표시 포함)"""
+    if not options:
+        return b""
+    parts = []
+    for code, value in options:
+        parts.append(_OPTION.pack(code, len(value)))
+        parts.append(value)
+        parts.append(b"\0" * _pad(len(value)))
+    parts.append(_OPTION.pack(OPT_END, 0))
+    return b"".join(parts)
+
+
+def _block(block_type, body):
+    total = _BLOCK_HEADER.size + len(body) + _BLOCK_TRAILER.size
+    return _BLOCK_HEADER.pack(block_type, total) + body + _BLOCK_TRAILER.pack(total)
+
+
+def usbpcap_frame(packet):
+    """UsbPacket의 USBPcap 의사 헤더 + 페이로드 바이트열"""
+    stage = packet.stage
+    header_len = USBPCAP_HEADER.size if stage is None else USBPCAP_HEADER.size + 1
+    header = USBPCAP_HEADER.pack(header_len, packet.irp_id, packet.status, packet.function, packet.info,
+                                 packet.bus, packet.device, packet.endpoint, packet.transfer_type, packet.data_length)
+    if stage is not None:
+        header += bytes((stage,))
+    return header + bytes(packet.payload)
+
+
+class PcapngWriter:
+    def __init__(self, stream, application="USB Packet Sniffer", comment=None):
+        self.stream = stream
+        self._interfaces = {}   # 인터페이스 이름 -> IDB 번호
+        self.packets_written = 0
+        options = [(OPT_SHB_USERAPPL, application.encode('utf-8'))]
+        if comment:
+            options.append((OPT_COMMENT, comment.encode('utf-8')))
+        stream.write(_block(PCAPNG_SHB, _SHB_BODY.pack(PCAPNG_BYTE_ORDER_MAGIC, 1, 0, -1) + _options(options)))
+
+    def _interface_id(self, name):
+        interface_id = self._interfaces.get(name)
+        if interface_id is None:
+            interface_id = self._interfaces[name] = len(self._interfaces)
+            options = [(OPT_IF_NAME, name.encode('utf-8'))] if name else []
+            self.stream.write(_block(PCAPNG_IDB, _IDB_BODY.pack(LINKTYPE_USBPCAP, 0, SNAPLEN) + _options(options)))
+        return interface_id
+
+    def write_packets(self, packets):
+        blocks = []
+        for packet in packets:
+            interface_id = self._interface_id(packet.interface)
+            frame = usbpcap_frame(packet)
+            timestamp = int(round(packet.timestamp * 1000000))
+            orig_len = max(packet.frame_len, len(frame))
+            body = _EPB_BODY.pack(interface_id, timestamp >> 32, timestamp & 0xFFFFFFFF, len(frame), orig_len)
+            blocks.append(_block(PCAPNG_EPB, body + frame + b"\0" * _pad(len(frame))))
+        self.stream.write(b"".join(blocks))
+        self.packets_written += len(blocks)
@@ -0,0 +1,388 @@
+# 1.개요 : 캡처 세션을 디스크에 컬럼 형식으로 저장/조회하는 아카이브
+# 2.특징 :
+## 1) 패킷 필드는 고정 폭 컬럼 파일(array 기반: ts.d, endpoint.B ...)로, 페이로드는 추가 전용 blob 파일(payload.bin)로 저장한다.
+## 2) 기록은 백그라운드 쓰레드가 큰 배치 단위로 수행한다. 캡처 쓰레드는 큐에 넣기만 하며 블로킹되지 않는다.
+## 3) INDEX_STRIDE개 레코드마다 (시각, 레코드 번호)를 희소 시간 인덱스(tindex)로 남겨, 전체 스캔 없이 시각으로 이동/범위 조회한다.
+## 4) 세그먼트 단위로 회전(segment_max_bytes)하고, 전체 용량(total_max_bytes)을 넘으면 가장 오래된 세그먼트부터 삭제한다.
+### - 용량은 세션 폴더의 상위 폴더(archive_dir)에 있는 모든 세션(session_*)과 기록 중인 세그먼트를 합쳐 계산한다.
+###   (캡처를 다시 시작할 때마다 새 세션 폴더가 생기므로, 이전 세션부터 지워 장시간 운용해도 디스크 사용량이 제한됨)
+# 3.사용법 :
+## 1) 기록: writer = SessionArchiveWriter(session_dir) -> writer.append(packets) -> writer.close()
+## 2) 조회: archive = SessionArchive(session_dir)
+###  - archive.find_time(ts): ts 이후 첫 레코드의 전체 번호
+###  - archive.iter_range(start_ts, end_ts): UsbPacket 목록 단위로 반환
+
+import os
+import shutil
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from core.batch_queue import BoundedBatchQueue, OverflowPolicy
+from core.usb_packet import UsbPacket
+
+# (컬럼 이름, array 타입 코드) - 파일 이름은 "<이름>.<타입 코드>"
+COLUMNS = (
+    ('ts', 'd'),
+    ('frame_len', 'I'),
+    ('data_len', 'I'),
+    ('direction', 'B'),
+    ('endpoint', 'B'),
+    ('transfer', 'B'),
+    ('device', 'H'),
+    ('bus', 'H'),
+    ('status', 'I'),
+    ('info', 'B'),
+    ('function', 'H'),
+    ('irp_id', 'Q'),
+    ('payload_off', 'Q'),
+    ('payload_len', 'I'),
+)
+
+PAYLOAD_FILE = 'payload.bin'
+TINDEX_TS_FILE = 'tindex_ts.d'
+TINDEX_REC_FILE = 'tindex_rec.Q'
+SEGMENT_PREFIX = 'seg_'
+SESSION_PREFIX = 'session_'
+
+# 희소 시간 인덱스 간격 (레코드 수)
+INDEX_STRIDE = 1024
+
+
+def _column_file(name, typecode):
+    return f"{name}.{typecode}"
+
+
+def new_session_dir(root_dir):
+    """root_dir 아래에 시각 기반 세션 폴더 경로를 만듭니다. (예: session_20260101_120000)"""
+    return os.path.join(root_dir, time.strftime(f"{SESSION_PREFIX}%Y%m%d_%H%M%S"))
+
+
+def _segment_dirs(session_dir):
+    try:
+        names = sorted(name for name in os.listdir(session_dir)
+                       if name.startswith(SEGMENT_PREFIX) and name[len(SEGMENT_PREFIX):].isdigit())
+    except OSError:
+        return []
+    return [os.path.join(session_dir, name) for name in names]
+
+
+def _dir_size(path):
+    total = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    total += entry.stat().st_size
+    except OSError:
+        pass
+    return total
+
+
+class SessionArchiveWriter:
+    SEGMENT_MAX_BYTES = 256 * 1024 * 1024
+    TOTAL_MAX_BYTES = 8 * 1024 * 1024 * 1024
+    BATCH_RECORDS = 16384
+    FLUSH_INTERVAL = 0.5
+    QUEUE_CAPACITY = 1000000
+
+    def __init__(self, session_dir, segment_max_bytes=SEGMENT_MAX_BYTES, total_max_bytes=TOTAL_MAX_BYTES):
+        self.session_dir = session_dir
+        self.segment_max_bytes = segment_max_bytes
+        self.total_max_bytes = total_max_bytes
+        os.makedirs(session_dir, exist_ok=True)
+
+        # 디스크가 못 따라오면 새 패킷을 버리고 개수만 센다 (캡처 쓰레드는 절대 블로킹하지 않음)
+        self._queue = BoundedBatchQueue(self.QUEUE_CAPACITY, OverflowPolicy.DROP_NEWEST)
+
+        self._segment_no = self._last_segment_no()
+        self._segment_path = None
+        self._files = None
+        self._payload_file = None
+        self._tindex_files = None
+        self._segment_records = 0
+        self._segment_bytes = 0
+        self._payload_off = 0
+        # 상위 폴더의 모든 세션에서 기록이 끝난 세그먼트 (경로, 크기) - 오래된 순
+        self._closed_segments = self._existing_segments()
+        self._closed_bytes = sum(size for _, size in self._closed_segments)
+        self.records_written = 0
+        self.last_error = None
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def dropped(self):
+        return self._queue.dropped_total
+
+    def append(self, packets):
+        """UsbPacket 목록을 기록 큐에 넣습니다. (블로킹하지 않음)"""
+        self._queue.put_many(packets)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+    # ------------------ 백그라운드 기록 ------------------
+
+    def _run(self):
+        try:
+            while True:
+                if self._queue.qsize() < self.BATCH_RECORDS and not self._stop.is_set():
+                    self._stop.wait(self.FLUSH_INTERVAL)
+                batch = self._queue.get_batch(self.BATCH_RECORDS)
+                if batch:
+                    self._write_batch(batch)
+                elif self._stop.is_set():
+                    break
+        except Exception as e:
+            # 디스크 오류뿐 아니라 잘못된 필드 값(array 범위 초과 등)도 기록해 close() 후 알릴 수 있게 함
+            self.last_error = e
+        finally:
+            try:
+                self._close_segment()
+            except Exception as e:
+                self.last_error = self.last_error or e
+
+    def _write_batch(self, packets):
+        if self._files is None:
+            self._open_segment()
+
+        columns = {name: array(typecode) for name, typecode in COLUMNS}
+        payloads = []
+        offset = self._payload_off
+        for p in packets:
+            payload_len = len(p.payload)
+            columns['ts'].append(p.timestamp)
+            columns['frame_len'].append(p.frame_len)
+            columns['data_len'].append(p.data_length)
+            columns['direction'].append(1 if p.endpoint & 0x80 else 0)
+            columns['endpoint'].append(p.endpoint)
+            columns['transfer'].append(p.transfer_type)
+            columns['device'].append(p.device)
+            columns['bus'].append(p.bus)
+            columns['status'].append(p.status)
+            columns['info'].append(p.info)
+            columns['function'].append(p.function)
+            columns['irp_id'].append(p.irp_id)
+            columns['payload_off'].append(offset)
+            columns['payload_len'].append(payload_len)
+            payloads.append(p.payload)
+            offset += payload_len
+
+        for name, _ in COLUMNS:
+            column = columns[name]
+            self._files[name].write(column.tobytes())
+            self._segment_bytes += column.itemsize * len(column)
+        blob = b"".join(payloads)
+        self._payload_file.write(blob)
+        self._segment_bytes += len(blob)
+        self._payload_off = offset
+
+        # 희소 시간 인덱스: 세그먼트 내 레코드 번호가 INDEX_STRIDE의 배수인 레코드
+        first = self._segment_records
+        n = len(packets)
+        index_ts = array('d')
+        index_rec = array('Q')
+        for rec in range(-(-first // INDEX_STRIDE) * INDEX_STRIDE, first + n, INDEX_STRIDE):
+            index_ts.append(columns['ts'][rec - first])
+            index_rec.append(rec)
+        if index_rec:
+            self._tindex_files[0].write(index_ts.tobytes())
+            self._tindex_files[1].write(index_rec.tobytes())
+
+        self._segment_records += n
+        self.records_written += n
+        for f in self._all_files():
+            f.flush()
+
+        if self._segment_bytes >= self.segment_max_bytes:
+            self._close_segment()
+        else:
+            self._enforce_total_limit()
+
+    def _last_segment_no(self):
+        return max((int(os.path.basename(path)[len(SEGMENT_PREFIX):]) for path in _segment_dirs(self.session_dir)),
+                   default=0)
+
+    def _existing_segments(self):
+        """상위 폴더의 세션들(이 세션 포함)에 이미 있는 세그먼트를 오래된 순으로 반환합니다."""
+        session_dir = os.path.normpath(self.session_dir)
+        root = os.path.dirname(session_dir)
+        try:
+            sessions = sorted(os.path.join(root, name) for name in os.listdir(root or os.curdir)
+                              if name.startswith(SESSION_PREFIX))
+        except OSError:
+            sessions = []
+        if session_dir not in sessions:
+            sessions.append(session_dir)
+        return [(path, _dir_size(path)) for session in sessions for path in _segment_dirs(session)]
+
+    def _open_segment(self):
+        self._segment_no += 1
+        self._segment_path = os.path.join(self.session_dir, f"{SEGMENT_PREFIX}{self._segment_no:06d}")
+        os.makedirs(self._segment_path, exist_ok=True)
+        self._files = {name: open(os.path.join(self._segment_path, _column_file(name, typecode)), 'ab')
+                       for name, typecode in COLUMNS}
+        self._payload_file = open(os.path.join(self._segment_path, PAYLOAD_FILE), 'ab')
+        self._tindex_files = (open(os.path.join(self._segment_path, TINDEX_TS_FILE), 'ab'),
+                              open(os.path.join(self._segment_path, TINDEX_REC_FILE), 'ab'))
+        self._segment_records = 0
+        self._segment_bytes = 0
+        self._payload_off = 0
+
+    def _all_files(self):
+        return list(self._files.values()) + [self._payload_file, *self._tindex_files]
+
+    def _close_segment(self):
+        if self._files is None:
+            return
+        for f in self._all_files():
+            f.close()
+        self._closed_segments.append((self._segment_path, self._segment_bytes))
+        self._closed_bytes += self._segment_bytes
+        self._files = None
+        self._segment_bytes = 0
+        self._enforce_total_limit()
+
+    def _enforce_total_limit(self):
+        # 기록 중인 세그먼트도 용량에 포함하되, 지우는 것은 기록이 끝난 세그먼트만
+        while self._closed_segments and self._closed_bytes + self._segment_bytes > self.total_max_bytes:
+            path, size = self._closed_segments.pop(0)
+            shutil.rmtree(path, ignore_errors=True)
+            self._closed_bytes -= size
+            session = os.path.dirname(path)
+            if os.path.normpath(session) != os.path.normpath(self.session_dir) and not _segment_dirs(session):
+                # 세그먼트가 모두 지워진 이전 세션 폴더도 정리
+                shutil.rmtree(session, ignore_errors=True)
+
+
+class ArchiveSegment:
+    """세그먼트 하나의 읽기 전용 뷰. 컬럼은 필요한 구간만 파일에서 읽습니다."""
+
+    def __init__(self, path):
+        self.path = path
+        # 기록 중인 세그먼트일 수 있으므로 모든 컬럼에 완전히 기록된 레코드 수만 사용
+        self.count = min(os.path.getsize(os.path.join(path, _column_file(name, typecode))) // array(typecode).itemsize
+                         for name, typecode in COLUMNS)
+        self.index_ts = self._read_array(TINDEX_TS_FILE, 'd')
+        self.index_rec = self._read_array(TINDEX_REC_FILE, 'Q')
+        n = min(len(self.index_ts), len(self.index_rec))
+        while n and self.index_rec[n - 1] >= self.count:
+            n -= 1
+        del self.index_ts[n:]
+        del self.index_rec[n:]
+
+        self.first_ts = self.read_column('ts', 0, 1)[0] if self.count else 0.0
+        self.last_ts = self.read_column('ts', self.count - 1, 1)[0] if self.count else 0.0
+
+    def _read_array(self, filename, typecode):
+        values = array(typecode)
+        try:
+            with open(os.path.join(self.path, filename), 'rb') as f:
+                data = f.read()
+            values.frombytes(data[:len(data) - len(data) % values.itemsize])
+        except FileNotFoundError:
+            pass
+        return values
+
+    def read_column(self, name, start, count):
+        typecode = dict(COLUMNS)[name]
+        values = array(typecode)
+        with open(os.path.join(self.path, _column_file(name, typecode)), 'rb') as f:
+            f.seek(start * values.itemsize)
+            values.frombytes(f.read(count * values.itemsize))
+        return values
+
+    def find_time(self, timestamp):
+        """timestamp 이상인 첫 레코드의 세그먼트 내 번호. (희소 인덱스로 구간을 좁힌 뒤 그 구간만 읽음)"""
+        k = bisect_left(self.index_ts, timestamp)
+        lo = self.index_rec[k - 1] if k > 0 else 0
+        hi = self.index_rec[k] if k < len(self.index_rec) else self.count
+        window = self.read_column('ts', lo, hi - lo)
+        return lo + bisect_left(window, timestamp)
+
+    def read_packets(self, start, count):
+        count = max(0, min(count, self.count - start))
+        if count == 0:
+            return []
+        cols = {name: self.read_column(name, start, count) for name, _ in COLUMNS}
+        first_off = cols['payload_off'][0]
+        last = count - 1
+        with open(os.path.join(self.path, PAYLOAD_FILE), 'rb') as f:
+            f.seek(first_off)
+            blob = memoryview(f.read(cols['payload_off'][last] + cols['payload_len'][last] - first_off))
+
+        packets = []
+        for i in range(count):
+            off = cols['payload_off'][i] - first_off
+            packets.append(UsbPacket(
+                cols['ts'][i], cols['frame_len'][i], cols['irp_id'][i], cols['status'][i],
+                cols['function'][i], cols['info'][i], cols['bus'][i], cols['device'][i],
+                cols['endpoint'][i], cols['transfer'][i], cols['data_len'][i],
+                blob[off:off + cols['payload_len'][i]],
+            ))
+        return packets
+
+
+class SessionArchive:
+    """세션 폴더의 모든 세그먼트를 하나의 연속된 레코드 열로 조회합니다."""
+    BATCH_SIZE = 4096
+
+    def __init__(self, session_dir):
+        self.session_dir = session_dir
+        self.segments = []
+        for name in sorted(os.listdir(session_dir)):
+            path = os.path.join(session_dir, name)
+            if name.startswith(SEGMENT_PREFIX) and os.path.exists(os.path.join(path, _column_file('ts', 'd'))):
+                segment = ArchiveSegment(path)
+                if segment.count:
+                    self.segments.append(segment)
+
+        # 세그먼트별 시작 레코드 번호 (전체 번호 -> 세그먼트 변환용)
+        self._starts = []
+        total = 0
+        for segment in self.segments:
+            self._starts.append(total)
+            total += segment.count
+        self.record_count = total
+
+    @property
+    def first_ts(self):
+        return self.segments[0].first_ts if self.segments else 0.0
+
+    @property
+    def last_ts(self):
+        return self.segments[-1].last_ts if self.segments else 0.0
+
+    def find_time(self, timestamp):
+        """timestamp 이상인 첫 레코드의 전체 번호. 없으면 record_count."""
+        for segment, start in zip(self.segments, self._starts):
+            if segment.last_ts >= timestamp:
+                return start + segment.find_time(timestamp)
+        return self.record_count
+
+    def iter_records(self, start=0, end=None, batch_size=BATCH_SIZE):
+        """전체 번호 [start, end) 구간의 패킷을 batch_size개씩 반환합니다."""
+        end = self.record_count if end is None else min(end, self.record_count)
+        for segment, seg_start in zip(self.segments, self._starts):
+            seg_end = seg_start + segment.count
+            if seg_end <= start:
+                continue
+            if seg_start >= end:
+                break
+            local = max(start, seg_start) - seg_start
+            local_end = min(end, seg_end) - seg_start
+            while local < local_end:
+                n = min(batch_size, local_end - local)
+                yield segment.read_packets(local, n)
+                local += n
+
+    def iter_range(self, start_ts=None, end_ts=None, batch_size=BATCH_SIZE):
+        """[start_ts, end_ts) 시간 구간의 패킷을 batch_size개씩 반환합니다."""
+        start = 0 if start_ts is None else self.find_time(start_ts)
+        end = None if end_ts is None else self.find_time(end_ts)
+        yield from self.iter_records(start, end, batch_size)
@@ -0,0 +1,266 @@
+# 1.개요 : 헤드리스(Qt 없음) 실행용 메세지 싱크 - 캡처 서비스의 출력을 표준 출력/회전 파일/로컬 소켓으로 보낸다.
+# 2.특징 :
+## 1) ConsoleWidget과 같은 add_message()/add_messages() 인터페이스이므로 UsbSniffService.set_console_widget()에 그대로 넘긴다.
+## 2) 캡처 쓰레드는 BoundedBatchQueue에 넣기만 하고, 문자열 변환과 I/O는 싱크의 백그라운드 쓰레드가 배치 단위로 한다.
+### - 출력이 못 따라오면 새 메세지를 "N개 생략" 요약 한 줄로 대체한다. (캡처 쓰레드는 절대 블로킹하지 않음)
+## 3) 출력 형식: 'text' (콘솔과 같은 "[RX] Time: ..." 한 줄) 또는 'jsonl' (시각/종류/엔드포인트/패킷 번호/요약/페이로드 hex)
+# 3.사용법 :
+## 1) sink = StdoutSink() / RotatingFileSink("logs") / SocketSink("tcp:127.0.0.1:5555") / SocketSink("unix:/tmp/usb.sock")
+## 2) 여러 곳에 동시에 보낼 때: FanoutSink([StdoutSink(), RotatingFileSink("logs")])
+## 3) service.set_console_widget(sink) → 캡처 → sink.close() (남은 메세지를 모두 기록한 뒤 종료)
+
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+from core.batch_queue import BoundedBatchQueue, OverflowPolicy
+from core.msg_type import MsgType
+
+
+def format_text(record):
+    msg_type, message, timestamp, endpoint, packet_id = record
+    return f"[{msg_type.name}] {message}\n"
+
+
+def format_jsonl(record):
+    msg_type, message, timestamp, endpoint, packet_id = record
+    payload = getattr(message, 'payload', None)
+    return json.dumps({
+        'time': timestamp,
+        'type': msg_type.name,
+        'endpoint': endpoint,
+        'packet_id': packet_id,
+        'text': str(message),
+        'data': bytes(payload).hex() if payload else None,
+    }, ensure_ascii=False) + "\n"
+
+
+FORMATTERS = {'text': format_text, 'jsonl': format_jsonl}
+
+
+class MessageSink:
+    """백그라운드 쓰레드에서 메세지를 문자열로 바꿔 write()로 내보내는 싱크의 기본 클래스."""
+    QUEUE_CAPACITY = 200000
+    BATCH_RECORDS = 8192
+    FLUSH_INTERVAL = 0.1
+
+    def __init__(self, fmt='text'):
+        if fmt not in FORMATTERS:
+            raise ValueError(f"지원하지 않는 출력 형식입니다: {fmt} ({', '.join(FORMATTERS)})")
+        self._format = FORMATTERS[fmt]
+        self._queue = BoundedBatchQueue(self.QUEUE_CAPACITY, OverflowPolicy.COALESCE, self._make_suppressed_summary)
+        self.last_error = None
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def dropped(self):
+        return self._queue.suppressed_total
+
+    def add_message(self, msg_type: MsgType, message, endpoint: int = None, packet_id: int = None):
+        self._queue.put((msg_type, message, time.time(), endpoint, packet_id))
+
+    def add_messages(self, messages):
+        """(msg_type, message, endpoint, packet_id) 목록을 한 번에 추가합니다. (블로킹하지 않음)"""
+        timestamp = time.time()
+        self._queue.put_many([(msg_type, message, timestamp, endpoint, packet_id)
+                              for msg_type, message, endpoint, packet_id in messages])
+
+    def close(self):
+        """큐에 남은 메세지를 모두 기록하고 출력을 닫습니다."""
+        self._stop.set()
+        self._thread.join()
+
+    def _make_suppressed_summary(self, count):
+        return (MsgType.WARNING, f"--- 출력 지연으로 메세지 {count}개 생략됨 ---", time.time(), None, None)
+
+    # ------------------ 백그라운드 기록 ------------------
+
+    def _run(self):
+        try:
+            while True:
+                if self._queue.qsize() < self.BATCH_RECORDS and not self._stop.is_set():
+                    self._stop.wait(self.FLUSH_INTERVAL)
+                batch = self._queue.get_batch(self.BATCH_RECORDS)
+                if batch:
+                    self.write("".join(map(self._format, batch)))
+                elif self._stop.is_set():
+                    break
+        except OSError as e:
+            self.last_error = e
+        finally:
+            self.close_output()
+
+    def write(self, text):
+        raise NotImplementedError
+
+    def close_output(self):
+        pass
+
+
+class StdoutSink(MessageSink):
+    def __init__(self, stream=None, fmt='text'):
+        self.stream = stream if stream is not None else sys.stdout
+        super().__init__(fmt)
+
+    def write(self, text):
+        self.stream.write(text)
+        self.stream.flush()
+
+
+class RotatingFileSink(MessageSink):
+    """directory에 capture_<시각>.log(.jsonl) 파일로 기록하고, max_bytes를 넘으면 새 파일로 회전합니다.
+    파일이 max_files개를 넘으면 가장 오래된 파일부터 삭제합니다."""
+    MAX_BYTES = 64 * 1024 * 1024
+    MAX_FILES = 20
+
+    def __init__(self, directory, max_bytes=MAX_BYTES, max_files=MAX_FILES, fmt='text'):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self._extension = '.jsonl' if fmt == 'jsonl' else '.log'
+        self._file = None
+        self._file_bytes = 0
+        self._paths = []    # 이 싱크가 만든 파일 (오래된 순)
+        os.makedirs(directory, exist_ok=True)
+        super().__init__(fmt)
+
+    def write(self, text):
+        if self._file is None or self._file_bytes >= self.max_bytes:
+            self._rotate()
+        data = text.encode('utf-8')
+        self._file.write(data)
+        self._file.flush()
+        self._file_bytes += len(data)
+
+    def _rotate(self):
+        self.close_output()
+        name = f"capture_{time.strftime('%Y%m%d_%H%M%S')}"
+        path = os.path.join(self.directory, name + self._extension)
+        suffix = 1
+        while os.path.exists(path):
+            path = os.path.join(self.directory, f"{name}_{suffix}{self._extension}")
+            suffix += 1
+        self._file = open(path, 'wb')
+        self._file_bytes = 0
+        self._paths.append(path)
+        while len(self._paths) > self.max_files:
+            try:
+                os.remove(self._paths.pop(0))
+            except OSError:
+                pass
+
+    def close_output(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class SocketSink(MessageSink):
+    """로컬 소켓에서 접속을 기다리고 접속한 모든 클라이언트에게 메세지를 보냅니다.
+    address: "tcp:호스트:포트" (기본 호스트 127.0.0.1) 또는 "unix:경로" (POSIX 전용)
+    일정 시간(SEND_TIMEOUT) 안에 받지 못하는 클라이언트는 연결을 끊습니다."""
+    SEND_TIMEOUT = 1.0
+
+    def __init__(self, address, fmt='text'):
+        self.address = address
+        self._server = self._listen(address)
+        self._clients = []
+        self._clients_lock = threading.Lock()
+        self._accept_thread = threading.Thread(target=self._accept_worker, daemon=True)
+        self._accept_thread.start()
+        super().__init__(fmt)
+
+    @staticmethod
+    def _listen(address):
+        kind, _, target = address.partition(':')
+        if kind == 'unix':
+            if not hasattr(socket, 'AF_UNIX'):
+                raise ValueError("이 운영체제는 UNIX 소켓을 지원하지 않습니다. tcp:호스트:포트를 사용하세요.")
+            if os.path.exists(target):
+                os.remove(target)
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(target)
+        elif kind == 'tcp':
+            host, _, port = target.rpartition(':')
+            if not port.isdigit():
+                raise ValueError(f"포트 번호가 올바르지 않습니다: {address}")
+            server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server.bind((host or '127.0.0.1', int(port)))
+        else:
+            raise ValueError(f"소켓 주소는 tcp:호스트:포트 또는 unix:경로 형식이어야 합니다: {address}")
+        server.listen()
+        return server
+
+    @property
+    def client_count(self):
+        with self._clients_lock:
+            return len(self._clients)
+
+    def _accept_worker(self):
+        while True:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                return      # 서버 소켓이 닫힘
+            client.settimeout(self.SEND_TIMEOUT)
+            with self._clients_lock:
+                self._clients.append(client)
+
+    def write(self, text):
+        with self._clients_lock:
+            clients = list(self._clients)
+        if not clients:
+            return
+        data = text.encode('utf-8')
+        for client in clients:
+            try:
+                client.sendall(data)
+            except OSError:
+                self._drop_client(client)
+
+    def _drop_client(self, client):
+        with self._clients_lock:
+            if client in self._clients:
+                self._clients.remove(client)
+        client.close()
+
+    def close_output(self):
+        try:
+            # 리눅스에서는 close()만으로 accept() 대기가 풀리지 않으므로 먼저 shutdown
+            self._server.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._server.close()
+        with self._clients_lock:
+            clients, self._clients = self._clients, []
+        for client in clients:
+            client.close()
+        kind, _, target = self.address.partition(':')
+        if kind == 'unix' and os.path.exists(target):
+            os.remove(target)
+
+
+class FanoutSink:
+    """여러 싱크에 같은 메세지를 전달합니다."""
+
+    def __init__(self, sinks):
+        self.sinks = list(sinks)
+
+    def add_message(self, msg_type: MsgType, message, endpoint: int = None, packet_id: int = None):
+        for sink in self.sinks:
+            sink.add_message(msg_type, message, endpoint, packet_id)
+
+    def add_messages(self, messages):
+        for sink in self.sinks:
+            sink.add_messages(messages)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
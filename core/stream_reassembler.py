@@ -0,0 +1,258 @@
+# 1.개요 : 벌크 전송 조각(URB 페이로드)을 엔드포인트별 바이트 스트림으로 이어 붙여 논리 프레임 단위로 잘라내는 재조립기
+# 2.특징 :
+## 1) 스트림은 (인터페이스, 버스, 장치, 엔드포인트 주소)로 구분한다. (엔드포인트 주소의 최상위 비트가 방향)
+## 2) 스트림마다 bytearray 하나에 페이로드(memoryview)를 바로 이어 붙이므로 조각마다 임시 객체를 만들지 않는다.
+### - 복사는 완성된 프레임을 꺼낼 때 한 번, 소비된 앞부분 정리는 feed() 호출당 한 번만 일어난다.
+## 3) 프레이밍 방식은 Framer 객체로 교체할 수 있다.
+### - DelimiterFramer: 구분자(CR/LF 등)로 자름 (이미 검사한 구간은 다시 검색하지 않음)
+### - LengthPrefixFramer: 헤더의 길이 필드로 자름
+### - FixedSizeFramer: 고정 크기로 자름
+### - IdleGapFramer: 일정 시간 조각이 들어오지 않으면 그때까지 모인 데이터를 하나의 프레임으로 냄
+## 4) 프레임이 max_frame 바이트를 넘도록 끝나지 않으면 잘라서 내보낸다. (truncated=True)
+# 3.사용법 :
+## 1) reassembler = StreamReassembler(DelimiterFramer(b'\r\n'))
+## 2) 캡처 쓰레드: for frame in reassembler.feed(packet): ... (완성된 StreamFrame 목록)
+## 3) 타이머/종료 시: reassembler.flush_idle() / reassembler.flush_all()로 남은 데이터를 프레임으로 꺼냄
+
+import threading
+import time
+
+from core.usb_packet import TRANSFER_BULK, payload_preview
+
+
+class StreamFrame:
+    __slots__ = ('interface', 'bus', 'device', 'endpoint', 'timestamp', 'data', 'fragments', 'truncated')
+
+    def __init__(self, interface, bus, device, endpoint, timestamp, data, fragments, truncated=False):
+        self.interface = interface          # 캡처한 인터페이스 이름 (재생 시 None)
+        self.bus = bus
+        self.device = device
+        self.endpoint = endpoint            # 방향 비트를 포함한 엔드포인트 주소
+        self.timestamp = timestamp          # 프레임 첫 조각의 타임스탬프
+        self.data = data                    # 프레임 바이트 (bytes)
+        self.fragments = fragments          # 프레임에 포함된 URB 조각 수
+        self.truncated = truncated          # max_frame 초과 또는 유휴 시간 초과로 강제로 잘린 프레임
+
+    # core.packet_filter로 UsbPacket과 같은 방식으로 거를 수 있도록 같은 이름의 속성 제공
+    transfer_type = TRANSFER_BULK
+
+    @property
+    def payload(self):
+        return self.data
+
+    def __str__(self):
+        return format_frame_summary(self)
+
+
+# ------------------ 프레이머 ------------------
+
+class Framer:
+    """프레이밍 방식의 기본 클래스.
+    cut(buf, pos, stream)은 buf[pos:]에서 다음 프레임을 찾아 (프레임 시작, 프레임 끝, 다음 위치)를 반환하고,
+    아직 프레임이 완성되지 않았으면 None을 반환합니다."""
+    # 이 시간(초) 동안 조각이 들어오지 않으면 남은 데이터를 프레임으로 냄 (None: 사용 안 함)
+    idle_timeout = None
+
+    def cut(self, buf, pos, stream):
+        raise NotImplementedError
+
+
+class DelimiterFramer(Framer):
+    def __init__(self, delimiter=b'\r\n', include_delimiter=False, idle_timeout=None):
+        if not delimiter:
+            raise ValueError("구분자는 비어 있을 수 없습니다.")
+        self.delimiter = bytes(delimiter)
+        self.include_delimiter = include_delimiter
+        self.idle_timeout = idle_timeout
+
+    def cut(self, buf, pos, stream):
+        delimiter = self.delimiter
+        index = buf.find(delimiter, max(pos, stream.scan))
+        if index < 0:
+            # 다음 조각에서는 구분자가 걸쳐 있을 수 있는 마지막 부분부터만 검색
+            stream.scan = max(pos, len(buf) - len(delimiter) + 1)
+            return None
+        next_pos = index + len(delimiter)
+        stream.scan = next_pos
+        return pos, (next_pos if self.include_delimiter else index), next_pos
+
+
+class LengthPrefixFramer(Framer):
+    def __init__(self, length_size=2, byteorder='little', length_offset=0, length_adjust=0,
+                 include_header=True, idle_timeout=None):
+        """length_offset 위치의 length_size 바이트 길이 필드 + length_adjust = 헤더 뒤 본문 길이."""
+        self.length_size = length_size
+        self.byteorder = byteorder
+        self.length_offset = length_offset
+        self.length_adjust = length_adjust
+        self.include_header = include_header
+        self.idle_timeout = idle_timeout
+        self.header_size = length_offset + length_size
+
+    def cut(self, buf, pos, stream):
+        header_end = pos + self.header_size
+        if len(buf) < header_end:
+            return None
+        length = int.from_bytes(buf[pos + self.length_offset:header_end], self.byteorder) + self.length_adjust
+        frame_end = header_end + max(length, 0)
+        if len(buf) < frame_end:
+            return None
+        return (pos if self.include_header else header_end), frame_end, frame_end
+
+
+class FixedSizeFramer(Framer):
+    def __init__(self, size, idle_timeout=None):
+        if size <= 0:
+            raise ValueError("프레임 크기는 1 이상이어야 합니다.")
+        self.size = size
+        self.idle_timeout = idle_timeout
+
+    def cut(self, buf, pos, stream):
+        frame_end = pos + self.size
+        if len(buf) < frame_end:
+            return None
+        return pos, frame_end, frame_end
+
+
+class IdleGapFramer(Framer):
+    """내용으로는 자르지 않고, 조각 사이 간격이 gap(초)를 넘으면 프레임을 끝냅니다."""
+    def __init__(self, gap=0.02):
+        self.idle_timeout = gap
+
+    def cut(self, buf, pos, stream):
+        return None
+
+
+# ------------------ 재조립기 ------------------
+
+class _Stream:
+    __slots__ = ('buf', 'scan', 'first_ts', 'last_ts', 'last_seen', 'fragments')
+
+    def __init__(self):
+        self.buf = bytearray()
+        self.scan = 0               # 프레이머가 이미 검사한 위치 (DelimiterFramer용)
+        self.first_ts = 0.0         # 남은 데이터 첫 조각의 캡처 타임스탬프
+        self.last_ts = 0.0          # 마지막 조각의 캡처 타임스탬프
+        self.last_seen = 0.0        # 마지막 조각이 들어온 시각 (time.monotonic)
+        self.fragments = 0          # 남은 데이터에 포함된 조각 수
+
+
+class StreamReassembler:
+    MAX_FRAME = 64 * 1024
+
+    def __init__(self, framer, max_frame=MAX_FRAME):
+        self.framer = framer
+        self.max_frame = max_frame
+        self._streams = {}
+        # feed()는 캡처 쓰레드, flush_idle()은 타이머 쓰레드에서 호출될 수 있음
+        self._lock = threading.Lock()
+
+    def feed(self, packet):
+        """패킷 페이로드를 스트림에 추가하고 완성된 프레임 목록을 반환합니다."""
+        payload = packet.payload
+        if not payload:
+            return []
+        key = (packet.interface, packet.bus, packet.device, packet.endpoint)
+        with self._lock:
+            stream = self._streams.get(key)
+            if stream is None:
+                stream = self._streams[key] = _Stream()
+
+            frames = []
+            timeout = self.framer.idle_timeout
+            if stream.buf and timeout is not None and packet.timestamp - stream.last_ts > timeout:
+                # 조각 사이 간격이 유휴 시간을 넘음: 남은 데이터를 먼저 프레임으로 냄
+                self._flush_stream(key, stream, frames)
+
+            if not stream.buf:
+                stream.first_ts = packet.timestamp
+            stream.buf += payload
+            stream.fragments += 1
+            stream.last_ts = packet.timestamp
+            stream.last_seen = time.monotonic()
+
+            self._cut_frames(key, stream, frames)
+            return frames
+
+    def flush_idle(self, now=None):
+        """유휴 시간(framer.idle_timeout) 동안 조각이 없던 스트림의 남은 데이터를 프레임으로 꺼냅니다."""
+        timeout = self.framer.idle_timeout
+        if timeout is None:
+            return []
+        now = time.monotonic() if now is None else now
+        frames = []
+        with self._lock:
+            for key, stream in self._streams.items():
+                if stream.buf and now - stream.last_seen > timeout:
+                    self._flush_stream(key, stream, frames)
+        return frames
+
+    def flush_all(self):
+        """모든 스트림의 남은 데이터를 프레임으로 꺼냅니다. (캡처 종료 시)"""
+        frames = []
+        with self._lock:
+            for key, stream in self._streams.items():
+                if stream.buf:
+                    self._flush_stream(key, stream, frames)
+        return frames
+
+    def clear(self):
+        with self._lock:
+            self._streams = {}
+
+    def _cut_frames(self, key, stream, frames):
+        buf = stream.buf
+        cut = self.framer.cut
+        interface, bus, device, endpoint = key
+        pos = 0
+        view = memoryview(buf)
+        try:
+            while pos < len(buf):
+                result = cut(buf, pos, stream)
+                if result is None:
+                    if len(buf) - pos <= self.max_frame:
+                        break
+                    # 프레임이 끝나지 않고 max_frame을 넘음: 강제로 자름
+                    start, end, next_pos = pos, pos + self.max_frame, pos + self.max_frame
+                    truncated = True
+                else:
+                    start, end, next_pos = result
+                    truncated = False
+                frames.append(StreamFrame(interface, bus, device, endpoint, stream.first_ts,
+                                          bytes(view[start:end]), stream.fragments, truncated))
+                pos = next_pos
+                # 같은 조각에 다음 프레임이 이어지면 그 조각이 다음 프레임의 첫 조각
+                stream.fragments = 1
+                stream.first_ts = stream.last_ts
+        finally:
+            view.release()
+
+        if pos:
+            del buf[:pos]
+            stream.scan = max(stream.scan - pos, 0)
+        if not buf:
+            stream.fragments = 0
+
+    def _flush_stream(self, key, stream, frames):
+        interface, bus, device, endpoint = key
+        # 유휴 간격 프레이밍에서는 정상적인 프레임 끝, 그 외 프레이머에서는 완성되지 않은 채 잘린 프레임
+        truncated = not isinstance(self.framer, IdleGapFramer)
+        frames.append(StreamFrame(interface, bus, device, endpoint, stream.first_ts,
+                                  bytes(stream.buf), stream.fragments, truncated))
+        stream.buf.clear()
+        stream.scan = 0
+        stream.fragments = 0
+
+
+def format_frame_summary(frame):
+    """재조립된 프레임의 한 줄 요약을 만듭니다. (format_summary와 같은 형식)"""
+    frame_time = time.strftime("%H:%M:%S", time.localtime(frame.timestamp))
+    frame_time += f".{int((frame.timestamp % 1) * 1000):03d}"
+    direction_name = "in" if frame.endpoint & 0x80 else "out"
+    info = f"EP 0x{frame.endpoint:02X} {direction_name}, {frame.fragments} URB"
+    if frame.truncated:
+        info += ", 잘림"
+    msg = f"Time: {frame_time} | Len: {len(frame.data)} | Proto: SERIAL | Info: {info} | Data(ASCII): {payload_preview(frame.data)}"
+    if frame.interface:
+        msg = f"[{frame.interface}] {msg}"
+    return msg
@@ -0,0 +1,169 @@
+# 1.개요 : 장치 주소/엔드포인트(방향 포함)별 트래픽 통계를 슬라이딩 윈도우로 집계하는 통계 엔진
+# 2.특징 :
+## 1) 캡처 쓰레드가 파싱된 패킷 배치를 update()로 넘기면 패킷마다 O(1)로 고정 크기 링 배열의 현재 구간에 더한다.
+### - 구간(BUCKET_SECONDS) WINDOW_BUCKETS개가 한 윈도우이며, 새 구간으로 넘어갈 때 재사용할 칸만 0으로 지운다.
+### - 집계 항목: 패킷 수, 바이트 수(헤더의 dataLength), 에러(USBD_STATUS != 0), STALL, 크기 분포(log2 구간)
+## 2) 콘솔 출력/필터와 무관하게 서비스가 받은 모든 패킷을 집계한다. (콘솔을 멈추거나 필터로 다 숨겨도 동작)
+## 3) 시간은 패킷 타임스탬프 기준이므로 최대 속도 재생에서도 실제 캡처 당시의 속도를 보여준다.
+### - 마지막 패킷 이후에는 벽시계 경과 시간만큼 윈도우를 밀어 트래픽이 끊긴 엔드포인트의 속도가 0으로 내려간다.
+## 4) snapshot()은 UI 쓰레드에서 원하는 주기로 호출한다. (엔드포인트 수 x 윈도우 크기만큼만 계산)
+# 3.사용법 :
+## 1) stats = TrafficStats() → 캡처 쓰레드: stats.update(packets)
+## 2) UI: for row in stats.snapshot(): row['bytes_per_sec'], row['sizes'] ...
+## 3) 새 캡처 시작 시 stats.reset()
+
+import threading
+import time
+from array import array
+
+# log2 크기 구간 수: 0, 1, 2~3, 4~7, ..., 2^16 이상
+SIZE_BINS = 18
+# STALL로 보는 USBD_STATUS (STALL_PID, ENDPOINT_HALTED)
+STALL_STATUSES = frozenset((0xC0000004, 0xC0000030))
+
+
+def size_bin_label(index):
+    """크기 구간 번호의 표시 문자열 (예: 7 -> '64~127')"""
+    if index == 0:
+        return "0"
+    if index == SIZE_BINS - 1:
+        return f"{1 << (index - 1)}+"
+    low = 1 << (index - 1)
+    return str(low) if low == 1 else f"{low}~{(low << 1) - 1}"
+
+
+class EndpointStats:
+    """엔드포인트 하나의 링 배열. 칸 번호 = 구간 번호 % window_buckets"""
+    __slots__ = ('bus', 'device', 'endpoint', 'last_bucket', 'packets', 'bytes', 'errors', 'stalls', 'sizes',
+                 'total_packets', 'total_bytes', 'total_errors')
+
+    def __init__(self, bus, device, endpoint, window_buckets, bucket):
+        self.bus = bus
+        self.device = device
+        self.endpoint = endpoint
+        self.last_bucket = bucket       # 마지막으로 기록한 구간 번호
+        self.packets = array('Q', bytes(8 * window_buckets))
+        self.bytes = array('Q', bytes(8 * window_buckets))
+        self.errors = array('Q', bytes(8 * window_buckets))
+        self.stalls = array('Q', bytes(8 * window_buckets))
+        self.sizes = array('Q', bytes(8 * window_buckets * SIZE_BINS))
+        self.total_packets = 0
+        self.total_bytes = 0
+        self.total_errors = 0
+
+    def advance(self, bucket, window_buckets):
+        """bucket 구간으로 넘어가면서 지난 구간 사이의 칸(최대 한 바퀴)을 0으로 지웁니다."""
+        zero_sizes = array('Q', bytes(8 * SIZE_BINS))
+        for skipped in range(self.last_bucket + 1, min(bucket, self.last_bucket + window_buckets) + 1):
+            slot = skipped % window_buckets
+            self.packets[slot] = self.bytes[slot] = self.errors[slot] = self.stalls[slot] = 0
+            self.sizes[slot * SIZE_BINS:(slot + 1) * SIZE_BINS] = zero_sizes
+        self.last_bucket = bucket
+
+
+class TrafficStats:
+    BUCKET_SECONDS = 0.5
+    WINDOW_BUCKETS = 20
+
+    def __init__(self, bucket_seconds=BUCKET_SECONDS, window_buckets=WINDOW_BUCKETS):
+        self.bucket_seconds = bucket_seconds
+        self.window_buckets = window_buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    @property
+    def window_seconds(self):
+        return self.bucket_seconds * self.window_buckets
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}        # (bus, device, endpoint) -> EndpointStats
+            self._first_time = None     # 첫 패킷 타임스탬프
+            self._last_time = None      # 가장 최근 패킷 타임스탬프
+            self._last_update = 0.0     # 가장 최근 패킷을 받은 벽시계(monotonic) 시각
+
+    def update(self, packets):
+        """파싱된 패킷(UsbPacket) 배치를 집계합니다."""
+        if not packets:
+            return
+        bucket_seconds = self.bucket_seconds
+        window_buckets = self.window_buckets
+        last_bin = SIZE_BINS - 1
+        with self._lock:
+            endpoints = self._endpoints
+            last_time = self._last_time
+            for packet in packets:
+                timestamp = packet.timestamp
+                bucket = int(timestamp / bucket_seconds)
+                key = (packet.bus, packet.device, packet.endpoint)
+                stats = endpoints.get(key)
+                if stats is None:
+                    stats = endpoints[key] = EndpointStats(packet.bus, packet.device, packet.endpoint, window_buckets, bucket)
+                elif bucket > stats.last_bucket:
+                    stats.advance(bucket, window_buckets)
+                elif bucket < stats.last_bucket:
+                    bucket = stats.last_bucket  # 늦게 도착한 패킷은 최신 구간에 합산
+                slot = bucket % window_buckets
+                size = packet.data_length
+                stats.packets[slot] += 1
+                stats.bytes[slot] += size
+                stats.sizes[slot * SIZE_BINS + min(size.bit_length(), last_bin)] += 1
+                stats.total_packets += 1
+                stats.total_bytes += size
+                status = packet.status
+                if status:
+                    stats.errors[slot] += 1
+                    stats.total_errors += 1
+                    if status in STALL_STATUSES:
+                        stats.stalls[slot] += 1
+                if last_time is None or timestamp > last_time:
+                    last_time = timestamp
+            if self._first_time is None:
+                self._first_time = packets[0].timestamp
+            self._last_time = last_time
+            self._last_update = time.monotonic()
+
+    def snapshot(self):
+        """엔드포인트별 윈도우 통계 목록 (bytes/s 내림차순). 각 항목은 dict:
+        bus, device, endpoint, packets_per_sec, bytes_per_sec, window_packets, window_bytes,
+        errors, stalls (윈도우 내), total_packets, total_bytes, total_errors, sizes (log2 구간별 패킷 수)"""
+        bucket_seconds = self.bucket_seconds
+        window_buckets = self.window_buckets
+        with self._lock:
+            if self._last_time is None:
+                return []
+            now = self._last_time + max(0.0, time.monotonic() - self._last_update)
+            current = int(now / bucket_seconds)
+            oldest = current - window_buckets + 1
+            # 캡처 시작 직후에는 지난 시간만큼으로 나눔 (윈도우가 다 차기 전 속도가 낮게 보이지 않도록)
+            span = max(bucket_seconds, min(self.window_seconds, now - self._first_time))
+            rows = []
+            for stats in self._endpoints.values():
+                window_packets = window_bytes = errors = stalls = 0
+                sizes = [0] * SIZE_BINS
+                for bucket in range(max(oldest, stats.last_bucket - window_buckets + 1), min(stats.last_bucket, current) + 1):
+                    slot = bucket % window_buckets
+                    window_packets += stats.packets[slot]
+                    window_bytes += stats.bytes[slot]
+                    errors += stats.errors[slot]
+                    stalls += stats.stalls[slot]
+                    base = slot * SIZE_BINS
+                    for index in range(SIZE_BINS):
+                        sizes[index] += stats.sizes[base + index]
+                rows.append({
+                    'bus': stats.bus,
+                    'device': stats.device,
+                    'endpoint': stats.endpoint,
+                    'packets_per_sec': window_packets / span,
+                    'bytes_per_sec': window_bytes / span,
+                    'window_packets': window_packets,
+                    'window_bytes': window_bytes,
+                    'errors': errors,
+                    'stalls': stalls,
+                    'total_packets': stats.total_packets,
+                    'total_bytes': stats.total_bytes,
+                    'total_errors': stats.total_errors,
+                    'sizes': sizes,
+                })
+        rows.sort(key=lambda row: row['bytes_per_sec'], reverse=True)
+        return rows
@@ -0,0 +1,257 @@
+# 1.개요 : 여러 바이트/ASCII 패턴과 조건(길이/방향/엔드포인트/패킷 간격)으로 트리거를 걸고, 발생 전후 패킷을 pcapng로 저장하는 트리거 엔진
+# 2.특징 :
+## 1) 트리거 하나의 패턴들은 정규식 교대(alternation) 하나로 컴파일하여 페이로드마다 한 번의 C 수준 스캔으로 찾는다.
+### - 엔드포인트 스트림((인터페이스, 버스, 장치, 엔드포인트))마다 마지막 (최대 패턴 길이 - 1) 바이트를 보관하여 URB 경계에 걸친 패턴도 찾는다.
+### - 조건/간격을 만족하지 않아 건너뛴 패킷이 있으면 꼬리를 버려, 이어지지 않은 패킷끼리 패턴을 이어 붙이지 않는다.
+### - 길이/방향/엔드포인트 조건은 core.packet_filter 식으로, 패킷 간격은 min_gap/max_gap(초)으로 지정한다.
+## 2) 캡처 쓰레드에서 배치마다 feed()를 호출한다. 최근 패킷은 크기 제한이 있는 pre 링(deque)에 배치 단위로 넣는다.
+### - 트리거가 걸리면 pre 링의 패킷(pre_packets개 / pre_seconds초 이내) + 이후 패킷(post_packets개 또는 post_seconds초)을 모은다.
+### - 파일 기록은 별도 쓰레드가 하므로 캡처 쓰레드는 디스크 I/O로 멈추지 않고, 모으는 동안 패킷을 버리지 않는다.
+## 3) 트리거 발생 시 on_event(이름, 설명, 패킷), 파일 저장 후 on_saved(경로, 패킷 수, 에러)를 호출한다. (콘솔 알림용)
+# 3.사용법 :
+## 1) engine = TriggerEngine([Trigger("reset", patterns=['"RST"', '0d:0a:ff'], condition='dir == in')], "triggers")
+## 2) service.start_capture(..., trigger_engine=engine) 또는 캡처 쓰레드에서 직접 engine.feed(packets)
+## 3) 캡처 종료 시 engine.close() (수집 중인 구간을 저장하고 기록 쓰레드 종료)
+
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+
+from core.packet_filter import compile_filter
+from core.pcap_writer import PcapngWriter
+
+_HEX_PATTERN_RE = re.compile(r'^(?:0[xX](?:[0-9A-Fa-f]{2})+|[0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2})+)$')
+
+
+def parse_pattern(text):
+    """패턴 문자열을 바이트열로 변환합니다.
+    0x0d0aff / 0d:0a:ff → hex, "AT+RST" → 따옴표 안 문자열, 그 외는 ASCII (\\r \\n \\x00 이스케이프 사용 가능)"""
+    if isinstance(text, (bytes, bytearray)):
+        return bytes(text)
+    text = text.strip()
+    if _HEX_PATTERN_RE.match(text):
+        return bytes.fromhex(text[2:] if text[:2].lower() == '0x' else text.replace(':', ''))
+    if len(text) >= 2 and text[0] == text[-1] == '"':
+        text = text[1:-1]
+    try:
+        pattern = text.encode('latin-1').decode('unicode_escape').encode('latin-1')
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        pattern = text.encode('utf-8')
+    if not pattern:
+        raise ValueError("빈 패턴은 사용할 수 없습니다.")
+    return pattern
+
+
+class PatternMatcher:
+    """여러 바이트 패턴을 한 번에 찾는 매처. search(스트림 키, 페이로드)는 찾은 패턴(bytes) 또는 None"""
+
+    def __init__(self, patterns):
+        self.patterns = sorted({parse_pattern(pattern) for pattern in patterns}, key=len, reverse=True)
+        if not self.patterns:
+            raise ValueError("패턴이 없습니다.")
+        self._regex = re.compile(b'|'.join(map(re.escape, self.patterns)))
+        self._carry = len(self.patterns[0]) - 1     # 다음 URB와 이어 볼 바이트 수
+        self._tails = {}                            # 스트림 키 -> 마지막 _carry 바이트
+
+    def search(self, key, payload):
+        carry = self._carry
+        found = None
+        if carry:
+            tail = self._tails.get(key)
+            if tail:
+                # 경계 구간(이전 꼬리 + 현재 앞부분)에서 꼬리에 걸친 매치만 (꼬리 안의 매치는 이미 보고함)
+                boundary = tail + bytes(payload[:carry])
+                pos = 0
+                while found is None and pos < len(tail):
+                    match = self._regex.search(boundary, pos)
+                    if match is None or match.start() >= len(tail):
+                        break
+                    if match.end() > len(tail):
+                        found = match.group()
+                    pos = match.start() + 1
+            if len(payload) >= carry:
+                self._tails[key] = bytes(payload[-carry:])
+            else:
+                self._tails[key] = ((tail or b"") + bytes(payload))[-carry:]
+        if found is None:
+            match = self._regex.search(payload)
+            if match is not None:
+                found = match.group()
+        return found
+
+    def reset(self, key):
+        """스트림의 보관한 꼬리를 버립니다. (다음 페이로드는 앞 패킷과 이어 보지 않음)"""
+        self._tails.pop(key, None)
+
+
+class Trigger:
+    """패턴/조건/패킷 간격을 모두 만족하는 패킷에서 발생하는 트리거. (패턴은 페이로드가 있는 패킷에서만 찾음)
+    condition: core.packet_filter 식 (예: 'dir == in and ep == 0x81 and len >= 8', 빈 패킷은 'len == 0')
+    min_gap / max_gap: 같은 엔드포인트 스트림의 직전 패킷과의 간격(초) 하한/상한"""
+
+    def __init__(self, name, patterns=(), condition=None, min_gap=None, max_gap=None):
+        self.name = name
+        self.matcher = PatternMatcher(patterns) if patterns else None
+        self.condition = compile_filter(condition) if isinstance(condition, str) else condition
+        self.min_gap = min_gap
+        self.max_gap = max_gap
+        if self.matcher is None and self.condition is None and min_gap is None and max_gap is None:
+            raise ValueError(f"트리거 '{name}'에 패턴이나 조건이 없습니다.")
+        self._last_times = {}   # 스트림 키 -> 직전 패킷 시각
+
+    def check(self, packet):
+        """발생하면 설명 문자열, 아니면 None"""
+        # 여러 인터페이스를 합친 캡처에서는 버스/장치 번호가 겹칠 수 있으므로 인터페이스까지 구분
+        key = (packet.interface, packet.bus, packet.device, packet.endpoint)
+        condition = self.condition
+        if condition is not None and not condition(packet):
+            return self._skip(key)
+        details = []
+        if self.min_gap is not None or self.max_gap is not None:
+            last_time = self._last_times.get(key)
+            self._last_times[key] = packet.timestamp
+            if last_time is None:
+                return self._skip(key)
+            gap = packet.timestamp - last_time
+            if (self.min_gap is not None and gap < self.min_gap) or (self.max_gap is not None and gap > self.max_gap):
+                return self._skip(key)
+            details.append(f"gap={gap * 1000:.1f}ms")
+        if self.matcher is not None:
+            if not packet.payload:
+                # 빈 패킷은 패턴 스캔만 건너뜀 (꼬리는 유지하여 앞뒤 데이터 패킷의 패턴은 이어서 찾음)
+                return None
+            found = self.matcher.search(key, packet.payload)
+            if found is None:
+                return None
+            details.insert(0, f"match={found!r}")
+        return " ".join(details) if details else "condition"
+
+    def _skip(self, key):
+        # 건너뛴 패킷 앞뒤의 페이로드가 하나의 패턴으로 이어 붙지 않도록 꼬리를 버림
+        if self.matcher is not None:
+            self.matcher.reset(key)
+        return None
+
+
+class TriggerEvent:
+    """트리거 하나가 발생한 구간. packets = 발생 전 패킷 + 발생 패킷 + 이후 패킷"""
+    __slots__ = ('trigger_name', 'description', 'timestamp', 'packets', 'post_count', 'extra_hits')
+
+    def __init__(self, trigger_name, description, timestamp, packets):
+        self.trigger_name = trigger_name
+        self.description = description
+        self.timestamp = timestamp
+        self.packets = packets
+        self.post_count = 0
+        self.extra_hits = 0     # 이후 구간을 모으는 동안 다시 발생한 횟수 (같은 파일에 포함)
+
+
+class TriggerEngine:
+    PRE_PACKETS = 10000
+    POST_PACKETS = 10000
+
+    def __init__(self, triggers, output_dir, pre_packets=PRE_PACKETS, pre_seconds=None,
+                 post_packets=POST_PACKETS, post_seconds=None):
+        self.triggers = list(triggers)
+        self.output_dir = output_dir
+        self.pre_packets = pre_packets
+        self.pre_seconds = pre_seconds
+        self.post_packets = post_packets
+        self.post_seconds = post_seconds
+        # 발생/저장 알림 (캡처 쓰레드 / 기록 쓰레드에서 호출됨)
+        self.on_event = None    # on_event(트리거 이름, 설명, 패킷)
+        self.on_saved = None    # on_saved(경로, 패킷 수, 에러 또는 None)
+        self.events_triggered = 0
+
+        # 💡 pre 링: 패킷 수로 메모리 상한을 두고, 시간 조건은 발생 시점에 잘라냄
+        self._ring = deque(maxlen=pre_packets)
+        self._event = None
+        self._save_queue = queue.Queue()
+        self._thread = threading.Thread(target=self._save_worker, daemon=True)
+        self._thread.start()
+
+    def feed(self, packets):
+        """캡처 쓰레드에서 파싱된 패킷(UsbPacket) 배치마다 호출합니다."""
+        triggers = self.triggers
+        for index, packet in enumerate(packets):
+            event = self._event
+            if event is not None:
+                event.packets.append(packet)
+                event.post_count += 1
+            # 모든 트리거를 검사해야 각 트리거의 스트림 상태(패턴 꼬리, 직전 시각)가 이어짐
+            # (빈 패킷도 조건/간격은 검사하고, 패턴 스캔만 Trigger.check에서 건너뜀)
+            hit = None
+            for trigger in triggers:
+                description = trigger.check(packet)
+                if description is not None and hit is None:
+                    hit = (trigger, description)
+            if hit is not None:
+                if event is None:
+                    event = self._start_event(hit[0], hit[1], packet, packets[:index])
+                else:
+                    event.extra_hits += 1
+            if event is not None and self._post_done(event, packet):
+                self._finish_event()
+        self._ring.extend(packets)
+
+    def close(self):
+        """수집 중인 구간을 저장하고 기록 쓰레드를 종료합니다."""
+        if self._event is not None:
+            self._finish_event()
+        self._save_queue.put(None)
+        self._thread.join()
+
+    def _start_event(self, trigger, description, packet, batch_before):
+        pre = list(self._ring)
+        pre.extend(batch_before)
+        if len(pre) > self.pre_packets:
+            pre = pre[-self.pre_packets:]
+        if self.pre_seconds is not None:
+            oldest = packet.timestamp - self.pre_seconds
+            start = 0
+            while start < len(pre) and pre[start].timestamp < oldest:
+                start += 1
+            pre = pre[start:]
+        pre.append(packet)
+        event = self._event = TriggerEvent(trigger.name, description, packet.timestamp, pre)
+        self.events_triggered += 1
+        if self.on_event is not None:
+            self.on_event(trigger.name, description, packet)
+        return event
+
+    def _post_done(self, event, packet):
+        if self.post_seconds is not None and packet.timestamp - event.timestamp >= self.post_seconds:
+            return True
+        return event.post_count >= self.post_packets
+
+    def _finish_event(self):
+        event, self._event = self._event, None
+        self._save_queue.put(event)
+
+    # ------------------ 백그라운드 기록 ------------------
+
+    def _save_worker(self):
+        while True:
+            event = self._save_queue.get()
+            if event is None:
+                return
+            path = None
+            try:
+                os.makedirs(self.output_dir, exist_ok=True)
+                name = re.sub(r'[^\w.-]+', '_', event.trigger_name)
+                stamp = time.strftime('%Y%m%d_%H%M%S', time.localtime(event.timestamp))
+                path = os.path.join(self.output_dir, f"trigger_{stamp}_{int(event.timestamp * 1000) % 1000:03d}_{name}.pcapng")
+                comment = f"trigger={event.trigger_name} {event.description} time={event.timestamp:.6f}"
+                if event.extra_hits:
+                    comment += f" extra_hits={event.extra_hits}"
+                with open(path, 'wb') as f:
+                    PcapngWriter(f, comment=comment).write_packets(event.packets)
+                error = None
+            except Exception as e:
+                # 기록 실패(디스크, 범위를 벗어난 필드의 struct.error 등)에도 쓰레드가 죽지 않고 다음 구간을 계속 저장
+                error = e
+            if self.on_saved is not None:
+                self.on_saved(path, len(event.packets), error)
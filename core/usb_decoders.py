@@ -0,0 +1,757 @@
+# 1.개요 : 원시 페이로드 바이트로 USB 클래스 프로토콜을 해석하는 내장 디코더 (tshark 디섹터 없이 프로세스 안에서 동작)
+# 2.특징 :
+## 1) 디코더는 인터페이스 클래스(HID/Mass Storage/CDC/벤더) → 엔드포인트로 찾는 디스패치 테이블로 고른다.
+### - 엔드포인트의 인터페이스 클래스는 캡처 중 오간 디스크립터 응답(장치/구성/HID 리포트)에서 학습한다.
+### - 디스크립터를 못 본 장치는 assign_endpoint()로 직접 지정하거나, 시그니처가 있는 CBW/CSW만 자동 판별한다.
+### - 클래스 요청은 인터페이스 클래스를 모르면 장치에서 알려진 클래스로 판단하고, 그래도 모르면
+###   여러 클래스가 같이 쓰는 요청 코드는 해석하지 않고 후보만 표시한다. (예: 0x01 = HID GET_REPORT / CDC GET_ENCAPSULATED_RESPONSE)
+## 2) 고정 레이아웃(SETUP/CBW/CSW/CDB/라인 코딩/디스크립터)은 미리 컴파일한 struct.Struct로 해석한다.
+### - HID 리포트는 리포트 디스크립터를 한 번 파싱하여 (시프트, 마스크) 목록으로 컴파일해 두고 비트 연산만 한다.
+## 3) 캡처 쓰레드는 컨트롤 전송만 observe()로 넘긴다. (SETUP과 완료 짝짓기 + 디스크립터 학습, 패킷 수에 비해 매우 적음)
+### - 실제 해석(decode)은 화면에 보이거나 내보내는 패킷만 str(packet) 시점에 한다. (UsbPacket.decoder)
+### - 학습한 표는 copy-on-write로 교체하므로 해석 쓰레드는 잠금 없이 읽는다. 패킷은 packet.descriptors로 자기 캡처의 표에 묶여,
+###   새 캡처가 clear()로 표를 새로 시작해도 화면에 남은 이전 캡처 패킷의 해석은 바뀌지 않는다.
+# 3.사용법 :
+## 1) decoder = UsbDecoder() → UsbPacket.decoder = decoder (format_summary에 "| Decoded: ..." 항목 추가)
+## 2) 캡처 쓰레드: 컨트롤 전송마다 decoder.observe(packet), 화면에 보낼 패킷마다 packet.descriptors = decoder.descriptors
+## 3) decoder.decode(packet) → "CBW tag=0x1 IN 512B LUN0: READ(10) LBA=2048 blocks=1" 같은 한 줄 설명 (없으면 None)
+## 4) 디스크립터가 없는 캡처: decoder.assign_endpoint(bus, device, 0x81, CLASS_HID, subclass=1, protocol=2)
+
+import struct
+import threading
+
+from core.usb_packet import TRANSFER_BULK, TRANSFER_CONTROL, DIRECTION_IN
+
+# USBPcap 컨트롤 전송 단계 (USBPCAP_BUFFER_CONTROL_HEADER.stage)
+STAGE_SETUP = 0
+STAGE_DATA = 1
+STAGE_STATUS = 2
+STAGE_COMPLETE = 3
+
+# 인터페이스 클래스 코드
+CLASS_CDC = 0x02
+CLASS_HID = 0x03
+CLASS_MASS_STORAGE = 0x08
+CLASS_CDC_DATA = 0x0A
+CLASS_VENDOR = 0xFF
+
+CLASS_NAMES = {
+    0x01: "Audio", CLASS_CDC: "CDC", CLASS_HID: "HID", 0x07: "Printer", CLASS_MASS_STORAGE: "MSC",
+    0x09: "Hub", CLASS_CDC_DATA: "CDC-Data", 0x0E: "Video", 0xE0: "Wireless", CLASS_VENDOR: "Vendor",
+}
+
+FTDI_VENDOR_ID = 0x0403
+
+# 디스크립터 타입
+DESC_DEVICE = 0x01
+DESC_CONFIGURATION = 0x02
+DESC_STRING = 0x03
+DESC_INTERFACE = 0x04
+DESC_ENDPOINT = 0x05
+DESC_HID = 0x21
+DESC_HID_REPORT = 0x22
+
+DESCRIPTOR_NAMES = {
+    DESC_DEVICE: "DEVICE", DESC_CONFIGURATION: "CONFIGURATION", DESC_STRING: "STRING",
+    DESC_INTERFACE: "INTERFACE", DESC_ENDPOINT: "ENDPOINT", 0x06: "DEVICE_QUALIFIER",
+    0x0F: "BOS", DESC_HID: "HID", DESC_HID_REPORT: "REPORT",
+}
+
+REQUEST_GET_DESCRIPTOR = 0x06
+
+# 미리 컴파일한 고정 레이아웃
+SETUP_PACKET = struct.Struct('<BBHHH')                    # bmRequestType, bRequest, wValue, wIndex, wLength
+DEVICE_DESCRIPTOR = struct.Struct('<BBHBBBBHHHBBBB')      # ... idVendor(7), idProduct(8) ...
+INTERFACE_DESCRIPTOR = struct.Struct('<BBBBBBBBB')        # ... bInterfaceNumber(2), bAlternateSetting(3), class(5) ...
+ENDPOINT_DESCRIPTOR = struct.Struct('<BBBBHB')            # ... bEndpointAddress(2), bmAttributes(3), wMaxPacketSize(4)
+CBW = struct.Struct('<4sIIBBB16s')                        # signature, tag, dataTransferLength, flags, LUN, CB length, CB
+CSW = struct.Struct('<4sIIB')                             # signature, tag, dataResidue, status
+CDB6 = struct.Struct('>BBHBB')                            # opcode, LBA(상위 5비트), LBA, length, control
+CDB10 = struct.Struct('>BBIBHB')                          # opcode, flags, LBA, group, length, control
+CDB16 = struct.Struct('>BBQIBB')                          # opcode, flags, LBA, length, group, control
+LINE_CODING = struct.Struct('<IBBB')                      # dwDTERate, bCharFormat, bParityType, bDataBits
+CDC_NOTIFICATION = struct.Struct('<BBHHH')                # bmRequestType, bNotification, wValue, wIndex, wLength
+FTDI_STATUS = struct.Struct('<BB')                        # modem status, line status
+
+CBW_SIGNATURE = b'USBC'
+CSW_SIGNATURE = b'USBS'
+
+# 짝을 기다리는 SETUP 최대 개수 (완료가 오지 않은 요청이 쌓이지 않도록)
+MAX_PENDING_SETUPS = 4096
+
+
+class UsbInterface:
+    """디스크립터에서 학습하거나 assign_endpoint()로 지정한 인터페이스 정보."""
+    __slots__ = ('number', 'usb_class', 'subclass', 'protocol', 'report_layout')
+
+    def __init__(self, number, usb_class, subclass=0, protocol=0):
+        self.number = number
+        self.usb_class = usb_class
+        self.subclass = subclass
+        self.protocol = protocol
+        self.report_layout = None   # HID: parse_report_descriptor() 결과
+
+
+# ------------------ HID 리포트 ------------------
+
+USAGE_PAGE_GENERIC_DESKTOP = 0x01
+USAGE_PAGE_KEYBOARD = 0x07
+USAGE_PAGE_LED = 0x08
+USAGE_PAGE_BUTTON = 0x09
+USAGE_PAGE_CONSUMER = 0x0C
+
+_GENERIC_DESKTOP_USAGES = {
+    0x30: "X", 0x31: "Y", 0x32: "Z", 0x33: "Rx", 0x34: "Ry", 0x35: "Rz",
+    0x36: "Slider", 0x37: "Dial", 0x38: "Wheel", 0x39: "Hat",
+}
+_CONSUMER_USAGES = {
+    0xB5: "NextTrack", 0xB6: "PrevTrack", 0xB7: "Stop", 0xCD: "PlayPause",
+    0xE2: "Mute", 0xE9: "VolumeUp", 0xEA: "VolumeDown", 0x238: "HPan",
+}
+_KEYBOARD_USAGES = {0x01: "ErrorRollOver", 0x28: "Enter", 0x29: "Esc", 0x2A: "Backspace", 0x2B: "Tab", 0x2C: "Space",
+                    0x39: "CapsLock", 0x4F: "Right", 0x50: "Left", 0x51: "Down", 0x52: "Up"}
+_KEYBOARD_USAGES.update({0x04 + i: chr(ord('a') + i) for i in range(26)})
+_KEYBOARD_USAGES.update({0x1E + i: str((i + 1) % 10) for i in range(10)})
+_KEYBOARD_USAGES.update({0x3A + i: f"F{i + 1}" for i in range(12)})
+_KEYBOARD_USAGES.update(zip(range(0xE0, 0xE8), ("LeftCtrl", "LeftShift", "LeftAlt", "LeftGUI",
+                                                "RightCtrl", "RightShift", "RightAlt", "RightGUI")))
+
+_USAGE_TABLES = {
+    USAGE_PAGE_GENERIC_DESKTOP: _GENERIC_DESKTOP_USAGES,
+    USAGE_PAGE_KEYBOARD: _KEYBOARD_USAGES,
+    USAGE_PAGE_CONSUMER: _CONSUMER_USAGES,
+}
+
+# 켜짐/꺼짐만 의미가 있는 1비트 필드의 사용 페이지 (눌린 것만 이름으로 표시)
+_SWITCH_PAGES = frozenset((USAGE_PAGE_KEYBOARD, USAGE_PAGE_LED, USAGE_PAGE_BUTTON))
+
+
+def usage_name(page, usage):
+    if page == USAGE_PAGE_BUTTON:
+        return f"Button{usage}"
+    name = _USAGE_TABLES.get(page, {}).get(usage)
+    return name if name is not None else f"{page:02X}:{usage:02X}"
+
+
+class HidReportLayout:
+    """parse_report_descriptor()가 만든 Input 리포트 레이아웃. 리포트 ID별 컴파일된 필드 목록을 가집니다.
+    변수 필드: (False, shift, mask, sign_bit, name, switch)
+    배열 필드: (True, shift, mask, size, count, page, usage_min, usages, logical_min)"""
+    __slots__ = ('reports', 'uses_report_ids')
+
+    def __init__(self, reports, uses_report_ids):
+        self.reports = reports
+        self.uses_report_ids = uses_report_ids
+
+    def decode(self, report):
+        if not report:
+            return None
+        report_id = 0
+        if self.uses_report_ids:
+            report_id = report[0]
+            report = report[1:]
+        fields = self.reports.get(report_id)
+        prefix = f"HID[{report_id}]" if self.uses_report_ids else "HID"
+        if fields is None:
+            return f"{prefix} unknown report"
+
+        value = int.from_bytes(report, 'little')
+        pressed = []
+        values = []
+        for field in fields:
+            if not field[0]:
+                _, shift, mask, sign_bit, name, switch = field
+                v = (value >> shift) & mask
+                if switch:
+                    if v:
+                        pressed.append(name)
+                    continue
+                if sign_bit and v & sign_bit:
+                    v -= mask + 1
+                values.append(f"{name}={v}")
+            else:
+                _, shift, mask, size, count, page, usage_min, usages, logical_min = field
+                for i in range(count):
+                    index = ((value >> (shift + i * size)) & mask) - logical_min
+                    if usages:
+                        if not 0 <= index < len(usages):
+                            continue
+                        page_i, usage = usages[index]
+                    else:
+                        page_i, usage = page, usage_min + index
+                    if usage:
+                        pressed.append(usage_name(page_i, usage))
+        if pressed:
+            values.insert(0, "+".join(pressed))
+        return f"{prefix} {' '.join(values)}" if values else f"{prefix} (released)"
+
+
+def _signed(value, size):
+    if size and value & (1 << (size * 8 - 1)):
+        return value - (1 << (size * 8))
+    return value
+
+
+def parse_report_descriptor(data):
+    """HID 리포트 디스크립터(short item)를 파싱하여 Input 리포트 레이아웃(HidReportLayout)을 만듭니다."""
+    data = bytes(data)
+    state = {'page': 0, 'logical_min': 0, 'report_size': 0, 'report_count': 0, 'report_id': 0}
+    stack = []
+    usages = []                  # 지역 Usage 목록 [(page, usage)]
+    usage_range = [None, None]   # 지역 Usage Minimum/Maximum
+    offsets = {}                 # 리포트 ID -> 다음 필드의 비트 위치
+    reports = {}
+    uses_report_ids = False
+
+    pos = 0
+    while pos < len(data):
+        prefix = data[pos]
+        if prefix == 0xFE:  # long item (사용하는 장치가 거의 없음): 건너뜀
+            if pos + 1 >= len(data):
+                break
+            pos += 3 + data[pos + 1]
+            continue
+        size = (0, 1, 2, 4)[prefix & 0x03]
+        item = prefix & 0xFC
+        raw = int.from_bytes(data[pos + 1:pos + 1 + size], 'little')
+        pos += 1 + size
+
+        if item == 0x04:        # Usage Page
+            state['page'] = raw
+        elif item == 0x14:      # Logical Minimum
+            state['logical_min'] = _signed(raw, size)
+        elif item == 0x74:      # Report Size
+            state['report_size'] = raw
+        elif item == 0x94:      # Report Count
+            state['report_count'] = raw
+        elif item == 0x84:      # Report ID
+            state['report_id'] = raw
+            uses_report_ids = True
+        elif item == 0xA4:      # Push
+            stack.append(dict(state))
+        elif item == 0xB4:      # Pop
+            if stack:
+                state = stack.pop()
+        elif item in (0x08, 0x18, 0x28):    # Usage / Usage Minimum / Usage Maximum
+            usage = (raw >> 16, raw & 0xFFFF) if size == 4 else (state['page'], raw)
+            if item == 0x08:
+                usages.append(usage)
+            else:
+                usage_range[item == 0x28] = usage
+        elif item in (0x80, 0x90, 0xB0):    # Input / Output / Feature
+            report_id = state['report_id']
+            report_size, report_count = state['report_size'], state['report_count']
+            if item == 0x80:
+                shift = offsets.get(report_id, 0)
+                offsets[report_id] = shift + report_size * report_count
+                if not raw & 0x01 and report_size:  # Constant(패딩)이 아닌 필드만
+                    reports.setdefault(report_id, []).extend(
+                        _compile_input(raw, shift, report_size, report_count, state, usages, usage_range))
+            usages = []
+            usage_range = [None, None]
+        elif item in (0xA0, 0xC0):          # Collection / End Collection
+            usages = []
+            usage_range = [None, None]
+    return HidReportLayout(reports, uses_report_ids)
+
+
+def _compile_input(flags, shift, size, count, state, usages, usage_range):
+    mask = (1 << size) - 1
+    usage_min, usage_max = usage_range
+    if flags & 0x02:    # Variable: 필드마다 Usage 하나
+        sign_bit = 1 << (size - 1) if state['logical_min'] < 0 else 0
+        fields = []
+        for i in range(count):
+            if usage_min is not None:
+                page, usage = usage_min[0], usage_min[1] + i
+                if usage_max is not None and usage > usage_max[1]:
+                    usage = usage_max[1]
+            elif usages:
+                page, usage = usages[min(i, len(usages) - 1)]
+            else:
+                page, usage = state['page'], 0
+            switch = size == 1 and page in _SWITCH_PAGES
+            fields.append((False, shift + i * size, mask, sign_bit, usage_name(page, usage), switch))
+        return fields
+    # Array: 필드 값이 Usage 목록(또는 범위)의 인덱스
+    if usage_min is not None:
+        return [(True, shift, mask, size, count, usage_min[0], usage_min[1], None, state['logical_min'])]
+    return [(True, shift, mask, size, count, state['page'], 0, tuple(usages), state['logical_min'])]
+
+
+# HID 1.11 부록 B의 부트 프로토콜 리포트 디스크립터 (리포트 디스크립터를 못 본 부트 장치용)
+BOOT_KEYBOARD_LAYOUT = parse_report_descriptor(bytes.fromhex(
+    '05010906a101050719e029e71500250175019508810295017508810195057501'
+    '050819012905910295017503910195067508150025650507190029658100c0'))
+BOOT_MOUSE_LAYOUT = parse_report_descriptor(bytes.fromhex(
+    '05010902a1010901a100050919012903150025019503750181029501750581'
+    '010501093009311581257f750895028106c0c0'))
+
+
+# ------------------ 클래스별 데이터 디코더 (decoder, packet, interface) -> str ------------------
+
+def _decode_hid(decoder, packet, interface):
+    if packet.direction != DIRECTION_IN:
+        return None
+    layout = interface.report_layout
+    if layout is None and interface.subclass == 1:
+        layout = {1: BOOT_KEYBOARD_LAYOUT, 2: BOOT_MOUSE_LAYOUT}.get(interface.protocol)
+    return layout.decode(packet.payload) if layout is not None else None
+
+
+SCSI_OPCODES = {
+    0x00: "TEST UNIT READY", 0x03: "REQUEST SENSE", 0x08: "READ(6)", 0x0A: "WRITE(6)", 0x12: "INQUIRY",
+    0x1A: "MODE SENSE(6)", 0x1B: "START STOP UNIT", 0x1E: "PREVENT ALLOW MEDIUM REMOVAL",
+    0x23: "READ FORMAT CAPACITIES", 0x25: "READ CAPACITY(10)", 0x28: "READ(10)", 0x2A: "WRITE(10)",
+    0x2F: "VERIFY(10)", 0x35: "SYNCHRONIZE CACHE(10)", 0x5A: "MODE SENSE(10)", 0x88: "READ(16)",
+    0x8A: "WRITE(16)", 0x9E: "SERVICE ACTION IN(16)", 0xA0: "REPORT LUNS",
+}
+
+
+def _cdb6_rw(cdb):
+    _, lba_msb, lba, length, _ = CDB6.unpack_from(cdb)
+    return f"LBA={((lba_msb & 0x1F) << 16) | lba} blocks={length or 256}"
+
+
+def _cdb10_rw(cdb):
+    _, _, lba, _, length, _ = CDB10.unpack_from(cdb)
+    return f"LBA={lba} blocks={length}"
+
+
+def _cdb16_rw(cdb):
+    _, _, lba, length, _, _ = CDB16.unpack_from(cdb)
+    return f"LBA={lba} blocks={length}"
+
+
+def _cdb_allocation(cdb):
+    return f"alloc={cdb[4]}"
+
+
+# SCSI 명령별 CDB 파라미터 해석 (opcode -> 함수)
+_SCSI_DECODERS = {
+    0x03: _cdb_allocation, 0x12: _cdb_allocation, 0x1A: _cdb_allocation,
+    0x08: _cdb6_rw, 0x0A: _cdb6_rw,
+    0x28: _cdb10_rw, 0x2A: _cdb10_rw, 0x2F: _cdb10_rw,
+    0x88: _cdb16_rw, 0x8A: _cdb16_rw,
+}
+
+CSW_STATUS_NAMES = {0: "Passed", 1: "Failed", 2: "Phase Error"}
+
+
+def decode_scsi_cdb(cdb):
+    opcode = cdb[0]
+    text = SCSI_OPCODES.get(opcode, f"SCSI 0x{opcode:02X}")
+    params = _SCSI_DECODERS.get(opcode)
+    if params is not None:
+        text += " " + params(cdb)
+    return text
+
+
+def _decode_msc(decoder, packet, interface):
+    # Bulk-Only Transport: CBW(31바이트, 'USBC')와 CSW(13바이트, 'USBS')만 해석하고 데이터 단계는 그대로 둠
+    payload = packet.payload
+    size = len(payload)
+    if size == CBW.size and payload[:4] == CBW_SIGNATURE:
+        _, tag, data_length, flags, lun, cb_length, cb = CBW.unpack(payload)
+        direction = "IN" if flags & 0x80 else "OUT"
+        return f"CBW tag=0x{tag:X} {direction} {data_length}B LUN{lun & 0x0F}: {decode_scsi_cdb(cb[:max(cb_length, 1)])}"
+    if size == CSW.size and payload[:4] == CSW_SIGNATURE:
+        _, tag, residue, status = CSW.unpack(payload)
+        return f"CSW tag=0x{tag:X} status={CSW_STATUS_NAMES.get(status, status)} residue={residue}"
+    return None
+
+
+_CDC_NOTIFICATIONS = {0x00: "NETWORK_CONNECTION", 0x01: "RESPONSE_AVAILABLE", 0x20: "SERIAL_STATE",
+                      0x2A: "CONNECTION_SPEED_CHANGE"}
+_SERIAL_STATE_BITS = ("DCD", "DSR", "BREAK", "RI", "FRAMING", "PARITY", "OVERRUN")
+
+
+def _bit_names(value, names):
+    return " ".join(name for bit, name in enumerate(names) if name and value & (1 << bit)) or "-"
+
+
+def _decode_cdc_notification(decoder, packet, interface):
+    payload = packet.payload
+    if len(payload) < CDC_NOTIFICATION.size:
+        return None
+    _, notification, value, _, length = CDC_NOTIFICATION.unpack_from(payload)
+    name = _CDC_NOTIFICATIONS.get(notification, f"NOTIFICATION 0x{notification:02X}")
+    if notification == 0x20 and len(payload) >= CDC_NOTIFICATION.size + 2:
+        state = int.from_bytes(payload[CDC_NOTIFICATION.size:CDC_NOTIFICATION.size + 2], 'little')
+        return f"{name} {_bit_names(state, _SERIAL_STATE_BITS)}"
+    if notification == 0x00:
+        return f"{name} {'connected' if value else 'disconnected'}"
+    return name
+
+
+_FTDI_MODEM_BITS = (None, None, None, None, "CTS", "DSR", "RI", "DCD")
+_FTDI_LINE_ERROR_BITS = (None, "OE", "PE", "FE", "BI")
+
+
+def _decode_ftdi(decoder, packet, interface):
+    # 벌크 IN은 USB 패킷(wMaxPacketSize)마다 앞에 2바이트 상태(모뎀/라인)가 붙음
+    if packet.transfer_type != TRANSFER_BULK or packet.direction != DIRECTION_IN:
+        return None
+    payload = packet.payload
+    if len(payload) < FTDI_STATUS.size:
+        return None
+    modem, line = FTDI_STATUS.unpack_from(payload)
+    max_packet = decoder.max_packet_size(packet)
+    data_bytes = len(payload) - FTDI_STATUS.size * ((len(payload) + max_packet - 1) // max_packet)
+    text = f"FTDI status {_bit_names(modem, _FTDI_MODEM_BITS)}"
+    if line & 0x1E:
+        text += f" errors {_bit_names(line, _FTDI_LINE_ERROR_BITS)}"
+    return f"{text} | {data_bytes} data bytes"
+
+
+# 인터페이스 클래스 -> 데이터 디코더
+CLASS_DECODERS = {
+    CLASS_HID: _decode_hid,
+    CLASS_MASS_STORAGE: _decode_msc,
+    CLASS_CDC: _decode_cdc_notification,
+}
+# 벤더 클래스(0xFF) 인터페이스: idVendor -> 데이터 디코더
+VENDOR_DECODERS = {
+    FTDI_VENDOR_ID: _decode_ftdi,
+}
+
+
+# ------------------ 컨트롤 요청 (setup, data) -> 상세 문자열 ------------------
+
+def describe_line_coding(data):
+    rate, stop_bits, parity, data_bits = LINE_CODING.unpack_from(data)
+    return f"{rate} {data_bits}{'NOEMS'[parity] if parity < 5 else '?'}{('1', '1.5', '2')[stop_bits] if stop_bits < 3 else '?'}"
+
+
+def _line_coding(setup, data):
+    return describe_line_coding(data) if data is not None and len(data) >= LINE_CODING.size else None
+
+
+def _control_line_state(setup, data):
+    value = setup[2]
+    return f"DTR={value & 1} RTS={(value >> 1) & 1}"
+
+
+def _send_break(setup, data):
+    return f"{setup[2]}ms"
+
+
+def _describe_descriptor(setup, data):
+    descriptor_type, index = setup[2] >> 8, setup[2] & 0xFF
+    name = DESCRIPTOR_NAMES.get(descriptor_type, f"0x{descriptor_type:02X}")
+    if data is None:
+        return f"{name}[{index}] len={setup[4]}"
+    data = bytes(data)
+    if descriptor_type == DESC_DEVICE and len(data) >= DEVICE_DESCRIPTOR.size:
+        fields = DEVICE_DESCRIPTOR.unpack_from(data)
+        return f"{name} VID={fields[7]:04X} PID={fields[8]:04X}"
+    if descriptor_type == DESC_CONFIGURATION:
+        classes = [CLASS_NAMES.get(cls, f"0x{cls:02X}") for cls in _iter_interface_classes(data)]
+        return f"{name} interfaces: {', '.join(classes)}" if classes else f"{name} {len(data)}B"
+    if descriptor_type == DESC_STRING and index and len(data) >= 2:
+        return f'{name}[{index}] "{data[2:data[0]].decode("utf-16-le", "replace")}"'
+    return f"{name}[{index}] {len(data)}B"
+
+
+def _iter_interface_classes(data):
+    for pos in _iter_descriptors(data, DESC_INTERFACE, INTERFACE_DESCRIPTOR.size):
+        if data[pos + 3] == 0:  # 대체 설정(alternate setting) 0만
+            yield data[pos + 5]
+
+
+def _iter_descriptors(data, descriptor_type, min_size):
+    pos = 0
+    while pos + 2 <= len(data):
+        length = data[pos]
+        if length < 2:
+            return
+        if data[pos + 1] == descriptor_type and pos + min_size <= len(data):
+            yield pos
+        pos += length
+
+
+def _value(setup, data):
+    return f"value=0x{setup[2]:04X}"
+
+
+def _ftdi_baudrate(setup, data):
+    # 3MHz 기준 클럭 / (정수 분주 + 소수 분주). 소수 분주 3비트 중 최상위 비트는 wIndex에 있음
+    value, index = setup[2], setup[3]
+    fraction = (0, 0.5, 0.25, 0.125, 0.375, 0.625, 0.75, 0.875)[(value >> 14) | ((index & 0x01) << 2)]
+    divisor = (value & 0x3FFF) + fraction
+    if divisor == 0:
+        return "3000000"
+    if divisor == 1:
+        return "2000000"
+    return f"~{round(3000000 / divisor)}"
+
+
+def _ftdi_data(setup, data):
+    value = setup[2]
+    parity = (value >> 8) & 0x07
+    stop_bits = (value >> 11) & 0x07
+    return f"{value & 0xFF}{'NOEMS'[parity] if parity < 5 else '?'}{('1', '1.5', '2')[stop_bits] if stop_bits < 3 else '?'}"
+
+
+def _ftdi_modem_ctrl(setup, data):
+    value = setup[2]
+    parts = [f"{name}={(value >> bit) & 1}" for bit, name in ((0, "DTR"), (1, "RTS")) if value & (0x100 << bit)]
+    return " ".join(parts) or None
+
+
+def _ftdi_latency(setup, data):
+    return f"{setup[2] & 0xFF}ms"
+
+
+# bRequest -> (이름, 상세 함수 또는 None)
+STANDARD_REQUESTS = {
+    0x00: ("GET_STATUS", None), 0x01: ("CLEAR_FEATURE", _value), 0x03: ("SET_FEATURE", _value),
+    0x05: ("SET_ADDRESS", lambda setup, data: f"addr={setup[2]}"),
+    REQUEST_GET_DESCRIPTOR: ("GET_DESCRIPTOR", _describe_descriptor),
+    0x07: ("SET_DESCRIPTOR", None), 0x08: ("GET_CONFIGURATION", None),
+    0x09: ("SET_CONFIGURATION", lambda setup, data: f"config={setup[2]}"),
+    0x0A: ("GET_INTERFACE", None),
+    0x0B: ("SET_INTERFACE", lambda setup, data: f"if={setup[3]} alt={setup[2]}"),
+}
+HID_REQUESTS = {
+    0x01: ("GET_REPORT", _value), 0x02: ("GET_IDLE", None), 0x03: ("GET_PROTOCOL", None),
+    0x09: ("SET_REPORT", _value), 0x0A: ("SET_IDLE", lambda setup, data: f"{(setup[2] >> 8) * 4}ms"),
+    0x0B: ("SET_PROTOCOL", lambda setup, data: "boot" if setup[2] == 0 else "report"),
+}
+MSC_REQUESTS = {
+    0xFE: ("GET_MAX_LUN", lambda setup, data: f"max LUN={data[0]}" if data else None),
+    0xFF: ("BULK_ONLY_RESET", None),
+}
+CDC_REQUESTS = {
+    0x00: ("SEND_ENCAPSULATED_COMMAND", None), 0x01: ("GET_ENCAPSULATED_RESPONSE", None),
+    0x20: ("SET_LINE_CODING", _line_coding), 0x21: ("GET_LINE_CODING", _line_coding),
+    0x22: ("SET_CONTROL_LINE_STATE", _control_line_state), 0x23: ("SEND_BREAK", _send_break),
+}
+FTDI_REQUESTS = {
+    0x00: ("FTDI RESET", None), 0x01: ("FTDI SET_MODEM_CTRL", _ftdi_modem_ctrl),
+    0x02: ("FTDI SET_FLOW_CTRL", _value), 0x03: ("FTDI SET_BAUDRATE", _ftdi_baudrate),
+    0x04: ("FTDI SET_DATA", _ftdi_data), 0x05: ("FTDI GET_MODEM_STATUS", None),
+    0x06: ("FTDI SET_EVENT_CHAR", _value), 0x07: ("FTDI SET_ERROR_CHAR", _value),
+    0x09: ("FTDI SET_LATENCY_TIMER", _ftdi_latency), 0x0A: ("FTDI GET_LATENCY_TIMER", None),
+}
+
+# 인터페이스 클래스 -> 클래스 요청 테이블
+CLASS_REQUESTS = {
+    CLASS_HID: HID_REQUESTS,
+    CLASS_MASS_STORAGE: MSC_REQUESTS,
+    CLASS_CDC: CDC_REQUESTS,
+}
+
+
+def _merge_class_requests():
+    """인터페이스 클래스를 모를 때 쓰는 테이블. 한 클래스에만 있는 요청 코드는 그대로 해석하고,
+    여러 클래스에서 쓰는 코드(예: 0x01 = HID GET_REPORT / CDC GET_ENCAPSULATED_RESPONSE)는 후보만 나열합니다."""
+    candidates = {}
+    for usb_class, table in CLASS_REQUESTS.items():
+        for request, entry in table.items():
+            candidates.setdefault(request, []).append((usb_class, entry[0]))
+    merged = {}
+    for request, entries in candidates.items():
+        if len(entries) == 1:
+            merged[request] = CLASS_REQUESTS[entries[0][0]][request]
+        else:
+            names = " | ".join(f"{CLASS_NAMES[usb_class]} {name}" for usb_class, name in entries)
+            merged[request] = (f"CLASS request 0x{request:02X} ({names})", None)
+    return merged
+
+
+_ANY_CLASS_REQUESTS = _merge_class_requests()
+VENDOR_REQUESTS = {
+    FTDI_VENDOR_ID: FTDI_REQUESTS,
+}
+
+
+class _Descriptors:
+    """한 캡처에서 학습한 디스크립터 표. 표(dict)는 제자리에서 고치지 않고 복사본을 고쳐 통째로 교체하므로(copy-on-write)
+    해석하는 쓰레드(UI/내보내기)는 잠금 없이 읽어도 순회 중에 크기가 바뀌지 않습니다."""
+    __slots__ = ('device_ids', 'interfaces', 'endpoints', 'max_packet')
+
+    def __init__(self):
+        self.device_ids = {}      # (bus, device) -> (idVendor, idProduct)
+        self.interfaces = {}      # (bus, device, 인터페이스 번호) -> UsbInterface
+        self.endpoints = {}       # (bus, device, 엔드포인트 주소) -> UsbInterface
+        self.max_packet = {}      # (bus, device, 엔드포인트 주소) -> wMaxPacketSize
+
+
+class UsbDecoder:
+    def __init__(self):
+        self._lock = threading.Lock()   # 표를 바꾸는 쪽(캡처 쓰레드의 observe, UI의 assign_endpoint)끼리만 잠금
+        self._pending = {}        # (bus, irp_id) -> SETUP 튜플 (완료를 기다리는 컨트롤 요청, 캡처 쓰레드 전용)
+        self.descriptors = _Descriptors()   # 지금 캡처에서 학습 중인 표 (packet.descriptors가 없는 패킷은 이 표로 해석)
+        self._assigned = {}       # assign_endpoint()로 직접 지정한 (bus, device, 엔드포인트 주소) -> UsbInterface
+
+    def clear(self):
+        """새 캡처용 빈 표로 학습을 다시 시작합니다. (새 캡처 시작 시 - 장치 주소가 재사용될 수 있음)
+        이전 표는 지우지 않으므로 이전 캡처 패킷(packet.descriptors)은 그대로 해석됩니다.
+        assign_endpoint()로 직접 지정한 엔드포인트는 유지합니다."""
+        with self._lock:
+            self._pending = {}
+            self.descriptors = _Descriptors()
+
+    def assign_endpoint(self, bus, device, endpoint, usb_class, subclass=0, protocol=0, vendor_id=None):
+        """디스크립터를 캡처하지 못한 장치의 엔드포인트 클래스를 직접 지정합니다."""
+        interface = UsbInterface(None, usb_class, subclass, protocol)
+        with self._lock:
+            self._assigned = {**self._assigned, (bus, device, endpoint): interface}
+            if vendor_id is not None:
+                descriptors = self.descriptors
+                descriptors.device_ids = {**descriptors.device_ids, (bus, device): (vendor_id, None)}
+        return interface
+
+    def set_report_descriptor(self, bus, device, endpoint, descriptor):
+        """HID 리포트 디스크립터(bytes)를 직접 지정합니다. 엔드포인트를 모르면 HID로 지정합니다."""
+        interface = self._interface_for(self.descriptors, bus, device, endpoint)
+        if interface is None:
+            interface = self.assign_endpoint(bus, device, endpoint, CLASS_HID)
+        interface.report_layout = parse_report_descriptor(descriptor)
+
+    def interface_for(self, packet):
+        return self._interface_for(self._descriptors_for(packet), packet.bus, packet.device, packet.endpoint)
+
+    def _descriptors_for(self, packet):
+        return packet.descriptors or self.descriptors
+
+    def _interface_for(self, descriptors, bus, device, endpoint):
+        key = (bus, device, endpoint)
+        interface = self._assigned.get(key)
+        return interface if interface is not None else descriptors.endpoints.get(key)
+
+    def _device_request_class(self, descriptors, bus, device):
+        """장치에서 알고 있는(학습/직접 지정) 인터페이스 중 클래스 요청을 쓰는 클래스가 하나뿐이면 그 클래스, 아니면 None."""
+        classes = {interface.usb_class for (b, d, _), interface in descriptors.interfaces.items() if (b, d) == (bus, device)}
+        classes.update(interface.usb_class for (b, d, _), interface in self._assigned.items() if (b, d) == (bus, device))
+        classes.intersection_update(CLASS_REQUESTS)
+        return classes.pop() if len(classes) == 1 else None
+
+    def _vendor_id(self, descriptors, packet):
+        return descriptors.device_ids.get((packet.bus, packet.device), (None,))[0]
+
+    def max_packet_size(self, packet):
+        return self._descriptors_for(packet).max_packet.get((packet.bus, packet.device, packet.endpoint)) or 64
+
+    # ------------------ 캡처 쓰레드: 컨트롤 전송 학습 ------------------
+
+    def observe(self, packet):
+        """컨트롤 전송 패킷마다 캡처 쓰레드에서 호출합니다. SETUP 단계와 이후 단계를 irp_id로 짝지어
+        packet.setup에 기록하고, 완료된 GET_DESCRIPTOR 응답에서 장치/인터페이스/HID 리포트 정보를 학습합니다."""
+        stage = packet.stage
+        if stage is None:
+            return
+        key = (packet.bus, packet.irp_id)
+        if stage == STAGE_SETUP:
+            if len(packet.payload) >= SETUP_PACKET.size:
+                setup = SETUP_PACKET.unpack_from(packet.payload)
+                packet.setup = setup
+                if len(self._pending) >= MAX_PENDING_SETUPS:
+                    self._pending.clear()
+                self._pending[key] = setup
+            return
+        setup = self._pending.pop(key, None) if stage == STAGE_COMPLETE else self._pending.get(key)
+        packet.setup = setup
+        if setup is not None and stage == STAGE_COMPLETE and packet.payload and packet.status == 0 \
+                and setup[0] & 0xE0 == 0x80 and setup[1] == REQUEST_GET_DESCRIPTOR:
+            with self._lock:
+                self._learn_descriptor(self.descriptors, packet, setup)
+
+    def _learn_descriptor(self, descriptors, packet, setup):
+        descriptor_type = setup[2] >> 8
+        bus, device = packet.bus, packet.device
+        data = bytes(packet.payload)
+        if descriptor_type == DESC_DEVICE and len(data) >= DEVICE_DESCRIPTOR.size:
+            fields = DEVICE_DESCRIPTOR.unpack_from(data)
+            descriptors.device_ids = {**descriptors.device_ids, (bus, device): (fields[7], fields[8])}
+        elif descriptor_type == DESC_CONFIGURATION:
+            self._learn_configuration(descriptors, bus, device, data)
+        elif descriptor_type == DESC_HID_REPORT:
+            number = setup[3] & 0xFF
+            interface = descriptors.interfaces.get((bus, device, number))
+            if interface is None:
+                interface = UsbInterface(number, CLASS_HID)
+                descriptors.interfaces = {**descriptors.interfaces, (bus, device, number): interface}
+            interface.report_layout = parse_report_descriptor(data)
+
+    def _learn_configuration(self, descriptors, bus, device, data):
+        # 복사본에 모두 기록한 뒤 한 번에 교체
+        interfaces = dict(descriptors.interfaces)
+        endpoints = dict(descriptors.endpoints)
+        max_packets = dict(descriptors.max_packet)
+        interface = None
+        pos = 0
+        while pos + 2 <= len(data):
+            length, descriptor_type = data[pos], data[pos + 1]
+            if length < 2:
+                break
+            if descriptor_type == DESC_INTERFACE and pos + INTERFACE_DESCRIPTOR.size <= len(data):
+                _, _, number, alternate, _, usb_class, subclass, protocol, _ = INTERFACE_DESCRIPTOR.unpack_from(data, pos)
+                interface = interfaces.get((bus, device, number))
+                if interface is None:
+                    interface = interfaces[(bus, device, number)] = UsbInterface(number, usb_class, subclass, protocol)
+                elif alternate == 0:
+                    interface.usb_class, interface.subclass, interface.protocol = usb_class, subclass, protocol
+            elif descriptor_type == DESC_ENDPOINT and interface is not None and pos + ENDPOINT_DESCRIPTOR.size <= len(data):
+                _, _, address, _, max_packet, _ = ENDPOINT_DESCRIPTOR.unpack_from(data, pos)
+                endpoints[(bus, device, address)] = interface
+                max_packets[(bus, device, address)] = max_packet & 0x7FF
+            pos += length
+        descriptors.interfaces = interfaces
+        descriptors.endpoints = endpoints
+        descriptors.max_packet = max_packets
+
+    # ------------------ 지연 해석 (화면 표시/내보내기 시) ------------------
+
+    def decode(self, packet):
+        """패킷 하나의 클래스 프로토콜 해석 결과(한 줄). 해당 디코더가 없거나 해석할 수 없으면 None."""
+        try:
+            if packet.transfer_type == TRANSFER_CONTROL:
+                return self._decode_control(packet)
+            if not packet.payload:
+                return None
+            descriptors = self._descriptors_for(packet)
+            interface = self._interface_for(descriptors, packet.bus, packet.device, packet.endpoint)
+            if interface is None:
+                # 디스크립터를 못 본 엔드포인트: 시그니처로 판별 가능한 Mass Storage CBW/CSW만 해석
+                return _decode_msc(self, packet, None) if packet.transfer_type == TRANSFER_BULK else None
+            if interface.usb_class == CLASS_VENDOR:
+                data_decoder = VENDOR_DECODERS.get(self._vendor_id(descriptors, packet))
+            else:
+                data_decoder = CLASS_DECODERS.get(interface.usb_class)
+            return data_decoder(self, packet, interface) if data_decoder is not None else None
+        except (struct.error, IndexError, ValueError):
+            return None
+
+    def _decode_control(self, packet):
+        setup = packet.setup
+        if setup is None:
+            return None
+        request_type, request = setup[0], setup[1]
+        kind = (request_type >> 5) & 0x03
+        if kind == 0:
+            table = STANDARD_REQUESTS
+        elif kind == 1:
+            descriptors = self._descriptors_for(packet)
+            usb_class = None
+            if request_type & 0x1F == 1:    # 수신자: 인터페이스 (wIndex 하위 바이트가 인터페이스 번호)
+                interface = descriptors.interfaces.get((packet.bus, packet.device, setup[3] & 0xFF))
+                if interface is not None:
+                    usb_class = interface.usb_class
+            if usb_class is None:
+                usb_class = self._device_request_class(descriptors, packet.bus, packet.device)
+            table = CLASS_REQUESTS.get(usb_class, {}) if usb_class is not None else _ANY_CLASS_REQUESTS
+        elif kind == 2:
+            table = VENDOR_REQUESTS.get(self._vendor_id(self._descriptors_for(packet), packet), {})
+        else:
+            table = {}
+
+        name, detail = table.get(request, (None, None))
+        if name is None:
+            name = f"{('STANDARD', 'CLASS', 'VENDOR', 'RESERVED')[kind]} request 0x{request:02X}"
+        # SETUP 단계의 페이로드는 SETUP 패킷 자체이므로 데이터로 보지 않음
+        data = packet.payload if packet.stage != STAGE_SETUP and packet.payload else None
+        text = detail(setup, data) if detail is not None else None
+        return f"{name} {text}" if text else name
+
@@ -0,0 +1,110 @@
+# 1.개요 : USBPcap 의사 헤더에서 파싱한 USB 패킷(URB) 레코드
+# 2.특징 :
+## 1) 텍스트 변환 없이 원시 필드(정수)와 원시 페이로드(memoryview/bytes)를 그대로 보관한다.
+## 2) __slots__를 사용하여 패킷당 메모리 사용량을 최소화한다.
+## 3) 화면 표시용 문자열은 format_summary()로 필요할 때만 만든다.
+### - 콘솔에는 패킷 객체를 그대로 넘기고, 화면에 보이는 행만 str(packet)으로 요약 문자열을 만든다.
+### - 요약에는 페이로드 앞 PREVIEW_BYTES 바이트만 표시하고, 전체 내용은 상세 창(hex dump)에서 본다.
+## 4) UsbPacket.decoder(core.usb_decoders.UsbDecoder)가 지정되면 요약에 클래스 프로토콜 해석 결과를 덧붙인다.
+### - 해석도 요약 문자열을 만들 때(화면에 보이거나 내보낼 때)만 한다.
+
+import time
+
+# USBPcap transfer 필드 값
+TRANSFER_ISOCHRONOUS = 0
+TRANSFER_INTERRUPT = 1
+TRANSFER_CONTROL = 2
+TRANSFER_BULK = 3
+
+TRANSFER_NAMES = {
+    TRANSFER_ISOCHRONOUS: "ISOCHRONOUS",
+    TRANSFER_INTERRUPT: "INTERRUPT",
+    TRANSFER_CONTROL: "CONTROL",
+    TRANSFER_BULK: "BULK",
+}
+
+# 방향 (엔드포인트 주소의 최상위 비트)
+DIRECTION_OUT = 0   # Host -> Device (TX)
+DIRECTION_IN = 1    # Device -> Host (RX)
+
+# info 필드 bit0: 0 = 요청(FDO -> PDO, submit), 1 = 완료(PDO -> FDO, complete)
+INFO_PDO_TO_FDO = 0x01
+
+# 출력 가능한 ASCII(32~126)만 남기고 나머지는 '.'으로 바꾸는 변환 테이블
+_ASCII_TABLE = bytes(b if 32 <= b < 127 else ord('.') for b in range(256))
+
+# 한 줄 요약에 표시할 페이로드 최대 바이트 수
+PREVIEW_BYTES = 64
+
+
+class UsbPacket:
+    __slots__ = (
+        'timestamp', 'frame_len', 'irp_id', 'status', 'function', 'info',
+        'bus', 'device', 'endpoint', 'transfer_type', 'data_length', 'payload', 'interface',
+        'stage', 'setup', 'descriptors',
+    )
+
+    # 요약에 해석 결과를 덧붙일 디코더 (core.usb_decoders.UsbDecoder, 모든 패킷이 공유)
+    decoder = None
+
+    def __init__(self, timestamp, frame_len, irp_id, status, function, info,
+                 bus, device, endpoint, transfer_type, data_length, payload):
+        self.timestamp = timestamp          # epoch 초 (float)
+        self.frame_len = frame_len          # 원래 프레임 길이 (의사 헤더 포함)
+        self.irp_id = irp_id
+        self.status = status                # USBD_STATUS
+        self.function = function            # URB Function
+        self.info = info
+        self.bus = bus
+        self.device = device
+        self.endpoint = endpoint            # 방향 비트를 포함한 엔드포인트 주소 (예: 0x81)
+        self.transfer_type = transfer_type
+        self.data_length = data_length      # 헤더에 기록된 데이터 길이
+        self.payload = payload              # 캡처된 데이터 (memoryview 또는 bytes)
+        self.interface = None               # 캡처한 인터페이스 이름 (다중 인터페이스 캡처 시 태깅)
+        self.stage = None                   # 컨트롤 전송 단계 (USBPcap 컨트롤 헤더, 그 외 None)
+        self.setup = None                   # 컨트롤 전송의 SETUP 패킷 (UsbDecoder.observe()가 짝지어 기록)
+        self.descriptors = None             # 해석에 쓸 캡처별 디스크립터 표 (서비스가 콘솔에 넘길 때 UsbDecoder.descriptors를 기록)
+
+    @property
+    def direction(self):
+        return DIRECTION_IN if self.endpoint & 0x80 else DIRECTION_OUT
+
+    @property
+    def is_completion(self):
+        return bool(self.info & INFO_PDO_TO_FDO)
+
+    def __str__(self):
+        return format_summary(self)
+
+
+def payload_to_ascii(payload):
+    """페이로드를 출력 가능한 ASCII 문자열로 변환합니다. (제어 문자는 '.')"""
+    return bytes(payload).translate(_ASCII_TABLE).decode('ascii')
+
+
+def payload_preview(payload, limit=PREVIEW_BYTES):
+    """한 줄 요약용 ASCII 미리보기. limit 바이트를 넘으면 잘라내고 '...'을 붙입니다."""
+    if len(payload) > limit:
+        return payload_to_ascii(payload[:limit]) + "..."
+    return payload_to_ascii(payload)
+
+
+def format_summary(packet):
+    """기존 tshark -T fields 출력과 같은 형식의 한 줄 요약을 만듭니다."""
+    frame_time = time.strftime("%H:%M:%S", time.localtime(packet.timestamp))
+    frame_time += f".{int((packet.timestamp % 1) * 1000):03d}"
+    transfer_name = TRANSFER_NAMES.get(packet.transfer_type, "UNKNOWN")
+    direction_name = "in" if packet.direction == DIRECTION_IN else "out"
+
+    msg = f"Time: {frame_time} | Len: {packet.frame_len} | Proto: USB | Info: URB_{transfer_name} {direction_name}"
+    decoder = packet.decoder
+    if decoder is not None:
+        decoded = decoder.decode(packet)
+        if decoded:
+            msg += f" | Decoded: {decoded}"
+    if packet.payload:
+        msg += f" | Data(ASCII): {payload_preview(packet.payload)}"
+    if packet.interface:
+        msg = f"[{packet.interface}] {msg}"
+    return msg
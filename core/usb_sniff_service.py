@@ -4,15 +4,62 @@
 ## 1) UsbSniffService()로 인스턴스 생성 - 싱글톤 클래스이므로 어디서 호출하든 같은 인스턴스 반환
 ## 2) get_interfaces()로 인터페이스 목록 조회
 ## 3) start_capture(interface_name)으로 캡처 시작 - 쓰레드 시작
+### - interface_name에 인터페이스 이름 목록을 주면 인터페이스마다 독립된 CaptureSession(tshark + 리더 쓰레드)을 띄우고
+###   TimestampMerger로 타임스탬프 순서로 합쳐 출력 (콘솔에는 [인터페이스] 태그가 붙음)
+### - 기본은 CaptureMode.PCAP: tshark -w - 의 원시 pcapng를 core.pcap_reader로 직접 파싱 (hex 텍스트 변환 없음, 전체 페이로드 유지)
+### - CaptureMode.FIELDS: 기존 tshark -T fields 텍스트 파싱 방식
 ## 4) stop_capture()로 캡처 중지 - 캡쳐 중지및 쓰레드 중지
+### - 블로킹하지 않으며, 유휴 버스에서도 캡처 쓰레드가 PipeReader.POLL_INTERVAL 안에 멈춤 (tshark는 프로세스 그룹 단위로 종료)
+### - restart_capture()는 tshark만 다시 띄우고 병합/아카이브/트리거/통계 파이프라인은 그대로 유지
+## 5) load_capture(path, speed=None)로 저장된 캡처 파일 재생 - 최대 속도 또는 원래 시간 간격(배속)으로 콘솔에 출력
+### - 재생이 끝나거나 tshark가 스스로 종료되어 캡처가 끝나면 on_capture_finished()를 캡처 쓰레드에서 호출
+## 6) start_capture(..., archive_dir=경로)로 캡처 세션을 컬럼형 아카이브(core.session_archive)에 백그라운드 기록
+## 7) payload_index로 콘솔에 출력된 패킷 페이로드를 검색 (패킷 번호로 콘솔 행 이동 가능)
+## 8) SERIAL 필터에 framer(core.stream_reassembler의 Framer)를 지정하면 벌크 전송을 엔드포인트별로 재조립하여 논리 프레임당 한 줄로 출력
+## 9) set_packet_filter(식)으로 소스 단계 필터(core.packet_filter)를 캡처 중에도 교체 - 걸러진 패킷은 문자열 변환을 하지 않음
+### - FIELDS 모드에서는 캡처 시작 시의 필터를 tshark -Y로도 내려보내 파이프를 건너오지 않게 함
+### - 캡처 중 교체는 tshark를 다시 띄우지 않고 파이썬 쪽에만 적용 (tshark -Y는 캡처 시작 시의 필터로 고정)
+## 10) 콘솔에는 요약 문자열 대신 패킷 객체(원시 페이로드 참조)를 넘김 - 요약/hex dump는 화면에 보이는 행만 만듦
+## 11) 헤드리스 실행: python -m core.capture (Qt 없이 표준 출력/회전 파일/소켓 싱크로 출력, core.sinks)
+### - 시작/재생 실패나 tshark 에러는 last_error에 남음 (정상 종료면 None)
+## 12) decoder(core.usb_decoders)가 컨트롤 전송에서 디스크립터를 학습하고, 요약 문자열을 만들 때 HID/Mass Storage/CDC/FTDI를 해석 (PCAP 모드)
+## 13) traffic_stats(core.traffic_stats)가 필터/콘솔과 무관하게 장치/엔드포인트별 슬라이딩 윈도우 통계를 집계
+## 14) start_capture/load_capture(..., trigger_engine=core.trigger.TriggerEngine)로 패턴/조건 트리거 전후 패킷을 pcapng로 저장 (PCAP 모드)
+### - 트리거가 발생하면 콘솔에 경고로 알리고, 파일 저장이 끝나면 경로를 알림
+## 15) latency(core.latency_analyzer)가 URB 제출→완료, TX→RX 응답, 패킷 간격 분포를 집계하고 지연 이상값을 콘솔에 경고
+### - FIELDS 모드도 frame.time_epoch(숫자 타임스탬프)와 irp_id/방향 컬럼을 받아 같은 분석을 함
 
+import os
 import threading
+import time
 import subprocess
-import re
 from enum import Enum
+from operator import attrgetter
 
-# console_widget.py 파일에서 MsgType만 임포트합니다.
-from ui.components.console_widget import MsgType
+# Qt 없이도 임포트할 수 있도록 MsgType은 core에서 가져옵니다.
+from core.msg_type import MsgType
+from core.capture_session import CaptureSession, PipeReader, StderrCollector, spawn_process, terminate_process, kill_process
+from core.timestamp_merger import TimestampMerger
+from core.capture_replay import CaptureFile
+from core.session_archive import SessionArchiveWriter, new_session_dir
+from core.payload_index import PayloadIndex
+from core.stream_reassembler import StreamReassembler
+from core.packet_filter import compile_filter
+from core.usb_packet import UsbPacket, TRANSFER_BULK, TRANSFER_CONTROL, TRANSFER_INTERRUPT, payload_preview
+from core.usb_decoders import UsbDecoder
+from core.traffic_stats import TrafficStats
+from core.latency_analyzer import LatencyAnalyzer
+from core.metrics import metrics, exponential_bounds
+
+# 파이프라인 계측 지표 (배치 단위로 갱신)
+_CAPTURE_PACKETS = metrics.counter('capture.packets')
+_CAPTURE_BYTES = metrics.counter('capture.bytes')
+_EMITTED = metrics.counter('capture.emitted')
+_FILTERED = metrics.counter('capture.filtered')
+# FIELDS 모드도 PCAP 경로(pcap_reader/capture_session)와 같은 지표에 기록
+_PARSE_US = metrics.histogram('capture.parse_us_per_packet', exponential_bounds(0.125, 2, 16))
+_CAPTURE_LAG_MS = metrics.histogram('capture.lag_ms', exponential_bounds(0.5, 2, 16))
+_frame_len = attrgetter('frame_len')
 
 # 🚀 캡처 필터용 Enum 정의 (다중 선택 가능)
 class UsbFilter(Enum):
@@ -22,33 +69,106 @@ class UsbFilter(Enum):
     STORAGE = "STORAGE"
     OTHER = "OTHER"
 
+# 🚀 캡처 방식: PCAP(원시 pcapng 직접 파싱, 기본값) / FIELDS(tshark -T fields 텍스트 파싱)
+class CaptureMode(Enum):
+    PCAP = "PCAP"
+    FIELDS = "FIELDS"
+
+class _FieldsLine:
+    """FIELDS 모드 한 줄의 원시 컬럼. 요약 문자열은 str() 호출 시(콘솔에 보일 때) 만듭니다."""
+    __slots__ = ('frame_time', 'length', 'protocol', 'info', 'payload')
+
+    def __init__(self, frame_time, length, protocol, info, payload):
+        self.frame_time = frame_time        # frame.time_epoch (epoch 초, float)
+        self.length = length
+        self.protocol = protocol
+        self.info = info
+        self.payload = payload
+
+    def __str__(self):
+        frame_time = time.strftime("%H:%M:%S", time.localtime(self.frame_time))
+        frame_time += f".{int((self.frame_time % 1) * 1000):03d}"
+        # 데이터가 있을 때만 Data 항목을 문자열에 추가합니다.
+        msg = f"Time: {frame_time} | Len: {self.length} | Proto: {self.protocol} | Info: {self.info}"
+        if self.payload:
+            msg += f" | Data(ASCII): {payload_preview(self.payload)}"
+        return msg
+
+
 class UsbSniffService:
     _instance = None
 
+    # tshark 출력 파이프에서 한 번에 읽을 최대 바이트 수
+    READ_CHUNK_SIZE = 65536
+    # 스트림 재조립 시 유휴 스트림의 남은 데이터를 확인하는 주기(초)
+    FLUSH_INTERVAL = 0.01
+    # 다중 인터페이스 병합 쓰레드가 새 패킷을 기다리는 최대 시간(초)
+    MERGE_INTERVAL = 0.02
+    # tshark -D 인터페이스 조회 최대 대기 시간(초)
+    LIST_TIMEOUT = 30
+    # 새 캡처 시작 전 이전 캡처 쓰레드의 정리(프로세스 회수 등)를 기다리는 최대 시간(초)
+    STOP_JOIN_TIMEOUT = 2.0
+    # tshark가 스스로 끝났을 때 stderr가 다 들어오기를 기다리는 최대 시간(초)
+    STDERR_WAIT = 0.5
+
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self, tshark_path=r'C:\Program Files\Wireshark\tshark.exe'):
+    def __init__(self, tshark_path=r'C:\Program Files\Wireshark\tshark.exe', index_payloads=True):
         if getattr(self, '_initialized', False):
             return
             
         self.tshark_path = tshark_path
         self.is_capturing = False
         self.capture_thread = None
-        self.capture_process = None
+        self.capture_process = None  # FIELDS 모드 tshark 프로세스
+        self._fields_pipe = None     # FIELDS 모드 stdout PipeReader
+        self._fields_stderr = None   # FIELDS 모드 StderrCollector
+        self.capture_mode = None     # 실행 중인 실시간 캡처 방식 (재생 중이면 None)
+        # tshark만 다시 띄우라는 요청 (캡처 쓰레드가 확인)
+        self._restart_requested = threading.Event()
+        self.sessions = []           # PCAP 모드 인터페이스별 캡처 세션
+        self.archive_writer = None   # 세션 아카이브 기록기 (start_capture에 archive_dir 지정 시)
+        self.trigger_engine = None   # 트리거 엔진 (start_capture/load_capture에 trigger_engine 지정 시)
+        # 콘솔에 출력된 패킷의 페이로드 검색 인덱스 (패킷 번호는 서비스 전체에서 증가)
+        # 검색 UI가 없는 헤드리스 실행에서는 index_payloads=False로 페이로드 사본을 보관하지 않음
+        self.payload_index = PayloadIndex() if index_payloads else None
+        self._next_packet_id = 0
+        # SERIAL 벌크 전송 재조립기 (start_capture/load_capture에 framer 지정 시)
+        self.reassembler = None
+        # 패킷 번호 부여 ~ 콘솔 전달 구간 보호 (캡처 쓰레드와 재조립 타이머 쓰레드가 함께 사용)
+        self._emit_lock = threading.Lock()
+        # 소스 단계 패킷 필터 (core.packet_filter.PacketFilter, None이면 전체 통과)
+        # 캡처 쓰레드는 배치마다 이 속성을 한 번 읽으므로 속성 교체만으로 실행 중에 바뀜
+        self.packet_filter = None
+        self._pushed_filter = None   # FIELDS 모드에서 tshark -Y로 내려보낸 필터
+        # USB 클래스 디코더: 캡처 쓰레드는 컨트롤 전송만 넘기고, 해석은 str(packet) 시점에 함
+        self.decoder = UsbDecoder()
+        UsbPacket.decoder = self.decoder
+        # 장치/엔드포인트별 트래픽 통계 (필터 적용 전 모든 패킷)
+        self.traffic_stats = TrafficStats()
+        # 요청/응답 지연 분석 (필터 적용 전 모든 패킷)
+        self.latency = LatencyAnalyzer()
+        # 마지막 캡처/재생의 실패 메세지 (시작 실패, tshark 에러, 재생 실패 등 - 정상 종료면 None)
+        self.last_error = None
+        # 캡처/재생이 끝나면(중지 요청, tshark 종료, 재생 완료) 캡처 쓰레드에서 호출할 함수
+        self.on_capture_finished = None
         
         self.console_widget = None 
         self._initialized = True
 
     def set_console_widget(self, widget):
+        """메세지를 받을 대상을 지정합니다. ConsoleWidget 또는 같은 add_message/add_messages를 가진
+        core.sinks의 싱크(표준 출력/회전 파일/소켓)를 받습니다."""
         self.console_widget = widget
 
     def get_interfaces(self):
         interfaces = []
         try:
-            result = subprocess.run([self.tshark_path, '-D'], capture_output=True, text=True, encoding='utf-8')
+            result = subprocess.run([self.tshark_path, '-D'], capture_output=True, text=True, encoding='utf-8',
+                                    timeout=self.LIST_TIMEOUT)
             for line in result.stdout.splitlines():
                 if 'USBPcap' in line:
                     words = line.split()
@@ -62,54 +182,339 @@ class UsbSniffService:
             raise FileNotFoundError("tshark.exe를 찾을 수 없습니다. 경로를 확인해 주세요.")
 
     # 🚀 protocol_filters를 리스트(List) 형태로 받도록 변경
-    def start_capture(self, interface_name, protocol_filters: list = None):
+    def start_capture(self, interface_name, protocol_filters: list = None, capture_mode=CaptureMode.PCAP, archive_dir=None, framer=None,
+                      packet_filter: str = None, trigger_engine=None):
         if self.is_capturing:
             self._log(MsgType.WARNING, "이미 캡처가 진행 중입니다.")
             return
+        self._join_capture_thread()
+        self.last_error = None
 
         # 필터가 명시되지 않으면 ALL로 간주
         if not protocol_filters:
             protocol_filters = [UsbFilter.ALL]
 
+        interface_names = [interface_name] if isinstance(interface_name, str) else list(interface_name)
+
+        try:
+            self.packet_filter = compile_filter(packet_filter)
+        except ValueError as e:
+            self._fail(f"패킷 필터 오류: {e}")
+            return
+        # 💡 FIELDS 모드만 tshark 디스플레이 필터로 내려보낼 수 있음 (-w 로 pcapng를 쓸 때는 -Y 사용 불가)
+        self._pushed_filter = self.packet_filter if capture_mode == CaptureMode.FIELDS else None
+
+        # 💡 archive_dir이 지정되면 캡처한 모든 패킷(필터 적용 전)을 세션 아카이브로 기록 (PCAP 모드)
+        if archive_dir and capture_mode == CaptureMode.PCAP:
+            session_dir = new_session_dir(archive_dir)
+            self.archive_writer = SessionArchiveWriter(session_dir)
+            self._log(MsgType.INFO, f"세션 아카이브 기록: {session_dir}")
+
+        # 💡 트리거는 원시 패킷(전후 구간 pcapng 저장)이 필요하므로 PCAP 모드에서만 동작
+        if trigger_engine is not None and capture_mode != CaptureMode.PCAP:
+            self._log(MsgType.WARNING, "트리거는 PCAP 방식 캡처에서만 사용할 수 있습니다. 트리거 없이 캡처합니다.")
+            trigger_engine.close()
+            trigger_engine = None
+        self._set_trigger_engine(trigger_engine)
+
+        # 장치 주소는 다시 연결하면 재사용되므로 이전 캡처에서 학습한 디스크립터는 버림
+        self.decoder.clear()
+        self.traffic_stats.reset()
+        self.latency.reset()
+
+        # 💡 재조립은 원시 페이로드가 있는 PCAP 모드에서만 가능
+        self._set_reassembler(protocol_filters, framer if capture_mode == CaptureMode.PCAP else None)
+
+        self.is_capturing = True
+        self.capture_mode = capture_mode
+        self._restart_requested.clear()
+        if capture_mode == CaptureMode.PCAP:
+            self.capture_thread = threading.Thread(target=self._session_worker, args=(interface_names, protocol_filters))
+        else:
+            self.capture_thread = threading.Thread(target=self._sniff_worker, args=(interface_names, protocol_filters))
+        self.capture_thread.daemon = True
+        self.capture_thread.start()
+
+        if self.reassembler is not None and self.reassembler.framer.idle_timeout is not None:
+            # 실시간 캡처: 더 이상 조각이 오지 않는 스트림도 유휴 시간이 지나면 프레임으로 출력
+            flush_thread = threading.Thread(target=self._flush_worker, args=(self.reassembler,))
+            flush_thread.daemon = True
+            flush_thread.start()
+
+    def load_capture(self, path, protocol_filters: list = None, speed: float = None, framer=None, packet_filter: str = None,
+                     trigger_engine=None):
+        """저장된 .pcap/.pcapng 파일을 재생합니다. speed가 None이면 최대 속도, 아니면 원래 시간 간격의 배속."""
+        if self.is_capturing:
+            self._log(MsgType.WARNING, "이미 캡처가 진행 중입니다.")
+            return
+
+        self._join_capture_thread()
+        self.last_error = None
+        if not protocol_filters:
+            protocol_filters = [UsbFilter.ALL]
+
+        try:
+            self.packet_filter = compile_filter(packet_filter)
+        except ValueError as e:
+            self._fail(f"패킷 필터 오류: {e}")
+            return
+        self._pushed_filter = None
+        self.capture_mode = None
+        self.decoder.clear()
+        self.traffic_stats.reset()
+        self.latency.reset()
+
+        # 재생 시에는 패킷 타임스탬프 간격으로만 유휴 시간을 판단 (재생 속도와 무관하게 같은 결과)
+        self._set_reassembler(protocol_filters, framer)
+        self._set_trigger_engine(trigger_engine)
+
         self.is_capturing = True
-        self.capture_thread = threading.Thread(target=self._sniff_worker, args=(interface_name, protocol_filters))
+        self.capture_thread = threading.Thread(target=self._replay_worker, args=(path, protocol_filters, speed))
         self.capture_thread.daemon = True
         self.capture_thread.start()
 
-    def _log(self, msg_type: MsgType, message: str):
+    def _join_capture_thread(self):
+        # 💡 중지 직후 다시 시작해도 이전 쓰레드의 정리(_cleanup)가 새 캡처의 아카이브/트리거를 닫지 않도록 기다림
+        thread = self.capture_thread
+        if thread is not None and thread is not threading.current_thread() and thread.is_alive():
+            thread.join(self.STOP_JOIN_TIMEOUT)
+            if thread.is_alive():
+                self._log(MsgType.WARNING, "이전 캡처 쓰레드가 아직 정리 중입니다.")
+
+    def restart_capture(self):
+        """실행 중인 실시간 캡처의 tshark만 다시 띄웁니다. 병합기/아카이브/트리거/통계/재조립 상태는 유지됩니다.
+        FIELDS 모드의 tshark -Y는 캡처 시작 시의 필터 그대로입니다. 실시간 캡처 중이 아니면 False."""
+        if not self.is_capturing or self.capture_mode is None:
+            return False
+        self._restart_requested.set()
+        if self._fields_pipe is not None:
+            # FIELDS 모드: 대기 중인 읽기를 깨워 캡처 쓰레드가 바로 재시작하도록 함
+            self._fields_pipe.close()
+        return True
+
+    def _replay_worker(self, path, protocol_filters: list, speed):
+        capture = None
+        try:
+            capture = CaptureFile(path)
+            speed_name = f"x{speed:g}" if speed else "최대 속도"
+            self._log(MsgType.INFO, f"--- [{os.path.basename(path)}] 캡처 파일 재생 시작 ({speed_name}) ---")
+
+            allowed_transfers = self._transfer_filter(protocol_filters)
+            for packets in capture.replay(speed, lambda: self.is_capturing):
+                self._emit_packets(packets, allowed_transfers)
+            self._flush_reassembler()
+
+            self._log(MsgType.INFO, f"--- 재생 완료: {capture.indexed_count}개 패킷 ---")
+        except Exception as e:
+            self._fail(f"캡처 파일 재생 실패: {e}")
+        finally:
+            if capture is not None:
+                capture.close()
+            self._close_trigger_engine()
+            self.is_capturing = False
+            self._notify_finished()
+
+    def set_packet_filter(self, text):
+        """소스 단계 패킷 필터를 교체합니다. 캡처 중에도 tshark 재시작 없이 다음 배치부터 적용됩니다.
+        문법 오류면 ValueError를 발생시키고 기존 필터를 유지합니다."""
+        packet_filter = compile_filter(text)
+        self.packet_filter = packet_filter
+        pushed = self._pushed_filter
+        if self.is_capturing and pushed is not None and (packet_filter is None or packet_filter.text != pushed.text):
+            # 💡 tshark는 다시 띄우지 않으므로 시작 시 내려보낸 -Y 필터는 그대로 적용됨
+            self._log(MsgType.WARNING, f"tshark 사전 필터(-Y)는 캡처 시작 시의 '{pushed.text}'가 유지됩니다. "
+                                       f"이 필터에서 제외된 패킷까지 보려면 캡처를 다시 시작하세요.")
+        return packet_filter
+
+    def _set_trigger_engine(self, trigger_engine):
+        self.trigger_engine = trigger_engine
+        if trigger_engine is None:
+            return
+        trigger_engine.on_event = self._on_trigger_event
+        trigger_engine.on_saved = self._on_trigger_saved
+        names = ", ".join(trigger.name for trigger in trigger_engine.triggers)
+        self._log(MsgType.INFO, f"트리거 대기: {names} (저장 폴더: {trigger_engine.output_dir})")
+
+    def _close_trigger_engine(self):
+        if self.trigger_engine is not None:
+            engine, self.trigger_engine = self.trigger_engine, None
+            engine.close()
+
+    def _on_trigger_event(self, name, description, packet):
+        # 캡처 쓰레드에서 호출됨
+        self._log(MsgType.WARNING, f"🔔 트리거 [{name}] 발생: {description} (EP 0x{packet.endpoint:02X}, 장치 {packet.bus}.{packet.device})")
+
+    def _on_trigger_saved(self, path, count, error):
+        # 트리거 기록 쓰레드에서 호출됨
+        if error is not None:
+            self._log(MsgType.ERROR, f"트리거 구간 저장 실패: {error}")
+        else:
+            self._log(MsgType.INFO, f"트리거 구간 저장: {path} ({count}개 패킷)")
+
+    def _set_reassembler(self, protocol_filters: list, framer):
+        if framer is not None and UsbFilter.SERIAL in protocol_filters:
+            self.reassembler = StreamReassembler(framer)
+        else:
+            self.reassembler = None
+
+    def _flush_worker(self, reassembler):
+        while self.is_capturing and self.reassembler is reassembler:
+            time.sleep(self.FLUSH_INTERVAL)
+            frames = reassembler.flush_idle()
+            if frames:
+                self._emit_frames(frames)
+
+    def _flush_reassembler(self):
+        # 캡처 종료 시 아직 끝나지 않은 프레임까지 출력
+        if self.reassembler is not None:
+            frames = self.reassembler.flush_all()
+            if frames:
+                self._emit_frames(frames)
+
+    def _fail(self, message):
+        # 콘솔에 에러로 알리고 last_error에 남김 (헤드리스 실행의 종료 코드 판단용)
+        self.last_error = message
+        self._log(MsgType.ERROR, message)
+
+    def _log(self, msg_type: MsgType, message: str, endpoint: int = None):
         if self.console_widget and hasattr(self.console_widget, 'add_message'):
-            self.console_widget.add_message(msg_type, message)
+            self.console_widget.add_message(msg_type, message, endpoint)
         else:
             print(f"[{msg_type.name}] {message}")
 
-    def _log_file(self, msg_type: MsgType, message: str):
-        # 화면 출력(UI 업데이트)은 _log에서 처리하므로 여기서는 파일만 기록
-        log_filename = "usb_capture_log.txt"
+    def _log_batch(self, messages):
+        """(MsgType, 메세지, 엔드포인트, 패킷 번호) 목록을 한 번에 콘솔로 전달합니다."""
+        if self.console_widget and hasattr(self.console_widget, 'add_messages'):
+            self.console_widget.add_messages(messages)
+        else:
+            for msg_type, message, endpoint, _ in messages:
+                self._log(msg_type, message, endpoint)
+
+    def _session_worker(self, interface_names: list, protocol_filters: list):
+        # 💡 PCAP 모드: 인터페이스마다 세션을 띄우고 이 쓰레드는 병합된 패킷의 필터링/출력만 담당합니다.
+        merger = TimestampMerger()
+        self.sessions = [CaptureSession(name, self._build_pcap_cmd(name), merger) for name in interface_names]
+        allowed_transfers = self._transfer_filter(protocol_filters)
+        reported = set()
+
+        try:
+            for session in self.sessions:
+                session.start()
+
+            filter_names = ", ".join([f.name for f in protocol_filters])
+            self._log(MsgType.INFO, f"--- [{', '.join(interface_names)}] PCAP 방식 패킷 캡처 시작 (필터: {filter_names}) ---")
+
+            while self.is_capturing and merger.open_sources:
+                if self._restart_requested.is_set():
+                    self._restart_requested.clear()
+                    self._restart_sessions(merger, interface_names, allowed_transfers, reported)
+                    continue
+                packets = merger.pop_ready(self.MERGE_INTERVAL)
+                if packets:
+                    self._emit_packets(packets, allowed_transfers)
+                self._report_session_errors(reported)
+
+            if self.is_capturing:
+                # 모든 세션이 스스로 끝남: 남은 패킷까지 출력
+                packets = merger.drain()
+                if packets:
+                    self._emit_packets(packets, allowed_transfers)
+                self._report_session_errors(reported)
+
+            if merger.late_count:
+                self._log(MsgType.WARNING, f"재정렬 범위를 넘어 늦게 도착한 패킷: {merger.late_count}개")
+
+        except Exception as e:
+            self._fail(f"파이썬 에러: {e}")
+        finally:
+            self._cleanup()
+
+    def _restart_sessions(self, merger, interface_names: list, allowed_transfers, reported):
+        for session in self.sessions:
+            session.shutdown()
+        # 이전 세션이 남긴 패킷을 먼저 출력 (병합기 소스는 세션 객체별이라, 아직 끝나지 않은 이전 리더가 새 세션 소스를 닫지 않음)
+        packets = merger.drain()
+        if packets:
+            self._emit_packets(packets, allowed_transfers)
+        # 새 세션의 에러는 다시 알림
+        reported.clear()
+        self.sessions = [CaptureSession(name, self._build_pcap_cmd(name), merger) for name in interface_names]
+        for session in self.sessions:
+            session.start()
+        self._log(MsgType.INFO, f"--- [{', '.join(interface_names)}] tshark 재시작 ---")
+
+    def _report_session_errors(self, reported):
+        for session in self.sessions:
+            if session.error and session.interface_name not in reported and not session.is_alive:
+                reported.add(session.interface_name)
+                self._fail(f"tshark 에러 [{session.interface_name}]: {session.error}")
+
+    def _sniff_worker(self, interface_names: list, protocol_filters: list):
+        # 💡 FIELDS 모드: tshark 하나에 -i를 여러 개 지정하면 tshark가 직접 합쳐 줍니다.
         try:
-            with open(log_filename, "a", encoding="utf-8") as f:
-                f.write(f"[{msg_type.name}] {message}\n")
+            self._start_fields_process(interface_names, protocol_filters)
+
+            filter_names = ", ".join([f.name for f in protocol_filters])
+            self._log(MsgType.INFO, f"--- [{', '.join(interface_names)}] FIELDS 방식 패킷 캡처 시작 (필터: {filter_names}) ---")
+
+            while True:
+                self._read_fields_stream(self._fields_pipe)
+                if not (self.is_capturing and self._restart_requested.is_set()):
+                    break
+                # 💡 tshark만 다시 띄움 (-Y는 캡처 시작 시 내려보낸 필터 그대로)
+                self._restart_requested.clear()
+                kill_process(self.capture_process)
+                self._start_fields_process(interface_names, protocol_filters)
+                self._log(MsgType.INFO, f"--- [{', '.join(interface_names)}] tshark 재시작 ---")
+
+            if self.is_capturing and self.capture_process:
+                err_msg = self._fields_stderr.text(self.STDERR_WAIT)
+                if err_msg:
+                    self._fail(f"tshark 에러: {err_msg}")
+
         except Exception as e:
-            print(f"파일 쓰기 실패: {e}")
+            self._fail(f"파이썬 에러: {e}")
+        finally:
+            self._cleanup()
 
-    # 🚀 다중 필터 로직을 반영한 _sniff_worker
-    def _sniff_worker(self, interface_name, protocol_filters: list):
+    def _start_fields_process(self, interface_names: list, protocol_filters: list):
+        cmd = self._build_fields_cmd(interface_names, protocol_filters, self._pushed_filter)
+        self.capture_process = spawn_process(cmd)
+        # stdout은 파이프 쓰레드로 읽어 중지 지연을 제한하고, stderr는 동시에 비워 tshark가 멈추지 않게 함
+        self._fields_pipe = PipeReader(self.capture_process.stdout)
+        self._fields_stderr = StderrCollector(self.capture_process.stderr)
+
+    def _build_pcap_cmd(self, interface_name):
+        # 💡 원시 pcapng를 표준 출력으로 받습니다. 텍스트 변환이 없으므로 디섹터/필드 설정이 필요 없습니다.
+        return [self.tshark_path, '-i', interface_name, '-w', '-', '-q']
+
+    def _build_fields_cmd(self, interface_names: list, protocol_filters: list, packet_filter=None):
         # 💡 1. 블랙리스트: 데이터 해석을 방해하는 디섹터들을 몽땅 끕니다.
         disable_protocols = {
             'usbhid', 'usbms', 'scsi', 'ftdi-ft'
         }
 
         # 💡 2. 명령어 세팅: 디섹터를 껐으므로 -e 옵션이 엄청나게 심플해집니다!
-        cmd = [
-            self.tshark_path, '-l', '-i', interface_name,
+        cmd = [self.tshark_path, '-l']
+        for interface_name in interface_names:
+            cmd.extend(['-i', interface_name])
+        cmd += [
             '-T', 'fields',
-            '-e', 'frame.time',
+            '-e', 'frame.time_epoch',               # 숫자 타임스탬프 (지연 분석/통계용)
             '-e', 'frame.len',
             '-e', '_ws.col.Protocol',               # 디섹터를 껐으므로 대부분 "USB" 또는 "URB"로 찍힙니다.
             '-e', '_ws.col.Info',                   # 상세 정보 대신 "URB_BULK in" 형태의 기본 정보가 찍힙니다.
             '-e', 'usb.endpoint_address.direction', # 🌟 완벽한 TX/RX 판별용 (0:OUT, 1:IN)
+            '-e', 'usb.endpoint_address',           # 콘솔 엔드포인트 필터용 (예: 0x81)
+            '-e', 'usb.bus_id',                     # 패킷 필터(bus)용
+            '-e', 'usb.device_address',             # 패킷 필터(dev)용
+            '-e', 'usb.transfer_type',              # 패킷 필터(type)용 (예: 0x03)
             '-e', 'usb.capdata',                    # 🌟 모든 데이터가 모이는 방
             '-e', 'data.data',                      # 혹시 모를 기타 데이터
             '-e', 'usb.data_fragment',              # 조각난 패킷 데이터
+            '-e', 'usb.usbd_status',                # 트래픽 통계(에러/STALL)용
+            '-e', 'usb.irp_id',                     # 지연 분석: URB 제출/완료 짝짓기용
+            '-e', 'usb.irp_info.direction',         # 지연 분석: 0 = 제출(FDO->PDO), 1 = 완료(PDO->FDO)
         ]
 
         # 💡 3. tshark 디스플레이 필터(-Y) 하드웨어 기반 세팅
@@ -131,113 +536,262 @@ class UsbSniffService:
 
         # OR 연산자로 필터 묶기
         display_filter_str = " || ".join(filter_conditions)
+        if packet_filter is not None:
+            # 소스 단계 패킷 필터도 함께 내려보내 걸러질 패킷이 파이프를 건너오지 않게 함
+            if display_filter_str:
+                display_filter_str = f"({display_filter_str}) && ({packet_filter.display_filter})"
+            else:
+                display_filter_str = packet_filter.display_filter
         if display_filter_str:
             cmd.extend(['-Y', display_filter_str])
 
         # 블랙리스트 옵션을 명령어에 추가
         for proto in disable_protocols:
             cmd.extend(['--disable-protocol', proto])
+        return cmd
 
-        try:
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    def _transfer_filter(self, protocol_filters: list):
+        # 💡 pcap 모드에서는 -Y(디스플레이 필터)를 쓸 수 없으므로 전송 타입으로 직접 거릅니다.
+        # (인터페이스 클래스는 디스크립터 없이 알 수 없으므로 HID=인터럽트, SERIAL/STORAGE=벌크로 근사)
+        if UsbFilter.ALL in protocol_filters:
+            return None
+        allowed_transfers = set()
+        if UsbFilter.HID in protocol_filters:
+            allowed_transfers.add(TRANSFER_INTERRUPT)
+        if UsbFilter.SERIAL in protocol_filters or UsbFilter.STORAGE in protocol_filters:
+            allowed_transfers.add(TRANSFER_BULK)
+        return allowed_transfers
 
-            self.capture_process = subprocess.Popen(
-                cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                text=True, encoding='utf-8', startupinfo=startupinfo
-            )
-            
-            filter_names = ", ".join([f.name for f in protocol_filters])
-            self._log(MsgType.INFO, f"--- [{interface_name}] 블랙리스트 방식 패킷 캡처 시작 (필터: {filter_names}) ---")
+    def _emit_packets(self, packets, allowed_transfers):
+        _CAPTURE_PACKETS.add(len(packets))
+        _CAPTURE_BYTES.add(sum(map(_frame_len, packets)))
+        if self.archive_writer is not None:
+            self.archive_writer.append(packets)
+        self.traffic_stats.update(packets)
+        self._analyze_latency(packets)
+        if self.trigger_engine is not None:
+            self.trigger_engine.feed(packets)
 
-            for line in self.capture_process.stdout:
-                if not self.is_capturing:
-                    break
-                
-                line = line.strip()
-                if not line or line.startswith("Capturing on"):
-                    continue
-                
-                parts = line.split('\t')
-                if len(parts) >= 2:
-                    frame_time = parts[0]
-                    time_match = re.search(r'(\d{2}:\d{2}:\d{2}\.\d{3})', frame_time)
-                    if time_match:
-                        frame_time = time_match.group(1)
-
-                    length = parts[1]
-                    protocol = parts[2].upper() if len(parts) > 2 else "UNKNOWN"
-                    info = parts[3] if len(parts) > 3 else "No Info"
-                    direction_flag = parts[4] if len(parts) > 4 else ""
-
-                    # 💡 4. 데이터 추출: 인덱스 5, 6, 7 (-e usb.capdata 등)에서 첫 번째 데이터 가져오기
-                    payload_candidates = [p for p in parts[5:] if p.strip()]
-                    raw_hex_data = payload_candidates[0] if payload_candidates else ""
-                    
-                    if raw_hex_data and ',' in raw_hex_data:
-                        raw_hex_data = raw_hex_data.split(',')[0]
-
-                    ascii_data = ""
-                    clean_hex = ""
-
-                    if raw_hex_data:
-                        clean_hex = raw_hex_data.replace(':', '')
-                        
-                        is_truncated = False
-                        if len(clean_hex) > 2000:
-                            clean_hex = clean_hex[:2000]
-                            is_truncated = True
-                            
-                        if len(clean_hex) % 2 != 0:
-                            clean_hex = clean_hex[:-1]
-                            
-                        try:
-                            decoded_bytes = bytes.fromhex(clean_hex)
-                            ascii_data = decoded_bytes.decode('ascii', errors='replace')
-                            # 제어 문자 필터링
-                            ascii_data = ''.join([c if 32 <= ord(c) < 127 else '.' for c in ascii_data])
-                            
-                            if is_truncated:
-                                ascii_data += "..."
-                        except Exception as e:
-                            ascii_data = f"[Decode Error: {e}]"
-
-                    # 💡 5. 완벽한 TX/RX 판별 및 출력
-                    # 데이터가 있을 때만 Data 항목을 문자열에 추가합니다.
-                    msg = f"Time: {frame_time} | Len: {length} | Proto: {protocol} | Info: {info}"
-                    if ascii_data:
-                        msg += f" | Data(ASCII): {ascii_data}"
-                    
-                    if direction_flag == "0" or (not direction_flag and 'out' in info.lower()):
-                        self._log(MsgType.TX, msg)
-                    elif direction_flag == "1" or (not direction_flag and 'in' in info.lower()):
-                        self._log(MsgType.RX, msg)
+        entries = []
+        reassembler = self.reassembler
+        packet_filter = self.packet_filter
+        observe = self.decoder.observe
+        # 패킷을 이번 캡처의 디스크립터 표에 묶음 (다음 캡처가 표를 새로 시작해도 해석이 바뀌지 않도록)
+        descriptors = self.decoder.descriptors
+        filtered = 0
+        for packet in packets:
+            # 💡 디스크립터 학습은 필터와 무관하게 모든 컨트롤 전송에서 (수가 적어 비용이 거의 없음)
+            if packet.transfer_type == TRANSFER_CONTROL:
+                observe(packet)
+            if allowed_transfers is not None and packet.transfer_type not in allowed_transfers:
+                continue
+            if reassembler is not None and packet.transfer_type == TRANSFER_BULK:
+                # 벌크 조각은 재조립기에 넣고 완성된 프레임만 출력 (패킷 필터는 완성된 프레임에 적용)
+                for frame in reassembler.feed(packet):
+                    if packet_filter is None or packet_filter(frame):
+                        entries.append(self._frame_entry(frame))
                     else:
-                        self._log(MsgType.RX, msg)
+                        filtered += 1
+                continue
+            # 💡 문자열 변환 전에 원시 필드로 판정
+            if packet_filter is not None and not packet_filter(packet):
+                filtered += 1
+                continue
+            # 💡 요약 문자열은 만들지 않고 패킷 객체를 그대로 넘김 (콘솔이 화면에 보이는 행만 str()로 변환)
+            packet.descriptors = descriptors
+            msg_type = MsgType.RX if packet.endpoint & 0x80 else MsgType.TX
+            entries.append((msg_type, packet, packet.endpoint, packet.payload))
 
-            if self.is_capturing and self.capture_process:
-                err_msg = self.capture_process.stderr.read()
-                if err_msg:
-                    self._log(MsgType.ERROR, f"tshark 에러: {err_msg.strip()}")
+        if filtered:
+            _FILTERED.add(filtered)
+        if entries:
+            self._emit_entries(entries)
 
-        except Exception as e:
-            self._log(MsgType.ERROR, f"파이썬 에러: {e}")
-        finally:
-            self._cleanup()
+    def _analyze_latency(self, packets):
+        outliers = self.latency.update(packets)
+        if outliers:
+            self._log_batch([(MsgType.WARNING, f"⏱ {outlier}", outlier.series.endpoint, None) for outlier in outliers])
+
+    def _emit_frames(self, frames):
+        packet_filter = self.packet_filter
+        entries = [self._frame_entry(frame) for frame in frames if packet_filter is None or packet_filter(frame)]
+        if entries:
+            self._emit_entries(entries)
+
+    def _frame_entry(self, frame):
+        msg_type = MsgType.RX if frame.endpoint & 0x80 else MsgType.TX
+        return (msg_type, frame, frame.endpoint, frame.data)
+
+    def _emit_entries(self, entries):
+        """(MsgType, 레코드, 엔드포인트, 페이로드) 목록에 패킷 번호를 붙여 검색 인덱스와 콘솔로 전달합니다.
+        레코드는 str()로 요약 문자열을 만들 수 있는 패킷 객체입니다. (UsbPacket, StreamFrame, _FieldsLine)"""
+        _EMITTED.add(len(entries))
+        with self._emit_lock:
+            packet_id = self._next_packet_id
+            self._next_packet_id = packet_id + len(entries)
+            packet_ids = range(packet_id, packet_id + len(entries))
+            if self.payload_index is not None:
+                self.payload_index.add_packets(packet_ids, [entry[3] for entry in entries])
+            self._log_batch([(msg_type, message, endpoint, pid)
+                             for (msg_type, message, endpoint, _), pid in zip(entries, packet_ids)])
+
+    def _read_fields_stream(self, stream):
+        # 💡 파이프에 도착한 만큼(read1) 한 번에 읽어 여러 줄을 하나의 배치로 콘솔에 전달합니다.
+        pending = b""
+        while self.is_capturing:
+            chunk = stream.read1(self.READ_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            lines = (pending + chunk).split(b'\n')
+            pending = lines.pop()  # 마지막 줄은 아직 덜 들어왔을 수 있으므로 보관
+            self._process_fields_lines(lines)
+
+        if pending:
+            # tshark가 끝나며 남긴 마지막 줄도 통계/지연 분석까지 같은 경로로 처리
+            self._process_fields_lines([pending])
+
+    def _process_fields_lines(self, lines):
+        packet_filter = self.packet_filter
+        batch = []
+        records = []
+        started = time.perf_counter()
+        for raw_line in lines:
+            parsed = self._parse_fields_line(raw_line.decode('utf-8', errors='replace'), packet_filter, records)
+            if parsed:
+                batch.append(parsed)
+        if records:
+            # 배치 단위 계측: 패킷당 파싱 시간과 (frame.time_epoch 기준) 마지막 패킷의 지연
+            _PARSE_US.observe((time.perf_counter() - started) * 1e6 / len(records))
+            if records[-1].timestamp > 0:
+                _CAPTURE_LAG_MS.observe((time.time() - records[-1].timestamp) * 1000.0)
+        # 배너("Capturing on ...")/빈 줄을 빼고 실제 패킷 줄만 셈
+        _CAPTURE_PACKETS.add(len(records))
+        _CAPTURE_BYTES.add(sum(map(_frame_len, records)))
+        self.traffic_stats.update(records)
+        self._analyze_latency(records)
+        if batch:
+            self._emit_entries(batch)
+
+    def _parse_fields_line(self, line, packet_filter=None, records=None):
+        """tshark -T fields 출력 한 줄을 (MsgType, 레코드, 엔드포인트, 페이로드)로 변환합니다. 건너뛸 줄이면 None.
+        records 목록을 주면 필터 적용 전에 원시 필드 레코드(UsbPacket)를 추가합니다. (트래픽 통계용)"""
+        line = line.strip()
+        if not line or line.startswith("Capturing on"):
+            return None
+        
+        parts = line.split('\t')
+        if len(parts) < 2:
+            return None
+
+        try:
+            frame_time = float(parts[0])
+        except ValueError:
+            frame_time = 0.0
+
+        # 💡 hex 디코딩/문자열 생성 전에 원시 필드로 패킷 필터 판정
+        if packet_filter is not None or records is not None:
+            fields_record = self._fields_record(frame_time, parts, packet_filter is not None and packet_filter.uses_payload)
+            if records is not None:
+                records.append(fields_record)
+            if packet_filter is not None and not packet_filter(fields_record):
+                _FILTERED.add(1)
+                return None
+
+        length = parts[1]
+        protocol = parts[2].upper() if len(parts) > 2 else "UNKNOWN"
+        info = parts[3] if len(parts) > 3 else "No Info"
+        direction_flag = parts[4] if len(parts) > 4 else ""
+
+        endpoint = None
+        if len(parts) > 5 and parts[5]:
+            try:
+                endpoint = int(parts[5].split(',')[0], 16)
+            except ValueError:
+                pass
+
+        # 💡 4. 데이터 추출: 인덱스 9, 10, 11 (-e usb.capdata 등)에서 첫 번째 데이터를 원시 바이트로 (자르지 않음)
+        payload_candidates = [p for p in parts[9:12] if p.strip()]
+        raw_hex_data = payload_candidates[0].split(',')[0] if payload_candidates else ""
+        clean_hex = raw_hex_data.replace(':', '')
+        if len(clean_hex) % 2 != 0:
+            clean_hex = clean_hex[:-1]
+        try:
+            payload = bytes.fromhex(clean_hex)
+        except ValueError:
+            payload = b""
+
+        # 💡 5. 완벽한 TX/RX 판별 - 표시 문자열은 화면에 보일 때 _FieldsLine이 만듦
+        record = _FieldsLine(frame_time, length, protocol, info, payload)
+        if direction_flag == "0" or (not direction_flag and 'out' in info.lower()):
+            return (MsgType.TX, record, endpoint, payload)
+        return (MsgType.RX, record, endpoint, payload)
+
+    @staticmethod
+    def _fields_record(frame_time, parts, with_payload):
+        """FIELDS 모드 한 줄의 원시 필드로 패킷 필터/통계/지연 분석용 UsbPacket을 만듭니다. (페이로드는 필요할 때만 디코딩)"""
+        def field(index):
+            try:
+                return int(parts[index].split(',')[0], 0)
+            except (IndexError, ValueError):
+                return 0
+
+        raw_hex = next((p for p in parts[9:12] if p.strip()), "").split(',')[0].replace(':', '')
+        payload = b""
+        if with_payload:
+            try:
+                payload = bytes.fromhex(raw_hex)
+            except ValueError:
+                pass
+        return UsbPacket(frame_time, field(1), field(13), field(12), 0, field(14), field(6), field(7), field(5), field(8),
+                         len(raw_hex) // 2, payload)
 
     def stop_capture(self):
+        """캡처 중지를 요청합니다. 기다리지 않으며, 프로세스 회수는 캡처 쓰레드의 정리 단계에서 합니다."""
         self.is_capturing = False
-        if self.capture_process and self.capture_process.poll() is None:
-            try:
-                # Windows 환경: /F (강제 종료), /T (하위 프로세스 트리까지 모두 종료)
-                subprocess.run(['taskkill', '/F', '/T', '/PID', str(self.capture_process.pid)], capture_output=True)
-            except Exception as e:
-                self._log(MsgType.ERROR, f"프로세스 종료 오류: {e}")
+        try:
+            if self._fields_pipe is not None:
+                self._fields_pipe.close()
+            terminate_process(self.capture_process)
+            for session in self.sessions:
+                session.stop()
+        except Exception as e:
+            self._log(MsgType.ERROR, f"프로세스 종료 오류: {e}")
 
     def _cleanup(self):
-        if self.capture_process and self.capture_process.poll() is None:
+        self._flush_reassembler()
+        try:
+            kill_process(self.capture_process)
+        except Exception:
+            pass
+        self.capture_process = None
+        self._fields_pipe = None
+        self._fields_stderr = None
+        for session in self.sessions:
             try:
-                subprocess.run(['taskkill', '/F', '/T', '/PID', str(self.capture_process.pid)], capture_output=True)
+                session.shutdown()
             except Exception:
                 pass
-        self._log(MsgType.INFO, "--- 캡처 중지됨 ---")
\ No newline at end of file
+        if len(self.sessions) > 1:
+            counts = ", ".join(f"{session.interface_name}: {session.packet_count}개" for session in self.sessions)
+            self._log(MsgType.INFO, f"인터페이스별 패킷 수 - {counts}")
+        self.sessions = []
+        # tshark가 스스로 종료된 경우에도 다시 시작할 수 있도록 상태를 되돌림
+        self.is_capturing = False
+        self.capture_mode = None
+        if self.archive_writer is not None:
+            writer, self.archive_writer = self.archive_writer, None
+            writer.close()
+            self._log(MsgType.INFO, f"세션 아카이브 종료: {writer.records_written}개 기록, {writer.dropped}개 누락")
+            if writer.last_error is not None:
+                self._fail(f"세션 아카이브 기록 중단: {writer.last_error}")
+        self._close_trigger_engine()
+        self._log(MsgType.INFO, "--- 캡처 중지됨 ---")
+        self._notify_finished()
+
+    def _notify_finished(self):
+        if self.on_capture_finished is not None:
+            try:
+                self.on_capture_finished()
+            except Exception as e:
+                self._log(MsgType.ERROR, f"캡처 종료 알림 오류: {e}")
\ No newline at end of file
@@ -0,0 +1,64 @@
+import struct
+
+from core.pcap_reader import (USBPCAP_HEADER, LINKTYPE_USBPCAP, PCAP_MAGIC_NS, PCAPNG_SHB, PCAPNG_IDB, PCAPNG_EPB,
+                              PCAPNG_BYTE_ORDER_MAGIC)
+from core.usb_packet import UsbPacket, TRANSFER_BULK
+
+
+def make_packet(payload=b"", timestamp=0.0, endpoint=0x81, transfer=TRANSFER_BULK, bus=1, device=3,
+                irp_id=1, info=1, function=9, interface=None, stage=None):
+    """테스트용 UsbPacket. frame_len = USBPcap 의사 헤더(+ 컨트롤 단계 바이트) + 페이로드 길이"""
+    header_len = USBPCAP_HEADER.size if stage is None else USBPCAP_HEADER.size + 1
+    packet = UsbPacket(timestamp, header_len + len(payload), irp_id, 0, function, info,
+                       bus, device, endpoint, transfer, len(payload), payload)
+    packet.interface = interface
+    packet.stage = stage
+    return packet
+
+
+# ------------------ 캡처 파일 조립 (리더와 독립된 테스트용 인코더) ------------------
+
+def usbpcap_frame(packet):
+    """UsbPacket의 USBPcap 의사 헤더(+ 컨트롤 단계 바이트) + 페이로드 바이트열"""
+    stage = packet.stage
+    header = USBPCAP_HEADER.pack(USBPCAP_HEADER.size if stage is None else USBPCAP_HEADER.size + 1,
+                                 packet.irp_id, packet.status, packet.function, packet.info,
+                                 packet.bus, packet.device, packet.endpoint, packet.transfer_type,
+                                 packet.data_length)
+    if stage is not None:
+        header += bytes((stage,))
+    return header + bytes(packet.payload)
+
+
+def pcapng_block(endian, block_type, body):
+    body += b"\0" * (-len(body) % 4)
+    total = 12 + len(body)
+    return struct.pack(endian + 'II', block_type, total) + body + struct.pack(endian + 'I', total)
+
+
+def pcapng_file(packets, endian='<', tsresol=6):
+    """SHB + USBPcap IDB(if_tsresol = 10^-tsresol) + 패킷마다 EPB"""
+    units = 10 ** tsresol
+    parts = [
+        pcapng_block(endian, PCAPNG_SHB, struct.pack(endian + 'IHHq', PCAPNG_BYTE_ORDER_MAGIC, 1, 0, -1)),
+        pcapng_block(endian, PCAPNG_IDB, struct.pack(endian + 'HHI', LINKTYPE_USBPCAP, 0, 0x40000)
+                     + struct.pack(endian + 'HH', 9, 1) + bytes((tsresol, 0, 0, 0)) + struct.pack(endian + 'HH', 0, 0)),
+    ]
+    for packet in packets:
+        frame = usbpcap_frame(packet)
+        timestamp = int(round(packet.timestamp * units))
+        parts.append(pcapng_block(endian, PCAPNG_EPB, struct.pack(endian + 'IIIII', 0, timestamp >> 32,
+                                                                  timestamp & 0xFFFFFFFF, len(frame), len(frame))
+                                  + frame))
+    return b"".join(parts)
+
+
+def pcap_file(packets, endian='<', magic=0xA1B2C3D4):
+    divisor = 1000000000 if magic == PCAP_MAGIC_NS else 1000000
+    parts = [struct.pack(endian + 'IHHiIII', magic, 2, 4, 0, 0, 0x40000, LINKTYPE_USBPCAP)]
+    for packet in packets:
+        frame = usbpcap_frame(packet)
+        ts_sec, ts_frac = divmod(int(round(packet.timestamp * divisor)), divisor)
+        parts.append(struct.pack(endian + 'IIII', ts_sec, ts_frac, len(frame), len(frame)))
+        parts.append(frame)
+    return b"".join(parts)
@@ -0,0 +1,75 @@
+import pytest
+
+from core.batch_queue import BoundedBatchQueue, OverflowPolicy
+
+
+def test_put_and_get_in_order():
+    queue = BoundedBatchQueue(10)
+    queue.put_many([1, 2, 3])
+    queue.put(4)
+    assert queue.get_batch(2) == [1, 2]
+    assert queue.get_batch(10) == [3, 4]
+    assert queue.empty()
+
+
+def test_drop_oldest():
+    queue = BoundedBatchQueue(3, OverflowPolicy.DROP_OLDEST)
+    queue.put_many([1, 2])
+    queue.put_many([3, 4])
+    assert queue.dropped_total == 1
+    queue.put_many([5, 6, 7, 8, 9])
+    assert queue.dropped_total == 1 + 3 + 2
+    assert queue.get_batch(10) == [7, 8, 9]
+    assert queue.qsize() == 0
+
+
+def test_drop_newest():
+    queue = BoundedBatchQueue(3, OverflowPolicy.DROP_NEWEST)
+    queue.put_many([1, 2])
+    queue.put_many([3, 4, 5])
+    assert queue.dropped_total == 2
+    assert queue.suppressed_total == 0
+    assert queue.get_batch(10) == [1, 2, 3]
+
+
+def test_coalesce_with_summary():
+    queue = BoundedBatchQueue(3, OverflowPolicy.COALESCE, summary_factory=lambda count: f"{count} skipped")
+    queue.put_many([1, 2, 3, 4, 5])
+    queue.put_many([6])
+    assert queue.suppressed_total == 3
+    assert queue.dropped_total == 0
+    assert queue.get_batch(10) == [1, 2, 3, "3 skipped"]
+    assert queue.empty()
+
+
+def test_coalesce_summary_before_new_items():
+    queue = BoundedBatchQueue(3, OverflowPolicy.COALESCE, summary_factory=lambda count: ("summary", count))
+    queue.put_many([1, 2, 3, 4])
+    assert queue.get_batch(2) == [1, 2]
+    queue.put_many([5])
+    assert queue.get_batch(10) == [3, ("summary", 1), 5]
+
+
+@pytest.mark.parametrize("max_items", [1, 3, 10])
+def test_coalesce_without_summary_factory(max_items):
+    queue = BoundedBatchQueue(3)
+    queue.put_many([1, 2, 3, 4, 5])
+    assert queue.suppressed_total == 2
+    items = []
+    while True:
+        batch = queue.get_batch(max_items)
+        if not batch:
+            break
+        items.extend(batch)
+    assert items == [1, 2, 3]
+    assert queue.qsize() == 0
+    queue.put_many([6])
+    assert queue.get_batch(10) == [6]
+
+
+def test_clear_resets_suppressed_run():
+    queue = BoundedBatchQueue(2, summary_factory=lambda count: count)
+    queue.put_many([1, 2, 3])
+    queue.clear()
+    assert queue.get_batch(10) == []
+    assert queue.empty()
@@ -0,0 +1,76 @@
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from core.capture_session import CaptureSession, PipeReader, kill_process, terminate_process
+from core.timestamp_merger import TimestampMerger
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="POSIX 프로세스 그룹")
+def test_kill_process_stops_group_and_reaps_leader():
+    # 리더는 SIGTERM을 무시하고, 그룹의 하위 프로세스는 계속 살아 있음
+    script = ("import signal, subprocess, sys, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); "
+              "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)']); "
+              "print(child.pid, flush=True); time.sleep(30)")
+    process = subprocess.Popen([sys.executable, '-c', script], stdout=subprocess.PIPE, start_new_session=True)
+    child_pid = int(process.stdout.readline())
+    started = time.monotonic()
+    kill_process(process, timeout=0.2)
+    assert time.monotonic() - started < 5
+    assert process.returncode == -signal.SIGKILL
+    process.stdout.close()
+    for _ in range(100):
+        try:
+            os.kill(child_pid, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.02)
+    else:
+        pytest.fail("그룹의 하위 프로세스가 남아 있음")
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="POSIX 프로세스 그룹")
+def test_no_group_signal_after_leader_is_reaped(monkeypatch):
+    process = subprocess.Popen([sys.executable, '-c', 'pass'], start_new_session=True)
+    process.wait()
+    sent = []
+    monkeypatch.setattr(os, 'killpg', lambda pgid, signum: sent.append((pgid, signum)))
+    terminate_process(process)
+    kill_process(process)
+    assert sent == []
+
+
+def test_pipe_reader_close_unblocks_idle_read():
+    # 유휴 버스: 파이프에 아무것도 오지 않아도 close() 후 POLL_INTERVAL 안에 EOF
+    read_fd, write_fd = os.pipe()
+    with os.fdopen(read_fd, 'rb', buffering=0) as pipe:
+        reader = PipeReader(pipe)
+        threading.Timer(0.1, reader.close).start()
+        started = time.monotonic()
+        assert reader.read1() == b""
+        assert time.monotonic() - started < 0.1 + PipeReader.POLL_INTERVAL * 4
+        os.close(write_fd)
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="POSIX 프로세스 그룹")
+def test_session_shutdown_is_bounded_for_silent_stubborn_tshark():
+    # 출력 없이 SIGTERM을 무시하는 tshark 흉내
+    script = "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); time.sleep(30)"
+    merger = TimestampMerger()
+    session = CaptureSession("USBPcap1", [sys.executable, '-c', script], merger)
+    session.start()
+    time.sleep(0.2)
+
+    started = time.monotonic()
+    session.stop()
+    assert time.monotonic() - started < 0.1   # stop()은 기다리지 않음
+    session.shutdown(timeout=0.3)
+    assert time.monotonic() - started < 0.3 + 1.0
+    assert session.process.returncode == -signal.SIGKILL
+    assert not session.is_alive
+    assert merger.open_sources == 0 and session.error is None
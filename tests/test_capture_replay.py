@@ -0,0 +1,67 @@
+import pytest
+
+import core.pcap_reader as pcap_reader
+from core.capture_replay import CaptureFile
+from tests import make_packet, pcapng_file
+
+
+@pytest.fixture
+def capture_path(tmp_path):
+    path = tmp_path / "capture.pcapng"
+    path.write_bytes(pcapng_file([make_packet(bytes([i % 256]), 1700000000.0 + i * 0.001, irp_id=i)
+                                  for i in range(100)]))
+    return path
+
+
+@pytest.fixture
+def parse_count(monkeypatch):
+    counter = [0]
+    parse = pcap_reader.parse_usbpcap_frame
+
+    def counting(*args):
+        counter[0] += 1
+        return parse(*args)
+
+    monkeypatch.setattr(pcap_reader, 'parse_usbpcap_frame', counting)
+    return counter
+
+
+def irp_ids(capture, start_index=0):
+    return [packet.irp_id for batch in capture.iter_batches(start_index) for packet in batch]
+
+
+@pytest.mark.parametrize("start_index", [0, 5, 30])
+def test_fresh_file_is_parsed_once(monkeypatch, capture_path, parse_count, start_index):
+    monkeypatch.setattr(CaptureFile, 'BATCH_SIZE', 16)
+    capture = CaptureFile(capture_path)
+    try:
+        assert irp_ids(capture, start_index) == list(range(start_index, 100))
+        assert parse_count[0] == 100
+        assert capture.indexed_count == 100
+    finally:
+        capture.close()
+
+
+def test_indexed_region_is_not_read_past_the_frontier(monkeypatch, capture_path, parse_count):
+    monkeypatch.setattr(CaptureFile, 'BATCH_SIZE', 16)
+    capture = CaptureFile(capture_path)
+    try:
+        # 앞 32개만 인덱싱된 상태에서 처음부터 다시 읽기
+        batches = capture.iter_batches(20)
+        assert [packet.irp_id for packet in next(batches)] == list(range(20, 32))
+        assert capture.indexed_count == 32
+        parse_count[0] = 0
+        assert irp_ids(capture, 10) == list(range(10, 100))
+        assert parse_count[0] == 90
+    finally:
+        capture.close()
+
+
+def test_start_past_end_and_packet_count(capture_path):
+    capture = CaptureFile(capture_path)
+    try:
+        assert irp_ids(capture, 150) == []
+        assert capture.packet_count() == 100
+        assert irp_ids(capture, 99) == [99]
+    finally:
+        capture.close()
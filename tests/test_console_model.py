@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PySide6")
+pytest.importorskip("qfluentwidgets")
+
+from core.msg_type import MsgType
+from ui.components.console_widget import ConsoleModel
+
+
+class CountingText:
+    """str() 호출 횟수를 세는 메세지 객체"""
+    calls = 0
+
+    def __init__(self, text):
+        self.text = text
+
+    def __str__(self):
+        CountingText.calls += 1
+        return self.text
+
+
+def records(count, start=0):
+    return [(MsgType.RX if i % 2 else MsgType.TX, CountingText(f"packet {i}"), float(i), 0x81, i)
+            for i in range(start, start + count)]
+
+
+def rows(model):
+    return [model.seq_at(row) for row in range(model.rowCount())]
+
+
+def test_ring_buffer_evicts_oldest_records():
+    model = ConsoleModel(10)
+    model.append_records(records(8))
+    model.append_records(records(5, start=8))
+    assert model.rowCount() == 10
+    assert [model.index(row).data(ConsoleModel.TimestampRole) for row in range(10)] == [float(i) for i in range(3, 13)]
+
+    # 용량보다 큰 묶음은 마지막 용량만큼만 보관
+    model.append_records(records(25, start=13))
+    assert model.rowCount() == 10
+    assert model.index(0).data(ConsoleModel.TimestampRole) == 28.0
+    assert model.index(9).data(ConsoleModel.MsgTypeRole) == MsgType.RX
+
+
+def test_text_filter_is_applied_incrementally_without_formatting_on_append():
+    model = ConsoleModel(1000)
+    model.append_records(records(100))
+    CountingText.calls = 0
+    model.set_filter(text="packet 1")
+    assert CountingText.calls == 0 and model.rowCount() == 0 and model.scan_pending
+
+    while model.scan_text(1.0):
+        pass
+    assert rows(model) == [1] + list(range(10, 20))
+    assert CountingText.calls == 100
+
+    # 새 레코드는 추가 시점에 포맷하지 않고 다음 scan_text()에서 판정
+    model.append_records(records(20, start=100))
+    assert CountingText.calls == 100 and model.scan_pending
+    model.scan_text(1.0)
+    assert rows(model)[-1] == 119 and len(rows(model)) == 31
+
+    # 이미 만든 요약은 재사용
+    model.set_filter(text="packet 5")
+    while model.scan_text(1.0):
+        pass
+    assert CountingText.calls == 120
+
+
+def test_text_filter_combines_with_type_filter_and_budget():
+    model = ConsoleModel(4000)
+    model.append_records(records(2000))
+    model.set_filter(msg_types={MsgType.RX}, text="packet 19")
+    assert model.scan_text(0.0)  # 예산이 없어도 한 묶음은 진행
+    while model.scan_text(1.0):
+        pass
+    assert rows(model) == [seq for seq in range(2000) if seq % 2 and str(seq).startswith("19")]
+
+
+def test_eviction_moves_scan_position():
+    model = ConsoleModel(10)
+    model.append_records(records(10))
+    model.set_filter(text="packet")
+    model.append_records(records(5, start=10))
+    while model.scan_text(1.0):
+        pass
+    assert rows(model) == list(range(5, 15))
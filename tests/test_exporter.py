@@ -0,0 +1,84 @@
+import csv
+import json
+
+import pytest
+
+from core import exporter
+from core.exporter import CSV_COLUMNS, SessionExporter, format_for_path
+from core.pcap_reader import PcapStreamReader
+from core.session_archive import SessionArchiveWriter
+from tests import make_packet
+
+
+@pytest.fixture
+def session_dir(tmp_path):
+    path = str(tmp_path / "session_1")
+    writer = SessionArchiveWriter(path)
+    writer.append([make_packet(bytes([i % 256, 0x0A]), 1000.0 + i * 0.01, 0x81 if i % 2 else 0x02, irp_id=i)
+                   for i in range(1000)])
+    writer.close()
+    return path
+
+
+def test_format_is_chosen_by_extension():
+    assert [format_for_path(path) for path in ("a.CSV", "b.json", "c.jsonl", "d.pcapng")] == \
+        ['csv', 'jsonl', 'jsonl', 'pcapng']
+    with pytest.raises(ValueError):
+        format_for_path("out.txt")
+
+
+def test_csv_export_with_time_range_and_filter(session_dir, tmp_path):
+    output = str(tmp_path / "out.csv")
+    progress = []
+    count = SessionExporter(session_dir, output, start_ts=1001.0, end_ts=1002.0, packet_filter="dir == in").run(
+        lambda done, total: progress.append((done, total)))
+    with open(output, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    assert tuple(rows[0]) == CSV_COLUMNS
+    assert count == len(rows) - 1 == 50
+    assert rows[1][:5] == ["1001.010000", "1", "3", "0x81", "in"]
+    assert rows[1][-1] == "650a"
+    assert progress[-1] == (100, 100)
+
+
+def test_jsonl_export_streams_in_batches(session_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(SessionExporter, 'BATCH_SIZE', 64)
+    output = str(tmp_path / "out.jsonl")
+    progress = []
+    assert SessionExporter(session_dir, output).run(lambda done, total: progress.append(done)) == 1000
+    with open(output, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 1000
+    assert records[2]['irp_id'] == "0x0000000000000002" and records[2]['direction'] == "out"
+    assert len(progress) == 16 and progress[-1] == 1000
+
+
+def test_pcapng_export_roundtrip(session_dir, tmp_path):
+    output = tmp_path / "out.pcapng"
+    assert SessionExporter(session_dir, str(output), end_ts=1000.5).run() == 50
+    packets = [packet for batch in PcapStreamReader.from_buffer(output.read_bytes()).iter_batches() for packet in batch]
+    assert [packet.irp_id for packet in packets] == list(range(50))
+    assert bytes(packets[3].payload) == b"\x03\x0a"
+
+
+def test_cancel_removes_partial_file(session_dir, tmp_path):
+    output = tmp_path / "out.csv"
+    assert SessionExporter(session_dir, str(output)).run(is_cancelled=lambda: True) is None
+    assert list(tmp_path.iterdir()) == [tmp_path / "session_1"]
+
+
+def test_failure_removes_partial_file(session_dir, tmp_path, monkeypatch):
+    def fail(self, packets):
+        raise OSError("디스크 가득 참")
+
+    monkeypatch.setattr(exporter.CsvExportWriter, 'write_packets', fail)
+    with pytest.raises(OSError):
+        SessionExporter(session_dir, str(tmp_path / "out.csv")).run()
+    assert list(tmp_path.iterdir()) == [tmp_path / "session_1"]
+
+
+def test_cli(session_dir, tmp_path):
+    output = tmp_path / "out.jsonl"
+    assert exporter.main([session_dir, str(output), '--start', '9', '--packet-filter', 'dir == out']) == 0
+    assert len(output.read_text(encoding='utf-8').splitlines()) == 50
+    assert exporter.main([session_dir, str(tmp_path / "out.txt")]) == 2
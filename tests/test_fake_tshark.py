@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+from bench import fake_tshark
+from core.pcap_reader import PcapStreamReader
+
+FAKE_TSHARK = fake_tshark.__file__
+
+
+def run_fake_tshark(*args, **env):
+    environment = dict(os.environ, FAKE_TSHARK_RATE="100000", **env)
+    return subprocess.run([sys.executable, FAKE_TSHARK, *args], capture_output=True, env=environment, timeout=30)
+
+
+def test_lists_usbpcap_interfaces():
+    lines = run_fake_tshark('-D').stdout.decode().splitlines()
+    assert len(lines) == len(fake_tshark.INTERFACES)
+    assert lines[0].endswith("(USBPcap1)")
+
+
+def test_pcapng_output_is_readable_usbpcap():
+    result = run_fake_tshark('-i', 'USBPcap1', '-w', '-', FAKE_TSHARK_COUNT="300", FAKE_TSHARK_PAYLOAD="16",
+                             FAKE_TSHARK_TX_RATIO="0")
+    packets = [packet for batch in PcapStreamReader.from_buffer(result.stdout).iter_batches() for packet in batch]
+    assert result.returncode == 0
+    assert len(packets) == 300
+    assert {packet.endpoint for packet in packets} == {0x81}
+    assert all(len(packet.payload) == 16 for packet in packets)
+    assert bytes(packets[0].payload).startswith(b"AT+BENCH=")
+
+
+def test_fields_output_matches_requested_count():
+    result = run_fake_tshark('-i', 'USBPcap1', '-T', 'fields', FAKE_TSHARK_COUNT="250", FAKE_TSHARK_TX_RATIO="1")
+    lines = result.stdout.decode().splitlines()
+    assert len(lines) == 250
+    parts = lines[0].split('\t')
+    assert float(parts[0]) > 0
+    assert parts[5] == "0x02"
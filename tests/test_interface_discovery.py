@@ -0,0 +1,73 @@
+import json
+import threading
+
+from core.interface_discovery import InterfaceDiscovery, diff_interfaces
+
+HUB = [(r"1. \\.\USBPcap1 (USBPcap1)", "USBPcap1"), (r"2. \\.\USBPcap2 (USBPcap2)", "USBPcap2")]
+
+
+def test_diff_reports_added_and_removed_in_order():
+    new = [HUB[1], ("3. USBPcap3", "USBPcap3")]
+    assert diff_interfaces(HUB, new) == ([("3. USBPcap3", "USBPcap3")], [HUB[0]])
+    assert diff_interfaces(HUB, list(HUB)) == ([], [])
+
+
+def test_cache_roundtrip_is_keyed_by_tshark_path(tmp_path):
+    path = str(tmp_path / "cache" / "interfaces.json")
+    first = InterfaceDiscovery(lambda: HUB, key="tshark-a", cache_path=path)
+    assert first.load_cache() == ([], False)
+    first.save_cache(HUB)
+    InterfaceDiscovery(lambda: [], key="tshark-b", cache_path=path).save_cache(HUB[:1])
+
+    assert first.load_cache() == (HUB, True)
+    assert InterfaceDiscovery(None, key="tshark-b", cache_path=path).load_cache() == (HUB[:1], True)
+    assert InterfaceDiscovery(None, key="tshark-a", cache_path=path, ttl=0).load_cache() == (HUB, False)
+
+
+def test_broken_cache_file_is_ignored(tmp_path):
+    path = tmp_path / "interfaces.json"
+    path.write_text("{not json", encoding='utf-8')
+    discovery = InterfaceDiscovery(lambda: HUB, cache_path=str(path))
+    assert discovery.load_cache() == ([], False)
+    discovery.save_cache(HUB)
+    assert json.loads(path.read_text(encoding='utf-8'))['']['interfaces'] == [list(item) for item in HUB]
+
+
+def test_refresh_runs_once_at_a_time_and_caches(tmp_path):
+    release = threading.Event()
+    done = threading.Event()
+    calls = []
+    results = []
+
+    def list_interfaces():
+        calls.append(1)
+        release.wait(5)
+        return HUB
+
+    def on_done(interfaces, error):
+        results.append((interfaces, error))
+        done.set()
+
+    discovery = InterfaceDiscovery(list_interfaces, cache_path=str(tmp_path / "interfaces.json"))
+    assert discovery.refresh_async(on_done)
+    assert discovery.is_refreshing
+    assert not discovery.refresh_async(on_done)
+    release.set()
+    assert done.wait(5)
+    assert results == [(HUB, None)] and len(calls) == 1
+    assert discovery.load_cache() == (HUB, True)
+
+
+def test_refresh_reports_errors(tmp_path):
+    done = threading.Event()
+    results = []
+
+    def list_interfaces():
+        raise FileNotFoundError("tshark 없음")
+
+    discovery = InterfaceDiscovery(list_interfaces, cache_path=str(tmp_path / "interfaces.json"))
+    discovery.refresh_async(lambda interfaces, error: (results.append((interfaces, error)), done.set()))
+    assert done.wait(5)
+    assert results[0][0] == [] and isinstance(results[0][1], FileNotFoundError)
+    assert not discovery.is_refreshing
+    assert discovery.load_cache() == ([], False)
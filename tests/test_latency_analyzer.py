@@ -0,0 +1,83 @@
+import pytest
+
+from core.latency_analyzer import KIND_GAP, KIND_RESPONSE, KIND_URB, LatencyAnalyzer, format_us
+from core.usb_packet import TRANSFER_CONTROL
+from tests import make_packet
+
+
+def urb(timestamp, irp_id, complete, endpoint=0x81, payload=b""):
+    return make_packet(payload, timestamp, endpoint, irp_id=irp_id, info=1 if complete else 0)
+
+
+def rows_by_kind(analyzer):
+    return {(row['kind'], row['label']): row for row in analyzer.snapshot()}
+
+
+def test_urb_submit_is_paired_with_completion_by_irp_id():
+    analyzer = LatencyAnalyzer()
+    analyzer.update([urb(1.0, 1, False), urb(1.0005, 2, False), urb(1.002, 1, True), urb(1.0035, 2, True)])
+    row = rows_by_kind(analyzer)[(KIND_URB, "0x81")]
+    assert row['count'] == 2
+    assert row['max_us'] == pytest.approx(3000)
+    assert row['mean_us'] == pytest.approx(2500)
+
+
+def test_completion_on_other_endpoint_is_not_paired():
+    analyzer = LatencyAnalyzer()
+    analyzer.update([urb(1.0, 1, False, endpoint=0x81), urb(1.001, 1, True, endpoint=0x82)])
+    assert (KIND_URB, "0x81") not in rows_by_kind(analyzer)
+
+
+def test_command_is_paired_with_first_response():
+    analyzer = LatencyAnalyzer()
+    analyzer.update([
+        make_packet(b"AT\r\n", 1.000, 0x02, info=1),
+        make_packet(b"OK\r\n", 1.004, 0x81, info=1),
+        make_packet(b"more", 1.010, 0x81, info=1),   # 두 번째 응답은 짝짓지 않음
+        make_packet(b"", 1.011, 0x80, TRANSFER_CONTROL, info=1),
+    ])
+    rows = rows_by_kind(analyzer)
+    response = rows[(KIND_RESPONSE, "0x02→0x81")]
+    assert response['count'] == 1 and response['max_us'] == pytest.approx(4000)
+    gap = rows[(KIND_GAP, "0x81")]
+    assert gap['count'] == 1 and gap['max_us'] == pytest.approx(6000)
+
+
+def test_quantiles_have_bucket_resolution():
+    analyzer = LatencyAnalyzer()
+    packets = []
+    for i in range(1000):
+        packets += [urb(i, i, False), urb(i + (i + 1) * 1e-6, i, True)]
+    analyzer.update(packets)
+    row = rows_by_kind(analyzer)[(KIND_URB, "0x81")]
+    for key, expected in (('p50_us', 500), ('p95_us', 950), ('p99_us', 990)):
+        assert row[key] == pytest.approx(expected, rel=0.1)
+    assert row['p50_us'] < row['p95_us'] < row['p99_us'] <= row['max_us'] == pytest.approx(1000)
+
+
+def test_outliers_are_reported_once_per_interval():
+    analyzer = LatencyAnalyzer(threshold_us=5000)
+    packets = []
+    for i in range(LatencyAnalyzer.OUTLIER_MIN_SAMPLES):
+        packets += [urb(i * 0.01, i, False), urb(i * 0.01 + 0.001, i, True)]
+    assert analyzer.update(packets) == []
+
+    slow = []
+    for i in range(3):
+        irp_id = 1000 + i
+        slow += [urb(10 + i * 0.1, irp_id, False), urb(10 + i * 0.1 + 0.02, irp_id, True)]
+    outliers = analyzer.update(slow)
+    assert len(outliers) == 1
+    assert outliers[0].value_us == pytest.approx(20000) and outliers[0].threshold_us <= 5000
+    assert "지연 이상값 [URB] 장치 1.3 EP 0x81: 20.0ms" in str(outliers[0])
+
+    outliers = analyzer.update([urb(12, 2000, False), urb(12.02, 2000, True)])
+    assert len(outliers) == 1 and outliers[0].suppressed == 2
+    assert rows_by_kind(analyzer)[(KIND_URB, "0x81")]['outliers'] == 4
+
+    analyzer.reset()
+    assert analyzer.snapshot() == []
+
+
+def test_format_us():
+    assert [format_us(v) for v in (850, 12345, 1500000)] == ["850µs", "12.3ms", "1.50s"]
@@ -0,0 +1,74 @@
+import time
+
+from core.metrics import Histogram, MetricsRegistry, exponential_bounds, metrics
+from core.packet_filter import compile_filter
+from core.usb_sniff_service import UsbSniffService
+
+
+def test_quantiles_interpolate_within_bucket():
+    histogram = Histogram('test', exponential_bounds(1, 2, 8))
+    for value in range(1, 101):
+        histogram.observe(value)
+    p50, p90, p99 = histogram.quantile(0.5), histogram.quantile(0.9), histogram.quantile(0.99)
+    assert p50 < p90 < p99 <= histogram.max == 100
+    # 버킷 (32, 64] 안의 50번째 값 / (64, 100] 안의 99번째 값
+    assert 32 < p50 <= 64 and abs(p50 - 50) < 1
+    assert 64 < p99 <= 100 and abs(p99 - 99) < 1
+
+
+def test_quantiles_of_single_bucket_stay_within_observed_range():
+    histogram = Histogram('test', [10, 100])
+    for _ in range(10):
+        histogram.observe(50)
+    assert 10 <= histogram.quantile(0.5) <= histogram.quantile(0.99) <= 50
+    assert Histogram('empty', [1]).quantile(0.5) == 0.0
+
+
+def test_overflow_bucket_uses_observed_max():
+    histogram = Histogram('test', [1, 2])
+    for value in (5, 6, 7, 8):
+        histogram.observe(value)
+    assert 2 < histogram.quantile(0.5) < histogram.quantile(1.0) == 8
+
+
+def test_registry_returns_same_metric_by_name():
+    registry = MetricsRegistry()
+    assert registry.counter('a') is registry.counter('a')
+    registry.counter('a').add(3)
+    registry.histogram('h', [1, 2]).observe(1.5)
+    snapshot = registry.snapshot()
+    assert snapshot['a']['value'] == 3 and snapshot['h']['count'] == 1
+    registry.reset()
+    assert registry.snapshot()['a']['value'] == 0
+
+
+def test_fields_batches_record_parse_time_and_lag(monkeypatch):
+    service = UsbSniffService()
+    emitted = []
+    monkeypatch.setattr(service, '_emit_entries', emitted.extend)
+    parse_us, lag_ms = metrics.get('capture.parse_us_per_packet'), metrics.get('capture.lag_ms')
+    packets = metrics.get('capture.packets')
+    parse_count, lag_count, lag_max, packet_count = parse_us.count, lag_ms.count, lag_ms.max, packets.value
+
+    sent = time.time() - 0.25
+    lines = [f"{sent - 0.001 * i:.6f}\t64\tUSB\tURB_BULK in".encode() for i in range(3, 0, -1)]
+    service._process_fields_lines([b"Capturing on 'USBPcap1'"] + lines)
+    assert len(emitted) == 3
+    assert parse_us.count == parse_count + 1
+    assert lag_ms.count == lag_count + 1 and lag_ms.max >= max(lag_max, 250)
+    # 배너 줄은 패킷으로 세지 않음
+    assert packets.value == packet_count + 3
+
+
+def test_filtered_fields_lines_still_count_as_captured(monkeypatch):
+    service = UsbSniffService()
+    emitted = []
+    monkeypatch.setattr(service, '_emit_entries', emitted.extend)
+    monkeypatch.setattr(service, 'packet_filter', compile_filter("dir == out"))
+    packets = metrics.get('capture.packets')
+    packet_count = packets.value
+
+    lines = [f"{time.time():.6f}\t64\tUSB\tURB_BULK in\t1\t0x81".encode() for _ in range(3)]
+    service._process_fields_lines([b"Capturing on 'USBPcap1'"] + lines)
+    assert emitted == []
+    assert packets.value == packet_count + 3
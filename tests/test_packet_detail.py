@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from core.usb_packet import PREVIEW_BYTES, TRANSFER_BULK, format_summary, payload_preview, payload_to_ascii
+from tests import make_packet
+
+
+def test_payload_to_ascii_masks_control_bytes():
+    assert payload_to_ascii(b"AT\r\n\x00\xff~") == "AT....~"
+    assert payload_to_ascii(memoryview(b"OK")) == "OK"
+
+
+def test_payload_preview_is_truncated():
+    payload = b"x" * (PREVIEW_BYTES + 10)
+    assert payload_preview(payload) == "x" * PREVIEW_BYTES + "..."
+    assert payload_preview(b"short") == "short"
+
+
+def test_summary_is_formatted_from_raw_fields():
+    packet = make_packet(b"OK\r\n", timestamp=1700000000.25, endpoint=0x81, transfer=TRANSFER_BULK)
+    summary = format_summary(packet)
+    assert str(packet) == summary
+    assert "| Len: 31 | Proto: USB | Info: URB_BULK in" in summary
+    assert summary.endswith("| Data(ASCII): OK..")
+    assert ".250 |" in summary
+
+    assert "Data(ASCII)" not in format_summary(make_packet(b"", endpoint=0x02))
+    assert "URB_BULK out" in format_summary(make_packet(b"", endpoint=0x02))
+
+
+def test_hex_dump_rows():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    pytest.importorskip("PySide6")
+    pytest.importorskip("qfluentwidgets")
+    from ui.components.packet_detail_widget import HexDumpModel
+
+    model = HexDumpModel()
+    model.set_payload(memoryview(bytes(range(0x41, 0x41 + 20))))
+    assert model.rowCount() == 2 and model.columnCount() == 3
+    row = [model.data(model.index(0, column)) for column in range(3)]
+    assert row == ["00000000", "41 42 43 44 45 46 47 48  49 4A 4B 4C 4D 4E 4F 50", "ABCDEFGHIJKLMNOP"]
+    assert model.data(model.index(1, 0)) == "00000010"
+    assert model.data(model.index(1, 1)) == "51 52 53 54"
+    model.set_payload(None)
+    assert model.rowCount() == 0
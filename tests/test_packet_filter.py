@@ -0,0 +1,97 @@
+import pytest
+
+from core.msg_type import MsgType
+from core.packet_filter import compile_filter
+from core.usb_sniff_service import UsbSniffService
+from core.usb_packet import TRANSFER_CONTROL
+from tests import make_packet
+
+
+@pytest.mark.parametrize("text", ["", "   ", None])
+def test_empty_filter_is_none(text):
+    assert compile_filter(text) is None
+
+
+@pytest.mark.parametrize("text, packet, expected", [
+    ("dir == in", make_packet(endpoint=0x81), True),
+    ("dir == in", make_packet(endpoint=0x02), False),
+    ("dir != in", make_packet(endpoint=0x02), True),
+    ("ep == 0x81", make_packet(endpoint=0x81), True),
+    ("ep == 0x81", make_packet(endpoint=0x82), False),
+    ("dev >= 3 and bus == 1", make_packet(device=3), True),
+    ("dev > 3", make_packet(device=3), False),
+    ("type == control", make_packet(transfer=TRANSFER_CONTROL), True),
+    ("type == bulk", make_packet(transfer=TRANSFER_CONTROL), False),
+    ("len > 2", make_packet(b"abc"), True),
+    ("len > 2", make_packet(b"ab"), False),
+    ('data startswith "AT"', make_packet(b"AT+CSQ"), True),
+    ('data startswith "AT"', make_packet(b"OK"), False),
+    ("data contains 0d:0a", make_packet(b"OK\r\n"), True),
+    ("data contains 0d:0a", make_packet(b"OK"), False),
+    ("data == 0x4f4b", make_packet(b"OK"), True),
+    ('data == "\\r"', make_packet(b"\r"), True),
+    ("not dir == in", make_packet(endpoint=0x81), False),
+    ("!(dir == in) || len == 0", make_packet(endpoint=0x81), True),
+    ("dir == in && (ep == 0x82 or len >= 1)", make_packet(b"x", endpoint=0x81), True),
+    ("DIR == IN AND EP == 0X81", make_packet(endpoint=0x81), True),
+])
+def test_filter_matches(text, packet, expected):
+    assert compile_filter(text)(packet) is expected
+
+
+def test_and_binds_tighter_than_or():
+    packet_filter = compile_filter("ep == 0x01 or ep == 0x81 and len > 0")
+    assert packet_filter(make_packet(endpoint=0x01))
+    assert not packet_filter(make_packet(endpoint=0x81))
+    assert packet_filter(make_packet(b"x", endpoint=0x81))
+
+
+@pytest.mark.parametrize("text, display_filter", [
+    ("dir == in", "usb.endpoint_address.direction == 1"),
+    ("ep == 0x81 and len > 0", "(usb.endpoint_address == 0x81 && usb.data_len > 0)"),
+    ('data startswith "AT"', "(usb.capdata[0:2] == 41:54 || data.data[0:2] == 41:54 || usb.data_fragment[0:2] == 41:54)"),
+    ("data contains 0x0d", '(usb.capdata contains "\\x0d" || data.data contains "\\x0d" || usb.data_fragment contains "\\x0d")'),
+    # not 아래에서는 파이썬이 보는 첫 필드만으로 좁혀, tshark가 파이썬 판정으로 남을 패킷을 버리지 않게 함
+    ("not data == 0x4f4b", "!(usb.capdata == 4f:4b)"),
+    ("not type == bulk", "!(usb.transfer_type == 0x3)"),
+])
+def test_display_filter(text, display_filter):
+    assert compile_filter(text).display_filter == display_filter
+
+
+def test_uses_payload():
+    assert not compile_filter("dir == in and ep == 0x81").uses_payload
+    assert compile_filter("dir == in and len > 0").uses_payload
+    assert compile_filter('not data contains "x"').uses_payload
+
+
+@pytest.mark.parametrize("text", [
+    "dir == sideways",
+    "dir > in",
+    "ep == abc",
+    "color == red",
+    "data startswith",
+    "data endswith \"x\"",
+    "(dir == in",
+    "dir == in)",
+    "ep == 0x81 ep == 0x82",
+    "dir == in and",
+    "len > 1 @",
+])
+def test_syntax_errors(text):
+    with pytest.raises(ValueError):
+        compile_filter(text)
+
+
+def test_runtime_filter_change_keeps_pushed_filter(monkeypatch):
+    service = UsbSniffService()
+    logs = []
+    monkeypatch.setattr(service, '_log', lambda msg_type, message, *args: logs.append(msg_type))
+    monkeypatch.setattr(service, 'is_capturing', True)
+    monkeypatch.setattr(service, '_pushed_filter', compile_filter("dir == in"))
+    try:
+        packet_filter = service.set_packet_filter("dir == out")
+        assert service.packet_filter is packet_filter
+        assert logs == [MsgType.WARNING]
+    finally:
+        service.packet_filter = None
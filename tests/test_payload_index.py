@@ -0,0 +1,46 @@
+import pytest
+
+from core.payload_index import PayloadIndex, SearchMode
+
+
+def search(payloads, text, mode):
+    index = PayloadIndex()
+    index.add_packets(range(len(payloads)), payloads)
+    hits = []
+    index.search(text, mode, hits.extend)
+    return hits
+
+
+@pytest.mark.parametrize("payloads, text, mode, expected", [
+    ([b"xxAT", b"OKxx", b"-AT\r\n"], "41:54", SearchMode.HEX, [(0, 2), (2, 1)]),
+    ([b"xxAT", b"OKxx"], "TOK", SearchMode.ASCII, []),
+    ([b"ERROR", b"no ERROR"], "ERROR", SearchMode.ASCII, [(0, 0), (1, 3)]),
+    # 경계를 넘는 매치(aa|ab)에 겹친 다음 패킷 안의 매치를 잃지 않음
+    ([b"aa", b"ab"], "a+b", SearchMode.REGEX, [(1, 0)]),
+    ([b"xa", b"aab", b"b"], "a+b", SearchMode.REGEX, [(1, 0)]),
+    ([b"1", b"23", b"4"], r"\d\d", SearchMode.REGEX, [(1, 0)]),
+    # 앵커는 패킷 시작/끝 기준
+    ([b"xOK", b"OKx", b"OK"], "^OK", SearchMode.REGEX, [(1, 0), (2, 0)]),
+    ([b"xOK", b"OKx", b"OK"], "OK$", SearchMode.REGEX, [(0, 1), (2, 0)]),
+    ([b"ab", b"c"], r"b\b", SearchMode.REGEX, [(0, 1)]),
+    ([b"AT+CSQ\r\n", b"AT+CGMI\r\n"], r"AT\+C[A-Z]+\r\n", SearchMode.REGEX, [(0, 0), (1, 0)]),
+])
+def test_search(payloads, text, mode, expected):
+    assert search(payloads, text, mode) == expected
+
+
+def test_regex_across_sealed_blocks():
+    index = PayloadIndex()
+    index.BLOCK_BYTES = 16
+    payloads = [b"0123456789", b"aa", b"ab", b"abc"] * 4
+    index.add_packets(range(len(payloads)), payloads)
+    hits = []
+    index.search("a+b", SearchMode.REGEX, hits.extend)
+    assert hits == [(packet_id, 0) for packet_id in range(len(payloads)) if payloads[packet_id] in (b"ab", b"abc")]
+
+
+def test_invalid_patterns():
+    with pytest.raises(ValueError):
+        search([b"x"], "zz", SearchMode.HEX)
+    with pytest.raises(ValueError):
+        search([b"x"], "(", SearchMode.REGEX)
@@ -0,0 +1,142 @@
+import io
+import struct
+
+import pytest
+
+from core.pcap_reader import (PcapStreamReader, PcapFormatError, LINKTYPE_USBPCAP,
+                              PCAP_MAGIC_US, PCAP_MAGIC_NS, PCAPNG_SHB, PCAPNG_IDB, PCAPNG_SPB,
+                              PCAPNG_BYTE_ORDER_MAGIC)
+from core.pcap_writer import PcapngWriter
+from core.usb_packet import TRANSFER_CONTROL, TRANSFER_INTERRUPT
+from tests import make_packet, usbpcap_frame, pcapng_block, pcapng_file, pcap_file
+
+
+def sample_packets():
+    return [
+        make_packet(b"AT\r\n", 1700000000.000001, 0x02, irp_id=0x10, info=0),
+        make_packet(b"OK\r\n", 1700000000.250000, 0x81, irp_id=0x11),
+        make_packet(b"\x12\x01\x00\x02", 1700000001.5, 0x80, TRANSFER_CONTROL, irp_id=0x12, info=0, stage=2),
+        make_packet(b"", 1700000002.0, 0x83, TRANSFER_INTERRUPT, irp_id=0x13, info=0),
+    ]
+
+
+def packet_fields(packet):
+    return (round(packet.timestamp, 6), packet.irp_id, packet.status, packet.function, packet.info,
+            packet.bus, packet.device, packet.endpoint, packet.transfer_type, packet.data_length,
+            bytes(packet.payload), packet.stage)
+
+
+def read_all(reader):
+    return [packet for batch in reader.iter_batches() for packet in batch]
+
+
+class ChunkedStream:
+    """read1()이 한 번에 size 바이트씩만 돌려주는 파이프 흉내"""
+
+    def __init__(self, data, size):
+        self._data = data
+        self._pos = 0
+        self._size = size
+
+    def read1(self, n=-1):
+        chunk = self._data[self._pos:self._pos + self._size]
+        self._pos += len(chunk)
+        return chunk
+
+    read = read1
+
+
+def test_pcapng_stream_roundtrip():
+    packets = sample_packets()
+    parsed = read_all(PcapStreamReader(io.BytesIO(pcapng_file(packets))))
+    assert [packet_fields(p) for p in parsed] == [packet_fields(p) for p in packets]
+
+
+def write_pcapng(packets, comment=None):
+    stream = io.BytesIO()
+    PcapngWriter(stream, comment=comment).write_packets(packets)
+    return stream.getvalue()
+
+
+def test_pcapng_writer_reader_roundtrip():
+    packets = sample_packets()
+    parsed = read_all(PcapStreamReader(io.BytesIO(write_pcapng(packets, comment="trigger"))))
+    assert [packet_fields(p) for p in parsed] == [packet_fields(p) for p in packets]
+
+
+def test_pcapng_writer_multiple_interfaces():
+    packets = sample_packets()
+    packets[0].interface = r"\\.\USBPcap1"
+    packets[1].interface = r"\\.\USBPcap2"
+    data = write_pcapng(packets)
+    assert data.count(struct.pack('<I', PCAPNG_IDB)) >= 2
+    assert len(read_all(PcapStreamReader(io.BytesIO(data)))) == len(packets)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64])
+def test_pcapng_roundtrip_from_small_pipe_reads(chunk_size):
+    packets = sample_packets() * 20
+    parsed = read_all(PcapStreamReader(ChunkedStream(pcapng_file(packets), chunk_size)))
+    assert [packet_fields(p) for p in parsed] == [packet_fields(p) for p in packets]
+
+
+def test_pcapng_buffer_mode_offsets_and_seek():
+    from array import array
+    packets = sample_packets()
+    reader = PcapStreamReader.from_buffer(pcapng_file(packets))
+    reader.offsets = array('Q')
+    assert len(read_all(reader)) == len(packets)
+    assert len(reader.offsets) == len(packets)
+
+    reader.seek(reader.offsets[2])
+    reader.offsets = None
+    assert [packet_fields(p) for p in read_all(reader)] == [packet_fields(p) for p in packets[2:]]
+
+
+@pytest.mark.parametrize("endian", ['<', '>'])
+@pytest.mark.parametrize("magic", [PCAP_MAGIC_US, PCAP_MAGIC_NS])
+def test_pcap_endian_and_resolution(endian, magic):
+    packets = sample_packets()
+    parsed = read_all(PcapStreamReader(io.BytesIO(pcap_file(packets, endian, magic))))
+    assert [packet_fields(p) for p in parsed] == [packet_fields(p) for p in packets]
+
+
+def test_pcapng_big_endian_section_with_nanosecond_resolution():
+    packets = sample_packets()
+    parsed = read_all(PcapStreamReader(io.BytesIO(pcapng_file(packets, '>', tsresol=9))))
+    assert [packet_fields(p) for p in parsed] == [packet_fields(p) for p in packets]
+
+
+def test_pcapng_sections_with_different_byte_order():
+    packets = sample_packets()
+    data = pcapng_file(packets[:2]) + pcapng_file(packets[2:], '>', tsresol=9)
+    parsed = read_all(PcapStreamReader(io.BytesIO(data)))
+    assert [packet_fields(p) for p in parsed] == [packet_fields(p) for p in packets]
+
+
+def test_pcapng_simple_packet_block():
+    packet = make_packet(b"hello")
+    frame = usbpcap_frame(packet)
+    data = (pcapng_block('<', PCAPNG_SHB, struct.pack('<IHHq', PCAPNG_BYTE_ORDER_MAGIC, 1, 0, -1))
+            + pcapng_block('<', PCAPNG_IDB, struct.pack('<HHI', LINKTYPE_USBPCAP, 0, 0x40000))
+            + pcapng_block('<', PCAPNG_SPB, struct.pack('<I', len(frame)) + frame))
+    parsed = read_all(PcapStreamReader(io.BytesIO(data)))
+    assert len(parsed) == 1
+    assert parsed[0].timestamp == 0.0
+    assert bytes(parsed[0].payload) == b"hello"
+    assert parsed[0].endpoint == 0x81
+
+
+def test_truncated_frame_is_skipped():
+    packets = sample_packets()
+    data = bytearray(pcap_file(packets[:1]))
+    # 의사 헤더보다 짧은 레코드
+    data += struct.pack('<IIII', 1, 0, 4, 4) + b"\0" * 4
+    data += pcap_file(packets[1:2])[24:]
+    parsed = read_all(PcapStreamReader(io.BytesIO(bytes(data))))
+    assert [packet_fields(p) for p in parsed] == [packet_fields(p) for p in packets[:2]]
+
+
+def test_unknown_magic_raises():
+    with pytest.raises(PcapFormatError):
+        read_all(PcapStreamReader(io.BytesIO(b"\0" * 64)))
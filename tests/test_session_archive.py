@@ -0,0 +1,49 @@
+import os
+
+from core.session_archive import SessionArchiveWriter, SessionArchive
+from core.usb_packet import UsbPacket, TRANSFER_BULK
+
+
+def make_packets(count, start=0):
+    return [UsbPacket(1000.0 + i * 0.001, 91, i, 0, 9, 1, 1, 3, 0x81, TRANSFER_BULK, 64, bytes([i % 256]) * 64)
+            for i in range(start, start + count)]
+
+
+def write_session(session_dir, packets, **kwargs):
+    writer = SessionArchiveWriter(session_dir, **kwargs)
+    writer.append(packets)
+    writer.close()
+    return writer
+
+
+def test_write_and_read_back(tmp_path):
+    packets = make_packets(3000)
+    writer = write_session(str(tmp_path / "session_1"), packets)
+    assert writer.last_error is None
+    archive = SessionArchive(str(tmp_path / "session_1"))
+    assert archive.record_count == 3000
+    read = [packet for batch in archive.iter_records() for packet in batch]
+    assert [(p.timestamp, p.irp_id, bytes(p.payload)) for p in read] == \
+        [(p.timestamp, p.irp_id, bytes(p.payload)) for p in packets]
+    assert archive.find_time(1000.0 + 1500 * 0.001) == 1500
+
+
+def test_total_limit_spans_sessions(tmp_path):
+    # 세션마다 세그먼트 하나(패킷 100개, 약 11KB) - 용량 제한은 세션 두 개 분량
+    for n in range(5):
+        write_session(str(tmp_path / f"session_{n}"), make_packets(100, n * 100),
+                      segment_max_bytes=1, total_max_bytes=25000)
+    assert sorted(os.listdir(tmp_path)) == ["session_3", "session_4"]
+    assert SessionArchive(str(tmp_path / "session_4")).record_count == 100
+
+
+def test_unrelated_folders_are_kept(tmp_path):
+    (tmp_path / "notes").mkdir()
+    for n in range(3):
+        write_session(str(tmp_path / f"session_{n}"), make_packets(100), segment_max_bytes=1, total_max_bytes=15000)
+    assert sorted(os.listdir(tmp_path)) == ["notes", "session_2"]
+
+
+def test_writer_error_is_recorded(tmp_path):
+    writer = write_session(str(tmp_path / "session_1"), [object()])
+    assert isinstance(writer.last_error, AttributeError)
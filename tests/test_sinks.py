@@ -0,0 +1,92 @@
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from core.msg_type import MsgType
+from core.sinks import RotatingFileSink, SocketSink, StdoutSink
+from tests import make_packet, pcapng_file
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_stdout_sink_writes_text_lines_on_close():
+    stream = io.StringIO()
+    sink = StdoutSink(stream)
+    sink.add_message(MsgType.INFO, "시작")
+    sink.add_messages([(MsgType.RX, make_packet(b"OK"), 0x81, 0), (MsgType.TX, "AT", 0x02, 1)])
+    sink.close()
+    lines = stream.getvalue().splitlines()
+    assert lines[0] == "[INFO] 시작"
+    assert lines[1].startswith("[RX] Time: ") and lines[1].endswith("Data(ASCII): OK")
+    assert lines[2] == "[TX] AT"
+
+
+def test_jsonl_format_carries_payload_hex():
+    stream = io.StringIO()
+    sink = StdoutSink(stream, fmt='jsonl')
+    sink.add_messages([(MsgType.RX, make_packet(b"\x01\x02"), 0x81, 7)])
+    sink.close()
+    record = json.loads(stream.getvalue())
+    assert (record['type'], record['endpoint'], record['packet_id'], record['data']) == ('RX', 0x81, 7, '0102')
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        StdoutSink(io.StringIO(), fmt='xml')
+
+
+def test_rotating_file_sink_keeps_newest_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(RotatingFileSink, 'BATCH_RECORDS', 1)
+    sink = RotatingFileSink(str(tmp_path), max_bytes=10, max_files=2)
+    for i in range(5):
+        sink.add_message(MsgType.INFO, f"message {i}")
+    sink.close()
+    files = sorted(os.listdir(tmp_path))
+    assert len(files) == 2 and all(name.endswith(".log") for name in files)
+    contents = "".join((tmp_path / name).read_text(encoding='utf-8') for name in files)
+    assert "message 4" in contents and "message 0" not in contents
+
+
+def test_socket_sink_sends_to_connected_clients():
+    sink = SocketSink("tcp:127.0.0.1:0")
+    port = sink._server.getsockname()[1]
+    with socket.create_connection(("127.0.0.1", port), timeout=5) as client:
+        for _ in range(250):
+            if sink.client_count:
+                break
+            time.sleep(0.02)
+        sink.add_message(MsgType.RX, "hello")
+        sink.close()
+        received = b""
+        while chunk := client.recv(4096):
+            received += chunk
+    assert received == "[RX] hello\n".encode()
+
+
+def test_socket_address_is_validated():
+    with pytest.raises(ValueError):
+        SocketSink("bogus")
+
+
+def run_capture(*args):
+    return subprocess.run([sys.executable, '-m', 'core.capture', *args], capture_output=True, cwd=PROJECT_DIR,
+                          timeout=60)
+
+
+def test_cli_exit_codes(tmp_path):
+    path = tmp_path / "capture.pcapng"
+    path.write_bytes(pcapng_file([make_packet(b"OK", 1700000000.0 + i, irp_id=i) for i in range(3)]))
+
+    result = run_capture('--read', str(path))
+    assert result.returncode == 0
+    assert result.stdout.decode('utf-8').count("Data(ASCII): OK") == 3
+
+    assert run_capture('--read', str(tmp_path / "missing.pcapng")).returncode == 1
+    assert run_capture('--read', str(path), '--socket', 'bogus').returncode == 2
+    assert run_capture('--read', str(path), '--iface', 'USBPcap1').returncode == 2
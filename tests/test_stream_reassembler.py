@@ -0,0 +1,71 @@
+from core.stream_reassembler import (StreamReassembler, DelimiterFramer, LengthPrefixFramer, FixedSizeFramer,
+                                     IdleGapFramer)
+from tests import make_packet
+
+
+def feed_all(reassembler, payloads, **kwargs):
+    frames = []
+    for index, payload in enumerate(payloads):
+        frames.extend(reassembler.feed(make_packet(payload, timestamp=index * 0.001, **kwargs)))
+    return frames
+
+
+def test_delimiter_split_across_fragments():
+    reassembler = StreamReassembler(DelimiterFramer(b'\r\n'))
+    frames = feed_all(reassembler, [b"AT+CS", b"Q\r", b"\nOK\r\nER", b"ROR\r\n"])
+    assert [frame.data for frame in frames] == [b"AT+CSQ", b"OK", b"ERROR"]
+    assert [frame.fragments for frame in frames] == [3, 1, 2]
+    assert frames[0].timestamp == 0.0
+    assert frames[2].timestamp == 0.002
+    assert not any(frame.truncated for frame in frames)
+
+
+def test_delimiter_include_delimiter():
+    reassembler = StreamReassembler(DelimiterFramer(b'\n', include_delimiter=True))
+    assert [frame.data for frame in feed_all(reassembler, [b"a\nb", b"\n"])] == [b"a\n", b"b\n"]
+
+
+def test_streams_are_separated_by_endpoint_and_interface():
+    reassembler = StreamReassembler(DelimiterFramer(b'\n'))
+    assert reassembler.feed(make_packet(b"in-", endpoint=0x81)) == []
+    assert reassembler.feed(make_packet(b"out-", endpoint=0x02)) == []
+    assert reassembler.feed(make_packet(b"other-", endpoint=0x81, interface="USBPcap2")) == []
+    frames = reassembler.feed(make_packet(b"done\n", endpoint=0x81))
+    assert [(frame.endpoint, frame.data) for frame in frames] == [(0x81, b"in-done")]
+
+
+def test_length_prefix_framer():
+    reassembler = StreamReassembler(LengthPrefixFramer(length_size=2, byteorder='big', include_header=False))
+    frames = feed_all(reassembler, [b"\x00\x03ab", b"c\x00", b"\x01z\x00\x00"])
+    assert [frame.data for frame in frames] == [b"abc", b"z", b""]
+
+
+def test_fixed_size_framer():
+    reassembler = StreamReassembler(FixedSizeFramer(4))
+    frames = feed_all(reassembler, [b"12", b"345678", b"9"])
+    assert [frame.data for frame in frames] == [b"1234", b"5678"]
+    rest = reassembler.flush_all()
+    assert [(frame.data, frame.truncated) for frame in rest] == [(b"9", True)]
+
+
+def test_max_frame_truncates_unterminated_data():
+    reassembler = StreamReassembler(DelimiterFramer(b'\n'), max_frame=8)
+    frames = feed_all(reassembler, [b"0123456789abc"])
+    assert [(frame.data, frame.truncated) for frame in frames] == [(b"01234567", True)]
+    assert [frame.data for frame in reassembler.feed(make_packet(b"\n"))] == [b"89abc"]
+
+
+def test_idle_gap_framer():
+    reassembler = StreamReassembler(IdleGapFramer(gap=0.01))
+    assert reassembler.feed(make_packet(b"ab", timestamp=1.0)) == []
+    assert reassembler.feed(make_packet(b"cd", timestamp=1.005)) == []
+    frames = reassembler.feed(make_packet(b"ef", timestamp=1.1))
+    assert [(frame.data, frame.fragments, frame.truncated) for frame in frames] == [(b"abcd", 2, False)]
+    assert reassembler.flush_idle(now=float('inf'))[0].data == b"ef"
+    assert reassembler.flush_all() == []
+
+
+def test_empty_payload_is_ignored():
+    reassembler = StreamReassembler(DelimiterFramer())
+    assert reassembler.feed(make_packet(b"")) == []
+    assert reassembler.flush_all() == []
@@ -0,0 +1,84 @@
+import time
+
+from core.timestamp_merger import TimestampMerger
+from tests import make_packet
+
+
+def packets(*timestamps):
+    return [make_packet(timestamp=timestamp) for timestamp in timestamps]
+
+
+def timestamps(merged):
+    return [packet.timestamp for packet in merged]
+
+
+def test_sources_are_merged_up_to_the_watermark():
+    merger = TimestampMerger(reorder_window=10)
+    merger.add_source("a")
+    merger.add_source("b")
+    merger.push("a", packets(1.0, 3.0, 5.0))
+    merger.push("b", packets(2.0, 4.0))
+    # b의 마지막 타임스탬프(4.0)까지만 순서가 확정됨
+    assert timestamps(merger.pop_ready(0)) == [1.0, 2.0, 3.0, 4.0]
+    merger.push("b", packets(6.0))
+    assert timestamps(merger.pop_ready(0)) == [5.0]
+    assert timestamps(merger.drain()) == [6.0]
+
+
+def test_quiet_source_does_not_hold_back_output():
+    merger = TimestampMerger(reorder_window=0.05)
+    merger.add_source("busy")
+    merger.add_source("idle")
+    merger.push("idle", packets(1.0))
+    merger.push("busy", packets(2.0, 3.0))
+    assert timestamps(merger.pop_ready(0)) == [1.0]
+    time.sleep(0.1)
+    merger.push("busy", packets(4.0))
+    assert timestamps(merger.pop_ready(0)) == [2.0, 3.0, 4.0]
+
+
+def test_late_packets_are_released_and_counted():
+    merger = TimestampMerger(reorder_window=10)
+    merger.add_source("a")
+    merger.push("a", packets(5.0, 6.0))
+    merger.close_source("a")
+    assert timestamps(merger.pop_ready(0)) == [5.0, 6.0]
+    merger.add_source("b")
+    merger.push("b", packets(4.0, 7.0))
+    merger.close_source("b")
+    assert timestamps(merger.pop_ready(0)) == [4.0, 7.0]
+    assert merger.late_count == 1
+
+
+def test_pop_ready_wakes_on_push():
+    merger = TimestampMerger()
+    merger.add_source("a")
+    assert merger.pop_ready(0.01) == []
+    merger.push("a", packets(1.0))
+    merger.close_source("a")
+    assert timestamps(merger.pop_ready(1.0)) == [1.0]
+    assert merger.open_sources == 0
+
+
+def test_restart_keeps_old_and_new_sources_apart():
+    merger = TimestampMerger()
+    old, new = object(), object()
+    merger.add_source(old)
+    merger.push(old, [make_packet(timestamp=1.0)])
+    # 재시작: 이전 리더가 끝나기 전에 같은 인터페이스의 새 세션이 소스를 등록
+    merger.add_source(new)
+    merger.push(old, [make_packet(timestamp=2.0)])
+    merger.close_source(old)
+    assert merger.open_sources == 1
+    merger.push(new, [make_packet(timestamp=3.0)])
+    assert [packet.timestamp for packet in merger.drain()] == [1.0, 2.0, 3.0]
+
+
+def test_closed_sources_are_dropped_after_release():
+    merger = TimestampMerger()
+    for key in range(3):
+        merger.add_source(key)
+        merger.push(key, [make_packet(timestamp=float(key))])
+        merger.close_source(key)
+    assert len(merger.drain()) == 3
+    assert not merger._sources
@@ -0,0 +1,104 @@
+import io
+
+import pytest
+
+import core.traffic_stats as traffic_stats
+from core.traffic_stats import SIZE_BINS, TrafficStats, size_bin_label
+from core.usb_sniff_service import UsbSniffService
+from tests import make_packet
+
+
+class FakeClock:
+    """snapshot()이 쓰는 벽시계(monotonic) 대역"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(traffic_stats, 'time', fake)
+    return fake
+
+
+def packets_at(timestamps, size=10, endpoint=0x81, status=0):
+    packets = []
+    for timestamp in timestamps:
+        packet = make_packet(b"x" * size, timestamp, endpoint)
+        packet.status = status
+        packets.append(packet)
+    return packets
+
+
+def by_endpoint(stats):
+    return {row['endpoint']: row for row in stats.snapshot()}
+
+
+def test_rates_over_full_window(clock):
+    stats = TrafficStats(bucket_seconds=1.0, window_buckets=10)
+    # 20초 동안 초당 5개 - 윈도우(10초)에는 마지막 10초만 남음
+    stats.update(packets_at([1000 + i * 0.2 for i in range(100)]))
+    row = by_endpoint(stats)[0x81]
+    assert row['window_packets'] == 50 and row['total_packets'] == 100
+    assert row['packets_per_sec'] == pytest.approx(5.0)
+    assert row['bytes_per_sec'] == pytest.approx(50.0)
+
+
+def test_rate_decays_after_traffic_stops(clock):
+    stats = TrafficStats(bucket_seconds=1.0, window_buckets=10)
+    stats.update(packets_at([1000 + i * 0.1 for i in range(100)]))
+    assert by_endpoint(stats)[0x81]['window_packets'] == 100
+    clock.now += 5
+    assert by_endpoint(stats)[0x81]['window_packets'] == 50
+    clock.now += 10
+    row = by_endpoint(stats)[0x81]
+    assert row['window_packets'] == 0 and row['packets_per_sec'] == 0 and row['total_packets'] == 100
+
+
+def test_short_capture_is_not_diluted_by_window(clock):
+    stats = TrafficStats(bucket_seconds=0.5, window_buckets=20)
+    stats.update(packets_at([1000.0, 1000.5, 1001.0, 1001.5, 1002.0]))
+    assert by_endpoint(stats)[0x81]['packets_per_sec'] == pytest.approx(2.5)
+
+
+def test_errors_stalls_and_size_bins(clock):
+    stats = TrafficStats()
+    stats.update(packets_at([1000.0], size=0) + packets_at([1000.1], size=64, endpoint=0x02)
+                 + packets_at([1000.2], endpoint=0x02, status=0xC0000004)
+                 + packets_at([1000.3], endpoint=0x02, status=0xC0000011))
+    rows = by_endpoint(stats)
+    out = rows[0x02]
+    assert (out['errors'], out['stalls'], out['total_errors']) == (2, 1, 2)
+    assert out['sizes'][7] == 1 and out['sizes'][4] == 2
+    assert rows[0x81]['sizes'][0] == 1
+    assert [row['endpoint'] for row in stats.snapshot()] == [0x02, 0x81]
+
+
+def test_late_packets_count_in_latest_bucket_and_reset(clock):
+    stats = TrafficStats(bucket_seconds=1.0, window_buckets=4)
+    stats.update(packets_at([1010.0]))
+    stats.update(packets_at([1000.0]))
+    assert by_endpoint(stats)[0x81]['window_packets'] == 2
+    stats.reset()
+    assert stats.snapshot() == []
+
+
+def test_size_bin_labels():
+    assert [size_bin_label(index) for index in range(4)] == ["0", "1", "2~3", "4~7"]
+    assert size_bin_label(SIZE_BINS - 1) == "65536+"
+
+
+def test_fields_stream_counts_unterminated_last_line(monkeypatch):
+    service = UsbSniffService()
+    stats = TrafficStats()
+    monkeypatch.setattr(service, 'traffic_stats', stats)
+    monkeypatch.setattr(service, '_emit_entries', lambda entries: None)
+    monkeypatch.setattr(service, 'is_capturing', True)
+    line = b"1700000000.000000\t64\tUSB\tURB_BULK in\t1\t0x81\t1\t3\t0x03"
+    # 마지막 줄은 줄바꿈 없이 끝남 (tshark 종료 직전 출력)
+    service._read_fields_stream(io.BytesIO(b"\n".join([line] * 3)))
+    assert by_endpoint(stats)[0x81]['total_packets'] == 3
@@ -0,0 +1,101 @@
+import struct
+
+import pytest
+
+from core.pcap_writer import PcapngWriter
+from core.trigger import Trigger, TriggerEngine, PatternMatcher, parse_pattern
+from tests import make_packet
+
+
+def check_all(trigger, packets):
+    return [trigger.check(packet) for packet in packets]
+
+
+@pytest.mark.parametrize("text, pattern", [
+    ("0d:0a:ff", b"\r\n\xff"),
+    ("0x0d0a", b"\r\n"),
+    ('"AT+RST"', b"AT+RST"),
+    (r"OK\r\n", b"OK\r\n"),
+    ("ERROR", b"ERROR"),
+])
+def test_parse_pattern(text, pattern):
+    assert parse_pattern(text) == pattern
+
+
+def test_pattern_across_fragment_boundary():
+    trigger = Trigger("x", patterns=["ERROR"])
+    assert check_all(trigger, [make_packet(b"xxxER"), make_packet(b"ROR")]) == [None, "match=b'ERROR'"]
+
+
+def test_pattern_across_three_fragments():
+    matcher = PatternMatcher(["ERROR"])
+    assert [matcher.search("k", part) for part in (b"E", b"RR", b"OR")] == [None, None, b"ERROR"]
+
+
+def test_condition_skip_breaks_pattern_tail():
+    trigger = Trigger("x", patterns=["ERROR"], condition="len >= 3")
+    assert check_all(trigger, [make_packet(b"xxxER"), make_packet(b"no"), make_packet(b"ROR")]) == [None, None, None]
+
+
+def test_gap_skip_breaks_pattern_tail():
+    trigger = Trigger("x", patterns=["ERROR"], max_gap=0.05)
+    packets = [make_packet(b"start", 0.0), make_packet(b"xxxER", 0.01), make_packet(b"zz", 0.5), make_packet(b"ROR", 0.51)]
+    assert check_all(trigger, packets) == [None, None, None, None]
+
+
+def test_streams_are_separated_by_interface():
+    trigger = Trigger("x", patterns=["ERROR"])
+    packets = [make_packet(b"xxxER", interface="USBPcap1"), make_packet(b"ROR", interface="USBPcap2")]
+    assert check_all(trigger, packets) == [None, None]
+
+
+def test_streams_are_separated_by_endpoint():
+    trigger = Trigger("x", patterns=["ERROR"])
+    assert check_all(trigger, [make_packet(b"xxxER", endpoint=0x81), make_packet(b"ROR", endpoint=0x82)]) == [None, None]
+
+
+def test_condition_and_gap_without_pattern():
+    trigger = Trigger("x", condition="dir == in", min_gap=0.1)
+    packets = [make_packet(b"a", 0.0), make_packet(b"b", 0.05), make_packet(b"c", 0.3), make_packet(b"d", 0.35, endpoint=0x02)]
+    assert check_all(trigger, packets) == [None, None, "gap=250.0ms", None]
+
+
+def test_trigger_without_pattern_or_condition():
+    with pytest.raises(ValueError):
+        Trigger("x")
+
+
+def test_condition_fires_on_empty_packets():
+    trigger = Trigger("z", condition="len == 0")
+    assert check_all(trigger, [make_packet(b"")] * 3) == ["condition"] * 3
+
+
+def test_engine_checks_empty_packets(tmp_path):
+    engine = TriggerEngine([Trigger("z", condition="len == 0")], str(tmp_path), post_packets=0)
+    engine.feed([make_packet(b"", timestamp=i) for i in range(5)])
+    engine.close()
+    assert engine.events_triggered == 5
+
+
+def test_empty_packet_keeps_pattern_tail():
+    trigger = Trigger("x", patterns=["ERROR"])
+    assert check_all(trigger, [make_packet(b"xxxER"), make_packet(b""), make_packet(b"ROR")]) == [None, None, "match=b'ERROR'"]
+
+
+def test_save_failure_is_reported_and_worker_keeps_running(tmp_path, monkeypatch):
+    calls = []
+
+    def write_packets(self, packets):
+        calls.append(len(packets))
+        if len(calls) == 1:
+            raise struct.error("argument out of range")
+
+    monkeypatch.setattr(PcapngWriter, 'write_packets', write_packets)
+    saved = []
+    engine = TriggerEngine([Trigger("x", patterns=["ERROR"])], str(tmp_path), post_packets=1)
+    engine.on_saved = lambda path, count, error: saved.append((count, error))
+    engine.feed([make_packet(b"ERROR", timestamp=0.0), make_packet(b"a", timestamp=0.1),
+                 make_packet(b"ERROR", timestamp=0.2), make_packet(b"b", timestamp=0.3)])
+    engine.close()
+    assert [count for count, _ in saved] == [2, 4]
+    assert isinstance(saved[0][1], struct.error) and saved[1][1] is None
@@ -0,0 +1,101 @@
+import struct
+import threading
+
+from core.usb_decoders import UsbDecoder, CLASS_HID, CLASS_CDC, STAGE_SETUP, STAGE_COMPLETE
+from core.usb_packet import TRANSFER_CONTROL
+from tests import make_packet
+
+
+def control_packet(payload, stage, device=3, irp_id=0x10):
+    return make_packet(payload, endpoint=0x80, transfer=TRANSFER_CONTROL, device=device, irp_id=irp_id,
+                       info=0 if stage == STAGE_SETUP else 1, function=0x08, stage=stage)
+
+
+def control_setup(request_type, request, value=0, index=0, length=0, device=3):
+    return control_packet(struct.pack('<BBHHH', request_type, request, value, index, length), STAGE_SETUP, device)
+
+
+def decode(decoder, packet):
+    decoder.observe(packet)
+    return decoder.decode(packet)
+
+
+def test_ambiguous_class_request_without_descriptors():
+    text = decode(UsbDecoder(), control_setup(0xA1, 0x01, 0x0100, 0, 8))
+    assert "GET_REPORT" in text and "GET_ENCAPSULATED_RESPONSE" in text
+    assert text.startswith("CLASS request 0x01")
+
+
+def test_unique_class_request_without_descriptors():
+    assert decode(UsbDecoder(), control_setup(0x21, 0x0A, 0x0000, 0)) == "SET_IDLE 0ms"
+    assert decode(UsbDecoder(), control_setup(0x21, 0x22, 0x0003, 0)).startswith("SET_CONTROL_LINE_STATE")
+
+
+def test_class_inferred_from_known_device_interfaces():
+    decoder = UsbDecoder()
+    decoder.assign_endpoint(1, 3, 0x81, CLASS_HID)
+    assert decode(decoder, control_setup(0xA1, 0x01, 0x0100, 0, 8)).startswith("GET_REPORT")
+
+    decoder = UsbDecoder()
+    decoder.assign_endpoint(1, 3, 0x83, CLASS_CDC)
+    assert decode(decoder, control_setup(0xA1, 0x01, 0, 0, 64)) == "GET_ENCAPSULATED_RESPONSE"
+
+    # 다른 장치에 지정한 클래스는 쓰지 않음
+    decoder = UsbDecoder()
+    decoder.assign_endpoint(1, 4, 0x81, CLASS_HID)
+    assert decode(decoder, control_setup(0xA1, 0x01, 0x0100, 0, 8)).startswith("CLASS request 0x01")
+
+
+def test_standard_request():
+    assert decode(UsbDecoder(), control_setup(0x00, 0x09, 1)) == "SET_CONFIGURATION config=1"
+
+
+def learn_configuration(decoder, usb_class, device=3, irp_id=0x20):
+    """구성 디스크립터 응답(인터페이스 0 + 엔드포인트 0x81)을 학습시킵니다."""
+    config = struct.pack('<BBHBBBBB', 9, 2, 25, 1, 1, 0, 0x80, 50)
+    config += struct.pack('<BBBBBBBBB', 9, 4, 0, 0, 1, usb_class, 0, 0, 0)
+    config += struct.pack('<BBBBHB', 7, 5, 0x81, 3, 64, 10)
+    setup = control_setup(0x80, 0x06, 0x0200, 0, len(config), device)
+    setup.irp_id = irp_id
+    decoder.observe(setup)
+    decoder.observe(control_packet(config, STAGE_COMPLETE, device, irp_id))
+
+
+def test_clear_keeps_decoding_of_bound_packets():
+    decoder = UsbDecoder()
+    learn_configuration(decoder, CLASS_CDC)
+    shown = control_setup(0xA1, 0x01, 0, 0, 64)
+    decoder.observe(shown)
+    shown.descriptors = decoder.descriptors
+    assert decoder.decode(shown) == "GET_ENCAPSULATED_RESPONSE"
+
+    # 새 캡처: 같은 주소에 HID 장치가 붙음 - 화면에 남은 이전 패킷의 해석은 그대로
+    decoder.clear()
+    learn_configuration(decoder, CLASS_HID)
+    assert decoder.decode(shown) == "GET_ENCAPSULATED_RESPONSE"
+    assert decode(decoder, control_setup(0xA1, 0x01, 0x0100, 0, 8)).startswith("GET_REPORT")
+
+
+def test_decode_while_learning_on_another_thread():
+    decoder = UsbDecoder()
+    errors = []
+    done = threading.Event()
+
+    def learn():
+        try:
+            for device in range(1, 128):
+                learn_configuration(decoder, CLASS_HID, device=device, irp_id=device)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+
+    thread = threading.Thread(target=learn)
+    thread.start()
+    packet = control_setup(0xA1, 0x01, 0x0100, 0, 8, device=200)
+    decoder.observe(packet)
+    while not done.is_set():
+        decoder.decode(packet)
+    thread.join()
+    assert not errors
+    assert decoder.decode(packet).startswith("CLASS request 0x01")
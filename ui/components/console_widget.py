@@ -7,59 +7,432 @@
 ## 1) ui스레드가 아닌 다른 서비스 쓰레드에서 메세지를 추가할 수 있도록 스레드 안전하게 메세지를 추가하는 기능을 구현한다.
 ## 2) PySide6 + qFluentWidget을 사용한다.
 ### - 패키지 설치 : pip install pyside6 pyqt-fluent-widget
-## 3) QListWidget 상속받아 구현한다.
-## 4) 메세지 종류에 따라 색상을 다르게 표시한다.
+## 3) QTableView(단일 열, 고정 행 높이) + QAbstractListModel(ConsoleModel) 구조로 구현한다.
+### - 메세지마다 QListWidgetItem을 만들지 않고, 고정 크기 링버퍼(타입 코드/타임스탬프/텍스트 슬롯)에 압축 레코드로 저장한다.
+### - 오래된 메세지 삭제는 링버퍼 head 이동으로 O(1) 처리하며, beginRemoveRows/beginInsertRows로 한 번에 통지한다.
+### - 메세지는 문자열 대신 패킷 객체도 받을 수 있으며, 표시 문자열은 화면에 보이는 행만 str()로 만든다.
+## 4) 메세지 종류에 따라 색상을 다르게 표시한다. (ConsoleDelegate에서 색상 적용)
 
 #4. 기능(API + UI):
 ## 1) 메세지를 추가한다. (add_message)
 ## 2) 현재 창에 표시된 모든 메세지를 삭제한다. (clear_message)
-## 3) 메세지를 필터링한다. (filter_message)
-### - 이전까지 출력된 메세지에는 적용되지 않으며, 새로 추가되는 메세지에 대해 적용할 필터를 설정한다.
-## 4) 전체 메세지 내용은 최근 20000줄로 제한된다. (메모리가 과 사용을 방지하기 위해 오래된 메세지는 삭제하여 메모리가 과 사용 되지 않도록 조정)
+## 3) 메세지를 필터링한다. (set_filter)
+### - 모든 메세지는 히스토리에 보관되며, 필터는 이전 메세지까지 소급 적용된다.
+### - 메세지 종류(TX/RX 방향 포함), 엔드포인트, 텍스트 부분 문자열로 필터링할 수 있다.
+### - 종류/엔드포인트별 인덱스 배열을 유지하므로 필터 변경 시 재포맷/전체 스캔 없이 화면을 다시 구성한다.
+### - 텍스트 조건은 레코드를 하나씩 확인해야 하므로 UI 타이머가 TEXT_SCAN_MS씩 나눠 적용한다. (화면에 점점 채워짐)
+## 4) 전체 메세지 내용은 최근 MAX_LINES(1,000,000)줄로 제한된다. (메모리가 과 사용을 방지하기 위해 오래된 메세지는 삭제하여 메모리가 과 사용 되지 않도록 조정)
+## 5) 행을 선택하면 하단 상세 창(PacketDetailWidget)에 해당 패킷의 전체 페이로드를 hex dump로 보여준다.
+## 6) 메세지 큐는 QUEUE_CAPACITY로 제한되며, 넘치면 OverflowPolicy(오래된 것 버림/새 것 버림/요약)에 따라 처리하고 드롭 카운터를 표시한다.
+### - 생산자는 add_messages()로 여러 메세지를 한 번에 넣는다. (캡처 쓰레드를 절대 블로킹하지 않음)
+### - 한 번의 타이머 틱에서 꺼내는 개수는 측정된 처리 시간에 맞춰 자동 조절된다. (DRAIN_TARGET_MS)
 
 #테스트
-import queue
-from enum import Enum, auto
-from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, 
-                               QListWidget, QListWidgetItem)
-from PySide6.QtCore import QTimer, Qt
-from PySide6.QtGui import QColor, QFont
-
-# qFluentWidget에서 CheckBox 임포트
-from qfluentwidgets import CheckBox  
-
-class MsgType(Enum):
-    INFO = auto()
-    ERROR = auto()
-    WARNING = auto()
-    TX = auto()
-    RX = auto()
+import time
+from array import array
+from bisect import bisect_left
+from itertools import chain
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QSplitter,
+                               QTableView, QHeaderView, QStyledItemDelegate, QAbstractItemView)
+from PySide6.QtCore import QTimer, Qt, QAbstractListModel, QModelIndex
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QPalette
 
-class ConsoleWidget(QWidget):  # 기존 QListWidget 대신 QWidget 상속으로 변경
-    MAX_LINES = 20000
+# qFluentWidget에서 CheckBox/입력창 임포트
+from qfluentwidgets import CheckBox, LineEdit, SearchLineEdit, CaptionLabel
+
+from core.batch_queue import BoundedBatchQueue, OverflowPolicy
+from core.msg_type import MsgType
+from core.metrics import metrics, exponential_bounds
+
+# UI 틱 단위 계측 지표
+# (지연 분위수를 비교할 수 있도록 버킷 간격을 √2배로 촘촘하게)
+_TICK_MS = metrics.histogram('console.tick_ms', exponential_bounds(0.25, 2 ** 0.5, 28))
+_RENDER_LATENCY_MS = metrics.histogram('console.latency_ms', exponential_bounds(1, 2 ** 0.5, 32))
+_QUEUE_DEPTH = metrics.gauge('console.queue_depth')
+_DROPPED = metrics.gauge('console.dropped')
+_SUPPRESSED = metrics.gauge('console.suppressed')
+_RENDERED = metrics.counter('console.rendered')
+
+# 타입 코드(MsgType.value) -> MsgType 빠른 역참조 테이블
+_MSG_TYPE_BY_CODE = {msg_type.value: msg_type for msg_type in MsgType}
+
+COLOR_MAP = {
+    MsgType.INFO: "#00FF00",     
+    MsgType.ERROR: "#FF3333",    
+    MsgType.WARNING: "#FFFF00",  
+    MsgType.TX: "#3399FF",       
+    MsgType.RX: "#CC66FF",       
+}
+
+class ConsoleModel(QAbstractListModel):
+    """고정 용량 링버퍼 위에서 동작하는 콘솔 메세지 모델.
+
+    각 메세지는 (타입 코드, 타임스탬프, 엔드포인트, 패킷 번호, 텍스트) 압축 레코드로 저장되며,
+    표시 문자열은 data() 호출 시(화면에 보이는 행만) 만들어집니다.
+    텍스트 슬롯에는 문자열 또는 str()로 요약을 만들 수 있는 패킷 객체(payload 속성 포함)가 들어갑니다.
+    레코드는 증가하는 시퀀스 번호(seq)로 식별되고 슬롯 위치는 seq % capacity 입니다.
+    필터가 설정되면 통과한 seq 목록(projection)만 행으로 노출합니다.
+    텍스트 필터는 scan_text()가 아직 판정하지 않은 레코드(seq >= _scan_seq)에 시간 예산만큼씩 적용합니다.
+    """
+    MsgTypeRole = Qt.ItemDataRole.UserRole + 1
+    TimestampRole = Qt.ItemDataRole.UserRole + 2
+    EndpointRole = Qt.ItemDataRole.UserRole + 3
+    PacketIdRole = Qt.ItemDataRole.UserRole + 4
+    PayloadRole = Qt.ItemDataRole.UserRole + 5
+
+    NO_ENDPOINT = 0xFFFF
+    # scan_text()가 시간 예산을 확인하는 간격(레코드 수)
+    SCAN_CHUNK = 512
+
+    def __init__(self, capacity, parent=None):
+        super().__init__(parent)
+        self._capacity = capacity
+        self._types = array('B', bytes(capacity))
+        self._times = array('d', bytes(8 * capacity))
+        self._endpoints = array('H', bytes(2 * capacity))
+        self._packet_ids = array('q', bytes(8 * capacity))
+        self._texts = [None] * capacity
+        self._summaries = [None] * capacity   # 만든 요약 문자열 캐시 (표시/텍스트 필터가 처음 필요할 때 채움)
+        self._first_seq = 0   # 가장 오래된 레코드의 시퀀스 번호
+        self._next_seq = 0    # 다음에 추가될 레코드의 시퀀스 번호
+
+        # 종류/엔드포인트별 seq 인덱스 (오름차순, 오래된 항목은 지연 삭제)
+        self._type_index = {code: array('q') for code in _MSG_TYPE_BY_CODE}
+        self._endpoint_index = {}
+        # 패킷 번호가 있는 레코드의 (패킷 번호, seq) - 둘 다 오름차순이므로 bisect로 검색
+        self._pid_index = array('q')
+        self._pid_seqs = array('q')
+
+        # 필터 상태 (None이면 해당 조건 없음)
+        self._filter_codes = None
+        self._filter_endpoint = None
+        self._filter_text = None
+        self._proj = None     # 필터 통과 seq 목록, None이면 전체 표시
+        self._proj_start = 0
+        self._scan_seq = None  # 텍스트 필터를 아직 판정하지 않은 첫 seq (텍스트 필터가 없으면 None)
+
+    # ------------------ Qt 모델 인터페이스 ------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        if self._proj is None:
+            return self._next_seq - self._first_seq
+        return len(self._proj) - self._proj_start
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        seq = self.seq_at(index.row())
+        if seq is None:
+            return None
+        slot = seq % self._capacity
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            msg_type = _MSG_TYPE_BY_CODE[self._types[slot]]
+            return f"[{msg_type.name}] {self._summary(slot)}"
+        if role == self.MsgTypeRole:
+            return _MSG_TYPE_BY_CODE[self._types[slot]]
+        if role == self.TimestampRole:
+            return self._times[slot]
+        if role == self.EndpointRole:
+            endpoint = self._endpoints[slot]
+            return None if endpoint == self.NO_ENDPOINT else endpoint
+        if role == self.PacketIdRole:
+            packet_id = self._packet_ids[slot]
+            return None if packet_id < 0 else packet_id
+        if role == self.PayloadRole:
+            return getattr(self._texts[slot], 'payload', None)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return time.strftime("%H:%M:%S", time.localtime(self._times[slot]))
+        return None
+
+    def _summary(self, slot):
+        summary = self._summaries[slot]
+        if summary is None:
+            summary = self._summaries[slot] = str(self._texts[slot])
+        return summary
+
+    def seq_at(self, row):
+        """화면 행 번호를 레코드 시퀀스 번호로 변환합니다."""
+        if row < 0 or row >= self.rowCount():
+            return None
+        if self._proj is None:
+            return self._first_seq + row
+        return self._proj[self._proj_start + row]
+
+    # ------------------ 레코드 추가/삭제 ------------------
+
+    def append_records(self, records):
+        """(msg_type, message, timestamp, endpoint, packet_id) 레코드 목록을 한 번에 추가합니다."""
+        n = len(records)
+        if n == 0:
+            return
+        capacity = self._capacity
+        if n > capacity:
+            records = records[-capacity:]
+            n = capacity
+
+        # 1. 용량 초과분은 first_seq 이동만으로 제거 (비워진 슬롯은 새 레코드가 그대로 재사용)
+        overflow = (self._next_seq - self._first_seq) + n - capacity
+        if overflow > 0:
+            self._evict(self._first_seq + overflow)
+
+        # 2. 새 레코드를 꼬리 슬롯에 기록하고 인덱스/필터 결과에 반영
+        proj = self._proj
+        # 텍스트 필터가 있으면 새 레코드도 scan_text()가 판정 (여기서는 요약 문자열을 만들지 않음)
+        check = proj is not None and self._scan_seq is None
+        passing = []
+        seq = self._next_seq
+        for msg_type, message, timestamp, endpoint, packet_id in records:
+            slot = seq % capacity
+            code = msg_type.value
+            self._types[slot] = code
+            self._times[slot] = timestamp
+            self._texts[slot] = message
+            self._summaries[slot] = None
+            self._type_index[code].append(seq)
+            if packet_id is None:
+                self._packet_ids[slot] = -1
+            else:
+                self._packet_ids[slot] = packet_id
+                self._pid_index.append(packet_id)
+                self._pid_seqs.append(seq)
+            if endpoint is None:
+                self._endpoints[slot] = self.NO_ENDPOINT
+            else:
+                self._endpoints[slot] = endpoint
+                ep_index = self._endpoint_index.get(endpoint)
+                if ep_index is None:
+                    ep_index = self._endpoint_index[endpoint] = array('q')
+                ep_index.append(seq)
+            if check and self._matches(code, endpoint):
+                passing.append(seq)
+            seq += 1
+
+        if proj is None:
+            first_row = self._next_seq - self._first_seq
+            self.beginInsertRows(QModelIndex(), first_row, first_row + n - 1)
+            self._next_seq = seq
+            self.endInsertRows()
+        else:
+            self._next_seq = seq
+            if passing:
+                first_row = len(proj) - self._proj_start
+                self.beginInsertRows(QModelIndex(), first_row, first_row + len(passing) - 1)
+                proj.extend(passing)
+                self.endInsertRows()
+
+    def _evict(self, new_first_seq):
+        if self._proj is None:
+            removed = new_first_seq - self._first_seq
+        else:
+            end = bisect_left(self._proj, new_first_seq, self._proj_start)
+            removed = end - self._proj_start
+
+        if removed > 0:
+            self.beginRemoveRows(QModelIndex(), 0, removed - 1)
+        self._first_seq = new_first_seq
+        if self._scan_seq is not None and self._scan_seq < new_first_seq:
+            self._scan_seq = new_first_seq
+        if self._proj is not None:
+            self._proj_start += removed
+            # 앞쪽 빈 공간이 절반을 넘으면 한 번에 압축 (분할 상환 O(1))
+            if self._proj_start > (len(self._proj) >> 1):
+                del self._proj[:self._proj_start]
+                self._proj_start = 0
+        if removed > 0:
+            self.endRemoveRows()
+
+        self._trim_index(self._type_index)
+        self._trim_index(self._endpoint_index, drop_empty=True)
+        stale = bisect_left(self._pid_seqs, self._first_seq)
+        if stale > (len(self._pid_seqs) >> 1):
+            del self._pid_seqs[:stale]
+            del self._pid_index[:stale]
+
+    def _trim_index(self, index, drop_empty=False):
+        for key, seqs in list(index.items()):
+            stale = bisect_left(seqs, self._first_seq)
+            if drop_empty and stale == len(seqs):
+                del index[key]
+            elif stale > (len(seqs) >> 1):
+                del seqs[:stale]
+
+    def clear(self):
+        self.beginResetModel()
+        self._texts = [None] * self._capacity
+        self._summaries = [None] * self._capacity
+        self._first_seq = self._next_seq
+        self._type_index = {code: array('q') for code in _MSG_TYPE_BY_CODE}
+        self._endpoint_index = {}
+        self._pid_index = array('q')
+        self._pid_seqs = array('q')
+        if self._proj is not None:
+            self._proj = array('q')
+            self._proj_start = 0
+        if self._scan_seq is not None:
+            self._scan_seq = self._next_seq
+        self.endResetModel()
+
+    def row_of_packet(self, packet_id):
+        """패킷 번호에 해당하는 현재 화면 행 번호. 이미 삭제되었거나 필터로 숨겨졌으면 None."""
+        k = bisect_left(self._pid_index, packet_id)
+        if k == len(self._pid_index) or self._pid_index[k] != packet_id:
+            return None
+        seq = self._pid_seqs[k]
+        if seq < self._first_seq:
+            return None
+        if self._proj is None:
+            return seq - self._first_seq
+        k = bisect_left(self._proj, seq, self._proj_start)
+        if k == len(self._proj) or self._proj[k] != seq:
+            return None
+        return k - self._proj_start
+
+    # ------------------ 필터 ------------------
+
+    def set_filter(self, msg_types=None, endpoint=None, text=None):
+        """필터를 설정하고 전체 히스토리에 소급 적용합니다. (None이면 해당 조건 해제)"""
+        codes = None
+        if msg_types is not None:
+            codes = frozenset(msg_type.value for msg_type in msg_types)
+            if len(codes) == len(_MSG_TYPE_BY_CODE):
+                codes = None
+
+        self.beginResetModel()
+        self._filter_codes = codes
+        self._filter_endpoint = endpoint
+        self._filter_text = text or None
+        self._proj = self._build_projection()
+        self._proj_start = 0
+        # 텍스트 조건은 빈 목록에서 시작해 scan_text()가 오래된 레코드부터 채움
+        self._scan_seq = self._first_seq if self._filter_text is not None else None
+        self.endResetModel()
+
+    @property
+    def scan_pending(self):
+        """텍스트 필터를 아직 판정하지 않은 레코드가 있는지"""
+        return self._scan_seq is not None and self._scan_seq < self._next_seq
+
+    def scan_text(self, budget):
+        """텍스트 필터를 아직 판정하지 않은 레코드에 budget초 동안 적용하고 통과한 행을 추가합니다.
+        SCAN_CHUNK개마다 시간을 확인하므로 레코드 수와 무관하게 UI 쓰레드를 budget 정도만 씁니다. 남은 레코드가 있으면 True."""
+        if self._scan_seq is None:
+            return False
+        codes = self._filter_codes
+        endpoint = self._filter_endpoint
+        text = self._filter_text
+        types, endpoints, capacity = self._types, self._endpoints, self._capacity
+        summary = self._summary
+        deadline = time.perf_counter() + budget
+        seq = self._scan_seq
+        end = self._next_seq
+        passing = []
+        while seq < end:
+            chunk_end = min(end, seq + self.SCAN_CHUNK)
+            for candidate in range(seq, chunk_end):
+                slot = candidate % capacity
+                if codes is not None and types[slot] not in codes:
+                    continue
+                if endpoint is not None and endpoints[slot] != endpoint:
+                    continue
+                if text in summary(slot):
+                    passing.append(candidate)
+            seq = chunk_end
+            if time.perf_counter() >= deadline:
+                break
+        self._scan_seq = seq
+        if passing:
+            proj = self._proj
+            first_row = len(proj) - self._proj_start
+            self.beginInsertRows(QModelIndex(), first_row, first_row + len(passing) - 1)
+            proj.extend(passing)
+            self.endInsertRows()
+        return seq < self._next_seq
 
-    COLOR_MAP = {
-        MsgType.INFO: "#00FF00",     
-        MsgType.ERROR: "#FF3333",    
-        MsgType.WARNING: "#FFFF00",  
-        MsgType.TX: "#3399FF",       
-        MsgType.RX: "#CC66FF",       
-    }
+    def _matches(self, code, endpoint):
+        if self._filter_codes is not None and code not in self._filter_codes:
+            return False
+        if self._filter_endpoint is not None and endpoint != self._filter_endpoint:
+            return False
+        return True
+
+    def _build_projection(self):
+        codes = self._filter_codes
+        endpoint = self._filter_endpoint
+        if self._filter_text is not None:
+            # 텍스트 조건이 있으면 scan_text()가 종류/엔드포인트와 함께 판정
+            return array('q')
+        if codes is None and endpoint is None:
+            return None
+
+        first = self._first_seq
+        if endpoint is not None:
+            # 엔드포인트 인덱스가 가장 좁으므로 먼저 사용하고 종류는 타입 배열로 확인
+            ep_index = self._endpoint_index.get(endpoint, array('q'))
+            seqs = ep_index[bisect_left(ep_index, first):]
+            if codes is not None:
+                types, capacity = self._types, self._capacity
+                seqs = array('q', [seq for seq in seqs if types[seq % capacity] in codes])
+        elif codes is not None:
+            # 종류별 인덱스는 이미 정렬되어 있으므로 이어 붙인 뒤 정렬(run 병합)만 수행
+            parts = [self._type_index[code] for code in codes]
+            parts = [part[bisect_left(part, first):] for part in parts]
+            if len(parts) == 1:
+                seqs = parts[0]
+            else:
+                seqs = array('q', sorted(chain.from_iterable(parts)))
+        return seqs
+
+class ConsoleDelegate(QStyledItemDelegate):
+    """메세지 종류에 따라 글자 색상을 입혀 그리는 델리게이트."""
 
     def __init__(self, parent=None):
+        super().__init__(parent)
+        self._colors = {msg_type: QColor(color_hex) for msg_type, color_hex in COLOR_MAP.items()}
+        self._default_color = QColor("#FFFFFF")
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        color = self._colors.get(index.data(ConsoleModel.MsgTypeRole), self._default_color)
+        option.palette.setColor(QPalette.ColorRole.Text, color)
+        option.palette.setColor(QPalette.ColorRole.HighlightedText, color)
+
+class ConsoleWidget(QWidget):  # 기존 QListWidget 대신 QWidget 상속으로 변경
+    MAX_LINES = 1000000
+    QUEUE_CAPACITY = 200000
+
+    # 타이머 한 틱에서 메세지 반영에 쓸 목표 시간(ms)과 틱당 처리 개수 범위
+    DRAIN_TARGET_MS = 15.0
+    MIN_DRAIN_BUDGET = 500
+    MAX_DRAIN_BUDGET = 200000
+    # 텍스트 필터를 나눠 적용할 때 한 번에 쓸 시간(ms)
+    TEXT_SCAN_MS = 15.0
+
+    COLOR_MAP = COLOR_MAP
+
+    def __init__(self, parent=None, overflow_policy=OverflowPolicy.COALESCE):
         super().__init__(parent)
         self._allowed_filters = set(MsgType)  # 초기에는 모든 필터 허용
         
         self._init_ui()
         
-        # 스레드 안전한 큐 생성
-        self.msg_queue = queue.Queue()
+        # 스레드 안전한 용량 제한 배치 큐 생성
+        self.msg_queue = BoundedBatchQueue(self.QUEUE_CAPACITY, overflow_policy, self._make_suppressed_summary)
+        self._drain_budget = 5000
+        self._shown_drop_counts = (0, 0)
         
         # 타이머를 이용한 일괄(Batch) 업데이트 설정
         self.update_timer = QTimer(self)
         self.update_timer.timeout.connect(self._process_message_queue)
         self.update_timer.start(100)
 
+        # 텍스트 필터 적용 타이머 (판정할 레코드가 남아 있는 동안만 이벤트 루프가 비는 대로 반복)
+        self.text_scan_timer = QTimer(self)
+        self.text_scan_timer.setInterval(0)
+        self.text_scan_timer.timeout.connect(self._scan_text_filter)
+
     def _init_ui(self):
         # 1. 메인 레이아웃 (수직)
         self.main_layout = QVBoxLayout(self)
@@ -78,83 +451,187 @@ class ConsoleWidget(QWidget):  # 기존 QListWidget 대신 QWidget 상속으로
             
             self.filter_layout.addWidget(cb)
             self.checkboxes[msg_type] = cb
+
+        # 엔드포인트 / 텍스트 필터 입력 (입력이 멈춘 뒤 한 번만 적용하도록 디바운스)
+        self.endpoint_edit = LineEdit(self)
+        self.endpoint_edit.setPlaceholderText("EP (예: 0x81)")
+        self.endpoint_edit.setFixedWidth(120)
+        self.endpoint_edit.setClearButtonEnabled(True)
+        self.text_edit = SearchLineEdit(self)
+        self.text_edit.setPlaceholderText("텍스트 필터")
+        self.text_edit.setMinimumWidth(200)
+
+        self.filter_debounce_timer = QTimer(self)
+        self.filter_debounce_timer.setSingleShot(True)
+        self.filter_debounce_timer.setInterval(150)
+        self.filter_debounce_timer.timeout.connect(self._update_filters_from_ui)
+        self.endpoint_edit.textChanged.connect(self.filter_debounce_timer.start)
+        self.text_edit.textChanged.connect(self.filter_debounce_timer.start)
+
+        self.filter_layout.addWidget(self.endpoint_edit)
+        self.filter_layout.addWidget(self.text_edit)
+
+        # 큐 포화로 버려지거나 요약된 메세지 수 표시
+        self.drop_label = CaptionLabel("드롭: 0 | 생략: 0", self)
+        self.filter_layout.addWidget(self.drop_label)
             
-        # 3. 하단 로그 리스트 위젯 (기존 로직 이동)
-        self.list_widget = QListWidget(self)
-        self.list_widget.setStyleSheet("""
-            QListWidget {
+        # 3. 하단 로그 뷰 (링버퍼 모델 + 색상 델리게이트)
+        self.model = ConsoleModel(self.MAX_LINES, self)
+        self.log_view = QTableView(self)
+        self.log_view.setModel(self.model)
+        self.log_view.setItemDelegate(ConsoleDelegate(self.log_view))
+        # QListView는 행 추가 때마다 전체 행을 다시 배치(O(n))하므로,
+        # 고정 행 높이 QTableView(단일 열, 헤더 숨김)로 스크롤/삽입 비용을 O(1)로 유지
+        self.log_view.horizontalHeader().hide()
+        self.log_view.horizontalHeader().setStretchLastSection(True)
+        self.log_view.verticalHeader().hide()
+        self.log_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.log_view.setShowGrid(False)
+        self.log_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.log_view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.log_view.setStyleSheet("""
+            QTableView {
                 background-color: black;
                 padding: 5px;
                 border: 1px solid #333333; /* 위젯 구분을 위한 테두리 추가 */
             }
-            QListWidget::item {
-                padding: 2px;
-            }
         """)
         font = QFont("Consolas", 10)
         font.setStyleHint(QFont.StyleHint.Monospace)
-        self.list_widget.setFont(font)
-        self.list_widget.setWordWrap(False) 
+        self.log_view.setFont(font)
+        self.log_view.setWordWrap(False)
+        self.log_view.verticalHeader().setDefaultSectionSize(QFontMetrics(font).height() + 4)
+
+        # 4. 선택한 패킷의 상세 창 (시작 시간을 줄이기 위해 처음 선택할 때 생성)
+        self.detail_panel = None
+        self.log_view.selectionModel().currentRowChanged.connect(self._show_packet_detail)
+
+        self.splitter = QSplitter(Qt.Orientation.Vertical, self)
+        self.splitter.addWidget(self.log_view)
 
         # 레이아웃 조립
         self.main_layout.addLayout(self.filter_layout)
-        self.main_layout.addWidget(self.list_widget)
+        self.main_layout.addWidget(self.splitter)
 
     def _update_filters_from_ui(self):
-        """UI의 체크박스 상태가 변경될 때 내부 필터 셋을 업데이트합니다."""
+        """UI의 필터 상태가 변경될 때 전체 히스토리에 필터를 다시 적용합니다."""
         new_filters = {msg_type for msg_type, cb in self.checkboxes.items() if cb.isChecked()}
-        self._allowed_filters = new_filters
+
+        endpoint = None
+        endpoint_text = self.endpoint_edit.text().strip()
+        if endpoint_text:
+            try:
+                endpoint = int(endpoint_text, 16)
+            except ValueError:
+                return  # 입력 중인 잘못된 값은 무시
+
+        self.set_filter(new_filters, endpoint, self.text_edit.text())
+
+    def _show_packet_detail(self, current, previous=None):
+        """선택한 행이 패킷이면 상세 창에 전체 페이로드를 표시합니다."""
+        if not current.isValid() or current.data(ConsoleModel.PacketIdRole) is None:
+            return
+        if self.detail_panel is None:
+            from ui.components.packet_detail_widget import PacketDetailWidget
+            self.detail_panel = PacketDetailWidget(self)
+            self.splitter.addWidget(self.detail_panel)
+            self.splitter.setStretchFactor(0, 3)
+            self.splitter.setStretchFactor(1, 1)
+        self.detail_panel.show_packet(current.data(Qt.ItemDataRole.DisplayRole), current.data(ConsoleModel.PayloadRole))
 
     # ------------------ API 기능 ------------------
 
-    def add_message(self, msg_type: MsgType, message: str):
-        self.msg_queue.put((msg_type, message))
+    def add_message(self, msg_type: MsgType, message: str, endpoint: int = None, packet_id: int = None):
+        self.msg_queue.put((msg_type, message, time.time(), endpoint, packet_id))
+
+    def add_messages(self, messages):
+        """(msg_type, message, endpoint, packet_id) 목록을 하나의 청크로 추가합니다. 캡처 쓰레드용 일괄 API."""
+        timestamp = time.time()
+        self.msg_queue.put_many([(msg_type, message, timestamp, endpoint, packet_id)
+                                 for msg_type, message, endpoint, packet_id in messages])
+
+    def scroll_to_packet(self, packet_id):
+        """패킷 번호에 해당하는 행으로 이동하고 선택합니다. 행이 없으면 False."""
+        row = self.model.row_of_packet(packet_id)
+        if row is None:
+            return False
+        index = self.model.index(row, 0)
+        self.log_view.scrollTo(index, QAbstractItemView.ScrollHint.PositionAtCenter)
+        self.log_view.setCurrentIndex(index)
+        return True
+
+    def set_overflow_policy(self, policy: OverflowPolicy):
+        self.msg_queue.policy = policy
+
+    def set_filter(self, msg_types=None, endpoint=None, text=None):
+        """메세지 종류(방향)/엔드포인트/텍스트 필터를 설정합니다. 이전 메세지에도 소급 적용됩니다."""
+        self._allowed_filters = set(msg_types) if msg_types is not None else set(MsgType)
+        self.model.set_filter(self._allowed_filters, endpoint, text)
+        self.log_view.scrollToBottom()
+        self._schedule_text_scan()
 
     def clear_message(self):
-        self.list_widget.clear()
+        self.model.clear()
+        if self.detail_panel is not None:
+            self.detail_panel.clear()
         # 큐도 함께 비워줌 (Thread-safe clear)
-        with self.msg_queue.mutex:
-            self.msg_queue.queue.clear()
+        self.msg_queue.clear()
 
     # ------------------ 내부 큐 처리 ------------------
 
+    def _make_suppressed_summary(self, count):
+        return (MsgType.WARNING, f"--- 큐 포화로 메세지 {count}개 생략됨 ---", time.time(), None, None)
+
+    def _schedule_text_scan(self):
+        if self.model.scan_pending and not self.text_scan_timer.isActive():
+            self.text_scan_timer.start()
+
+    def _scan_text_filter(self):
+        scrollbar = self.log_view.verticalScrollBar()
+        is_scrolled_to_bottom = scrollbar.value() == scrollbar.maximum()
+        if not self.model.scan_text(self.TEXT_SCAN_MS / 1000.0):
+            self.text_scan_timer.stop()
+        if is_scrolled_to_bottom:
+            self.log_view.scrollToBottom()
+
+    def _update_drop_label(self):
+        counts = (self.msg_queue.dropped_total, self.msg_queue.suppressed_total)
+        if counts != self._shown_drop_counts:
+            self._shown_drop_counts = counts
+            _DROPPED.set(counts[0])
+            _SUPPRESSED.set(counts[1])
+            self.drop_label.setText(f"드롭: {counts[0]} | 생략: {counts[1]}")
+
     def _process_message_queue(self):
+        self._update_drop_label()
+        _QUEUE_DEPTH.set(self.msg_queue.qsize())
         if self.msg_queue.empty():
             return
 
-        scrollbar = self.list_widget.verticalScrollBar()
-        is_scrolled_to_bottom = (self.list_widget.count() == 0) or (scrollbar.value() == scrollbar.maximum())
+        started = time.perf_counter()
+        scrollbar = self.log_view.verticalScrollBar()
+        is_scrolled_to_bottom = (self.model.rowCount() == 0) or (scrollbar.value() == scrollbar.maximum())
 
-        # 렌더링 부하 억제
-        self.list_widget.setUpdatesEnabled(False)
-        
-        added_count = 0
-        while not self.msg_queue.empty() and added_count < 1000:
-            try:
-                msg_type, message = self.msg_queue.get_nowait()
-            except queue.Empty:
-                break
-                
-            # 요구사항: 큐에서 꺼낼 때 필터를 확인하므로 이전 메세지는 그대로 둠
-            if msg_type not in self._allowed_filters:
-                continue
-
-            display_text = f"[{msg_type.name}] {message}"
-            item = QListWidgetItem(display_text)
-            color_hex = self.COLOR_MAP.get(msg_type, "#FFFFFF")
-            item.setForeground(QColor(color_hex))
-            
-            self.list_widget.addItem(item)
-            added_count += 1
+        records = self.msg_queue.get_batch(self._drain_budget)
 
-        # 변수화된 max_lines(기본 20000)를 활용한 제한 처리
-        excess = self.list_widget.count() - self.MAX_LINES
-        if excess > 0:
-            for _ in range(excess):
-                taken_item = self.list_widget.takeItem(0)
-                del taken_item
+        # 필터와 무관하게 모두 히스토리에 보관하고, 모델이 필터 통과분만 행으로 노출
+        self.model.append_records(records)
 
-        self.list_widget.setUpdatesEnabled(True)
+        if is_scrolled_to_bottom and records:
+            self.log_view.scrollToBottom()
+        self._schedule_text_scan()
 
-        if is_scrolled_to_bottom and added_count > 0:
-            self.list_widget.scrollToBottom()
\ No newline at end of file
+        # 측정된 처리 시간에 맞춰 다음 틱의 처리 개수를 조절
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        _TICK_MS.observe(elapsed_ms)
+        if records:
+            # 이번 틱에서 가장 오래 기다린 메세지(큐 맨 앞) 기준 추가 ~ 화면 반영 지연
+            _RENDER_LATENCY_MS.observe((time.time() - records[0][2]) * 1000.0)
+            _RENDERED.add(len(records))
+        if elapsed_ms > self.DRAIN_TARGET_MS:
+            budget = int(self._drain_budget * self.DRAIN_TARGET_MS / elapsed_ms)
+        elif elapsed_ms < self.DRAIN_TARGET_MS / 2 and len(records) == self._drain_budget:
+            budget = self._drain_budget * 2
+        else:
+            budget = self._drain_budget
+        self._drain_budget = max(self.MIN_DRAIN_BUDGET, min(self.MAX_DRAIN_BUDGET, budget))
@@ -0,0 +1,183 @@
+#1. 개요: 세션 아카이브를 CSV / JSON Lines / pcapng로 내보내는 컴포넌트 위젯 (core.exporter)
+
+#2. 디자인:
+## 1) 상단: 세션 폴더 + 선택 버튼, 시간 구간(세션 시작부터 초), 패킷 필터 식, 형식 선택, 내보내기/취소 버튼
+## 2) 하단: 진행률 막대 + 상태 표시 (처리 수 / 전체 수, 완료 시 패킷 수와 소요 시간)
+
+#3. 구현:
+## 1) 내보내기는 UI 쓰레드가 아닌 별도 쓰레드에서 core.exporter.SessionExporter.run으로 수행한다.
+## 2) 진행률은 배치마다 시그널로 UI 쓰레드에 전달되고, 취소는 이벤트 플래그로 알린다. (쓰던 .part 파일은 지워짐)
+## 3) 아카이브를 배치 단위로 읽어 바로 기록하므로 세션 크기와 무관하게 메모리 사용량이 일정하다.
+
+import os
+import threading
+import time
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QFileDialog
+from PySide6.QtCore import Signal
+
+from qfluentwidgets import ComboBox, LineEdit, PushButton, PrimaryPushButton, ProgressBar, CaptionLabel, FluentIcon as FIF
+
+from core.exporter import SessionExporter, EXPORT_FORMATS
+from core.session_archive import SessionArchive
+
+
+def latest_session_dir(archive_root):
+    """archive_root 아래 가장 최근 세션 폴더 경로. 없으면 빈 문자열."""
+    try:
+        sessions = sorted(name for name in os.listdir(archive_root) if name.startswith("session_"))
+    except OSError:
+        return ""
+    return os.path.join(archive_root, sessions[-1]) if sessions else ""
+
+
+class ExportWidget(QWidget):
+    # (처리 수, 전체 수) / (기록한 패킷 수(취소 시 -1), 소요 시간(초), 에러 메세지)
+    _progress = Signal(int, int)
+    _finished = Signal(int, float, str)
+
+    def __init__(self, archive_root, parent=None):
+        super().__init__(parent)
+        self.archive_root = archive_root
+        self._cancel_event = None
+
+        self._init_ui()
+        self._progress.connect(self._on_progress)
+        self._finished.connect(self._on_finished)
+
+    def _init_ui(self):
+        self.main_layout = QVBoxLayout(self)
+        self.main_layout.setContentsMargins(0, 0, 0, 0)
+
+        self.option_layout = QHBoxLayout()
+        self.session_edit = LineEdit(self)
+        self.session_edit.setPlaceholderText("세션 아카이브 폴더")
+        self.session_edit.setMinimumWidth(280)
+        self.browse_btn = PushButton(FIF.FOLDER, "세션 선택", self)
+        self.start_edit = LineEdit(self)
+        self.start_edit.setPlaceholderText("시작(초)")
+        self.start_edit.setFixedWidth(90)
+        self.end_edit = LineEdit(self)
+        self.end_edit.setPlaceholderText("끝(초)")
+        self.end_edit.setFixedWidth(90)
+        self.filter_edit = LineEdit(self)
+        self.filter_edit.setPlaceholderText("패킷 필터 (예: dir == in and ep == 0x81)")
+        self.format_combo = ComboBox(self)
+        for fmt in EXPORT_FORMATS:
+            self.format_combo.addItem(fmt.upper(), userData=fmt)
+        self.export_btn = PrimaryPushButton(FIF.SAVE, "내보내기", self)
+        self.cancel_btn = PushButton(FIF.CANCEL, "취소", self)
+        self.cancel_btn.setEnabled(False)
+
+        self.option_layout.addWidget(self.session_edit, 2)
+        self.option_layout.addWidget(self.browse_btn)
+        self.option_layout.addWidget(self.start_edit)
+        self.option_layout.addWidget(self.end_edit)
+        self.option_layout.addWidget(self.filter_edit, 2)
+        self.option_layout.addWidget(self.format_combo)
+        self.option_layout.addWidget(self.export_btn)
+        self.option_layout.addWidget(self.cancel_btn)
+
+        self.progress_layout = QHBoxLayout()
+        self.progress_bar = ProgressBar(self)
+        self.progress_bar.setRange(0, 1000)
+        self.status_label = CaptionLabel("", self)
+        self.progress_layout.addWidget(self.progress_bar, 1)
+        self.progress_layout.addWidget(self.status_label)
+
+        self.main_layout.addLayout(self.option_layout)
+        self.main_layout.addLayout(self.progress_layout)
+
+        self.browse_btn.clicked.connect(self.browse_session)
+        self.export_btn.clicked.connect(self.start_export)
+        self.cancel_btn.clicked.connect(self.cancel_export)
+
+    # ------------------ API 기능 ------------------
+
+    @property
+    def is_exporting(self):
+        return self._cancel_event is not None
+
+    def showEvent(self, event):
+        # 처음 열 때 가장 최근 세션을 채워 둠
+        if not self.session_edit.text():
+            self.session_edit.setText(latest_session_dir(self.archive_root))
+        super().showEvent(event)
+
+    def browse_session(self):
+        path = QFileDialog.getExistingDirectory(self, "세션 아카이브 폴더 선택", self.session_edit.text() or self.archive_root)
+        if path:
+            self.session_edit.setText(path)
+
+    def start_export(self):
+        """출력 파일을 고른 뒤 내보내기를 백그라운드 쓰레드에서 시작합니다."""
+        if self.is_exporting:
+            return
+        session_dir = self.session_edit.text().strip()
+        if not session_dir or not os.path.isdir(session_dir):
+            self.status_label.setText("세션 아카이브 폴더를 선택하세요.")
+            return
+        try:
+            start = float(self.start_edit.text()) if self.start_edit.text().strip() else None
+            end = float(self.end_edit.text()) if self.end_edit.text().strip() else None
+        except ValueError:
+            self.status_label.setText("시간 구간은 세션 시작부터의 초(숫자)로 입력하세요.")
+            return
+
+        fmt = self.format_combo.currentData()
+        default_path = os.path.basename(os.path.normpath(session_dir)) + f".{fmt}"
+        path, _ = QFileDialog.getSaveFileName(self, "내보내기", default_path, f"{fmt.upper()} (*.{fmt})")
+        if not path:
+            return
+
+        try:
+            first_ts = SessionArchive(session_dir).first_ts
+            exporter = SessionExporter(session_dir, path, fmt,
+                                       start_ts=None if start is None else first_ts + start,
+                                       end_ts=None if end is None else first_ts + end,
+                                       packet_filter=self.filter_edit.text())
+        except Exception as e:
+            self.status_label.setText(f"내보내기 설정 오류: {e}")
+            return
+
+        cancel_event = self._cancel_event = threading.Event()
+        self._set_exporting_ui(True)
+        self.progress_bar.setValue(0)
+        self.status_label.setText("내보내는 중...")
+        worker = threading.Thread(target=self._export_worker, args=(exporter, cancel_event), daemon=True)
+        worker.start()
+
+    def cancel_export(self):
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+
+    # ------------------ 내부 처리 ------------------
+
+    def _export_worker(self, exporter, cancel_event):
+        started = time.perf_counter()
+        try:
+            exported = exporter.run(progress=self._progress.emit, is_cancelled=cancel_event.is_set)
+            self._finished.emit(-1 if exported is None else exported, time.perf_counter() - started, "")
+        except Exception as e:
+            # 손상된 아카이브(struct.error, IndexError 등)도 패널이 내보내는 중 상태로 남지 않도록 항상 완료를 알림
+            self._finished.emit(0, time.perf_counter() - started, str(e) or type(e).__name__)
+
+    def _set_exporting_ui(self, exporting):
+        self.export_btn.setEnabled(not exporting)
+        self.cancel_btn.setEnabled(exporting)
+        self.browse_btn.setEnabled(not exporting)
+
+    def _on_progress(self, done, total):
+        self.progress_bar.setValue(done * 1000 // total if total else 1000)
+        self.status_label.setText(f"{done:,} / {total:,}")
+
+    def _on_finished(self, exported, elapsed, error):
+        self._cancel_event = None
+        self._set_exporting_ui(False)
+        if error:
+            self.status_label.setText(f"내보내기 실패: {error}")
+        elif exported < 0:
+            self.progress_bar.setValue(0)
+            self.status_label.setText("내보내기 취소됨")
+        else:
+            self.progress_bar.setValue(1000)
+            self.status_label.setText(f"{exported:,}개 패킷 내보냄 ({elapsed:.1f}초)")
@@ -0,0 +1,111 @@
+#1. 개요: 요청/응답 지연 분포(core.latency_analyzer)를 표로 보여주는 지연 분석 컴포넌트 위젯
+
+#2. 디자인:
+## 1) 상단: 항목 수와 전체 이상값 수 한 줄
+## 2) 하단: 지연 항목 한 행씩 "종류 | 장치 | EP | 샘플 | 평균 | p50 | p95 | p99 | 최대 | 이상값" 표
+### - 종류: URB(제출→완료), TX→RX(명령→응답, EP는 OUT→IN), Gap(같은 엔드포인트 데이터 패킷 간격)
+### - 이상값이 있는 행은 툴팁에 이상값 기준(p99 x 배수)을 보여준다.
+
+#3. 구현:
+## 1) REFRESH_MS 주기의 QTimer로 LatencyAnalyzer.snapshot()을 읽어 모델을 통째로 교체한다. (위젯이 보일 때만)
+## 2) 분위수는 고정 로그 버킷에서 계산하므로 행 수와 무관하게 snapshot() 비용이 일정하다.
+
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QTableView, QHeaderView, QAbstractItemView
+from PySide6.QtCore import Qt, QTimer, QAbstractTableModel, QModelIndex
+
+from qfluentwidgets import CaptionLabel
+
+from core.latency_analyzer import format_us, KIND_GAP
+
+
+class LatencyModel(QAbstractTableModel):
+    HEADERS = ("Kind", "Device", "EP", "Samples", "Mean", "p50", "p95", "p99", "Max", "Outliers")
+    _US_KEYS = {4: 'mean_us', 5: 'p50_us', 6: 'p95_us', 7: 'p99_us', 8: 'max_us'}
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return row['kind']
+            if column == 1:
+                return f"{row['bus']}.{row['device']}"
+            if column == 2:
+                return row['label']
+            if column == 3:
+                return f"{row['count']:,}"
+            if column in self._US_KEYS:
+                return format_us(row[self._US_KEYS[column]])
+            # 패킷 간격은 유휴 시간이 섞이므로 이상값을 세지 않음
+            return "" if row['kind'] == KIND_GAP else f"{row['outliers']:,}"
+        if role == Qt.ItemDataRole.ToolTipRole and column == 9 and row['outliers']:
+            return f"p99 x 배수를 넘은 지연 {row['outliers']:,}건 (콘솔에 경고로 표시)"
+        if role == Qt.ItemDataRole.TextAlignmentRole and column >= 3:
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
+class LatencyWidget(QWidget):
+    REFRESH_MS = 1000
+
+    def __init__(self, latency_analyzer, parent=None):
+        super().__init__(parent)
+        self.latency_analyzer = latency_analyzer
+        self._init_ui()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(self.REFRESH_MS)
+
+    def _init_ui(self):
+        self.main_layout = QVBoxLayout(self)
+        self.main_layout.setContentsMargins(0, 0, 0, 0)
+
+        self.summary_label = CaptionLabel("", self)
+
+        self.model = LatencyModel(self)
+        self.table_view = QTableView(self)
+        self.table_view.setModel(self.model)
+        self.table_view.verticalHeader().hide()
+        self.table_view.horizontalHeader().setStretchLastSection(True)
+        self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.table_view.setShowGrid(False)
+        self.table_view.setWordWrap(False)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+
+        self.main_layout.addWidget(self.summary_label)
+        self.main_layout.addWidget(self.table_view)
+
+    def refresh(self):
+        if not self.isVisible():
+            return
+        rows = self.latency_analyzer.snapshot()
+        self.model.set_rows(rows)
+        outliers = sum(row['outliers'] for row in rows if row['kind'] != KIND_GAP)
+        self.summary_label.setText(
+            f"지연 항목 {len(rows)}개 · 이상값 {outliers:,}건"
+            f" (기준: p99 x {self.latency_analyzer.outlier_factor:g})"
+        )
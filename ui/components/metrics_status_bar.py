@@ -0,0 +1,59 @@
+#1. 개요: 캡처 파이프라인 계측 지표(core.metrics)를 한 줄로 보여주는 상태 표시줄 컴포넌트 위젯
+
+#2. 디자인:
+## 1) 왼쪽: 수신 속도(pkt/s, MB/s), 파싱 비용, tshark 출력 지연, 큐 깊이, 화면 반영 지연, UI 틱 시간, 드롭/생략 수
+## 2) 오른쪽: 현재 지표를 JSON 파일로 저장하는 버튼
+
+#3. 구현:
+## 1) REFRESH_MS 주기의 QTimer로 metrics.snapshot()을 읽어 텍스트만 갱신한다. (측정 지점에는 UI 코드가 없음)
+
+from PySide6.QtWidgets import QWidget, QHBoxLayout, QFileDialog
+from PySide6.QtCore import QTimer
+
+from qfluentwidgets import CaptionLabel, PushButton, FluentIcon as FIF
+
+from core.metrics import metrics
+
+
+class MetricsStatusBar(QWidget):
+    REFRESH_MS = 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.main_layout = QHBoxLayout(self)
+        self.main_layout.setContentsMargins(0, 0, 0, 0)
+
+        self.status_label = CaptionLabel("", self)
+        self.dump_btn = PushButton(FIF.SAVE, "지표 저장(JSON)", self)
+        self.dump_btn.clicked.connect(self.dump_metrics)
+
+        self.main_layout.addWidget(self.status_label)
+        self.main_layout.addStretch(1)
+        self.main_layout.addWidget(self.dump_btn)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(self.REFRESH_MS)
+        self.refresh()
+
+    def refresh(self):
+        snapshot = metrics.snapshot()
+
+        def value(name, key, default=0):
+            return snapshot.get(name, {}).get(key, default)
+
+        self.status_label.setText(
+            f"수신 {value('capture.packets', 'rate'):,.0f} pkt/s · {value('capture.bytes', 'rate') / 1e6:.2f} MB/s"
+            f" | 파싱 {value('capture.parse_us_per_packet', 'mean'):.2f} µs/pkt"
+            f" | 출력 지연 p99 {value('capture.lag_ms', 'p99'):,.0f} ms"
+            f" | 큐 {value('console.queue_depth', 'value'):,}"
+            f" | 화면 지연 p99 {value('console.latency_ms', 'p99'):,.0f} ms"
+            f" | 틱 p99 {value('console.tick_ms', 'p99'):.1f} ms"
+            f" | 드롭 {value('console.dropped', 'value'):,} / 생략 {value('console.suppressed', 'value'):,}"
+        )
+
+    def dump_metrics(self):
+        path, _ = QFileDialog.getSaveFileName(self, "지표 저장", "metrics.json", "JSON Files (*.json)")
+        if path:
+            metrics.dump_json(path)
@@ -0,0 +1,115 @@
+#1. 개요: 콘솔에서 선택한 패킷의 전체 페이로드를 오프셋/HEX/ASCII 덤프로 보여주는 상세 창 컴포넌트 위젯
+
+#2. 디자인:
+## 1) 상단: 선택한 패킷의 한 줄 요약 + 페이로드 크기 + 닫기 버튼
+## 2) 하단: 한 행에 BYTES_PER_ROW(16)바이트씩 "오프셋 | HEX | ASCII" 3열 표
+
+#3. 구현:
+## 1) 덤프 문자열을 미리 만들지 않고 HexDumpModel.data()가 화면에 보이는 행만 그때그때 만든다.
+### - 고정 행 높이 QTableView이므로 수 MB 전송도 행 수와 무관하게 스크롤/표시 비용이 일정하다.
+## 2) 페이로드는 복사하지 않고 캡처 버퍼를 참조하는 memoryview/bytes를 그대로 보관한다.
+
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QTableView, QHeaderView, QAbstractItemView
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QFont, QFontMetrics
+
+from qfluentwidgets import CaptionLabel, TransparentToolButton, FluentIcon as FIF
+
+from core.usb_packet import payload_to_ascii
+
+
+class HexDumpModel(QAbstractTableModel):
+    """페이로드를 BYTES_PER_ROW 바이트 단위 행으로 보여주는 모델. 행 문자열은 data() 호출 시에만 만듭니다."""
+    BYTES_PER_ROW = 16
+    HEADERS = ("Offset", "Hex", "ASCII")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._payload = b""
+
+    def set_payload(self, payload):
+        self.beginResetModel()
+        self._payload = payload if payload is not None else b""
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return (len(self._payload) + self.BYTES_PER_ROW - 1) // self.BYTES_PER_ROW
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        offset = index.row() * self.BYTES_PER_ROW
+        column = index.column()
+        if column == 0:
+            return f"{offset:08X}"
+        chunk = bytes(self._payload[offset:offset + self.BYTES_PER_ROW])
+        if column == 1:
+            # 8바이트마다 한 칸 더 띄워 읽기 쉽게 표시
+            return f"{chunk[:8].hex(' ')}  {chunk[8:].hex(' ')}".rstrip().upper()
+        return payload_to_ascii(chunk)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
+class PacketDetailWidget(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._init_ui()
+
+    def _init_ui(self):
+        self.main_layout = QVBoxLayout(self)
+        self.main_layout.setContentsMargins(0, 0, 0, 0)
+
+        self.header_layout = QHBoxLayout()
+        self.summary_label = CaptionLabel("", self)
+        self.size_label = CaptionLabel("", self)
+        self.close_btn = TransparentToolButton(FIF.CLOSE, self)
+        self.close_btn.clicked.connect(self.hide)
+        self.header_layout.addWidget(self.summary_label, 1)
+        self.header_layout.addWidget(self.size_label)
+        self.header_layout.addWidget(self.close_btn)
+
+        self.model = HexDumpModel(self)
+        self.dump_view = QTableView(self)
+        self.dump_view.setModel(self.model)
+        self.dump_view.verticalHeader().hide()
+        self.dump_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.dump_view.horizontalHeader().setStretchLastSection(True)
+        self.dump_view.setShowGrid(False)
+        self.dump_view.setWordWrap(False)
+        self.dump_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        font = QFont("Consolas", 10)
+        font.setStyleHint(QFont.StyleHint.Monospace)
+        self.dump_view.setFont(font)
+        font_metrics = QFontMetrics(font)
+        self.dump_view.verticalHeader().setDefaultSectionSize(font_metrics.height() + 4)
+        # 행 내용 길이가 고정이므로 열 너비도 글자 수로 고정 (ResizeToContents의 전체 행 스캔을 피함)
+        self.dump_view.setColumnWidth(0, font_metrics.horizontalAdvance("0" * 8) + 16)
+        self.dump_view.setColumnWidth(1, font_metrics.horizontalAdvance("0" * (HexDumpModel.BYTES_PER_ROW * 3 + 1)) + 16)
+
+        self.main_layout.addLayout(self.header_layout)
+        self.main_layout.addWidget(self.dump_view)
+
+    # ------------------ API 기능 ------------------
+
+    def show_packet(self, summary, payload):
+        """요약 문자열과 페이로드(bytes/memoryview, 없으면 None)를 표시합니다."""
+        self.summary_label.setText(summary)
+        size = len(payload) if payload is not None else 0
+        self.size_label.setText(f"{size:,} bytes")
+        self.model.set_payload(payload)
+        self.dump_view.scrollToTop()
+        self.show()
+
+    def clear(self):
+        self.summary_label.setText("")
+        self.size_label.setText("")
+        self.model.set_payload(None)
@@ -0,0 +1,122 @@
+#1. 개요: 캡처된 패킷 페이로드를 검색하고 결과(히트) 목록을 보여주는 컴포넌트 위젯
+
+#2. 디자인:
+## 1) 상단: 검색 방식(HEX/ASCII/REGEX) 선택 + 검색어 입력 + 상태 표시
+## 2) 하단: 히트 목록 (패킷 번호, 페이로드 내 오프셋). 항목을 클릭하면 packet_selected 시그널로 패킷 번호를 알린다.
+
+#3. 구현:
+## 1) 검색은 UI 쓰레드가 아닌 별도 쓰레드에서 core.payload_index.PayloadIndex.search로 수행한다.
+## 2) 히트는 블록 단위로 시그널을 통해 UI 쓰레드로 전달되어 목록에 점진적으로 추가된다.
+## 3) 새 검색을 시작하면 이전 검색은 취소된다. (검색 세대 번호 비교)
+
+import threading
+import time
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QListWidgetItem
+from PySide6.QtCore import Qt, Signal
+
+from qfluentwidgets import ComboBox, SearchLineEdit, CaptionLabel, ListWidget
+
+from core.payload_index import SearchMode
+
+
+class PayloadSearchWidget(QWidget):
+    MAX_HITS = 10000
+
+    packet_selected = Signal(int)
+    # (검색 세대, 히트 목록) / (검색 세대, 총 히트 수, 소요 시간(초), 에러 메세지)
+    _hits_found = Signal(int, list)
+    _search_finished = Signal(int, int, float, str)
+
+    def __init__(self, payload_index, parent=None):
+        super().__init__(parent)
+        self.payload_index = payload_index
+        self._generation = 0
+        self._hit_count = 0
+
+        self._init_ui()
+        self._hits_found.connect(self._on_hits_found)
+        self._search_finished.connect(self._on_search_finished)
+
+    def _init_ui(self):
+        self.main_layout = QVBoxLayout(self)
+        self.main_layout.setContentsMargins(0, 0, 0, 0)
+
+        self.search_layout = QHBoxLayout()
+        self.mode_combo = ComboBox(self)
+        for mode in SearchMode:
+            self.mode_combo.addItem(mode.name, userData=mode)
+
+        self.search_edit = SearchLineEdit(self)
+        self.search_edit.setPlaceholderText("페이로드 검색 (HEX 예: 41 54 0D / ASCII 예: AT+ / 정규식)")
+        self.search_edit.setMinimumWidth(360)
+        self.search_edit.searchSignal.connect(self.start_search)
+        self.search_edit.returnPressed.connect(lambda: self.start_search(self.search_edit.text()))
+
+        self.status_label = CaptionLabel("", self)
+
+        self.search_layout.addWidget(self.mode_combo)
+        self.search_layout.addWidget(self.search_edit)
+        self.search_layout.addWidget(self.status_label)
+        self.search_layout.addStretch(1)
+
+        self.hit_list = ListWidget(self)
+        self.hit_list.setUniformItemSizes(True)
+        self.hit_list.itemClicked.connect(self._on_hit_clicked)
+
+        self.main_layout.addLayout(self.search_layout)
+        self.main_layout.addWidget(self.hit_list)
+
+    # ------------------ API 기능 ------------------
+
+    def start_search(self, text):
+        """검색을 백그라운드 쓰레드에서 시작합니다. 진행 중인 검색은 취소됩니다."""
+        self._generation += 1
+        self._hit_count = 0
+        self.hit_list.clear()
+        if not text:
+            self.status_label.setText("")
+            return
+
+        generation = self._generation
+        mode = self.mode_combo.currentData()
+        self.status_label.setText("검색 중...")
+        worker = threading.Thread(target=self._search_worker, args=(generation, text, mode), daemon=True)
+        worker.start()
+
+    # ------------------ 내부 처리 ------------------
+
+    def _search_worker(self, generation, text, mode):
+        started = time.perf_counter()
+        try:
+            total = self.payload_index.search(
+                text, mode,
+                on_hits=lambda hits: self._hits_found.emit(generation, hits),
+                is_cancelled=lambda: generation != self._generation,
+                max_hits=self.MAX_HITS,
+            )
+            self._search_finished.emit(generation, total, time.perf_counter() - started, "")
+        except ValueError as e:
+            self._search_finished.emit(generation, 0, time.perf_counter() - started, str(e))
+
+    def _on_hits_found(self, generation, hits):
+        if generation != self._generation:
+            return
+        self.hit_list.setUpdatesEnabled(False)
+        for packet_id, offset in hits:
+            item = QListWidgetItem(f"패킷 #{packet_id}  @ 오프셋 {offset}")
+            item.setData(Qt.ItemDataRole.UserRole, packet_id)
+            self.hit_list.addItem(item)
+        self.hit_list.setUpdatesEnabled(True)
+        self._hit_count += len(hits)
+        self.status_label.setText(f"검색 중... {self._hit_count}건")
+
+    def _on_search_finished(self, generation, total, elapsed, error):
+        if generation != self._generation:
+            return
+        if error:
+            self.status_label.setText(error)
+        else:
+            self.status_label.setText(f"{total}건 ({elapsed * 1000:.0f} ms)")
+
+    def _on_hit_clicked(self, item):
+        self.packet_selected.emit(item.data(Qt.ItemDataRole.UserRole))
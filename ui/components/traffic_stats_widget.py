@@ -0,0 +1,128 @@
+#1. 개요: 장치/엔드포인트별 트래픽 통계(core.traffic_stats)를 표로 보여주는 대시보드 컴포넌트 위젯
+
+#2. 디자인:
+## 1) 상단: 윈도우 길이와 전체 합계(pkt/s, KB/s) 한 줄
+## 2) 하단: 엔드포인트 한 행씩 "장치 | EP | 방향 | pkt/s | KB/s | 에러 | STALL | 누적 패킷 | 크기 분포" 표 (KB/s 내림차순)
+### - 크기 분포는 log2 구간별 패킷 수를 막대 문자(▁~█)로 표시하고, 툴팁에 구간별 개수를 보여준다.
+
+#3. 구현:
+## 1) REFRESH_MS 주기의 QTimer로 TrafficStats.snapshot()을 읽어 모델을 통째로 교체한다. (행 수 = 엔드포인트 수라 적음)
+### - 위젯이 보이지 않을 때는 snapshot()을 호출하지 않는다.
+## 2) 통계는 서비스가 필터/콘솔과 무관하게 집계하므로 콘솔을 멈추거나 필터로 모두 숨겨도 계속 갱신된다.
+
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QTableView, QHeaderView, QAbstractItemView
+from PySide6.QtCore import Qt, QTimer, QAbstractTableModel, QModelIndex
+
+from qfluentwidgets import CaptionLabel
+
+from core.traffic_stats import size_bin_label
+
+_BARS = "▁▂▃▄▅▆▇█"
+
+
+def _size_sparkline(sizes):
+    # 패킷이 있는 구간 범위만 막대로 표시 (0은 공백)
+    used = [index for index, count in enumerate(sizes) if count]
+    if not used:
+        return ""
+    peak = max(sizes)
+    return "".join(_BARS[(count * (len(_BARS) - 1)) // peak] if count else " "
+                   for count in sizes[used[0]:used[-1] + 1])
+
+
+class TrafficStatsModel(QAbstractTableModel):
+    HEADERS = ("Device", "EP", "Dir", "pkt/s", "KB/s", "Errors", "Stalls", "Total", "Sizes")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return f"{row['bus']}.{row['device']}"
+            if column == 1:
+                return f"0x{row['endpoint']:02X}"
+            if column == 2:
+                return "IN" if row['endpoint'] & 0x80 else "OUT"
+            if column == 3:
+                return f"{row['packets_per_sec']:,.0f}"
+            if column == 4:
+                return f"{row['bytes_per_sec'] / 1024:,.1f}"
+            if column == 5:
+                return f"{row['errors']:,}"
+            if column == 6:
+                return f"{row['stalls']:,}"
+            if column == 7:
+                return f"{row['total_packets']:,}"
+            return _size_sparkline(row['sizes'])
+        if role == Qt.ItemDataRole.ToolTipRole and column == 8:
+            return "\n".join(f"{size_bin_label(i)} B: {count:,}" for i, count in enumerate(row['sizes']) if count)
+        if role == Qt.ItemDataRole.TextAlignmentRole and 3 <= column <= 7:
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
+class TrafficStatsWidget(QWidget):
+    REFRESH_MS = 500
+
+    def __init__(self, traffic_stats, parent=None):
+        super().__init__(parent)
+        self.traffic_stats = traffic_stats
+        self._init_ui()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(self.REFRESH_MS)
+
+    def _init_ui(self):
+        self.main_layout = QVBoxLayout(self)
+        self.main_layout.setContentsMargins(0, 0, 0, 0)
+
+        self.summary_label = CaptionLabel("", self)
+
+        self.model = TrafficStatsModel(self)
+        self.table_view = QTableView(self)
+        self.table_view.setModel(self.model)
+        self.table_view.verticalHeader().hide()
+        self.table_view.horizontalHeader().setStretchLastSection(True)
+        self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.table_view.setShowGrid(False)
+        self.table_view.setWordWrap(False)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+
+        self.main_layout.addWidget(self.summary_label)
+        self.main_layout.addWidget(self.table_view)
+
+    def refresh(self):
+        if not self.isVisible():
+            return
+        rows = self.traffic_stats.snapshot()
+        self.model.set_rows(rows)
+        total_packets = sum(row['packets_per_sec'] for row in rows)
+        total_bytes = sum(row['bytes_per_sec'] for row in rows)
+        self.summary_label.setText(
+            f"최근 {self.traffic_stats.window_seconds:g}초 · 엔드포인트 {len(rows)}개"
+            f" · 합계 {total_packets:,.0f} pkt/s · {total_bytes / 1024:,.1f} KB/s"
+        )
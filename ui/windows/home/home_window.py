@@ -1,13 +1,43 @@
-from PySide6.QtCore import Qt
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout
-from qfluentwidgets import FluentWidget, FluentIcon as FIF, TitleLabel, ComboBox, PushButton, CheckBox
+from PySide6.QtCore import Qt, QTimer, Signal
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QFileDialog
+from qfluentwidgets import FluentWidget, FluentIcon as FIF, TitleLabel, ComboBox, PushButton, CheckBox, LineEdit
 
 # 기존에 작성하신 콘솔 위젯 임포트
 from ui.components.console_widget import ConsoleWidget
+from ui.components.payload_search_widget import PayloadSearchWidget
+from ui.components.metrics_status_bar import MetricsStatusBar
+from ui.components.traffic_stats_widget import TrafficStatsWidget
+from ui.components.latency_widget import LatencyWidget
+from ui.components.export_widget import ExportWidget
 # USB 캡처 서비스 임포트
 from core.usb_sniff_service import UsbSniffService, UsbFilter
+from core.stream_reassembler import DelimiterFramer, LengthPrefixFramer, IdleGapFramer
+from core.interface_discovery import InterfaceDiscovery, diff_interfaces
+from core.trigger import TriggerEngine, Trigger
 
 class HomeWindow(FluentWidget):
+    # 캡처 파일 재생 속도 (None: 최대 속도, 숫자: 원래 시간 간격의 배속)
+    REPLAY_SPEEDS = [("최대 속도", None), ("x1", 1.0), ("x2", 2.0), ("x10", 10.0)]
+    # 세션 아카이브 저장 폴더
+    ARCHIVE_DIR = "sessions"
+    # Serial 벌크 전송 재조립 방식 (None: 재조립 없이 URB마다 한 줄)
+    FRAMERS = [
+        ("프레이밍 없음", None),
+        ("CR/LF 구분", lambda: DelimiterFramer(b'\r\n', idle_timeout=0.5)),
+        ("LF 구분", lambda: DelimiterFramer(b'\n', idle_timeout=0.5)),
+        ("길이 접두(2B LE)", lambda: LengthPrefixFramer(2, 'little', idle_timeout=0.5)),
+        ("유휴 간격 20ms", lambda: IdleGapFramer(0.02)),
+    ]
+    # 트리거 발생 전후 구간(pcapng) 저장 폴더
+    TRIGGER_DIR = "triggers"
+    # 인터페이스 목록 주기 재조회 간격(ms) - 허브 연결/해제 반영 (캡처 중에는 건너뜀)
+    INTERFACE_REFRESH_MS = 60000
+
+    # 백그라운드 인터페이스 조회 결과 (목록, 에러 메세지) - 조회 쓰레드에서 UI 쓰레드로 전달
+    _interfaces_loaded = Signal(list, str)
+    # 캡처/재생이 스스로 끝남 - 캡처 쓰레드에서 UI 쓰레드로 전달
+    _capture_finished = Signal()
+
     def __init__(self):
         super().__init__()
         
@@ -33,10 +63,26 @@ class HomeWindow(FluentWidget):
         self.start_btn = PushButton(FIF.PLAY, "캡처 시작", self)
         self.stop_btn = PushButton(FIF.PAUSE, "캡처 중지", self)
         self.stop_btn.setEnabled(False) # 처음에는 중지 버튼 비활성화
+        self.refresh_btn = PushButton(FIF.SYNC, "새로고침", self)
+        self.stats_btn = PushButton(FIF.SPEED_HIGH, "트래픽 통계", self)
+        self.latency_btn = PushButton(FIF.STOP_WATCH, "지연 분석", self)
+        self.export_btn = PushButton(FIF.SAVE, "내보내기", self)
+
+        # 저장된 캡처 파일 재생 (배속 선택)
+        self.open_btn = PushButton(FIF.FOLDER, "캡처 파일 열기", self)
+        self.speed_combo = ComboBox(self)
+        for label, speed in self.REPLAY_SPEEDS:
+            self.speed_combo.addItem(label, userData=speed)
         
         self.control_layout.addWidget(self.interface_combo)
+        self.control_layout.addWidget(self.refresh_btn)
         self.control_layout.addWidget(self.start_btn)
         self.control_layout.addWidget(self.stop_btn)
+        self.control_layout.addWidget(self.open_btn)
+        self.control_layout.addWidget(self.speed_combo)
+        self.control_layout.addWidget(self.stats_btn)
+        self.control_layout.addWidget(self.latency_btn)
+        self.control_layout.addWidget(self.export_btn)
         self.control_layout.addStretch(1) # 우측 여백 확보
         
         # 컨트롤 패널에 필터 체크박스 추가
@@ -44,14 +90,40 @@ class HomeWindow(FluentWidget):
         self.cb_hid = CheckBox("HID", self)
         self.cb_serial = CheckBox("Serial", self)
         self.cb_storage = CheckBox("Storage", self)
+        self.cb_archive = CheckBox("세션 저장", self)
+        self.framer_combo = ComboBox(self)
+        for label, factory in self.FRAMERS:
+            self.framer_combo.addItem(label, userData=factory)
         
         self.filter_layout.addWidget(self.cb_hid)
         self.filter_layout.addWidget(self.cb_serial)
+        self.filter_layout.addWidget(self.framer_combo)
         self.filter_layout.addWidget(self.cb_storage)
+        self.filter_layout.addWidget(self.cb_archive)
         self.filter_layout.addStretch(1)
+
+        # 소스 단계 패킷 필터 식 (Enter로 캡처 중에도 바로 적용)
+        self.packet_filter_edit = LineEdit(self)
+        self.packet_filter_edit.setPlaceholderText('패킷 필터 (예: dir == in and ep == 0x81 and data startswith "AT")')
+        self.packet_filter_edit.setClearButtonEnabled(True)
+        self.packet_filter_edit.setMinimumWidth(400)
+        self.packet_filter_edit.returnPressed.connect(self.apply_packet_filter)
+        self.filter_layout.addWidget(self.packet_filter_edit)
         
+        # 트리거: 패턴(쉼표 구분)과 조건(패킷 필터 식) - 발생 시 전후 패킷을 pcapng로 저장하고 콘솔에 알림
+        self.trigger_layout = QHBoxLayout()
+        self.trigger_edit = LineEdit(self)
+        self.trigger_edit.setPlaceholderText('트리거 패턴 (쉼표 구분, 예: ERROR, "RST", 0d:0a:ff)')
+        self.trigger_edit.setClearButtonEnabled(True)
+        self.trigger_condition_edit = LineEdit(self)
+        self.trigger_condition_edit.setPlaceholderText('트리거 조건 (예: dir == in and ep == 0x81)')
+        self.trigger_condition_edit.setClearButtonEnabled(True)
+        self.trigger_layout.addWidget(self.trigger_edit, 1)
+        self.trigger_layout.addWidget(self.trigger_condition_edit, 1)
+
         # 레이아웃에 추가
         self.main_layout.addLayout(self.filter_layout)
+        self.main_layout.addLayout(self.trigger_layout)
         self.main_layout.addLayout(self.control_layout)
 
         # 콘솔 위젯 추가
@@ -64,24 +136,125 @@ class HomeWindow(FluentWidget):
         # 1. USB Sniff Service 초기화 및 콘솔 연결
         self.sniffer = UsbSniffService()
         self.sniffer.set_console_widget(self.console)
+        self.sniffer.on_capture_finished = self._capture_finished.emit
+        self._capture_finished.connect(self._on_capture_finished)
+
+        # 페이로드 검색 패널 (히트 클릭 시 콘솔의 해당 패킷으로 이동)
+        self.search_panel = PayloadSearchWidget(self.sniffer.payload_index, self)
+        self.search_panel.setMaximumHeight(180)
+        self.search_panel.packet_selected.connect(self.jump_to_packet)
+        self.main_layout.addWidget(self.search_panel)
+
+        # 장치/엔드포인트별 트래픽 통계 대시보드 (버튼으로 표시/숨김, 숨기면 갱신하지 않음)
+        self.stats_panel = TrafficStatsWidget(self.sniffer.traffic_stats, self)
+        self.stats_panel.setMaximumHeight(220)
+        self.stats_panel.hide()
+        self.main_layout.addWidget(self.stats_panel)
+
+        # 요청/응답 지연 분포 (URB 제출→완료, TX→RX, 패킷 간격 - 버튼으로 표시/숨김)
+        self.latency_panel = LatencyWidget(self.sniffer.latency, self)
+        self.latency_panel.setMaximumHeight(220)
+        self.latency_panel.hide()
+        self.main_layout.addWidget(self.latency_panel)
+
+        # 세션 아카이브 내보내기 (CSV/JSONL/pcapng, 백그라운드 쓰레드 + 진행률)
+        self.export_panel = ExportWidget(self.ARCHIVE_DIR, self)
+        self.export_panel.hide()
+        self.main_layout.addWidget(self.export_panel)
+
+        # 하단 상태 표시줄 (처리량/지연/큐 깊이 지표)
+        self.status_bar = MetricsStatusBar(self)
+        self.main_layout.addWidget(self.status_bar)
         
-        # 2. 인터페이스 목록 불러오기
+        # 2. 인터페이스 목록 불러오기 (캐시로 바로 채우고 tshark 조회는 백그라운드에서)
+        self._interfaces = []
+        self.interface_discovery = InterfaceDiscovery(self.sniffer.get_interfaces, key=self.sniffer.tshark_path)
+        self._interfaces_loaded.connect(self._apply_interfaces)
         self.load_interfaces()
+        self.interface_refresh_timer = QTimer(self)
+        self.interface_refresh_timer.timeout.connect(self.refresh_interfaces)
+        self.interface_refresh_timer.start(self.INTERFACE_REFRESH_MS)
         
         # 3. 버튼 이벤트 연결
+        self.refresh_btn.clicked.connect(self.refresh_interfaces)
         self.start_btn.clicked.connect(self.start_capture)
         self.stop_btn.clicked.connect(self.stop_capture)
+        self.open_btn.clicked.connect(self.open_capture_file)
+        self.stats_btn.clicked.connect(self.toggle_stats_panel)
+        self.latency_btn.clicked.connect(self.toggle_latency_panel)
+        self.export_btn.clicked.connect(self.toggle_export_panel)
+
+    def toggle_stats_panel(self):
+        self.stats_panel.setVisible(not self.stats_panel.isVisible())
+        if self.stats_panel.isVisible():
+            self.stats_panel.refresh()
+
+    def toggle_latency_panel(self):
+        self.latency_panel.setVisible(not self.latency_panel.isVisible())
+        if self.latency_panel.isVisible():
+            self.latency_panel.refresh()
+
+    def toggle_export_panel(self):
+        self.export_panel.setVisible(not self.export_panel.isVisible())
 
     def load_interfaces(self):
-        """tshark를 통해 사용 가능한 USBPcap 인터페이스 목록을 로드하여 콤보박스에 추가합니다."""
-        try:
-            interfaces = self.sniffer.get_interfaces()
-            for full_name, short_name in interfaces:
-                # 콤보박스에는 전체 이름을 보여주고, 내부 데이터로 short_name을 저장합니다.
-                self.interface_combo.addItem(full_name, userData=short_name)
-        except Exception as e:
+        """캐시된 인터페이스 목록으로 콤보박스를 바로 채우고, 캐시가 없거나 오래되었으면 백그라운드 조회를 시작합니다."""
+        cached, fresh = self.interface_discovery.load_cache()
+        if cached:
+            self._apply_interfaces(cached, "")
+        if not fresh:
+            self.refresh_interfaces()
+
+    def refresh_interfaces(self):
+        """tshark로 인터페이스 목록을 백그라운드에서 다시 조회합니다. (캡처 중이거나 이미 조회 중이면 건너뜀)"""
+        if self.sniffer.is_capturing:
+            return
+        if self.interface_discovery.refresh_async(
+                lambda interfaces, error: self._interfaces_loaded.emit(interfaces, str(error) if error else "")):
+            self.refresh_btn.setEnabled(False)
+            if not self._interfaces:
+                self.interface_combo.setPlaceholderText("USB 인터페이스 목록을 불러오는 중...")
+
+    def _apply_interfaces(self, interfaces, error):
+        """새 목록과 현재 목록의 차이만 콤보박스에 반영합니다. (선택 항목 유지)"""
+        self.refresh_btn.setEnabled(True)
+        self.interface_combo.setPlaceholderText("캡처할 USB 인터페이스를 선택하세요")
+        if error:
+            from ui.components.console_widget import MsgType
+            self.console.add_message(MsgType.ERROR, f"인터페이스 로드 실패: {error}")
+            return
+
+        added, removed = diff_interfaces(self._interfaces, interfaces)
+        if not added and not removed:
+            return
+        was_all = isinstance(self.interface_combo.currentData(), list)
+
+        # 여러 루트 허브 동시 캡처 항목은 구성이 바뀌므로 지우고 마지막에 다시 추가
+        for index in reversed(range(self.interface_combo.count())):
+            if isinstance(self.interface_combo.itemData(index), list):
+                self.interface_combo.removeItem(index)
+        for _, short_name in removed:
+            index = self.interface_combo.findData(short_name)
+            if index >= 0:
+                self.interface_combo.removeItem(index)
+        for full_name, short_name in added:
+            # 콤보박스에는 전체 이름을 보여주고, 내부 데이터로 short_name을 저장합니다.
+            self.interface_combo.addItem(full_name, userData=short_name)
+        if len(interfaces) > 1:
+            # 여러 루트 허브를 동시에 캡처 (인터페이스별 세션을 타임스탬프 순서로 병합)
+            self.interface_combo.addItem(f"모든 USBPcap 인터페이스 동시 캡처 ({len(interfaces)}개)",
+                                         userData=[short_name for _, short_name in interfaces])
+            if was_all:
+                self.interface_combo.setCurrentIndex(self.interface_combo.count() - 1)
+
+        if self._interfaces:
+            # 처음 채울 때가 아니면 허브 연결/해제를 콘솔에 알림
             from ui.components.console_widget import MsgType
-            self.console.add_message(MsgType.ERROR, f"인터페이스 로드 실패: {str(e)}")
+            for full_name, _ in added:
+                self.console.add_message(MsgType.INFO, f"USB 인터페이스 추가됨: {full_name}")
+            for full_name, _ in removed:
+                self.console.add_message(MsgType.WARNING, f"USB 인터페이스 제거됨: {full_name}")
+        self._interfaces = list(interfaces)
 
     def start_capture(self):
         """선택된 인터페이스로 패킷 캡처를 시작합니다."""
@@ -92,6 +265,63 @@ class HomeWindow(FluentWidget):
             self.console.add_message(MsgType.WARNING, "캡처할 인터페이스를 먼저 선택해주세요.")
             return
 
+        if not self.apply_packet_filter():
+            return
+        trigger_engine = self._build_trigger_engine()
+        if trigger_engine is False:
+            return
+
+        archive_dir = self.ARCHIVE_DIR if self.cb_archive.isChecked() else None
+        self.sniffer.start_capture(selected_interface, self._selected_filters(), archive_dir=archive_dir,
+                                   framer=self._selected_framer(), packet_filter=self.packet_filter_edit.text(),
+                                   trigger_engine=trigger_engine)
+        self._set_capturing_ui(True)
+
+    def open_capture_file(self):
+        """저장된 .pcap/.pcapng 파일을 선택하여 콘솔로 재생합니다."""
+        path, _ = QFileDialog.getOpenFileName(self, "캡처 파일 열기", "", "Capture Files (*.pcap *.pcapng);;All Files (*)")
+        if not path or not self.apply_packet_filter():
+            return
+        trigger_engine = self._build_trigger_engine()
+        if trigger_engine is False:
+            return
+
+        self.sniffer.load_capture(path, self._selected_filters(), self.speed_combo.currentData(),
+                                  framer=self._selected_framer(), packet_filter=self.packet_filter_edit.text(),
+                                  trigger_engine=trigger_engine)
+        self._set_capturing_ui(True)
+
+    def apply_packet_filter(self):
+        """입력된 패킷 필터 식을 서비스에 적용합니다. 문법 오류면 콘솔에 알리고 False를 반환합니다."""
+        try:
+            self.sniffer.set_packet_filter(self.packet_filter_edit.text())
+        except ValueError as e:
+            from ui.components.console_widget import MsgType
+            self.console.add_message(MsgType.ERROR, f"패킷 필터 오류: {e}")
+            return False
+        return True
+
+    def _build_trigger_engine(self):
+        """트리거 입력으로 TriggerEngine을 만듭니다. 입력이 없으면 None, 오류면 콘솔에 알리고 False."""
+        patterns = [pattern for pattern in self.trigger_edit.text().split(',') if pattern.strip()]
+        condition = self.trigger_condition_edit.text().strip() or None
+        if not patterns and condition is None:
+            return None
+        try:
+            trigger = Trigger(self.trigger_edit.text().strip() or condition, patterns=patterns, condition=condition)
+        except ValueError as e:
+            from ui.components.console_widget import MsgType
+            self.console.add_message(MsgType.ERROR, f"트리거 설정 오류: {e}")
+            return False
+        return TriggerEngine([trigger], self.TRIGGER_DIR)
+
+    def jump_to_packet(self, packet_id):
+        """검색 결과로 선택된 패킷을 콘솔에서 찾아 스크롤합니다."""
+        if not self.console.scroll_to_packet(packet_id):
+            from ui.components.console_widget import MsgType
+            self.console.add_message(MsgType.WARNING, f"패킷 #{packet_id}은(는) 콘솔에 없습니다. (오래되어 삭제되었거나 필터로 숨겨짐)")
+
+    def _selected_filters(self):
         # 선택된 필터 수집
         active_filters = []
         if self.cb_hid.isChecked(): active_filters.append(UsbFilter.HID)
@@ -100,25 +330,39 @@ class HomeWindow(FluentWidget):
         
         if not active_filters:
             active_filters = [UsbFilter.ALL] # 아무것도 선택 안하면 전체 캡처
+        return active_filters
 
-        self.sniffer.start_capture(selected_interface, active_filters)
-        
+    def _selected_framer(self):
+        factory = self.framer_combo.currentData()
+        return factory() if factory else None
+
+    def _set_capturing_ui(self, capturing):
         # UI 상태 업데이트
-        self.start_btn.setEnabled(False)
-        self.stop_btn.setEnabled(True)
-        self.interface_combo.setEnabled(False)
+        self.start_btn.setEnabled(not capturing)
+        self.open_btn.setEnabled(not capturing)
+        self.stop_btn.setEnabled(capturing)
+        self.interface_combo.setEnabled(not capturing)
+        self.refresh_btn.setEnabled(not capturing and not self.interface_discovery.is_refreshing)
+        self.framer_combo.setEnabled(not capturing)
+        self.trigger_edit.setEnabled(not capturing)
+        self.trigger_condition_edit.setEnabled(not capturing)
+
+    def _on_capture_finished(self):
+        # 중지 직후 새 캡처를 시작했다면 이전 캡처의 종료 알림은 무시
+        if not self.sniffer.is_capturing:
+            self._set_capturing_ui(False)
 
     def stop_capture(self):
         """패킷 캡처를 중지합니다."""
         self.sniffer.stop_capture()
         
         # UI 상태 복구
-        self.start_btn.setEnabled(True)
-        self.stop_btn.setEnabled(False)
-        self.interface_combo.setEnabled(True)
+        self._set_capturing_ui(False)
 
     def closeEvent(self, event):
         """프로그램 종료 시 백그라운드에 tshark 프로세스가 남지 않도록 안전하게 종료합니다."""
+        self.sniffer.on_capture_finished = None
         if self.sniffer.is_capturing:
             self.sniffer.stop_capture()
+        self.export_panel.cancel_export()
         super().closeEvent(event)
\ No newline at end of file